@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+认证微服务客户端连接复用压测
+
+在独立进程中用uvicorn启动一个桩认证服务（/auth/phone/verify、/auth/wechat/login、
+/auth/system/public-key），模拟登录高峰：大量并发的手机验证码登录请求。
+桩服务按客户端地址统计建立过的TCP连接数（通过/_stats读取），用来对比三种写法：
+
+- per_call：每次请求新建一个httpx.AsyncClient（改造前健康检查/公钥路径的写法）
+- shared_keepalive5：共享客户端，但最多只保持5条空闲连接（改造前的连接池配置）
+- shared：共享客户端，保持连接数与最大连接数一致（当前的get_auth_http_client）
+
+每个场景输出吞吐（请求/秒）、p50/p99延迟和桩服务看到的新建连接数。
+桩服务为每个请求加一点固定处理延迟（--server-delay），让并发请求真正重叠。
+
+注意：uvicorn不支持HTTP/2，明文http下httpx也不会协商h2，这里衡量的是HTTP/1.1长连接复用；
+对HTTPS部署的认证服务，共享客户端会在同一批连接上走HTTP/2多路复用。
+
+用法：
+    uv run python scripts/benchmark_auth_client.py --requests 2000 --concurrency 50
+
+作者：TaKeKe团队
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api.config import config  # noqa: E402
+from src.services.auth.client import AuthMicroserviceClient  # noqa: E402
+from src.services.http_client_registry import close_http_clients, get_http_client_registry  # noqa: E402
+
+
+def build_stub_auth_server(delay: float) -> FastAPI:
+    """桩认证服务：记录每个请求的客户端地址（同一TCP连接的端口相同）"""
+    app = FastAPI()
+    connections = set()
+
+    def token_response() -> Dict:
+        return {"code": 200, "message": "ok", "data": {"access_token": "a", "refresh_token": "r", "user_id": "u"}}
+
+    @app.post("/auth/phone/verify")
+    async def phone_verify(request: Request):
+        connections.add(request.client)
+        await asyncio.sleep(delay)
+        return token_response()
+
+    @app.post("/auth/wechat/login")
+    async def wechat_login(request: Request):
+        connections.add(request.client)
+        await asyncio.sleep(delay)
+        return token_response()
+
+    @app.get("/auth/system/public-key")
+    async def public_key(request: Request):
+        connections.add(request.client)
+        return {"code": 200, "message": "ok", "data": {"public_key": "", "algorithm": "HS256"}}
+
+    @app.post("/_stats/reset")
+    async def reset_stats():
+        connections.clear()
+        return {"ok": True}
+
+    @app.get("/_stats")
+    async def stats():
+        return {"connections": len(connections)}
+
+    return app
+
+
+def serve_stub_auth_server(port: int, delay: float) -> None:
+    """在子进程中运行桩认证服务"""
+    uvicorn.run(
+        build_stub_auth_server(delay),
+        host="127.0.0.1",
+        port=port,
+        log_level="warning",
+        backlog=4096
+    )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_load(
+    send: Callable[[int], Awaitable[None]],
+    requests: int,
+    concurrency: int
+) -> Dict[str, float]:
+    """并发发起请求，返回吞吐与延迟"""
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await send(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="认证微服务客户端连接复用压测")
+    parser.add_argument("--requests", type=int, default=2000, help="每个场景的登录请求数")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发请求数")
+    parser.add_argument("--server-delay", type=float, default=0.002, help="桩服务每个请求的处理时间（秒）")
+    args = parser.parse_args()
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = multiprocessing.Process(target=serve_stub_auth_server, args=(port, args.server_delay), daemon=True)
+    server.start()
+    # 独立的统计客户端（/_stats不记录连接）
+    stats_client = httpx.AsyncClient(base_url=base_url)
+    while True:
+        try:
+            await stats_client.get("/_stats")
+            break
+        except httpx.TransportError:
+            await asyncio.sleep(0.05)
+
+    payload = {"phone": "13800000000", "code": "123456", "scene": "login", "project": config.project}
+
+    async def per_call(i: int) -> None:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(f"{base_url}/auth/phone/verify", json=payload)
+            response.raise_for_status()
+
+    keepalive5 = get_http_client_registry().get_client(
+        "auth_keepalive5",
+        timeout=httpx.Timeout(30.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=5, keepalive_expiry=30.0),
+        http2=True
+    )
+
+    async def shared_keepalive5(i: int) -> None:
+        response = await keepalive5.post(f"{base_url}/auth/phone/verify", json=payload)
+        response.raise_for_status()
+
+    auth_client = AuthMicroserviceClient(base_url=base_url)
+
+    async def shared(i: int) -> None:
+        await auth_client.phone_verify("13800000000", "123456", "login")
+
+    scenarios = [("per_call", per_call), ("shared_keepalive5", shared_keepalive5), ("shared", shared)]
+    rows = []
+    try:
+        for name, send in scenarios:
+            # 预热（shared场景即启动时的公钥预取）
+            if name == "shared":
+                await auth_client.get_public_key()
+            await run_load(send, args.concurrency, args.concurrency)
+
+            await stats_client.post("/_stats/reset")
+            result = await run_load(send, args.requests, args.concurrency)
+            new_connections = (await stats_client.get("/_stats")).json()["connections"]
+            rows.append((name, result, new_connections))
+    finally:
+        await close_http_clients()
+        await stats_client.aclose()
+        server.terminate()
+        server.join()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} server_delay={args.server_delay * 1000:.1f}ms")
+    print(f"{'scenario':<20}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'new conns':>12}")
+    for name, result, conns in rows:
+        print(f"{name:<20}{result['rps']:10.0f}{result['p50_ms']:10.2f}{result['p99_ms']:10.2f}{conns:12d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
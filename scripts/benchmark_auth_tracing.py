@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+认证路径追踪基准测试
+
+通过一个最小的FastAPI应用（路由依赖中调用JWTValidator.validate_token），
+用httpx的ASGI传输在进程内发起认证请求，对比不同追踪配置下的每秒请求数：
+- off：采样率0，追踪完全关闭
+- sampled：默认采样率（1%），DEBUG日志开启
+- full：采样率100%，DEBUG日志开启
+
+日志输出到NullHandler，只衡量追踪本身的开销。
+cache-hit模式所有请求使用同一个令牌；cache-miss模式每个请求使用不同令牌（走验签路径）。
+
+用法：
+    uv run python scripts/benchmark_auth_tracing.py --requests 5000
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock
+
+import httpx
+import jwt
+from fastapi import Depends, FastAPI, Header
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.auth.jwt_validator import JWTValidator  # noqa: E402
+from src.services.auth.tracing import AuthTracer  # noqa: E402
+
+
+SECRET = "benchmark-secret-with-at-least-32-bytes"
+
+
+def make_tokens(count: int) -> List[str]:
+    """生成测试令牌"""
+    now = datetime.now(timezone.utc)
+    return [
+        jwt.encode(
+            {
+                "sub": f"user-{i}",
+                "iat": int(now.timestamp()),
+                "exp": int((now + timedelta(hours=1)).timestamp())
+            },
+            SECRET,
+            algorithm="HS256"
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(validator: JWTValidator) -> FastAPI:
+    """构造只有一个认证路由的应用"""
+    app = FastAPI()
+
+    async def current_user(authorization: str = Header(...)) -> str:
+        result = await validator.validate_token(authorization.split(" ", 1)[1])
+        return result.user_info.user_id
+
+    @app.get("/me")
+    async def me(user_id: str = Depends(current_user)):
+        return {"user_id": user_id}
+
+    return app
+
+
+def build_validator(sample_rate: float) -> JWTValidator:
+    validator = JWTValidator(auth_client=MagicMock(), user_cache_max_size=100000)
+    validator.tracer = AuthTracer(sample_rate=sample_rate)
+
+    async def key_info(kid=None):
+        return SECRET, "HS256", True
+
+    validator._get_public_key_info = key_info
+    return validator
+
+
+async def run_scenario(sample_rate: float, tokens: List[str], requests: int, concurrency: int) -> float:
+    validator = build_validator(sample_rate)
+    transport = httpx.ASGITransport(app=build_app(validator))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 预热
+        await client.get("/me", headers={"Authorization": f"Bearer {tokens[0]}"})
+
+        counter = iter(range(requests))
+
+        async def worker():
+            for i in counter:
+                token = tokens[i % len(tokens)]
+                response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="认证路径追踪开销基准测试")
+    parser.add_argument("--requests", type=int, default=5000, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发请求数")
+    args = parser.parse_args()
+
+    trace_logger = logging.getLogger("src.services.auth.trace")
+    trace_logger.addHandler(logging.NullHandler())
+    trace_logger.propagate = False
+    trace_logger.setLevel(logging.DEBUG)
+
+    hit_tokens = make_tokens(1)
+    miss_tokens = make_tokens(args.requests + 1)
+
+    for mode, tokens in (("cache-hit", hit_tokens), ("cache-miss", miss_tokens)):
+        for name, sample_rate in (("off", 0.0), ("sampled", 0.01), ("full", 1.0)):
+            rps = await run_scenario(sample_rate, tokens, args.requests, args.concurrency)
+            print(f"{mode:<10} tracing={name:<8} {rps:10.1f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
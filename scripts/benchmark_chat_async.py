@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+异步聊天流程并发基准测试
+
+在独立进程中用uvicorn启动一个假的OpenAI兼容服务，每次补全固定等待--latency秒，
+模拟LLM网络延迟。在同一个事件循环中同时发起--turns轮对话，对比：
+
+- to_thread：改造前异步路由调用同步接口的方式，asyncio.to_thread(send_message)，
+  并发受线程池和检查点器连接池大小限制
+- async：ChatService.asend_message()，AsyncSqliteSaver + ainvoke，等待LLM时让出事件循环
+
+同时用一个每10ms醒来一次的协程测量事件循环的最大延迟（越小越好）。
+数据库放在临时目录。
+
+用法：
+    uv run python scripts/benchmark_chat_async.py --turns 200 --latency 0.2
+
+作者：TaKeKe团队
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, List, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+# 聊天数据库路径在导入时读取，必须在导入src之前设置
+_tmp_dir = tempfile.mkdtemp(prefix="chat_async_bench_")
+os.environ["CHAT_DB_PATH"] = os.path.join(_tmp_dir, "chat.db")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.domains.chat.database import chat_db_manager  # noqa: E402
+from src.domains.chat.graph import reset_chat_model  # noqa: E402
+from src.domains.chat.service import ChatService  # noqa: E402
+
+
+def build_fake_llm_server(latency: float) -> FastAPI:
+    """假的OpenAI兼容服务：等待latency秒后返回固定回复"""
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions():
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "fake-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "好的。"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }
+
+    return app
+
+
+def serve_fake_llm_server(port: int, latency: float) -> None:
+    """在子进程中运行假LLM服务"""
+    uvicorn.run(build_fake_llm_server(latency), host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(base_url: str) -> None:
+    while True:
+        try:
+            httpx.post(f"{base_url}/chat/completions", json={})
+            return
+        except httpx.TransportError:
+            time.sleep(0.05)
+
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    """每10ms醒来一次，返回实际唤醒时间比预期晚的最大值（秒）"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def run(
+    send: Callable[[str, str], Awaitable[dict]],
+    sessions: List[Tuple[str, str]]
+) -> Tuple[float, float]:
+    """并发发送，返回（总耗时，事件循环最大延迟）"""
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(send(user_id, session_id) for user_id, session_id in sessions))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    lag = await lag_task
+    assert all(result["ai_response"] == "好的。" for result in results)
+    return elapsed, lag
+
+
+async def bench(turns: int) -> List[Tuple[str, float, float]]:
+    service = ChatService()
+
+    async def new_sessions() -> List[Tuple[str, str]]:
+        sessions = []
+        for _ in range(turns):
+            user_id = str(uuid.uuid4())
+            sessions.append((user_id, (await service.acreate_session(user_id, "benchmark"))["session_id"]))
+        return sessions
+
+    async def send_to_thread(user_id: str, session_id: str) -> dict:
+        return await asyncio.to_thread(service.send_message, user_id, session_id, "你好")
+
+    async def send_async(user_id: str, session_id: str) -> dict:
+        return await service.asend_message(user_id, session_id, "你好")
+
+    # 预热：建立连接、编译图、创建模型客户端
+    await run(send_async, await new_sessions())
+    await run(send_to_thread, (await new_sessions())[:4])
+
+    rows = []
+    for name, send in (("to_thread", send_to_thread), ("async", send_async)):
+        elapsed, lag = await run(send, await new_sessions())
+        rows.append((name, elapsed, lag))
+
+    await chat_db_manager.close_async_checkpointer()
+    chat_db_manager.close_checkpointer_pool()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="异步聊天流程并发基准测试")
+    parser.add_argument("--turns", type=int, default=200, help="同时发起的对话轮数")
+    parser.add_argument("--latency", type=float, default=0.2, help="假LLM每次补全的延迟（秒）")
+    args = parser.parse_args()
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}/v1"
+    server = multiprocessing.Process(target=serve_fake_llm_server, args=(port, args.latency), daemon=True)
+    server.start()
+
+    os.environ["OPENAI_API_KEY"] = "sk-bench"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_MODEL"] = "fake-model"
+    reset_chat_model()
+
+    try:
+        _wait_for_server(base_url)
+        rows = asyncio.run(bench(args.turns))
+    finally:
+        server.terminate()
+        server.join()
+
+    print(f"turns={args.turns} llm_latency={args.latency}s fake LLM @ {base_url}")
+    print(f"{'scenario':<12}{'wall s':>10}{'turns/s':>10}{'max loop lag ms':>18}")
+    for name, elapsed, lag in rows:
+        print(f"{name:<12}{elapsed:10.2f}{args.turns / elapsed:10.1f}{lag * 1000:18.1f}")
+
+
+if __name__ == "__main__":
+    main()
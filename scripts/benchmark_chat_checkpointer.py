@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+聊天检查点器连接池基准测试
+
+对比ChatService发送消息的两种方式（吞吐：消息/秒）：
+
+- per_call：改造前的写法，每条消息都SqliteSaver.from_conn_string()新建连接、建表，
+  再create_chat_graph()重新编译图后invoke
+- pooled：当前的ChatService.send_message()，从进程级连接池借用检查点器和已编译的图
+
+模型替换为固定回复的假模型（不衡量LLM本身），数据库放在临时目录。
+每个会话发送--turns条消息后换新会话，避免会话历史越来越长掩盖每次调用的固定开销。
+除单线程外，还用多个线程并发发送，验证连接池在多线程下的表现。
+
+用法：
+    uv run python scripts/benchmark_chat_checkpointer.py --messages 300 --threads 4 --turns 10
+
+作者：TaKeKe团队
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+# 聊天数据库路径在导入时读取，必须在导入src之前设置
+_tmp_dir = tempfile.mkdtemp(prefix="chat_bench_")
+os.environ["CHAT_DB_PATH"] = os.path.join(_tmp_dir, "chat.db")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from unittest.mock import patch  # noqa: E402
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel  # noqa: E402
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langgraph.checkpoint.sqlite import SqliteSaver  # noqa: E402
+
+from src.domains.chat.database import chat_db_manager, get_chat_database_path  # noqa: E402
+from src.domains.chat.graph import ChatGraph, create_chat_graph  # noqa: E402
+from src.domains.chat.service import ChatService  # noqa: E402
+
+
+FAKE_MODEL = FakeListChatModel(responses=["好的，已经记下了。"])
+
+
+def send_per_call(service: ChatService, user_id: str, session_id: str, message: str) -> None:
+    """改造前：每条消息新建连接并重新编译图"""
+    config = service._create_runnable_config(user_id, session_id)
+    with SqliteSaver.from_conn_string(get_chat_database_path()) as checkpointer:
+        graph = create_chat_graph(checkpointer, service._store)
+        graph.graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+
+
+def send_pooled(service: ChatService, user_id: str, session_id: str, message: str) -> None:
+    """当前：连接池 + 缓存的已编译图"""
+    service.send_message(user_id, session_id, message)
+
+
+def run(
+    service: ChatService,
+    send: Callable[[ChatService, str, str, str], None],
+    messages: int,
+    threads: int,
+    turns: int
+) -> float:
+    """每个会话发送turns条消息，返回消息/秒（不含创建会话的时间）"""
+    per_thread = messages // threads
+    sessions: List[List[tuple]] = []
+    for _ in range(threads):
+        thread_sessions = []
+        for _ in range((per_thread + turns - 1) // turns):
+            user_id = str(uuid.uuid4())
+            thread_sessions.append((user_id, service.create_session(user_id, "benchmark")["session_id"]))
+        sessions.append(thread_sessions)
+
+    def worker(index: int) -> None:
+        for i in range(per_thread):
+            user_id, session_id = sessions[index][i // turns]
+            send(service, user_id, session_id, f"消息{i}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="聊天检查点器连接池基准测试")
+    parser.add_argument("--messages", type=int, default=300, help="每个场景发送的消息数")
+    parser.add_argument("--threads", type=int, default=4, help="并发场景的线程数")
+    parser.add_argument("--turns", type=int, default=10, help="每个会话的消息数")
+    args = parser.parse_args()
+
+    with patch.object(ChatGraph, "_get_model", lambda self: FAKE_MODEL):
+        service = ChatService()
+        # 预热：创建连接池并编译图
+        run(service, send_pooled, args.threads, args.threads, args.turns)
+
+        rows = []
+        for threads in (1, args.threads):
+            before = run(service, send_per_call, args.messages, threads, args.turns)
+            after = run(service, send_pooled, args.messages, threads, args.turns)
+            rows.append((threads, before, after))
+
+    print(f"db={get_chat_database_path()} messages={args.messages} turns/session={args.turns}")
+    print(f"{'threads':<10}{'per_call msg/s':>16}{'pooled msg/s':>16}{'speedup':>10}")
+    for threads, before, after in rows:
+        print(f"{threads:<10}{before:16.1f}{after:16.1f}{after / before:9.1f}x")
+    print(f"pool: {chat_db_manager.get_checkpointer_pool().get_stats()}")
+    chat_db_manager.close_checkpointer_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+会话列表查询基准测试
+
+在临时数据库中为--users个用户各创建--sessions个会话，每个会话写入--checkpoints个检查点
+（通过CatalogSqliteSaver写入，目录随之维护），然后对比查询一个用户会话列表的耗时：
+
+- scan：改造前的做法，对checkpoints按thread_id做GROUP BY取最新检查点，
+  逐行解析元数据JSON过滤用户，再为每个匹配的会话单独COUNT
+- catalog：ChatService.list_sessions()，对会话目录做一次(user_id, updated_at)索引范围扫描
+
+用法：
+    uv run python scripts/benchmark_chat_list_sessions.py --users 200 --sessions 20 --checkpoints 6
+
+作者：TaKeKe团队
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List
+
+# 聊天数据库路径在导入时读取，必须在导入src之前设置
+_tmp_dir = tempfile.mkdtemp(prefix="chat_list_bench_")
+os.environ["CHAT_DB_PATH"] = os.path.join(_tmp_dir, "chat.db")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.domains.chat.database import chat_db_manager  # noqa: E402
+from src.domains.chat.service import ChatService  # noqa: E402
+
+
+def populate(service: ChatService, users: int, sessions: int, checkpoints: int) -> List[str]:
+    """写入测试数据，返回用户ID列表"""
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    with chat_db_manager.get_checkpointer_pool().acquire() as slot:
+        saver = slot.checkpointer
+        for user_id in user_ids:
+            for index in range(sessions):
+                session_id = str(uuid.uuid4())
+                config, checkpoint, metadata = service._build_session_checkpoint(
+                    saver, user_id, session_id, f"会话{index}"
+                )
+                config = saver.put(config, checkpoint, metadata, {})
+                for step in range(1, checkpoints):
+                    config, checkpoint, _ = service._build_session_checkpoint(saver, user_id, session_id, "")
+                    config = saver.put(
+                        config, checkpoint, {"user_id": user_id, "source": "loop", "step": step}, {}
+                    )
+    return user_ids
+
+
+def list_by_scan(db_path: str, user_id: str, limit: int) -> int:
+    """改造前的查询方式"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT thread_id, checkpoint_id, metadata FROM checkpoints
+            WHERE (thread_id, checkpoint_id) IN (
+                SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id
+            )
+            ORDER BY thread_id DESC
+            """
+        ).fetchall()
+        sessions = []
+        for thread_id, _, metadata in rows:
+            if json.loads(metadata).get("user_id") == user_id:
+                count = conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                sessions.append((thread_id, count.fetchone()[0]))
+        return len(sessions[:limit])
+    finally:
+        conn.close()
+
+
+def measure(func: Callable[[], int], rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="会话列表查询基准测试")
+    parser.add_argument("--users", type=int, default=200, help="用户数")
+    parser.add_argument("--sessions", type=int, default=20, help="每个用户的会话数")
+    parser.add_argument("--checkpoints", type=int, default=6, help="每个会话的检查点数")
+    parser.add_argument("--rounds", type=int, default=20, help="每种查询的重复次数")
+    args = parser.parse_args()
+
+    service = ChatService()
+    db_path = os.environ["CHAT_DB_PATH"]
+
+    start = time.perf_counter()
+    user_ids = populate(service, args.users, args.sessions, args.checkpoints)
+    print(
+        f"users={args.users} sessions/user={args.sessions} checkpoints/session={args.checkpoints} "
+        f"({args.users * args.sessions * args.checkpoints} checkpoints, populated in "
+        f"{time.perf_counter() - start:.1f}s)"
+    )
+
+    user_id = user_ids[len(user_ids) // 2]
+    assert list_by_scan(db_path, user_id, 20) == len(service.list_sessions(user_id)["sessions"])
+
+    rows = [
+        ("scan", measure(lambda: list_by_scan(db_path, user_id, 20), args.rounds)),
+        ("catalog", measure(lambda: len(service.list_sessions(user_id)["sessions"]), args.rounds)),
+    ]
+    chat_db_manager.close_checkpointer_pool()
+
+    print(f"{'scenario':<10}{'p50 ms':>10}")
+    for name, elapsed in rows:
+        print(f"{name:<10}{elapsed * 1000:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
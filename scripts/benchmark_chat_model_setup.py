@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+聊天模型客户端复用基准测试
+
+在独立进程中用uvicorn启动一个假的OpenAI兼容服务（/v1/chat/completions立即返回固定回复），
+对比每轮对话的开销：
+
+- per_turn：改造前的写法，每轮都读取配置、新建ChatOpenAI客户端并bind_tools绑定8个工具
+- shared：当前的get_chat_model()，配置不变时复用同一个已绑定工具的客户端
+
+分两项输出：
+- setup：只衡量获取模型这一步（µs/轮）
+- turn：一次完整的图调用（agent节点请求假服务，InMemorySaver），衡量端到端每轮耗时（ms/轮）
+
+用法：
+    uv run python scripts/benchmark_chat_model_setup.py --turns 300
+
+作者：TaKeKe团队
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List
+from unittest.mock import patch
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.store.memory import InMemoryStore  # noqa: E402
+
+from src.domains.chat.graph import (  # noqa: E402
+    ChatGraph,
+    build_chat_model,
+    get_chat_model,
+    read_chat_model_settings,
+    reset_chat_model
+)
+
+
+def build_fake_llm_server() -> FastAPI:
+    """假的OpenAI兼容服务：不调用工具，直接返回固定回复"""
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions():
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "fake-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "好的。"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }
+
+    return app
+
+
+def serve_fake_llm_server(port: int) -> None:
+    """在子进程中运行假LLM服务"""
+    uvicorn.run(build_fake_llm_server(), host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(base_url: str) -> None:
+    while True:
+        try:
+            httpx.post(f"{base_url}/chat/completions", json={})
+            return
+        except httpx.TransportError:
+            time.sleep(0.05)
+
+
+def per_turn_model(self):
+    """改造前：每轮新建客户端并绑定工具"""
+    return build_chat_model(read_chat_model_settings())
+
+
+def measure(func: Callable[[], None], turns: int) -> List[float]:
+    """返回每次调用的耗时（秒），先预热几次"""
+    for _ in range(5):
+        func()
+    samples = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="聊天模型客户端复用基准测试")
+    parser.add_argument("--turns", type=int, default=300, help="每个场景的轮数")
+    args = parser.parse_args()
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}/v1"
+    server = multiprocessing.Process(target=serve_fake_llm_server, args=(port,), daemon=True)
+    server.start()
+
+    os.environ["OPENAI_API_KEY"] = "sk-bench"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_MODEL"] = "fake-model"
+    reset_chat_model()
+
+    try:
+        _wait_for_server(base_url)
+        graph = ChatGraph(InMemorySaver(), InMemoryStore())
+        user_id = str(uuid.uuid4())
+
+        def turn() -> None:
+            config = {"configurable": {"thread_id": str(uuid.uuid4()), "user_id": user_id}}
+            result = graph.graph.invoke({"messages": [HumanMessage(content="你好")]}, config)
+            assert result["messages"][-1].content == "好的。", result["messages"][-1].content
+
+        rows = []
+        with patch.object(ChatGraph, "_get_model", per_turn_model):
+            rows.append(("per_turn", measure(lambda: graph._get_model(), args.turns), measure(turn, args.turns)))
+        rows.append(("shared", measure(get_chat_model, args.turns), measure(turn, args.turns)))
+    finally:
+        server.terminate()
+        server.join()
+
+    print(f"turns={args.turns} fake LLM @ {base_url}")
+    print(f"{'scenario':<12}{'setup µs p50':>14}{'setup µs mean':>15}{'turn ms p50':>13}{'turn ms mean':>14}")
+    for name, setup, turns in rows:
+        print(
+            f"{name:<12}{statistics.median(setup) * 1e6:14.1f}{statistics.mean(setup) * 1e6:15.1f}"
+            f"{statistics.median(turns) * 1e3:13.2f}{statistics.mean(turns) * 1e3:14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
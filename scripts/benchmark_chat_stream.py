@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+本地流式聊天首token时间基准测试
+
+在独立进程中用uvicorn启动一个假的OpenAI兼容服务：等待--first-latency秒后开始输出，
+之后每隔--token-delay秒输出一个token，共--tokens个（stream=true时按SSE逐块返回，
+否则等全部生成完后一次性返回）。对比用户看到第一个字的时间：
+
+- send：ChatService.asend_message()，整轮完成后才拿到回复（首token时间 = 总耗时）
+- stream：ChatService.astream_message()，模型以流式接口调用，token到达即产出
+
+数据库放在临时目录。
+
+用法：
+    uv run python scripts/benchmark_chat_stream.py --rounds 10 --tokens 60
+
+作者：TaKeKe团队
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# 聊天数据库路径在导入时读取，必须在导入src之前设置
+_tmp_dir = tempfile.mkdtemp(prefix="chat_stream_bench_")
+os.environ["CHAT_DB_PATH"] = os.path.join(_tmp_dir, "chat.db")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.domains.chat.database import chat_db_manager  # noqa: E402
+from src.domains.chat.graph import reset_chat_model  # noqa: E402
+from src.domains.chat.service import ChatService  # noqa: E402
+
+
+def build_fake_llm_server(first_latency: float, token_delay: float, tokens: int) -> FastAPI:
+    """假的OpenAI兼容服务，支持stream=true的SSE输出"""
+    app = FastAPI()
+    pieces = [f"字{i % 10}" for i in range(tokens)]
+
+    def chunk(delta: dict, finish_reason=None) -> str:
+        body = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "fake-model",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+
+        if payload.get("stream"):
+            async def events():
+                await asyncio.sleep(first_latency)
+                yield chunk({"role": "assistant", "content": ""})
+                for piece in pieces:
+                    yield chunk({"content": piece})
+                    await asyncio.sleep(token_delay)
+                yield chunk({}, "stop")
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(first_latency + token_delay * tokens)
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "fake-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(pieces)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": tokens, "total_tokens": tokens + 1}
+        }
+
+    return app
+
+
+def serve_fake_llm_server(port: int, first_latency: float, token_delay: float, tokens: int) -> None:
+    """在子进程中运行假LLM服务"""
+    app = build_fake_llm_server(first_latency, token_delay, tokens)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(base_url: str) -> None:
+    while True:
+        try:
+            httpx.get(f"{base_url}/models")
+            return
+        except httpx.TransportError:
+            time.sleep(0.05)
+
+
+async def bench(rounds: int) -> List[Tuple[str, List[float], List[float]]]:
+    service = ChatService()
+    user_id = str(uuid.uuid4())
+
+    async def send() -> Tuple[float, float]:
+        start = time.perf_counter()
+        await service.asend_message(user_id, str(uuid.uuid4()), "你好")
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    async def stream() -> Tuple[float, float]:
+        start = time.perf_counter()
+        first_token = None
+        async for event in service.astream_message(user_id, str(uuid.uuid4()), "你好"):
+            if event["type"] == "token" and first_token is None:
+                first_token = time.perf_counter() - start
+        return first_token, time.perf_counter() - start
+
+    # 预热：建立连接、编译图、创建模型客户端
+    await send()
+    await stream()
+
+    rows = []
+    for name, func in (("send", send), ("stream", stream)):
+        samples = [await func() for _ in range(rounds)]
+        rows.append((name, [s[0] for s in samples], [s[1] for s in samples]))
+
+    await chat_db_manager.close_async_checkpointer()
+    chat_db_manager.close_checkpointer_pool()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地流式聊天首token时间基准测试")
+    parser.add_argument("--rounds", type=int, default=10, help="每个场景的轮数")
+    parser.add_argument("--tokens", type=int, default=60, help="每次回复的token数")
+    parser.add_argument("--first-latency", type=float, default=0.3, help="假LLM开始输出前的延迟（秒）")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="假LLM相邻token的间隔（秒）")
+    args = parser.parse_args()
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}/v1"
+    server = multiprocessing.Process(
+        target=serve_fake_llm_server,
+        args=(port, args.first_latency, args.token_delay, args.tokens),
+        daemon=True
+    )
+    server.start()
+
+    os.environ["OPENAI_API_KEY"] = "sk-bench"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_MODEL"] = "fake-model"
+    reset_chat_model()
+
+    try:
+        _wait_for_server(base_url)
+        rows = asyncio.run(bench(args.rounds))
+    finally:
+        server.terminate()
+        server.join()
+
+    print(
+        f"rounds={args.rounds} tokens={args.tokens} first_latency={args.first_latency}s "
+        f"token_delay={args.token_delay}s fake LLM @ {base_url}"
+    )
+    print(f"{'scenario':<10}{'TTFT ms p50':>14}{'total ms p50':>15}")
+    for name, ttft, total in rows:
+        print(f"{name:<10}{statistics.median(ttft) * 1000:14.1f}{statistics.median(total) * 1000:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
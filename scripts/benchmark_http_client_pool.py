@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+HTTP连接池基准测试
+
+对比两种调用方式访问本地桩服务器（stub server）的延迟：
+- before：每次调用创建新的httpx.AsyncClient（旧版TaskMicroserviceClient/AuthMicroserviceClient写法）
+- after：使用HTTP客户端注册表中长生命周期的共享客户端（连接保持复用）
+
+桩服务器基于asyncio实现，支持HTTP/1.1 keep-alive，可选人为增加建连延迟
+（模拟跨机房TCP/TLS握手开销）。
+
+用法：
+    uv run python scripts/benchmark_http_client_pool.py --requests 500 --concurrency 10
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.http_client_registry import HTTPClientRegistry  # noqa: E402
+
+
+RESPONSE_BODY = b'{"code":200,"success":true,"message":"ok","data":[]}'
+
+
+async def start_stub_server(handshake_delay: float) -> asyncio.AbstractServer:
+    """启动本地桩服务器，返回JSON并保持连接"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if handshake_delay:
+            await asyncio.sleep(handshake_delay)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                content_length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        content_length = int(line.split(b":", 1)[1])
+                if content_length:
+                    await reader.readexactly(content_length)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(RESPONSE_BODY)).encode() + b"\r\n"
+                    b"Connection: keep-alive\r\n\r\n" + RESPONSE_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def run_per_call_client(url: str, total: int, concurrency: int) -> List[float]:
+    """before：每次请求新建并关闭AsyncClient"""
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(url)
+                response.json()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies
+
+
+async def run_pooled_client(url: str, total: int, concurrency: int) -> List[float]:
+    """after：通过注册表复用长连接"""
+    registry = HTTPClientRegistry()
+    client = registry.get_client(
+        "benchmark",
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        http2=True
+    )
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.json()
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(one() for _ in range(total)))
+    finally:
+        await registry.close_all()
+    return latencies
+
+
+def summarize(name: str, latencies: List[float], elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{name:<8} requests={len(latencies):<5} "
+        f"mean={statistics.mean(latencies) * 1000:7.3f}ms "
+        f"p50={statistics.median(latencies) * 1000:7.3f}ms "
+        f"p95={p95 * 1000:7.3f}ms "
+        f"throughput={len(latencies) / elapsed:8.1f} req/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP连接池前后对比基准测试")
+    parser.add_argument("--requests", type=int, default=500, help="每种方式的请求总数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    parser.add_argument("--handshake-delay-ms", type=float, default=0.0, help="模拟建连延迟（毫秒）")
+    args = parser.parse_args()
+
+    server = await start_stub_server(args.handshake_delay_ms / 1000)
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/tasks/"
+
+    print(f"stub server: {url}, handshake_delay={args.handshake_delay_ms}ms")
+    async with server:
+        # 预热
+        await run_pooled_client(url, 20, 2)
+
+        start = time.perf_counter()
+        before = await run_per_call_client(url, args.requests, args.concurrency)
+        summarize("before", before, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        after = await run_pooled_client(url, args.requests, args.concurrency)
+        summarize("after", after, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
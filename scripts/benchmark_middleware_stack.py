@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+中间件栈逐层开销基准测试
+
+在一个最小的FastAPI应用上按由外到内的顺序逐层叠加中间件：
+异常处理 → 请求体缓冲 → 日志 → 安全 → 限流 → 输入验证 → 认证，
+用httpx的ASGI传输在进程内发起请求，输出每一层累计和新增的每请求耗时（µs/request）。
+
+同时给出同样层数的空BaseHTTPMiddleware（dispatch中只调用call_next）作为对照，
+用于衡量改为纯ASGI后省下的开销。
+
+日志中间件的标准输出重定向到空设备，限流阈值调到足够大以免触发429，
+认证使用固定的验证结果（不衡量JWT验签本身）。
+
+每个场景跑多轮取最好一轮，减少调度抖动的影响。
+
+用法：
+    uv run python scripts/benchmark_middleware_stack.py --requests 5000
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Sequence
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api.auth_context import AuthContext  # noqa: E402
+from src.api.config import config  # noqa: E402
+from src.api.middleware import (  # noqa: E402
+    AuthMiddleware,
+    ExceptionHandlerMiddleware,
+    LoggingMiddleware,
+    RateLimitMiddleware,
+    RequestBodyMiddleware,
+    SecurityMiddleware
+)
+from src.api.middleware.security import InputValidationMiddleware  # noqa: E402
+from src.services.auth.jwt_validator import TokenValidationResult, UserInfo  # noqa: E402
+
+
+LAYERS = [
+    ("exception", ExceptionHandlerMiddleware),
+    ("request_body", RequestBodyMiddleware),
+    ("logging", LoggingMiddleware),
+    ("security", SecurityMiddleware),
+    ("rate_limit", RateLimitMiddleware),
+    ("input_validation", InputValidationMiddleware),
+    ("auth", AuthMiddleware),
+]
+
+BODY = {"title": "benchmark", "description": "x" * 200, "tags": ["a", "b", "c"]}
+
+
+class NoopHTTPMiddleware(BaseHTTPMiddleware):
+    """对照组：什么都不做的BaseHTTPMiddleware"""
+
+    async def dispatch(self, request: Request, call_next):
+        return await call_next(request)
+
+
+def build_app(middlewares: Sequence[type]) -> FastAPI:
+    """按由外到内的顺序构建应用"""
+    app = FastAPI()
+
+    @app.post("/tasks")
+    async def create_task(request: Request):
+        return {"ok": True, "size": len(await request.body())}
+
+    for middleware in reversed(middlewares):
+        app.add_middleware(middleware)
+    return app
+
+
+async def _fixed_auth_context(request, token):
+    payload = {"sub": "bench-user", "is_guest": False, "exp": 9999999999, "iat": 0}
+    user_info = UserInfo(user_id="bench-user", is_guest=False, exp=9999999999, iat=0, token_hash="h", cache_time=0)
+    return AuthContext(token=token, result=TokenValidationResult(payload=payload, user_info=user_info))
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int, rounds: int) -> float:
+    """返回多轮中最好一轮的每请求平均耗时（µs）"""
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": "Bearer bench"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 预热
+        for _ in range(20):
+            await client.post("/tasks", json=BODY, headers=headers)
+
+        best = float("inf")
+        for _ in range(rounds):
+            counter = iter(range(requests))
+
+            async def worker():
+                for _ in counter:
+                    response = await client.post("/tasks", json=BODY, headers=headers)
+                    assert response.status_code == 200, response.text
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            best = min(best, time.perf_counter() - start)
+    return best / requests * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="中间件栈逐层开销基准测试")
+    parser.add_argument("--requests", type=int, default=5000, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发请求数")
+    parser.add_argument("--rounds", type=int, default=5, help="每个场景的轮数（取最好一轮）")
+    args = parser.parse_args()
+
+    config.rate_limit_enabled = True
+    config.rate_limit_requests_per_minute = 10 ** 9
+
+    rows: List[tuple] = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+            patch("src.api.middleware.auth_microservice.resolve_auth_context", _fixed_auth_context):
+        base = await measure(build_app([]), args.requests, args.concurrency, args.rounds)
+        rows.append(("(no middleware)", base, 0.0, base, 0.0))
+
+        previous = noop_previous = base
+        for depth in range(1, len(LAYERS) + 1):
+            name = LAYERS[depth - 1][0]
+            total = await measure(build_app([cls for _, cls in LAYERS[:depth]]), args.requests, args.concurrency, args.rounds)
+            noop_total = await measure(build_app([NoopHTTPMiddleware] * depth), args.requests, args.concurrency, args.rounds)
+            rows.append((f"+{name}", total, total - previous, noop_total, noop_total - noop_previous))
+            previous, noop_previous = total, noop_total
+
+    print(f"{'layer':<20}{'asgi total':>12}{'asgi +layer':>13}{'noop-BHM total':>16}{'noop-BHM +layer':>17}  (µs/request)")
+    for name, total, delta, noop_total, noop_delta in rows:
+        print(f"{name:<20}{total:12.1f}{delta:13.1f}{noop_total:16.1f}{noop_delta:17.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
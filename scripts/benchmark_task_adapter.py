@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+任务响应适配器基准测试
+
+对比任务列表接口两种响应构造方式的耗时：
+- before：旧版写法，每个任务复制后在函数内重建映射表、两次调用datetime.now()，
+  再用TaskResponse(**task)逐个构造，最后组装TaskListResponse
+- after：build_task_list_response，模块级映射表、按需生成默认值，
+  一次遍历后整体校验为TaskListResponse
+
+使用合成的10/100/1000个任务的微服务响应数据。
+
+用法：
+    uv run python scripts/benchmark_task_adapter.py --repeat 200
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.domains.task.router import build_task_list_response  # noqa: E402
+from src.domains.task.schemas import PaginationInfo, TaskListResponse, TaskResponse  # noqa: E402
+
+
+def make_payload(count: int) -> Dict[str, Any]:
+    """生成合成的微服务任务列表数据"""
+    statuses = ["NOT_STARTED", "IN_PROGRESS", "COMPLETED"]
+    priorities = ["LOW", "MEDIUM", "HIGH"]
+    tasks = [
+        {
+            "id": f"550e8400-e29b-41d4-a716-{i:012d}",
+            "user_id": "550e8400-e29b-41d4-a716-446655440001",
+            "title": f"任务{i}",
+            "description": "合成任务描述",
+            "status": statuses[i % 3],
+            "priority": priorities[i % 3],
+            "tags": ["工作", "重要"],
+            "due_date": "2024-12-31",
+            "created_at": "2024-12-15T10:00:00Z",
+            "updated_at": "2024-12-16T14:30:00Z"
+        }
+        for i in range(count)
+    ]
+    return {"tasks": tasks, "total": count, "limit": count, "offset": 0}
+
+
+def legacy_adapt_single_task_data(task_data: Dict[str, Any]) -> Dict[str, Any]:
+    """旧版单任务适配（保留用于对比）"""
+    adapted_task = task_data.copy()
+    priority_mapping = {
+        'Low': 'low', 'low': 'low', 'Medium': 'medium', 'medium': 'medium',
+        'High': 'high', 'high': 'high', 'HIGH': 'high', 'MEDIUM': 'medium', 'LOW': 'low'
+    }
+    status_mapping = {
+        'todo': 'pending', 'TODO': 'pending', 'pending': 'pending', 'NOT_STARTED': 'pending',
+        'inprogress': 'in_progress', 'IN_PROGRESS': 'in_progress', 'in_progress': 'in_progress',
+        'completed': 'completed', 'COMPLETED': 'completed'
+    }
+    if 'priority' in adapted_task and adapted_task['priority']:
+        original_priority = str(adapted_task['priority'])
+        adapted_task['priority'] = priority_mapping.get(original_priority, original_priority.lower())
+    if 'status' in adapted_task and adapted_task['status']:
+        original_status = str(adapted_task['status'])
+        adapted_task['status'] = status_mapping.get(original_status, original_status.lower())
+    required_fields = {
+        'parent_id': None,
+        'tags': [],
+        'service_ids': [],
+        'planned_start_time': None,
+        'planned_end_time': None,
+        'last_claimed_date': None,
+        'is_deleted': False,
+        'created_at': datetime.now().isoformat(),
+        'updated_at': datetime.now().isoformat(),
+        'completion_percentage': 0.0
+    }
+    for field, default_value in required_fields.items():
+        if field not in adapted_task:
+            adapted_task[field] = default_value
+    return adapted_task
+
+
+def legacy_build(data: Dict[str, Any]) -> TaskListResponse:
+    """旧版：先适配为字典，再逐个构造模型"""
+    adapted = {"data": data}.copy()
+    tasks_array = adapted["data"]["tasks"]
+    adapted_tasks = [legacy_adapt_single_task_data(task) for task in tasks_array]
+    total = data.get("total", len(adapted_tasks))
+    limit = data.get("limit", 20)
+    offset = data.get("offset", 0)
+    current_page = (offset // limit) + 1 if limit > 0 else 1
+    total_pages = (total + limit - 1) // limit if limit > 0 else 1
+    list_data = {
+        "tasks": adapted_tasks,
+        "pagination": {
+            "current_page": current_page,
+            "page_size": limit,
+            "total_count": total,
+            "total_pages": total_pages,
+            "has_next": current_page < total_pages,
+            "has_prev": current_page > 1
+        }
+    }
+    pagination_info = PaginationInfo(**list_data["pagination"])
+    tasks = [TaskResponse(**task_data) for task_data in list_data["tasks"]]
+    return TaskListResponse(tasks=tasks, pagination=pagination_info)
+
+
+def optimized_build(data: Dict[str, Any]) -> TaskListResponse:
+    """新版：一次遍历并整体校验"""
+    return build_task_list_response(data, 1, 20)
+
+
+def measure(func: Callable[[Dict[str, Any]], TaskListResponse], data: Dict[str, Any], repeat: int) -> List[float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="任务响应适配器前后对比基准测试")
+    parser.add_argument("--repeat", type=int, default=200, help="每种规模的重复次数")
+    args = parser.parse_args()
+
+    for count in (10, 100, 1000):
+        data = make_payload(count)
+        # 结果一致性检查
+        assert legacy_build(data).model_dump() == optimized_build(data).model_dump()
+        # 预热
+        measure(legacy_build, data, 5)
+        measure(optimized_build, data, 5)
+
+        before = sorted(measure(legacy_build, data, args.repeat))
+        after = sorted(measure(optimized_build, data, args.repeat))
+        before_median = before[len(before) // 2] * 1000
+        after_median = after[len(after) // 2] * 1000
+        print(
+            f"tasks={count:<5} before={before_median:8.3f}ms after={after_median:8.3f}ms "
+            f"speedup={before_median / after_median:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
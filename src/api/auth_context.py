@@ -0,0 +1,115 @@
+"""
+请求级认证上下文
+
+同一个请求内只验证一次JWT令牌：认证中间件和各认证依赖函数
+（get_current_user_id、get_current_user_info等）共享同一份验证结果，
+结果保存在request.state.auth_context上。
+
+设计原则：
+- 一次验证：首个需要认证的环节验证令牌，后续环节直接复用结果（包括失败结果）
+- 按令牌匹配：中间件和依赖取到的令牌不同（如中间件从Cookie取令牌）时重新验证
+- 启动时解析环境开关：是否使用开发环境验证器只在启动时读取一次环境变量
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request
+
+from src.services.auth.jwt_validator import TokenValidationResult, validate_jwt_token
+
+
+@dataclass(frozen=True)
+class AuthSettings:
+    """认证相关的环境开关"""
+    is_development: bool
+    skip_signature: bool
+
+    @property
+    def use_dev_validator(self) -> bool:
+        """是否使用开发环境验证器（仅开发环境且显式开启跳过签名时）"""
+        return self.is_development and self.skip_signature
+
+
+def load_auth_settings() -> AuthSettings:
+    """
+    从环境变量读取认证开关
+
+    Returns:
+        AuthSettings: 认证开关
+    """
+    return AuthSettings(
+        is_development=os.getenv("ENVIRONMENT", "development").lower() == "development",
+        skip_signature=os.getenv("JWT_SKIP_SIGNATURE", "false").lower() == "true"
+    )
+
+
+# 全局认证开关（启动时解析一次）
+_auth_settings: Optional[AuthSettings] = None
+
+
+def get_auth_settings() -> AuthSettings:
+    """
+    获取认证开关（单例模式）
+
+    Returns:
+        AuthSettings: 认证开关
+    """
+    global _auth_settings
+    if _auth_settings is None:
+        _auth_settings = load_auth_settings()
+    return _auth_settings
+
+
+def reset_auth_settings() -> None:
+    """重置认证开关，下次使用时重新读取环境变量（用于测试）"""
+    global _auth_settings
+    _auth_settings = None
+
+
+@dataclass
+class AuthContext:
+    """单个请求的令牌验证结果"""
+    token: str
+    result: Optional[TokenValidationResult] = None
+    error: Optional[Exception] = None
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.result is not None
+
+
+async def _validate_token(token: str) -> TokenValidationResult:
+    if get_auth_settings().use_dev_validator:
+        from src.services.auth.dev_jwt_validator import validate_jwt_token_dev_result
+        return await validate_jwt_token_dev_result(token)
+    return await validate_jwt_token(token)
+
+
+async def resolve_auth_context(request: Optional[Request], token: str) -> AuthContext:
+    """
+    获取请求的认证上下文，同一请求同一令牌只验证一次
+
+    验证失败不会抛出异常，错误保存在AuthContext.error中，由调用方决定抛出还是忽略。
+
+    Args:
+        request: 请求对象；为None时（如直接调用依赖函数）不做请求级复用
+        token: JWT令牌
+
+    Returns:
+        AuthContext: 认证上下文
+    """
+    if request is not None:
+        cached = getattr(request.state, "auth_context", None)
+        if cached is not None and cached.token == token:
+            return cached
+
+    try:
+        context = AuthContext(token=token, result=await _validate_token(token))
+    except Exception as e:
+        context = AuthContext(token=token, error=e)
+
+    if request is not None:
+        request.state.auth_context = context
+    return context
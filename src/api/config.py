@@ -147,6 +147,31 @@ class APIConfig(BaseSettings):
     rate_limit_enabled: bool = Field(default=True, description="是否启用限流")
     rate_limit_requests_per_minute: int = Field(default=60, description="每分钟请求数限制")
     rate_limit_burst_size: int = Field(default=10, description="突发请求大小")
+    rate_limit_backend: str = Field(
+        default="memory",
+        description="限流后端：memory（进程内）或sqlite（同一主机的多个worker共享）",
+        env="RATE_LIMIT_BACKEND"
+    )
+    rate_limit_sqlite_path: str = Field(
+        default="data/rate_limit.db",
+        description="sqlite限流后端的数据库文件路径",
+        env="RATE_LIMIT_SQLITE_PATH"
+    )
+    rate_limit_lease_size: int = Field(
+        default=20,
+        description="共享限流后端单次最多预留的配额",
+        env="RATE_LIMIT_LEASE_SIZE"
+    )
+    rate_limit_local_share: float = Field(
+        default=0.1,
+        description="共享限流后端单次预留占剩余配额的比例",
+        env="RATE_LIMIT_LOCAL_SHARE"
+    )
+    rate_limit_sync_interval: float = Field(
+        default=1.0,
+        description="共享计数已满时本地缓存拒绝结果的时长(秒)",
+        env="RATE_LIMIT_SYNC_INTERVAL"
+    )
 
     # 日志配置
     log_level: str = Field(default="INFO", description="日志级别")
@@ -155,6 +180,11 @@ class APIConfig(BaseSettings):
     # 安全配置
     secure_cookies: bool = Field(default=True, description="安全Cookie")
     csrf_protection: bool = Field(default=True, description="CSRF保护")
+    max_request_body_size: int = Field(
+        default=1024 * 1024,
+        description="JSON请求体最大字节数，超过时返回413",
+        env="MAX_REQUEST_BODY_SIZE"
+    )
 
     # 文件上传配置
     max_file_size: int = Field(default=10 * 1024 * 1024, description="最大文件大小(字节)")
@@ -210,6 +240,123 @@ class APIConfig(BaseSettings):
         default=60,
         description="Task微服务健康检查间隔(秒)"
     )
+    task_service_cache_enabled: bool = Field(
+        default=True,
+        description="是否启用Task微服务只读接口响应缓存",
+        env="TASK_SERVICE_CACHE_ENABLED"
+    )
+    task_service_cache_ttl: float = Field(
+        default=5.0,
+        description="Task微服务响应缓存过期时间(秒)",
+        env="TASK_SERVICE_CACHE_TTL"
+    )
+    task_service_cache_max_entries: int = Field(
+        default=10000,
+        description="Task微服务响应缓存最大条目数",
+        env="TASK_SERVICE_CACHE_MAX_ENTRIES"
+    )
+    task_service_coalescing_enabled: bool = Field(
+        default=True,
+        description="是否合并并发的相同Task微服务GET请求",
+        env="TASK_SERVICE_COALESCING_ENABLED"
+    )
+    task_service_hedging_enabled: bool = Field(
+        default=False,
+        description="是否对Task微服务已映射的GET请求启用请求对冲",
+        env="TASK_SERVICE_HEDGING_ENABLED"
+    )
+    task_service_hedging_percentile: float = Field(
+        default=0.95,
+        description="对冲触发阈值使用的路由延迟分位数(0-1)",
+        env="TASK_SERVICE_HEDGING_PERCENTILE"
+    )
+    task_service_hedging_window_size: int = Field(
+        default=200,
+        description="每个路由计算延迟分位数的滚动样本数",
+        env="TASK_SERVICE_HEDGING_WINDOW_SIZE"
+    )
+    task_service_hedging_min_samples: int = Field(
+        default=20,
+        description="路由样本数达到该值后才开始对冲",
+        env="TASK_SERVICE_HEDGING_MIN_SAMPLES"
+    )
+    task_service_hedging_min_delay: float = Field(
+        default=0.05,
+        description="对冲触发阈值下限(秒)",
+        env="TASK_SERVICE_HEDGING_MIN_DELAY"
+    )
+    task_service_hedging_max_delay: float = Field(
+        default=2.0,
+        description="对冲触发阈值上限(秒)",
+        env="TASK_SERVICE_HEDGING_MAX_DELAY"
+    )
+    task_service_hedging_budget_ratio: float = Field(
+        default=0.05,
+        description="对冲请求占主请求的最大比例（全局预算）",
+        env="TASK_SERVICE_HEDGING_BUDGET_RATIO"
+    )
+    task_service_hedging_max_burst: float = Field(
+        default=10.0,
+        description="对冲预算允许积累的最大突发对冲数",
+        env="TASK_SERVICE_HEDGING_MAX_BURST"
+    )
+    task_service_pagination_mode: str = Field(
+        default="auto",
+        description="任务列表分页模式：upstream(转发limit/offset)、local(本地切片)、auto(自动探测)",
+        env="TASK_SERVICE_PAGINATION_MODE"
+    )
+
+    # 条件GET（ETag）配置
+    conditional_get_enabled: bool = Field(
+        default=True,
+        description="是否为任务列表、Top3和用户资料接口启用ETag/304",
+        env="CONDITIONAL_GET_ENABLED"
+    )
+    conditional_get_max_age: float = Field(
+        default=5.0,
+        description="ETag记录免上游校验的最长时间(秒)，与任务响应缓存TTL一致，即其他worker写操作的最长不可见时间",
+        env="CONDITIONAL_GET_MAX_AGE"
+    )
+    conditional_get_max_users: int = Field(
+        default=10000,
+        description="条件GET最多记录的用户数",
+        env="CONDITIONAL_GET_MAX_USERS"
+    )
+    task_batch_complete_max_items: int = Field(
+        default=50,
+        description="批量完成任务接口单次最多任务数",
+        env="TASK_BATCH_COMPLETE_MAX_ITEMS"
+    )
+    task_batch_complete_concurrency: int = Field(
+        default=10,
+        description="批量完成任务时并发调用Task微服务的最大请求数",
+        env="TASK_BATCH_COMPLETE_CONCURRENCY"
+    )
+    task_tree_upstream_enabled: bool = Field(
+        default=True,
+        description="任务树是否优先调用上游任务树接口",
+        env="TASK_TREE_UPSTREAM_ENABLED"
+    )
+    task_tree_max_depth: int = Field(
+        default=5,
+        description="任务树最大展开深度（根任务为第0层）",
+        env="TASK_TREE_MAX_DEPTH"
+    )
+    task_tree_level_concurrency: int = Field(
+        default=8,
+        description="任务树按层展开时每层并发查询子任务的最大请求数",
+        env="TASK_TREE_LEVEL_CONCURRENCY"
+    )
+    task_tree_max_nodes: int = Field(
+        default=500,
+        description="任务树最大节点数",
+        env="TASK_TREE_MAX_NODES"
+    )
+    task_tree_max_child_pages: int = Field(
+        default=20,
+        description="任务树按层展开时单个父任务查询子任务的最大翻页数",
+        env="TASK_TREE_MAX_CHILD_PAGES"
+    )
 
     # 聊天微服务配置 (已迁移到新服务器)
     chat_service_url: str = Field(
@@ -221,6 +368,11 @@ class APIConfig(BaseSettings):
         default=30,
         description="聊天微服务调用超时时间(秒)"
     )
+    chat_backend: str = Field(
+        default="microservice",
+        description="聊天接口后端：microservice（代理聊天微服务）或local（本地运行聊天图，逐token流式输出）",
+        env="CHAT_BACKEND"
+    )
 
     # 认证微服务配置 (已迁移到新服务器)
     auth_service_url: str = Field(
@@ -232,6 +384,71 @@ class APIConfig(BaseSettings):
         default=30,
         description="认证微服务调用超时时间(秒)"
     )
+    auth_service_max_connections: int = Field(
+        default=100,
+        description="认证微服务最大连接数",
+        env="AUTH_SERVICE_MAX_CONNECTIONS"
+    )
+    auth_service_max_keepalive_connections: int = Field(
+        default=100,
+        description="认证微服务最大保持连接数（与最大连接数一致，登录高峰后连接不被丢弃）",
+        env="AUTH_SERVICE_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    auth_service_keepalive_expiry: float = Field(
+        default=60.0,
+        description="认证微服务空闲连接保持时间(秒)",
+        env="AUTH_SERVICE_KEEPALIVE_EXPIRY"
+    )
+    auth_service_health_cache_ttl: float = Field(
+        default=5.0,
+        description="认证微服务健康检查结果缓存时间(秒)，0表示不缓存",
+        env="AUTH_SERVICE_HEALTH_CACHE_TTL"
+    )
+    auth_service_warmup_timeout: float = Field(
+        default=5.0,
+        description="启动时预热认证微服务连接并预取公钥的最长等待时间(秒)",
+        env="AUTH_SERVICE_WARMUP_TIMEOUT"
+    )
+    jwt_user_cache_max_size: int = Field(
+        default=10000,
+        description="JWT验证结果缓存最大条目数",
+        env="JWT_USER_CACHE_MAX_SIZE"
+    )
+    jwt_user_cache_ttl: int = Field(
+        default=300,
+        description="JWT验证结果缓存时间(秒)，不会超过令牌过期时间",
+        env="JWT_USER_CACHE_TTL"
+    )
+    jwt_public_key_cache_ttl: int = Field(
+        default=3600,
+        description="JWT公钥缓存时间(秒)",
+        env="JWT_PUBLIC_KEY_CACHE_TTL"
+    )
+    jwt_public_key_refresh_ahead: int = Field(
+        default=300,
+        description="JWT公钥到期前多久开始后台刷新(秒)",
+        env="JWT_PUBLIC_KEY_REFRESH_AHEAD"
+    )
+    jwt_public_key_refresh_backoff: float = Field(
+        default=5.0,
+        description="JWT公钥刷新失败后首次重试的等待时间(秒)，连续失败时翻倍",
+        env="JWT_PUBLIC_KEY_REFRESH_BACKOFF"
+    )
+    jwt_public_key_refresh_backoff_max: float = Field(
+        default=300.0,
+        description="JWT公钥刷新失败后重试等待时间的上限(秒)",
+        env="JWT_PUBLIC_KEY_REFRESH_BACKOFF_MAX"
+    )
+    jwt_unknown_kid_refresh_interval: int = Field(
+        default=30,
+        description="令牌携带未知kid时触发公钥刷新的最小间隔(秒)",
+        env="JWT_UNKNOWN_KID_REFRESH_INTERVAL"
+    )
+    auth_trace_sample_rate: float = Field(
+        default=0.01,
+        description="认证路径追踪采样率(0-1)，仅在DEBUG日志开启时生效",
+        env="AUTH_TRACE_SAMPLE_RATE"
+    )
 
     # 奖励微服务配置 (已迁移到新服务器)
     reward_service_url: str = Field(
@@ -289,6 +506,75 @@ class APIConfig(BaseSettings):
         description="聊天微服务调用超时时间(秒)"
     )
 
+    # 微服务熔断器配置（所有出站微服务客户端共享）
+    circuit_breaker_enabled: bool = Field(
+        default=True,
+        description="是否启用微服务熔断器",
+        env="CIRCUIT_BREAKER_ENABLED"
+    )
+    circuit_breaker_failure_rate_threshold: float = Field(
+        default=0.5,
+        description="熔断错误率阈值(0-1)",
+        env="CIRCUIT_BREAKER_FAILURE_RATE_THRESHOLD"
+    )
+    circuit_breaker_slow_call_rate_threshold: float = Field(
+        default=0.8,
+        description="熔断慢调用率阈值(0-1)",
+        env="CIRCUIT_BREAKER_SLOW_CALL_RATE_THRESHOLD"
+    )
+    circuit_breaker_slow_call_duration: float = Field(
+        default=5.0,
+        description="慢调用判定时长(秒)",
+        env="CIRCUIT_BREAKER_SLOW_CALL_DURATION"
+    )
+    circuit_breaker_minimum_calls: int = Field(
+        default=5,
+        description="计算熔断比率所需的最少调用次数",
+        env="CIRCUIT_BREAKER_MINIMUM_CALLS"
+    )
+    circuit_breaker_window_size: int = Field(
+        default=20,
+        description="熔断统计滑动窗口大小(调用次数)",
+        env="CIRCUIT_BREAKER_WINDOW_SIZE"
+    )
+    circuit_breaker_open_duration: float = Field(
+        default=30.0,
+        description="熔断打开持续时间(秒)，之后进入半开探测",
+        env="CIRCUIT_BREAKER_OPEN_DURATION"
+    )
+
+    # 准入控制配置（开销大的接口按路由分组限制并发）
+    admission_control_enabled: bool = Field(
+        default=True,
+        description="是否启用准入控制",
+        env="ADMISSION_CONTROL_ENABLED"
+    )
+    admission_route_groups: dict = Field(
+        default={
+            "chat_stream": {"max_concurrency": 32, "max_queue": 64},
+            "chat_sessions": {"max_concurrency": 64, "max_queue": 128},
+            "user_profile": {"max_concurrency": 128, "max_queue": 256},
+            "task_batch": {"max_concurrency": 16, "max_queue": 32}
+        },
+        description="各路由分组的并发上限和队列长度",
+        env="ADMISSION_ROUTE_GROUPS"
+    )
+    admission_target_delay: float = Field(
+        default=0.05,
+        description="准入控制目标排队时间(秒)，持续超过时缩短排队超时",
+        env="ADMISSION_TARGET_DELAY"
+    )
+    admission_interval: float = Field(
+        default=0.5,
+        description="准入控制排队时间统计间隔(秒)",
+        env="ADMISSION_INTERVAL"
+    )
+    admission_max_queue_wait: float = Field(
+        default=1.0,
+        description="未过载时的最长排队时间(秒)",
+        env="ADMISSION_MAX_QUEUE_WAIT"
+    )
+
 
 # 全局配置实例
 config = APIConfig()
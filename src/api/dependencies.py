@@ -3,24 +3,66 @@
 
 使用微服务JWT token验证机制，确保所有API都有正确的用户认证。
 支持开发环境的特殊验证模式。
+
+同一请求内的令牌验证结果保存在请求级认证上下文中（见src/api/auth_context.py），
+认证中间件和本模块的各依赖函数共享一次验证结果。
 """
 
-import os
 from typing import AsyncGenerator, Optional
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import jwt
 
-from src.services.auth.jwt_validator import validate_jwt_token_simple, validate_jwt_token, TokenValidationResult
+from src.api.auth_context import resolve_auth_context
+from src.services.auth.jwt_validator import TokenValidationResult
 
 # HTTP Bearer认证方案
 security = HTTPBearer(auto_error=False)
 
 
+def _missing_token_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="缺少认证令牌",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def _resolve_access_token(
+    credentials: HTTPAuthorizationCredentials,
+    request: Optional[Request]
+) -> TokenValidationResult:
+    """
+    验证访问令牌（请求内复用验证结果）
+
+    Raises:
+        HTTPException: 令牌无效或不是访问令牌时
+    """
+    context = await resolve_auth_context(request, credentials.credentials)
+
+    if context.error is not None:
+        if isinstance(context.error, HTTPException):
+            raise context.error
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"认证失败: {str(context.error)}",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    # 验证令牌类型
+    if context.result.payload.get("token_type") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="令牌类型错误"
+        )
+
+    return context.result
+
+
 async def get_current_user_id(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request = None
 ) -> UUID:
     """
     从JWT令牌中获取当前用户ID
@@ -30,60 +72,29 @@ async def get_current_user_id(
     如果令牌无效，抛出HTTPException。
     """
     if not credentials:
+        raise _missing_token_error()
+
+    result = await _resolve_access_token(credentials, request)
+
+    user_id = result.payload.get("sub")
+    if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="缺少认证令牌",
-            headers={"WWW-Authenticate": "Bearer"}
+            detail="令牌中缺少用户ID"
         )
 
     try:
-        # 根据环境选择验证器
-        is_development = os.getenv("ENVIRONMENT", "development").lower() == "development"
-
-        if is_development and os.getenv("JWT_SKIP_SIGNATURE", "false").lower() == "true":
-            # 开发环境使用开发验证器
-            from src.services.auth.dev_jwt_validator import validate_jwt_token_dev_result
-            result = await validate_jwt_token_dev_result(credentials.credentials)
-        else:
-            # 生产环境使用标准验证器
-            result = await validate_jwt_token(credentials.credentials)
-
-        payload = result.payload
-
-        # 验证令牌类型
-        if payload.get("token_type") != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="令牌类型错误"
-            )
-
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="令牌中缺少用户ID"
-            )
-
         return UUID(user_id)
-
-    except HTTPException:
-        # 重新抛出HTTPException
-        raise
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="令牌格式错误"
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"认证失败: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
 
 
 async def get_current_user_id_optional(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request = None
 ) -> Optional[UUID]:
     """
     可选的用户认证依赖
@@ -95,50 +106,30 @@ async def get_current_user_id_optional(
         return None
 
     try:
-        # 根据环境选择验证器
-        is_development = os.getenv("ENVIRONMENT", "development").lower() == "development"
-
-        if is_development and os.getenv("JWT_SKIP_SIGNATURE", "false").lower() == "true":
-            # 开发环境使用开发验证器
-            from src.services.auth.dev_jwt_validator import validate_jwt_token_dev_result
-            result = await validate_jwt_token_dev_result(credentials.credentials)
-        else:
-            # 生产环境使用标准验证器
-            result = await validate_jwt_token(credentials.credentials)
-
-        payload = result.payload
-
-        # 验证令牌类型
-        if payload.get("token_type") != "access":
-            return None
-
-        user_id = payload.get("sub")
-        if not user_id:
-            return None
-
-        return UUID(user_id)
-
-    except Exception:
+        return await get_current_user_id(credentials, request)
+    except HTTPException:
         # 任何验证错误都返回None，而不是抛出异常
         return None
 
 
 # 可选认证依赖
 async def get_optional_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request = None
 ) -> dict | None:
     """获取当前用户信息（可选）"""
     if not credentials:
         return None
 
     try:
-        return await get_current_user_id(credentials)
+        return await get_current_user_id(credentials, request)
     except HTTPException:
         return None
 
 
 async def get_current_user_info(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request = None
 ) -> TokenValidationResult:
     """
     获取当前用户的完整验证信息（包括缓存信息）
@@ -147,37 +138,14 @@ async def get_current_user_info(
         TokenValidationResult: 包含payload和用户信息的完整验证结果
     """
     if not credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="缺少认证令牌",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
+        raise _missing_token_error()
 
-    try:
-        # 使用增强的JWT验证器获取完整用户信息
-        result = await validate_jwt_token(credentials.credentials)
-
-        # 验证令牌类型
-        if result.payload.get("token_type") != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="令牌类型错误"
-            )
-
-        return result
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"认证失败: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
+    return await _resolve_access_token(credentials, request)
 
 
 async def get_current_user_info_optional(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request = None
 ) -> TokenValidationResult | None:
     """
     获取当前用户的完整验证信息（可选）
@@ -189,15 +157,8 @@ async def get_current_user_info_optional(
         return None
 
     try:
-        result = await validate_jwt_token(credentials.credentials)
-
-        # 验证令牌类型
-        if result.payload.get("token_type") != "access":
-            return None
-
-        return result
-
-    except Exception:
+        return await _resolve_access_token(credentials, request)
+    except HTTPException:
         return None
 
 
@@ -36,8 +36,18 @@ async def lifespan(app: FastAPI):
     print(f"🌐 API服务地址: http://{config.api_host}:{config.api_port}{config.api_prefix}")
 
     # 认证功能已迁移到微服务，无需本地数据库
+    # 认证相关环境开关只在启动时解析一次
+    from src.api.auth_context import get_auth_settings
+    get_auth_settings()
     print("✅ 认证微服务集成完成")
 
+    # 预热认证微服务连接：建立共享连接池并预取JWT公钥，首批请求不必等待握手和取公钥
+    from src.services.auth.jwt_validator import warm_up_auth
+    if await warm_up_auth(timeout=config.auth_service_warmup_timeout):
+        print("✅ 认证微服务连接预热完成（公钥已缓存）")
+    else:
+        print("⚠️ 认证微服务连接预热失败，首次验证令牌时再获取公钥")
+
     # Task数据库已迁移到微服务，无需本地初始化
     print("✅ Task微服务集成完成")
 
@@ -47,6 +57,21 @@ async def lifespan(app: FastAPI):
     # 聊天功能已启用，基于本地LLM实现
     print("✅ 聊天功能已启用（本地LLM实现）")
 
+    # 聊天检查点器连接池：启动时打开固定数量的连接（WAL模式）并建表
+    from src.domains.chat.database import chat_db_manager
+    try:
+        chat_db_manager.get_checkpointer_pool()
+        print("✅ 聊天检查点器连接池初始化完成")
+    except Exception as e:
+        print(f"❌ 聊天检查点器连接池初始化失败: {e}")
+
+    # 异步聊天接口使用的检查点器绑定应用的事件循环，启动时创建
+    try:
+        await chat_db_manager.get_async_checkpointer()
+        print("✅ 聊天异步检查点器初始化完成")
+    except Exception as e:
+        print(f"❌ 聊天异步检查点器初始化失败: {e}")
+
     # 初始化Focus数据库
     from src.domains.focus.database import create_focus_tables
     try:
@@ -61,6 +86,21 @@ async def lifespan(app: FastAPI):
 
     # 关闭时执行
     print("🛑 API服务正在关闭...")
+
+    # 关闭共享的微服务HTTP连接池
+    from src.services.http_client_registry import close_http_clients
+    await close_http_clients()
+    print("✅ 微服务HTTP连接池已关闭")
+
+    chat_db_manager.close_checkpointer_pool()
+    print("✅ 聊天检查点器连接池已关闭")
+
+    try:
+        await chat_db_manager.close_async_checkpointer()
+        print("✅ 聊天异步检查点器已关闭")
+    except Exception as e:
+        print(f"❌ 聊天异步检查点器关闭失败: {e}")
+
     print("✅ API服务已关闭")
 
 
@@ -79,6 +119,13 @@ from src.api.openapi import setup_openapi
 setup_openapi(app)
 
 
+# 添加准入控制中间件 - 开销大的接口按路由分组限制并发，过载时返回503
+# （先添加，位于CORS中间件内层，503响应同样带CORS头）
+from src.api.middleware.admission import AdmissionControlMiddleware
+
+app.add_middleware(AdmissionControlMiddleware)
+
+
 # 添加CORS中间件 - 完全关闭CORS，允许所有访问
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -251,13 +298,18 @@ app.include_router(chat_router, prefix=config.api_prefix)
 @app.get(f"{config.api_prefix}/health", tags=["系统"])
 async def health_check():
     """健康检查端点"""
+    from src.services.circuit_breaker import get_all_circuit_breaker_stats
+    from src.services.admission_control import get_all_admission_stats
+
     return create_success_response(
         data={
             "status": "healthy",
             "app_name": config.app_name,
             "version": config.app_version,
             "timestamp": str(datetime.now()),
-            "environment": "production" if not config.debug else "development"
+            "environment": "production" if not config.debug else "development",
+            "circuit_breakers": get_all_circuit_breaker_stats(),
+            "admission_control": get_all_admission_stats()
         },
         message="服务运行正常"
     )
@@ -4,16 +4,20 @@ API中间件模块
 包含所有FastAPI中间件，用于处理认证、日志、限流、CORS等横切关注点。
 """
 
+from .admission import AdmissionControlMiddleware
 from .auth_microservice import MicroserviceAuthMiddleware as AuthMiddleware
+from .body import RequestBodyMiddleware
 from .exception_handler import ExceptionHandlerMiddleware
 from .logging import LoggingMiddleware
 from .rate_limit import RateLimitMiddleware
 from .security import SecurityMiddleware
 
 __all__ = [
+    "AdmissionControlMiddleware",
     "AuthMiddleware",
     "ExceptionHandlerMiddleware",
     "LoggingMiddleware",
     "RateLimitMiddleware",
+    "RequestBodyMiddleware",
     "SecurityMiddleware"
 ]
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+准入控制中间件
+
+按路由分组限制开销大的接口同时处理的请求数，过载时返回503和Retry-After。
+名额在整个响应（包括流式响应）发送完成后才释放。
+
+受保护的路由分组：
+- chat_stream：流式聊天
+- chat_sessions：会话列表
+- user_profile：用户信息（聚合奖励数据）
+- task_batch：批量任务操作
+"""
+
+import re
+from typing import List, Optional, Pattern, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.services.admission_control import AdmissionRejected, get_admission_controller
+from ..config import config
+from ..responses import create_service_unavailable_response
+
+# (方法, 路径正则, 分组名)
+ROUTE_GROUPS: List[Tuple[str, Pattern[str], str]] = [
+    ("POST", re.compile(r"^/chat/sessions/[^/]+/chat$"), "chat_stream"),
+    ("GET", re.compile(r"^/chat/sessions/?$"), "chat_sessions"),
+    ("GET", re.compile(r"^/user/profile/?$"), "user_profile"),
+    ("POST", re.compile(r"^/tasks/complete:batch$"), "task_batch"),
+]
+
+
+class AdmissionControlMiddleware:
+    """准入控制中间件（纯ASGI）"""
+
+    def __init__(self, app: ASGIApp, route_groups: Optional[List[Tuple[str, Pattern[str], str]]] = None):
+        self.app = app
+        self.route_groups = route_groups if route_groups is not None else ROUTE_GROUPS
+        self.prefix = config.api_prefix.rstrip("/")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """对受保护的路由执行准入控制"""
+        group = self._match_group(scope) if scope["type"] == "http" and config.admission_control_enabled else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        controller = get_admission_controller(group)
+        try:
+            await controller.acquire()
+        except AdmissionRejected as e:
+            response = create_service_unavailable_response(retry_after=e.retry_after)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+    def _match_group(self, scope: Scope) -> Optional[str]:
+        """匹配请求所属的路由分组"""
+        path = scope["path"]
+        if self.prefix:
+            if not path.startswith(self.prefix):
+                return None
+            path = path[len(self.prefix):]
+
+        method = scope["method"]
+        for group_method, pattern, group in self.route_groups:
+            if method == group_method and pattern.match(path):
+                return group
+        return None
@@ -0,0 +1,104 @@
+"""
+纯ASGI中间件公共工具
+
+中间件直接实现ASGI接口（__call__(scope, receive, send)），不再继承BaseHTTPMiddleware：
+每层不再额外创建任务和内存流，流式响应（如聊天SSE）原样逐块透传。
+
+提供：
+- 响应头修改：在http.response.start消息发出前修改响应头
+- 请求体缓冲与回放：读取完整请求体后，向下游重新提供同样的请求体
+- 客户端IP解析
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import Message, Receive, Send
+
+
+def wrap_send(send: Send, on_start: Callable[[Message, MutableHeaders], None]) -> Send:
+    """
+    包装send，在响应开始时回调以修改响应头
+
+    Args:
+        send: 原始send
+        on_start: 回调(message, headers)，headers可直接修改
+
+    Returns:
+        Send: 包装后的send
+    """
+    async def send_wrapper(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            on_start(message, MutableHeaders(scope=message))
+        await send(message)
+
+    return send_wrapper
+
+
+class RequestBodyTooLarge(Exception):
+    """请求体超过大小限制"""
+
+
+async def buffer_request_body(
+    receive: Receive,
+    max_size: Optional[int] = None
+) -> Tuple[bytes, Receive]:
+    """
+    读取完整请求体，并返回可向下游回放该请求体的receive
+
+    Args:
+        receive: 原始receive
+        max_size: 请求体最大字节数，None表示不限制
+
+    Returns:
+        (body, receive): 请求体字节和回放用的receive
+
+    Raises:
+        RequestBodyTooLarge: 请求体超过max_size
+    """
+    chunks: List[bytes] = []
+    size = 0
+    disconnected = False
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            disconnected = True
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise RequestBodyTooLarge(size)
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay_receive() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            if disconnected:
+                return {"type": "http.disconnect"}
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay_receive
+
+
+def get_client_ip(request: Request) -> str:
+    """获取客户端IP地址"""
+    # 检查代理头
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip
+
+    # 返回直连IP
+    return request.client.host if request.client else "unknown"
+
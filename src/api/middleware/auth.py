@@ -5,17 +5,23 @@
 移除重复的验证逻辑，简化为轻量级的认证层。
 """
 
+import json
+import logging
 from typing import Optional
 
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException, status
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from src.services.auth.jwt_validator import validate_jwt_token_simple
+from .asgi import buffer_request_body
 
+logger = logging.getLogger(__name__)
 
-class AuthMiddleware(BaseHTTPMiddleware):
+
+class AuthMiddleware:
     """
-    认证中间件类（透传模式）
+    认证中间件类（透传模式，纯ASGI）
 
     重构后的轻量级认证中间件：
     - 统一使用 JWTValidator 进行令牌验证
@@ -24,14 +30,14 @@ class AuthMiddleware(BaseHTTPMiddleware):
     - 保持API兼容性
     """
 
-    def __init__(self, app):
+    def __init__(self, app: ASGIApp):
         """
         初始化认证中间件
 
         Args:
-            app: FastAPI应用实例
+            app: ASGI应用
         """
-        super().__init__(app)
+        self.app = app
 
         # 不需要认证的路径
         self.public_paths = {
@@ -43,23 +49,23 @@ class AuthMiddleware(BaseHTTPMiddleware):
             "/static"
         }
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         验证认证请求（透传模式）
 
-        Args:
-            request: HTTP请求对象
-            call_next: 下一个中间件或路由处理器
-
-        Returns:
-            HTTP响应对象
-
         Raises:
             HTTPException: 认证失败时抛出HTTP异常
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # 检查是否为公开路径
         if self._is_public_path(request.url.path):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # 提取令牌
         token = self._extract_token(request)
@@ -82,14 +88,14 @@ class AuthMiddleware(BaseHTTPMiddleware):
             raise
         except Exception as e:
             # 记录未知错误但不暴露详细信息
-            print(f"[AuthMiddleware] 认证验证异常: {str(e)}")
+            logger.warning(f"认证验证异常: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="认证验证失败",
                 headers={"WWW-Authenticate": "Bearer"}
             )
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
     def _set_user_state(self, request: Request, payload: dict) -> None:
         """
@@ -154,57 +160,56 @@ class AuthMiddleware(BaseHTTPMiddleware):
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header[7:]
-            print(f"[AuthMiddleware] 从Authorization头提取令牌: {token[:20]}...")
             return token
 
         # 从查询参数提取（临时用途）
         token = request.query_params.get("token")
         if token:
-            print(f"[AuthMiddleware] 从查询参数提取令牌: {token[:20]}...")
             return token
 
         # 从Cookie提取（备用方式）
         token = request.cookies.get("access_token")
         if token:
-            print(f"[AuthMiddleware] 从Cookie提取令牌: {token[:20]}...")
             return token
 
-        print(f"[AuthMiddleware] 未提取到令牌")
         return None
 
 
-class RefreshTokenMiddleware(BaseHTTPMiddleware):
+class RefreshTokenMiddleware:
     """
-    刷新令牌中间件（简化版）
+    刷新令牌中间件（简化版，纯ASGI）
 
     保留刷新令牌的特殊处理逻辑，但简化实现。
     """
 
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.refresh_token_paths = {
             "/auth/token/refresh"
         }
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """处理刷新令牌"""
-        if request.url.path in self.refresh_token_paths:
+        if scope["type"] == "http" and scope["path"] in self.refresh_token_paths:
             # 特殊处理刷新令牌逻辑
-            return await self._handle_refresh_token(request, call_next)
+            await self._handle_refresh_token(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
-    async def _handle_refresh_token(self, request: Request, call_next):
+    async def _handle_refresh_token(self, scope: Scope, receive: Receive, send: Send) -> None:
         """处理刷新令牌请求"""
+        request = Request(scope)
+
         # 从请求体或Cookie获取刷新令牌
         refresh_token = None
 
-        # 尝试从请求体获取
+        # 尝试从请求体获取（读取后向下游回放）
         if request.method == "POST":
+            body_bytes, receive = await buffer_request_body(receive)
             try:
-                body = await request.json()
-                refresh_token = body.get("refresh_token")
-            except:
+                refresh_token = json.loads(body_bytes).get("refresh_token")
+            except (ValueError, AttributeError):
                 pass
 
         # 尝试从Cookie获取
@@ -220,4 +225,4 @@ class RefreshTokenMiddleware(BaseHTTPMiddleware):
         # 设置刷新令牌到请求状态，让后续处理使用
         request.state.refresh_token = refresh_token
 
-        return await call_next(request)
\ No newline at end of file
+        await self.app(scope, receive, send)
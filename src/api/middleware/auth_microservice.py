@@ -11,16 +11,22 @@
 - 详细的错误处理和日志
 """
 
+import logging
 from typing import Optional, Dict, Any
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException, status
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from ..auth_context import resolve_auth_context
 from ...services.auth.jwt_validator import get_jwt_validator
 
 
-class MicroserviceAuthMiddleware(BaseHTTPMiddleware):
+logger = logging.getLogger(__name__)
+
+
+class MicroserviceAuthMiddleware:
     """
-    微服务认证中间件
+    微服务认证中间件（纯ASGI）
 
     提供基于微服务的JWT令牌认证功能，包括：
     - 使用微服务公钥验证JWT令牌
@@ -35,14 +41,14 @@ class MicroserviceAuthMiddleware(BaseHTTPMiddleware):
     - 保持与原中间件相同的接口
     """
 
-    def __init__(self, app):
+    def __init__(self, app: ASGIApp):
         """
         初始化微服务认证中间件
 
         Args:
-            app: FastAPI应用实例
+            app: ASGI应用
         """
-        super().__init__(app)
+        self.app = app
 
         # JWT验证器实例（延迟初始化）
         self._jwt_validator = None
@@ -67,7 +73,7 @@ class MicroserviceAuthMiddleware(BaseHTTPMiddleware):
             "/"
         }
 
-        print("[MicroserviceAuthMiddleware] 初始化微服务认证中间件")
+        logger.info("初始化微服务认证中间件")
 
     def _get_jwt_validator(self):
         """
@@ -127,41 +133,37 @@ class MicroserviceAuthMiddleware(BaseHTTPMiddleware):
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header[7:]
-            print(f"[MicroserviceAuthMiddleware] 从Authorization头提取令牌: {token[:20]}...")
             return token
 
         # 从查询参数提取（临时用途）
         token = request.query_params.get("token")
         if token:
-            print(f"[MicroserviceAuthMiddleware] 从查询参数提取令牌: {token[:20]}...")
             return token
 
         # 从Cookie提取（备用方式）
         token = request.cookies.get("access_token")
         if token:
-            print(f"[MicroserviceAuthMiddleware] 从Cookie提取令牌: {token[:20]}...")
             return token
 
-        print(f"[MicroserviceAuthMiddleware] 未提取到令牌")
         return None
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         验证认证请求
 
-        Args:
-            request: HTTP请求对象
-            call_next: 下一个中间件或路由处理器
-
-        Returns:
-            HTTP响应对象
-
         Raises:
             HTTPException: 认证失败时抛出HTTP异常
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # 检查是否为公开路径
         if self._is_public_path(request.url.path):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # 提取令牌
         token = self._extract_token(request)
@@ -172,29 +174,24 @@ class MicroserviceAuthMiddleware(BaseHTTPMiddleware):
                 headers={"WWW-Authenticate": "Bearer"}
             )
 
-        try:
-            # 使用微服务JWT验证器验证令牌
-            jwt_validator = self._get_jwt_validator()
-            payload = await jwt_validator.validate_token(token)
-
-            # 设置用户信息到请求状态
-            self._set_user_state(request, payload)
-
-            print(f"[MicroserviceAuthMiddleware] 令牌验证成功: user_id={payload.get('sub')}")
-
-        except HTTPException:
-            # 重新抛出HTTP异常
-            raise
-        except Exception as e:
+        # 验证结果保存在请求级认证上下文中，路由的认证依赖直接复用，不再重复验证
+        context = await resolve_auth_context(request, token)
+        if context.error is not None:
+            if isinstance(context.error, HTTPException):
+                # 重新抛出HTTP异常
+                raise context.error
             # 记录未知错误但不暴露详细信息
-            print(f"[MicroserviceAuthMiddleware] 认证验证异常: {str(e)}")
+            logger.warning(f"认证验证异常: {str(context.error)}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="认证验证失败",
                 headers={"WWW-Authenticate": "Bearer"}
             )
 
-        return await call_next(request)
+        # 设置用户信息到请求状态
+        self._set_user_state(request, context.result.payload)
+
+        await self.app(scope, receive, send)
 
     def _set_user_state(self, request: Request, payload: Dict[str, Any]) -> None:
         """
@@ -0,0 +1,148 @@
+"""
+请求体缓冲中间件
+
+JSON请求体在整个中间件栈中只读取一次：第一个需要请求体的环节（RequestBodyMiddleware，
+或未启用它时的日志/输入验证中间件）读取完整请求体，把原始字节保存在请求scope上，
+之后的中间件直接复用；路由照常从receive读取回放的请求体。
+
+缓存位置：request.state.request_body（RequestBody对象）
+- raw：原始字节
+- text：按UTF-8解码的文本（只解码一次）
+- json()：解析后的JSON（只解析一次）
+
+请求体超过config.max_request_body_size时返回413，不再继续读取。
+"""
+
+import json
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..config import config
+from ..responses import create_error_response
+from .asgi import RequestBodyTooLarge, buffer_request_body
+
+_UNSET = object()
+
+REQUEST_BODY_STATE_KEY = "request_body"
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+
+class RequestBody:
+    """已缓冲的请求体"""
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._text: Optional[str] = None
+        self._json: Any = _UNSET
+        self._json_error: Optional[ValueError] = None
+
+    @property
+    def text(self) -> str:
+        """按UTF-8解码的请求体文本"""
+        if self._text is None:
+            self._text = self.raw.decode("utf-8", errors="replace")
+        return self._text
+
+    def json(self) -> Any:
+        """
+        解析后的JSON请求体（只解析一次）
+
+        Raises:
+            ValueError: 请求体不是合法JSON
+        """
+        if self._json is _UNSET and self._json_error is None:
+            try:
+                self._json = json.loads(self.raw)
+            except ValueError as e:
+                self._json_error = e
+        if self._json_error is not None:
+            raise self._json_error
+        return self._json
+
+
+def is_json_body_request(scope: Scope) -> bool:
+    """是否为带JSON请求体的请求"""
+    if scope["type"] != "http" or scope["method"] not in BODY_METHODS:
+        return False
+    for name, value in scope["headers"]:
+        if name == b"content-type":
+            return value.startswith(b"application/json")
+    return False
+
+
+def get_cached_request_body(scope: Scope) -> Optional[RequestBody]:
+    """获取scope上已缓冲的请求体，未缓冲时返回None"""
+    return scope.get("state", {}).get(REQUEST_BODY_STATE_KEY)
+
+
+async def read_request_body(
+    scope: Scope,
+    receive: Receive,
+    max_size: Optional[int] = None
+) -> Tuple[RequestBody, Receive]:
+    """
+    读取并缓存请求体，已缓存时直接复用
+
+    Args:
+        scope: ASGI scope
+        receive: 当前receive
+        max_size: 请求体最大字节数，默认使用config.max_request_body_size
+
+    Returns:
+        (body, receive): 缓冲后的请求体和供下游使用的receive
+
+    Raises:
+        HTTPException: 请求体超过大小限制（413）
+    """
+    cached = get_cached_request_body(scope)
+    if cached is not None:
+        # 上游已缓冲，receive已经是回放用的receive
+        return cached, receive
+
+    if max_size is None:
+        max_size = config.max_request_body_size
+
+    # 声明的长度已超限时不再读取
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            if value.isdigit() and int(value) > max_size:
+                raise _too_large()
+            break
+
+    try:
+        raw, receive = await buffer_request_body(receive, max_size)
+    except RequestBodyTooLarge:
+        raise _too_large()
+
+    body = RequestBody(raw)
+    scope.setdefault("state", {})[REQUEST_BODY_STATE_KEY] = body
+    return body, receive
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail="请求体过大"
+    )
+
+
+class RequestBodyMiddleware:
+    """请求体缓冲中间件（纯ASGI）"""
+
+    def __init__(self, app: ASGIApp, max_size: Optional[int] = None):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """缓冲JSON请求体并限制大小"""
+        if is_json_body_request(scope):
+            try:
+                _, receive = await read_request_body(scope, receive, self.max_size)
+            except HTTPException as e:
+                response = create_error_response(message=e.detail, status_code=e.status_code)
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
@@ -4,41 +4,69 @@
 统一处理API中的所有异常，生成标准化的错误响应。
 """
 
+import json
 import traceback
 from typing import Dict, Any, Optional
 
-from fastapi import Request, Response
 from fastapi.exceptions import RequestValidationError
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from ..responses import (
     create_validation_error_response,
     create_error_response,
     create_internal_server_error_response
 )
+from .asgi import get_client_ip
 
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
-    """异常处理中间件"""
+class ExceptionHandlerMiddleware:
+    """异常处理中间件（纯ASGI）"""
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """处理异常"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
+            return
 
         except RequestValidationError as e:
+            if response_started:
+                raise
             # 参数验证异常
-            return self._handle_validation_error(e, request)
+            response = self._handle_validation_error(e, Request(scope))
 
         except StarletteHTTPException as e:
+            if response_started:
+                raise
             # HTTP异常（包括404、405等）
-            return self._handle_http_exception(e, request)
+            response = self._handle_http_exception(e, Request(scope))
 
         except Exception as e:
+            if response_started:
+                # 响应已开始发送（如流式响应中途出错），无法再返回错误响应
+                self._log_exception(e, Request(scope))
+                raise
             # 其他异常
-            return self._handle_general_exception(e, request)
+            response = self._handle_general_exception(e, Request(scope))
+
+        await response(scope, receive, send)
 
     def _handle_validation_error(self, e: RequestValidationError, request: Request) -> Response:
         """处理参数验证错误"""
@@ -68,8 +96,7 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
 
         return create_error_response(
             message=message,
-            status_code=e.status_code,
-            error_code=f"HTTP_{e.status_code}"
+            status_code=e.status_code
         )
 
     def _handle_general_exception(self, e: Exception, request: Request) -> Response:
@@ -97,7 +124,6 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
         }
 
         # 记录到日志
-        import json
         print(json.dumps({
             "event": "exception",
             **error_info
@@ -105,12 +131,4 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
 
     def _get_client_ip(self, request: Request) -> str:
         """获取客户端IP地址"""
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
-
-        return request.client.host if request.client else "unknown"
\ No newline at end of file
+        return get_client_ip(request)
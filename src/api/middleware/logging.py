@@ -5,25 +5,36 @@
 状态码、用户信息等。
 """
 
+import json
 import time
 import uuid
 from typing import Dict, Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from ..config import config
+from .asgi import get_client_ip
+from .body import is_json_body_request, read_request_body
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """日志中间件"""
+class LoggingMiddleware:
+    """日志中间件（纯ASGI）"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.start_time = time.time()
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """记录请求和响应日志"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # 生成请求ID
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
@@ -31,31 +42,29 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         # 记录开始时间
         start_time = time.time()
 
-        # 提取请求信息
-        request_info = await self._extract_request_info(request)
+        # 提取请求信息（读取请求体后向下游回放）
+        request_info, receive = await self._extract_request_info(request, receive)
 
         # 记录请求日志
         self._log_request(request_id, request_info)
 
-        try:
-            # 处理请求
-            response = await call_next(request)
-
-            # 计算处理时间
-            process_time = time.time() - start_time
-
-            # 提取响应信息
-            response_info = self._extract_response_info(response, process_time)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # 计算处理时间（到响应开始为止）
+                process_time = time.time() - start_time
+                headers = MutableHeaders(scope=message)
 
-            # 记录响应日志
-            self._log_response(request_id, response_info)
+                # 提取响应信息并记录响应日志
+                response_info = self._extract_response_info(message["status"], headers, process_time)
+                self._log_response(request_id, response_info)
 
-            # 添加响应头
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = f"{process_time:.3f}"
-
-            return response
+                # 添加响应头
+                headers["X-Request-ID"] = request_id
+                headers["X-Process-Time"] = f"{process_time:.3f}"
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # 计算处理时间
             process_time = time.time() - start_time
@@ -66,8 +75,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             # 重新抛出异常
             raise
 
-    async def _extract_request_info(self, request: Request) -> Dict[str, Any]:
-        """提取请求信息"""
+    async def _extract_request_info(self, request: Request, receive: Receive) -> tuple[Dict[str, Any], Receive]:
+        """提取请求信息，返回请求信息和供下游使用的receive"""
         # 基础信息
         request_info = {
             "method": request.method,
@@ -87,25 +96,29 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             if request.method in ["GET", "DELETE"]:
                 request_info["query_params"] = dict(request.query_params)
             elif request.method in ["POST", "PUT", "PATCH"]:
-                if request.headers.get("content-type", "").startswith("application/json"):
+                if is_json_body_request(request.scope):
+                    # 请求体在中间件栈中只读取和解析一次
+                    body, receive = await read_request_body(request.scope, receive)
                     try:
-                        body = await request.json()
-                        request_info["body"] = self._sanitize_body(body)
-                    except:
+                        request_info["body"] = self._sanitize_body(body.json())
+                    except ValueError:
                         request_info["body"] = "[解析失败]"
                 else:
                     request_info["body"] = f"[二进制数据，大小: {request.headers.get('content-length', '0')}字节]"
+        except HTTPException:
+            # 请求体超过大小限制
+            raise
         except Exception:
             pass
 
-        return request_info
+        return request_info, receive
 
-    def _extract_response_info(self, response: Response, process_time: float) -> Dict[str, Any]:
+    def _extract_response_info(self, status_code: int, headers: MutableHeaders, process_time: float) -> Dict[str, Any]:
         """提取响应信息"""
         return {
-            "status_code": response.status_code,
-            "content_type": response.headers.get("content-type", ""),
-            "content_length": response.headers.get("content-length", "0"),
+            "status_code": status_code,
+            "content_type": headers.get("content-type", ""),
+            "content_length": headers.get("content-length", "0"),
             "process_time_ms": round(process_time * 1000, 2)
         }
 
@@ -164,17 +177,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
 
     def _get_client_ip(self, request: Request) -> str:
         """获取客户端IP地址"""
-        # 检查代理头
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
-
-        # 返回直连IP
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request)
 
     def _sanitize_body(self, body: Dict[str, Any]) -> Dict[str, Any]:
         """清理请求体，移除敏感信息"""
@@ -190,7 +193,3 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             return sanitized
 
         return body
-
-
-# 导入json模块
-import json
\ No newline at end of file
@@ -4,55 +4,70 @@ API限流中间件
 实现基于用户和IP的API访问频率限制，防止API滥用。
 """
 
-import time
-from collections import defaultdict, deque
-from typing import Dict, Deque, Tuple
+from typing import Dict, Tuple
 
-from fastapi import Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from ..config import config
 from ..responses import create_rate_limit_response
+from .asgi import get_client_ip
+from .rate_limiter import RateLimitDecision, create_rate_limit_backend
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """限流中间件"""
+class RateLimitMiddleware:
+    """限流中间件（纯ASGI）"""
 
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.requests_per_minute = config.rate_limit_requests_per_minute
         self.burst_size = config.rate_limit_burst_size
 
-        # 存储请求计数器
-        self.ip_counters: Dict[str, Deque[float]] = defaultdict(deque)
-        self.user_counters: Dict[str, Deque[float]] = defaultdict(deque)
-
-        # 最后清理时间
-        self.last_cleanup = time.time()
+        # 限流后端（进程内或多worker共享，由config.rate_limit_backend决定）
+        self.backend = create_rate_limit_backend(config)
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """检查限流"""
-        if not config.rate_limit_enabled:
-            return await call_next(request)
-
-        # 清理过期计数器
-        self._cleanup_counters()
+        if scope["type"] != "http" or not config.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
 
+        request = Request(scope)
+        limits = self._get_limits(request)
+        await self._apply_rate_limit(request, scope, receive, send, *limits)
+
+    def _get_limits(self, request: Request) -> Tuple[int, int]:
+        """获取本次请求适用的(每分钟请求数, 突发大小)"""
+        return self.requests_per_minute, self.burst_size
+
+    async def _apply_rate_limit(
+        self,
+        request: Request,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        requests_per_minute: int,
+        burst_size: int
+    ) -> None:
+        """按给定限制执行限流检查"""
         # 获取限制键
         limit_key, limit_type = self._get_limit_key(request)
 
-        # 检查是否超出限制
-        if self._is_rate_limited(limit_key, limit_type):
-            return create_rate_limit_response()
-
-        # 记录请求
-        self._record_request(limit_key, limit_type)
+        # 检查并记录请求
+        decision = await self.backend.hit(limit_key, requests_per_minute)
+        if not decision.allowed:
+            response = create_rate_limit_response(retry_after=decision.retry_after())
+            await response(scope, receive, send)
+            return
 
         # 添加限流头信息
-        response = await call_next(request)
-        self._add_rate_limit_headers(response, limit_key, limit_type)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._add_rate_limit_headers(MutableHeaders(scope=message), decision)
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_wrapper)
 
     def _get_limit_key(self, request: Request) -> Tuple[str, str]:
         """获取限制键"""
@@ -65,100 +80,21 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         client_ip = self._get_client_ip(request)
         return f"ip:{client_ip}", "ip"
 
-    def _is_rate_limited(self, limit_key: str, limit_type: str) -> bool:
-        """检查是否超出限制"""
-        if limit_type == "user":
-            counters = self.user_counters
-        else:
-            counters = self.ip_counters
-
-        requests = counters[limit_key]
-        now = time.time()
-
-        # 清理1分钟前的请求
-        while requests and requests[0] <= now - 60:
-            requests.popleft()
-
-        # 检查请求数量
-        return len(requests) >= self.requests_per_minute
-
-    def _record_request(self, limit_key: str, limit_type: str):
-        """记录请求"""
-        if limit_type == "user":
-            counters = self.user_counters
-        else:
-            counters = self.ip_counters
-
-        counters[limit_key].append(time.time())
-
-    def _add_rate_limit_headers(self, response: Response, limit_key: str, limit_type: str):
+    def _add_rate_limit_headers(self, headers: MutableHeaders, decision: RateLimitDecision):
         """添加限流头信息"""
-        if limit_type == "user":
-            counters = self.user_counters
-        else:
-            counters = self.ip_counters
-
-        # 确保计数器存在
-        if limit_key not in counters:
-            counters[limit_key] = deque()
-
-        requests = counters[limit_key]
-        now = time.time()
-
-        # 清理1分钟前的请求
-        while requests and requests[0] <= now - 60:
-            requests.popleft()
-
-        # 添加头信息
-        response.headers["x-rate-limit-limit"] = str(self.requests_per_minute)
-        response.headers["x-rate-limit-remaining"] = str(max(0, self.requests_per_minute - len(requests)))
-        response.headers["x-rate-limit-reset"] = str(int(now + 60))
-
-    def _cleanup_counters(self):
-        """清理过期计数器"""
-        now = time.time()
-
-        # 每分钟清理一次
-        if now - self.last_cleanup < 60:
-            return
-
-        # 清理IP计数器
-        for key in list(self.ip_counters.keys()):
-            requests = self.ip_counters[key]
-            while requests and requests[0] <= now - 60:
-                requests.popleft()
-            if not requests:
-                del self.ip_counters[key]
-
-        # 清理用户计数器
-        for key in list(self.user_counters.keys()):
-            requests = self.user_counters[key]
-            while requests and requests[0] <= now - 60:
-                requests.popleft()
-            if not requests:
-                del self.user_counters[key]
-
-        self.last_cleanup = now
+        headers["x-rate-limit-limit"] = str(decision.limit)
+        headers["x-rate-limit-remaining"] = str(decision.remaining)
+        headers["x-rate-limit-reset"] = str(int(decision.reset_at))
 
     def _get_client_ip(self, request: Request) -> str:
         """获取客户端IP地址"""
-        # 检查代理头
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("x-real-ip")
-        if real_ip:
-            return real_ip
-
-        # 返回直连IP
-        return request.client.host if request.client else "unknown"
+        return get_client_ip(request)
 
 
 class AdvancedRateLimitMiddleware(RateLimitMiddleware):
     """高级限流中间件（支持分级限制）"""
 
-    def __init__(self, app):
+    def __init__(self, app: ASGIApp):
         super().__init__(app)
         # 不同端点的限制配置
         self.endpoint_limits = {
@@ -169,28 +105,10 @@ class AdvancedRateLimitMiddleware(RateLimitMiddleware):
             "default": {"requests_per_minute": 60, "burst_size": 10}
         }
 
-    async def dispatch(self, request: Request, call_next):
-        """检查分级限流"""
-        if not config.rate_limit_enabled:
-            return await call_next(request)
-
-        # 获取端点限制配置
+    def _get_limits(self, request: Request) -> Tuple[int, int]:
+        """按端点获取限制配置（按请求传递，不修改实例属性，并发请求互不影响）"""
         endpoint_config = self._get_endpoint_config(request)
-
-        # 临时更新限制配置
-        original_requests_per_minute = self.requests_per_minute
-        original_burst_size = self.burst_size
-
-        self.requests_per_minute = endpoint_config["requests_per_minute"]
-        self.burst_size = endpoint_config["burst_size"]
-
-        try:
-            # 执行限流检查
-            return await super().dispatch(request, call_next)
-        finally:
-            # 恢复原始配置
-            self.requests_per_minute = original_requests_per_minute
-            self.burst_size = original_burst_size
+        return endpoint_config["requests_per_minute"], endpoint_config["burst_size"]
 
     def _get_endpoint_config(self, request: Request) -> Dict[str, int]:
         """获取端点限制配置"""
@@ -0,0 +1,418 @@
+"""
+滑动窗口限流器
+
+用"滑动窗口计数器"近似滑动日志：每个限流键只保存当前窗口和上一窗口的请求数，
+估算值 = 上一窗口计数 × 上一窗口在滑动窗口中的剩余占比 + 当前窗口计数。
+
+- 每个键固定内存（窗口起点和两个计数），检查和记录都是O(1)
+- 过期索引：键按最近访问时间排列在OrderedDict中，最旧的键在最前面，
+  每次请求只从头部清理少量已过期的键（两个窗口内没有请求），不再全量扫描
+
+限流状态通过后端保存：
+- InProcessRateLimitBackend：进程内计数，每个worker独立计数
+- SQLiteRateLimitBackend：同一主机上多个worker共享计数（WAL模式的SQLite文件）。
+  每次从共享计数中批量预留一部分配额，在本地消耗预留配额预先放行，
+  避免每个请求都访问共享存储
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """单次限流判定结果"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_at: float
+
+    def retry_after(self, now: Optional[float] = None) -> int:
+        """距离窗口重置的秒数（至少1秒）"""
+        now = time.time() if now is None else now
+        return max(1, math.ceil(self.reset_at - now))
+
+
+class _WindowCounter:
+    """单个键的窗口计数"""
+
+    __slots__ = ("window_start", "current", "previous")
+
+    def __init__(self, window_start: float):
+        self.window_start = window_start
+        self.current = 0
+        self.previous = 0
+
+
+class SlidingWindowRateLimiter:
+    """滑动窗口计数限流器（进程内）"""
+
+    def __init__(self, window_seconds: float = 60.0, cleanup_batch: int = 32):
+        """
+        初始化限流器
+
+        Args:
+            window_seconds: 窗口长度（秒）
+            cleanup_batch: 每次请求最多清理的过期键数量
+        """
+        self.window_seconds = window_seconds
+        self.cleanup_batch = cleanup_batch
+        self._counters: "OrderedDict[str, _WindowCounter]" = OrderedDict()
+        self._stats = {"allowed": 0, "limited": 0, "expired": 0}
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> RateLimitDecision:
+        """
+        记录一次请求并判定是否放行（超限的请求不计数）
+
+        Args:
+            key: 限流键
+            limit: 每个窗口允许的请求数
+            now: 当前时间戳（测试用）
+
+        Returns:
+            RateLimitDecision: 判定结果
+        """
+        now = time.time() if now is None else now
+        self.cleanup(now)
+
+        counter = self._get_counter(key, now)
+        estimated = self._estimate(counter, now)
+        reset_at = counter.window_start + self.window_seconds
+
+        if estimated + 1 > limit:
+            self._stats["limited"] += 1
+            return RateLimitDecision(allowed=False, limit=limit, remaining=0, reset_at=reset_at)
+
+        counter.current += 1
+        self._stats["allowed"] += 1
+        remaining = max(0, math.floor(limit - estimated - 1))
+        return RateLimitDecision(allowed=True, limit=limit, remaining=remaining, reset_at=reset_at)
+
+    def cleanup(self, now: Optional[float] = None, max_items: Optional[int] = None) -> int:
+        """
+        从过期索引头部清理过期键
+
+        Args:
+            now: 当前时间戳
+            max_items: 最多清理的数量，默认cleanup_batch
+
+        Returns:
+            int: 清理的键数量
+        """
+        now = time.time() if now is None else now
+        max_items = self.cleanup_batch if max_items is None else max_items
+        # 两个窗口内没有请求的键对估算值已无贡献
+        expire_before = now - 2 * self.window_seconds
+
+        removed = 0
+        while self._counters and removed < max_items:
+            key, counter = next(iter(self._counters.items()))
+            if counter.window_start > expire_before:
+                break
+            del self._counters[key]
+            removed += 1
+
+        self._stats["expired"] += removed
+        return removed
+
+    def _get_counter(self, key: str, now: float) -> _WindowCounter:
+        window_start = math.floor(now / self.window_seconds) * self.window_seconds
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = _WindowCounter(window_start)
+            self._counters[key] = counter
+            return counter
+
+        # 移到索引末尾（最近访问）
+        self._counters.move_to_end(key)
+        if counter.window_start != window_start:
+            if window_start - counter.window_start == self.window_seconds:
+                counter.previous = counter.current
+            else:
+                counter.previous = 0
+            counter.current = 0
+            counter.window_start = window_start
+        return counter
+
+    def _estimate(self, counter: _WindowCounter, now: float) -> float:
+        elapsed = (now - counter.window_start) / self.window_seconds
+        return counter.previous * (1 - elapsed) + counter.current
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {"keys": len(self._counters), **self._stats}
+
+
+class RateLimitBackend(ABC):
+    """限流后端抽象接口"""
+
+    name = "base"
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int) -> RateLimitDecision:
+        """记录一次请求并判定是否放行"""
+        pass
+
+    async def close(self) -> None:
+        """关闭后端，写入尚未同步的计数"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {"backend": self.name}
+
+
+class InProcessRateLimitBackend(RateLimitBackend):
+    """进程内限流后端"""
+
+    name = "memory"
+
+    def __init__(self, window_seconds: float = 60.0):
+        self.limiter = SlidingWindowRateLimiter(window_seconds=window_seconds)
+
+    async def hit(self, key: str, limit: int) -> RateLimitDecision:
+        return self.limiter.hit(key, limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.limiter.get_stats()}
+
+
+class _Lease:
+    """某个键在当前窗口从共享存储预留到的配额"""
+
+    __slots__ = ("window_start", "tokens", "remaining", "denied_until")
+
+    def __init__(self, window_start: float, tokens: int, remaining: int, denied_until: float = 0.0):
+        self.window_start = window_start
+        self.tokens = tokens
+        self.remaining = remaining
+        self.denied_until = denied_until
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    基于SQLite文件的共享限流后端（单主机多worker）
+
+    每个worker按"预留配额"方式使用共享计数：需要时在一个写事务内读取该键的
+    滑动窗口估算值，预留剩余配额的local_share比例（不超过lease_size），
+    并把预留数一次性计入共享计数；之后的请求在本地消耗预留配额，不访问共享存储。
+
+    - 所有worker预留的总数不超过限制，多worker下总放行数不会超过限制
+    - 远离限制时一次预留覆盖多个请求；接近限制时预留变小，每个请求都以共享计数为准
+    - 共享计数已满时在本地缓存拒绝结果sync_interval秒，超限客户端不会反复访问共享存储
+    - 窗口结束时未用完的预留作废（按已使用计入，偏保守）
+    - 共享存储不可用时退化为进程内计数
+    - 预留配额按(键, 限制)分别保存：同一键在不同限制档位下（如默认档和登录档）
+      共享同一个计数，但宽松档位预留的配额不会被严格档位的请求消耗
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        window_seconds: float = 60.0,
+        lease_size: int = 20,
+        local_share: float = 0.1,
+        sync_interval: float = 1.0,
+        max_local_keys: int = 10000
+    ):
+        """
+        初始化共享限流后端
+
+        Args:
+            path: SQLite数据库文件路径
+            window_seconds: 窗口长度（秒）
+            lease_size: 单次最多预留的配额
+            local_share: 单次预留占剩余配额的比例
+            sync_interval: 共享计数已满时本地缓存拒绝结果的时长（秒）
+            max_local_keys: 本地缓存的最大键数量
+        """
+        self.path = path
+        self.window_seconds = window_seconds
+        self.lease_size = lease_size
+        self.local_share = local_share
+        self.sync_interval = sync_interval
+        self.max_local_keys = max_local_keys
+
+        self._leases: "OrderedDict[Tuple[str, int], _Lease]" = OrderedDict()
+        self._reserve_lock = asyncio.Lock()
+        self._db_lock = threading.Lock()
+        self._last_purge = 0.0
+        self._fallback = SlidingWindowRateLimiter(window_seconds=window_seconds)
+        self._stats = {
+            "allowed": 0,
+            "limited": 0,
+            "local_decisions": 0,
+            "reservations": 0,
+            "reserved_tokens": 0,
+            "store_errors": 0
+        }
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 手动管理事务（BEGIN IMMEDIATE）
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_limit_counters (
+                    key TEXT NOT NULL,
+                    window_start INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (key, window_start)
+                )
+                """
+            )
+
+    async def hit(self, key: str, limit: int) -> RateLimitDecision:
+        now = time.time()
+        window_start = math.floor(now / self.window_seconds) * self.window_seconds
+
+        decision = self._consume_local(key, limit, window_start, now)
+        if decision is not None:
+            self._stats["local_decisions"] += 1
+            return decision
+
+        async with self._reserve_lock:
+            # 等锁期间其他请求可能已完成预留
+            decision = self._consume_local(key, limit, window_start, now)
+            if decision is not None:
+                return decision
+
+            try:
+                granted, available = await asyncio.to_thread(self._reserve_db, key, limit, window_start, now)
+            except sqlite3.Error as e:
+                logger.warning(f"限流共享存储访问失败，使用进程内计数: {e}")
+                self._stats["store_errors"] += 1
+                return self._fallback.hit(key, limit, now)
+
+            self._stats["reservations"] += 1
+            self._stats["reserved_tokens"] += granted
+
+            lease = _Lease(window_start, granted, available)
+            if granted == 0:
+                reset_at = window_start + self.window_seconds
+                lease.denied_until = now + min(self.sync_interval, max(0.0, reset_at - now))
+            lease_key = (key, limit)
+            self._leases[lease_key] = lease
+            self._leases.move_to_end(lease_key)
+            while len(self._leases) > self.max_local_keys:
+                self._leases.popitem(last=False)
+
+            return self._consume_local(key, limit, window_start, now)
+
+    def _consume_local(self, key: str, limit: int, window_start: float, now: float) -> Optional[RateLimitDecision]:
+        """用本地预留配额判定，需要访问共享存储时返回None"""
+        lease = self._leases.get((key, limit))
+        if lease is None or lease.window_start != window_start:
+            return None
+
+        reset_at = window_start + self.window_seconds
+        if lease.tokens > 0:
+            lease.tokens -= 1
+            lease.remaining -= 1
+            self._stats["allowed"] += 1
+            return RateLimitDecision(allowed=True, limit=limit, remaining=max(0, lease.remaining), reset_at=reset_at)
+
+        if lease.denied_until > now:
+            self._stats["limited"] += 1
+            return RateLimitDecision(allowed=False, limit=limit, remaining=0, reset_at=reset_at)
+
+        return None
+
+    def _reserve_db(self, key: str, limit: int, window_start: float, now: float) -> Tuple[int, int]:
+        """
+        在线程中执行：在一个写事务内计算剩余配额并预留
+
+        Returns:
+            (granted, available): 预留到的配额和预留前的剩余配额
+        """
+        current_start = int(window_start)
+        previous_start = int(window_start - self.window_seconds)
+
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows: List[Tuple[int, int]] = self._conn.execute(
+                    "SELECT window_start, count FROM rate_limit_counters WHERE key = ? AND window_start IN (?, ?)",
+                    (key, current_start, previous_start)
+                ).fetchall()
+                counts = dict(rows)
+
+                elapsed = (now - window_start) / self.window_seconds
+                estimated = counts.get(previous_start, 0) * (1 - elapsed) + counts.get(current_start, 0)
+                available = math.floor(limit - estimated)
+
+                granted = 0
+                if available >= 1:
+                    granted = max(1, min(self.lease_size, math.floor(available * self.local_share)))
+                    self._conn.execute(
+                        """
+                        INSERT INTO rate_limit_counters (key, window_start, count) VALUES (?, ?, ?)
+                        ON CONFLICT (key, window_start) DO UPDATE SET count = count + excluded.count
+                        """,
+                        (key, current_start, granted)
+                    )
+
+                # 每个窗口清理一次已过期的计数
+                if window_start - self._last_purge >= self.window_seconds:
+                    self._conn.execute("DELETE FROM rate_limit_counters WHERE window_start < ?", (previous_start,))
+                    self._last_purge = window_start
+
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return granted, max(0, available)
+
+    async def close(self) -> None:
+        with self._db_lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "local_keys": len(self._leases),
+            **self._stats
+        }
+
+
+def create_rate_limit_backend(config: Any) -> RateLimitBackend:
+    """
+    按配置创建限流后端
+
+    Args:
+        config: API配置
+
+    Returns:
+        RateLimitBackend: 限流后端
+    """
+    backend = getattr(config, "rate_limit_backend", "memory")
+    if backend == "sqlite":
+        return SQLiteRateLimitBackend(
+            path=getattr(config, "rate_limit_sqlite_path", "data/rate_limit.db"),
+            lease_size=getattr(config, "rate_limit_lease_size", 20),
+            local_share=getattr(config, "rate_limit_local_share", 0.1),
+            sync_interval=getattr(config, "rate_limit_sync_interval", 1.0)
+        )
+    if backend != "memory":
+        logger.warning(f"未知的限流后端: {backend}，使用进程内后端")
+    return InProcessRateLimitBackend()
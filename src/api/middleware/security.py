@@ -4,40 +4,73 @@
 实现各种安全增强功能，包括安全头设置、CSRF保护等。
 """
 
+import re
 import secrets
-from typing import Optional
+from typing import Any, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from ..config import config
-
-
-class SecurityMiddleware(BaseHTTPMiddleware):
-    """安全中间件"""
-
-    def __init__(self, app):
-        super().__init__(app)
+from ..responses import create_error_response
+from .body import is_json_body_request, read_request_body
+
+# 危险字符串模式
+DANGEROUS_PATTERNS = [
+    r"<script[^>]*>.*?</script>",  # XSS
+    r"javascript:",  # JavaScript协议
+    r"vbscript:",  # VBScript协议
+    r"onload\s*=",  # 事件处理器
+    r"onerror\s*=",  # 错误处理器
+    r"onclick\s*=",  # 点击处理器
+    r"union\s+select",  # SQL注入
+    r"drop\s+table",  # SQL删除
+    r"insert\s+into",  # SQL插入
+    r"update\s+set",  # SQL更新
+    r"delete\s+from",  # SQL删除
+]
+
+# 所有模式合并为一个预编译正则，一次扫描完成检查
+DANGEROUS_CONTENT_RE = re.compile("|".join(f"(?:{p})" for p in DANGEROUS_PATTERNS), re.IGNORECASE)
+
+
+class SecurityMiddleware:
+    """安全中间件（纯ASGI）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.csrf_tokens = {}
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """添加安全头和CSRF保护"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # 生成CSRF令牌
         if config.csrf_protection:
             csrf_token = self._generate_or_get_csrf_token(request)
             request.state.csrf_token = csrf_token
 
-        # 处理请求
-        response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
 
-        # 添加安全头
-        self._add_security_headers(response, request)
+                # 添加安全头
+                self._add_security_headers(headers, request)
 
-        # 设置CSRF令牌
-        if config.csrf_protection:
-            self._set_csrf_token(response, request)
+                # 设置CSRF令牌
+                if config.csrf_protection:
+                    self._set_csrf_token(headers, request)
+            await send(message)
 
-        return response
+        # 处理请求
+        await self.app(scope, receive, send_wrapper)
 
     def _generate_or_get_csrf_token(self, request: Request) -> str:
         """生成或获取CSRF令牌"""
@@ -54,19 +87,19 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         # 简单的格式验证
         return len(token) >= 32 and token.isalnum()
 
-    def _add_security_headers(self, response: Response, request: Request):
+    def _add_security_headers(self, headers: MutableHeaders, request: Request):
         """添加安全头"""
         # 防止MIME类型嗅探
-        response.headers["X-Content-Type-Options"] = "nosniff"
+        headers["X-Content-Type-Options"] = "nosniff"
 
         # 防止点击劫持
-        response.headers["X-Frame-Options"] = "DENY"
+        headers["X-Frame-Options"] = "DENY"
 
         # 启用XSS保护
-        response.headers["X-XSS-Protection"] = "1; mode=block"
+        headers["X-XSS-Protection"] = "1; mode=block"
 
         # 限制引用来源
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
 
         # 内容安全策略 - 为API文档页面放宽限制
         if request.url.path in ["/docs", "/redoc"]:
@@ -91,11 +124,11 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                 "connect-src 'self'; "
                 "frame-ancestors 'none';"
             )
-        response.headers["Content-Security-Policy"] = csp
+        headers["Content-Security-Policy"] = csp
 
         # HSTS（仅在HTTPS下）
         if request.url.scheme == "https":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+            headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
 
         # 权限策略
         permissions_policy = (
@@ -108,14 +141,15 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             "gyroscope=(), "
             "accelerometer=()"
         )
-        response.headers["Permissions-Policy"] = permissions_policy
+        headers["Permissions-Policy"] = permissions_policy
 
-    def _set_csrf_token(self, response: Response, request: Request):
+    def _set_csrf_token(self, headers: MutableHeaders, request: Request):
         """设置CSRF令牌"""
         if hasattr(request.state, "csrf_token"):
             csrf_token = request.state.csrf_token
-            # 设置CSRF令牌Cookie
-            response.set_cookie(
+            # 设置CSRF令牌Cookie（借助Response生成Set-Cookie头）
+            cookie = Response()
+            cookie.set_cookie(
                 key="csrf_token",
                 value=csrf_token,
                 max_age=3600,  # 1小时
@@ -123,72 +157,71 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                 httponly=True,
                 samesite="strict"
             )
+            headers.append("set-cookie", cookie.headers["set-cookie"])
             # 在响应头中添加令牌（方便前端获取）
-            response.headers["X-CSRF-Token"] = csrf_token
-
-
-class InputValidationMiddleware(BaseHTTPMiddleware):
-    """输入验证中间件"""
-
-    def __init__(self, app):
-        super().__init__(app)
-        # 危险字符串模式
-        self.dangerous_patterns = [
-            r"<script[^>]*>.*?</script>",  # XSS
-            r"javascript:",  # JavaScript协议
-            r"vbscript:",  # VBScript协议
-            r"onload\s*=",  # 事件处理器
-            r"onerror\s*=",  # 错误处理器
-            r"onclick\s*=",  # 点击处理器
-            r"union\s+select",  # SQL注入
-            r"drop\s+table",  # SQL删除
-            r"insert\s+into",  # SQL插入
-            r"update\s+set",  # SQL更新
-            r"delete\s+from",  # SQL删除
-        ]
-
-    async def dispatch(self, request: Request, call_next):
+            headers["X-CSRF-Token"] = csrf_token
+
+
+class InputValidationMiddleware:
+    """输入验证中间件（纯ASGI）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.dangerous_patterns = DANGEROUS_PATTERNS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """验证输入数据"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # 检查查询参数
         if request.query_params:
             if self._contains_dangerous_content(dict(request.query_params)):
-                from ..responses import create_error_response
-                return create_error_response(
+                response = create_error_response(
                     message="请求参数包含非法内容",
-                    status_code=400,
-                    error_code="INVALID_INPUT"
+                    status_code=400
                 )
-
-        # 检查请求体
-        if request.method in ["POST", "PUT", "PATCH"]:
-            content_type = request.headers.get("content-type", "")
-            if content_type.startswith("application/json"):
-                try:
-                    body = await request.json()
-                    if self._contains_dangerous_content(body):
-                        from ..responses import create_error_response
-                        return create_error_response(
-                            message="请求体包含非法内容",
-                            status_code=400,
-                            error_code="INVALID_INPUT"
-                        )
-                except:
-                    # JSON解析失败，让其他中间件处理
-                    pass
+                await response(scope, receive, send)
+                return
+
+        # 检查请求体（复用已缓冲的请求体，未缓冲时读取后向下游回放）
+        if is_json_body_request(scope):
+            try:
+                body, receive = await read_request_body(scope, receive)
+            except HTTPException as e:
+                response = create_error_response(message=e.detail, status_code=e.status_code)
+                await response(scope, receive, send)
+                return
+
+            if self._body_contains_dangerous_content(body):
+                response = create_error_response(
+                    message="请求体包含非法内容",
+                    status_code=400
+                )
+                await response(scope, receive, send)
+                return
 
         # 处理请求
-        return await call_next(request)
+        await self.app(scope, receive, send)
+
+    def _body_contains_dangerous_content(self, body) -> bool:
+        """检查JSON请求体中的字符串值是否包含危险内容（复用已缓存的解析结果）"""
+        try:
+            data = body.json()
+        except ValueError:
+            # JSON解析失败，让其他中间件处理
+            return False
+        return self._contains_dangerous_content(data)
 
-    def _contains_dangerous_content(self, data: dict) -> bool:
+    def _contains_dangerous_content(self, data: Any) -> bool:
         """检查是否包含危险内容"""
-        import re
-
         def check_value(value):
             if isinstance(value, str):
                 # 检查危险模式
-                for pattern in self.dangerous_patterns:
-                    if re.search(pattern, value, re.IGNORECASE):
-                        return True
+                return DANGEROUS_CONTENT_RE.search(value) is not None
             elif isinstance(value, dict):
                 for v in value.values():
                     if check_value(v):
@@ -199,4 +232,4 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
                         return True
             return False
 
-        return check_value(data)
\ No newline at end of file
+        return check_value(data)
@@ -84,4 +84,70 @@ def create_forbidden_response(
     return JSONResponse(
         content=response_data,
         status_code=status.HTTP_403_FORBIDDEN
-    )
\ No newline at end of file
+    )
+
+def create_validation_error_response(
+    errors: Optional[Dict[str, Any]] = None,
+    message: str = "请求参数验证失败"
+) -> JSONResponse:
+    """创建参数验证错误响应 - data中返回各字段的错误信息"""
+    response_data = {
+        "code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+        "message": message,
+        "data": errors
+    }
+    return JSONResponse(
+        content=response_data,
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
+
+
+def create_internal_server_error_response(
+    message: str = "服务器内部错误"
+) -> JSONResponse:
+    """创建服务器内部错误响应 - 只返回code、message、data三个字段"""
+    response_data = {
+        "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "message": message,
+        "data": None
+    }
+    return JSONResponse(
+        content=response_data,
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+    )
+
+
+def create_rate_limit_response(
+    message: str = "请求过于频繁，请稍后重试",
+    retry_after: Optional[int] = None
+) -> JSONResponse:
+    """创建限流响应 - 只返回code、message、data三个字段"""
+    response_data = {
+        "code": status.HTTP_429_TOO_MANY_REQUESTS,
+        "message": message,
+        "data": None
+    }
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+    return JSONResponse(
+        content=response_data,
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers=headers
+    )
+
+
+def create_service_unavailable_response(
+    message: str = "服务繁忙，请稍后重试",
+    retry_after: Optional[int] = None
+) -> JSONResponse:
+    """创建服务不可用响应 - 只返回code、message、data三个字段"""
+    response_data = {
+        "code": status.HTTP_503_SERVICE_UNAVAILABLE,
+        "message": message,
+        "data": None
+    }
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+    return JSONResponse(
+        content=response_data,
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers=headers
+    )
@@ -20,6 +20,7 @@ from pydantic import BaseModel, Field
 from ..services.reward_microservice_client import RewardMicroserviceClient, get_reward_client
 from .schemas import UnifiedResponse
 from .dependencies import get_current_user_id
+from ..services.conditional_get import bump_user_data_version
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -87,7 +88,11 @@ async def redeem_prize_endpoint(
     """4.3 充值界面（兑换奖品） - 微服务代理"""
     try:
         logger.info(f"兑换奖品API调用: user_id={user_id}, code={request.code}")
-        response = await client.redeem(str(user_id), request.code)
+        try:
+            response = await client.redeem(str(user_id), request.code)
+        finally:
+            # 兑换会改变积分余额（用户资料中展示）
+            bump_user_data_version(user_id)
 
         # 检查微服务响应格式
         if not isinstance(response, dict):
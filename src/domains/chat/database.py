@@ -12,6 +12,9 @@
 
 功能特性：
 - LangGraph SqliteSaver配置和管理
+- 进程级检查点器连接池（WAL模式、固定连接数、线程安全）
+- 异步检查点器（AsyncSqliteSaver），供事件循环内的异步聊天流程使用
+- 会话目录（按用户和更新时间索引），随检查点写入在同一事务中维护
 - 聊天会话状态持久化
 - 数据库连接检查
 - 错误诊断和调试信息
@@ -20,15 +23,24 @@
 版本：1.0.0
 """
 
+import asyncio
 import os
+import queue
 import sqlite3
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
+import aiosqlite
 from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.store.memory import InMemoryStore
 
+from .session_catalog import AsyncCatalogSqliteSaver, CatalogSqliteSaver
+
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -36,6 +48,11 @@ logger = logging.getLogger(__name__)
 # 聊天域数据库配置
 CHAT_DB_PATH = os.getenv("CHAT_DB_PATH", "data/chat.db")
 CHAT_ECHO_SQL = os.getenv("CHAT_ECHO_SQL", "false").lower() == "true"
+# 检查点器连接池：连接数、获取连接的最长等待时间（秒）
+CHAT_CHECKPOINTER_POOL_SIZE = int(os.getenv("CHAT_CHECKPOINTER_POOL_SIZE", "4"))
+CHAT_CHECKPOINTER_ACQUIRE_TIMEOUT = float(os.getenv("CHAT_CHECKPOINTER_ACQUIRE_TIMEOUT", "30"))
+# 事件循环变化时关闭旧异步连接的最长等待时间（秒）
+_STALE_CONNECTION_CLOSE_TIMEOUT = 5.0
 
 
 def get_chat_database_path() -> str:
@@ -97,6 +114,191 @@ def create_chat_checkpointer() -> SqliteSaver:
         raise
 
 
+async def create_async_chat_checkpointer(db_path: str) -> AsyncSqliteSaver:
+    """
+    创建异步聊天检查点器
+
+    基于aiosqlite打开一条连接（WAL模式）并完成建表。AsyncSqliteSaver内部用
+    asyncio锁串行化数据库操作，SQL在aiosqlite的后台线程中执行，不阻塞事件循环；
+    LLM调用期间不持有锁，一条连接即可支撑大量并发对话。
+    必须在将要使用它的事件循环中创建。
+
+    Args:
+        db_path: 数据库文件路径
+
+    Returns:
+        AsyncSqliteSaver: 已完成建表的异步检查点器
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = await aiosqlite.connect(db_path, timeout=5.0)
+    try:
+        checkpointer = AsyncCatalogSqliteSaver(conn)
+        await checkpointer.setup()
+        await conn.execute("PRAGMA synchronous=NORMAL")
+    except Exception:
+        await conn.close()
+        raise
+
+    logger.info(f"聊天异步检查点器创建成功: {db_path}")
+    return checkpointer
+
+
+class PooledCheckpointer:
+    """
+    检查点器连接池中的一个槽位
+
+    持有一条SQLite连接和基于它的SqliteSaver，以及绑定在这个检查点器上、
+    可以跨调用复用的对象（例如编译后的聊天图）。同一时刻只会被一个调用方持有。
+    """
+
+    def __init__(self, checkpointer: SqliteSaver):
+        self.checkpointer = checkpointer
+        self._resources: Dict[str, Any] = {}
+
+    def get_or_create(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        获取绑定在本槽位上的对象，不存在时用factory创建并缓存
+
+        Args:
+            key: 对象名
+            factory: 创建函数
+
+        Returns:
+            Any: 缓存的对象
+        """
+        resource = self._resources.get(key)
+        if resource is None:
+            resource = factory()
+            self._resources[key] = resource
+        return resource
+
+
+class CheckpointerPool:
+    """
+    进程级SQLite检查点器连接池
+
+    启动时打开固定数量的连接（WAL模式），每条连接上建一个SqliteSaver并完成建表，
+    之后所有聊天操作从池中借用，不再为每次调用新建连接、重复建表和编译图。
+    借用/归还通过queue.LifoQueue完成，可以在多线程中使用。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = CHAT_CHECKPOINTER_POOL_SIZE,
+        acquire_timeout: float = CHAT_CHECKPOINTER_ACQUIRE_TIMEOUT
+    ):
+        """
+        初始化连接池
+
+        Args:
+            db_path: 数据库文件路径
+            size: 连接数
+            acquire_timeout: 获取连接的最长等待时间（秒）
+        """
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self.closed = False
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._connections: List[sqlite3.Connection] = []
+        # 后进先出：低并发时总是复用最近归还的槽位，其余槽位上的图按需编译
+        self._slots: "queue.LifoQueue[PooledCheckpointer]" = queue.LifoQueue()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "acquisitions": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "total_wait_time": 0.0
+        }
+
+        try:
+            for _ in range(self.size):
+                # SqliteSaver内部对连接加锁，允许跨线程使用
+                conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
+                self._connections.append(conn)
+                # 写检查点时在同一事务中维护会话目录
+                checkpointer = CatalogSqliteSaver(conn)
+                # 建表（含会话目录）并切换到WAL模式（读写互不阻塞）
+                checkpointer.setup()
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._slots.put(PooledCheckpointer(checkpointer))
+        except Exception:
+            self.close()
+            raise
+
+        logger.info(f"聊天检查点器连接池创建成功: {db_path}, size={self.size}")
+
+    @contextmanager
+    def acquire(self) -> Iterator[PooledCheckpointer]:
+        """
+        借用一个检查点器槽位，退出时归还
+
+        Yields:
+            PooledCheckpointer: 槽位
+
+        Raises:
+            RuntimeError: 连接池已关闭，或等待超时
+        """
+        if self.closed:
+            raise RuntimeError("聊天检查点器连接池已关闭")
+
+        start = time.perf_counter()
+        try:
+            slot = self._slots.get_nowait()
+            waited = False
+        except queue.Empty:
+            waited = True
+            try:
+                slot = self._slots.get(timeout=self.acquire_timeout)
+            except queue.Empty:
+                with self._stats_lock:
+                    self._stats["timeouts"] += 1
+                raise RuntimeError(f"获取聊天检查点器超时（{self.acquire_timeout}秒）")
+
+        with self._stats_lock:
+            self._stats["acquisitions"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["total_wait_time"] += time.perf_counter() - start
+
+        try:
+            yield slot
+        finally:
+            self._slots.put(slot)
+
+    def close(self) -> None:
+        """关闭所有连接"""
+        self.closed = True
+        for conn in self._connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.error(f"关闭聊天检查点器连接失败: {e}")
+        self._connections = []
+        logger.info("聊天检查点器连接池已关闭")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取连接池统计信息
+
+        Returns:
+            Dict[str, Any]: 连接数、空闲数、借用次数、等待次数和平均等待时间
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        total_wait_time = stats.pop("total_wait_time")
+        return {
+            "size": self.size,
+            "available": self._slots.qsize(),
+            "closed": self.closed,
+            "avg_wait_ms": round(total_wait_time / stats["waits"] * 1000, 3) if stats["waits"] else 0.0,
+            **stats
+        }
+
+
 def create_memory_store() -> InMemoryStore:
     """
     创建LangGraph内存存储
@@ -200,6 +402,39 @@ def get_database_info() -> dict:
         }
 
 
+async def _shutdown_stale_async_connection(checkpointer: AsyncSqliteSaver) -> None:
+    """
+    关闭绑定在旧事件循环上的aiosqlite连接
+
+    旧循环仍在运行时把close()调度回旧循环执行；旧循环已停止时，
+    在当前循环上await close()——aiosqlite的结果future绑定调用方所在循环，
+    真正的sqlite close仍在连接自己的后台线程中执行。close失败或超时时
+    尽量投递停止信号，让非守护的后台线程能够退出。
+
+    Args:
+        checkpointer: 绑定在旧事件循环上的异步检查点器
+    """
+    conn = checkpointer.conn
+    old_loop = checkpointer.loop
+    try:
+        if old_loop.is_running() and not old_loop.is_closed():
+            future = asyncio.run_coroutine_threadsafe(conn.close(), old_loop)
+            await asyncio.wait_for(
+                asyncio.wrap_future(future), _STALE_CONNECTION_CLOSE_TIMEOUT
+            )
+        else:
+            await asyncio.wait_for(conn.close(), _STALE_CONNECTION_CLOSE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"关闭旧异步检查点器连接失败: {e}")
+        # aiosqlite没有公开的停止接口；_stop_running()是0.21.0（uv.lock锁定版本）的
+        # 私有方法，只投递停止信号。后续版本没有该方法时只记录日志
+        stop_running = getattr(conn, "_stop_running", None)
+        if conn.is_alive() and callable(stop_running):
+            stop_running()
+        elif conn.is_alive():
+            logger.warning("无法停止旧异步检查点器的aiosqlite后台线程")
+
+
 class ChatDatabaseManager:
     """
     聊天数据库管理器
@@ -207,14 +442,20 @@ class ChatDatabaseManager:
     提供聊天域数据库的统一管理接口，包括连接管理、
     健康检查和错误处理等功能。
 
-    注意：由于 SqliteSaver 现在是上下文管理器，这个类主要
-    用于创建检查点器实例，而不是管理连接。
+    同步聊天操作通过get_checkpointer_pool()借用进程级连接池中的检查点器；
+    异步聊天操作通过get_async_checkpointer()使用当前事件循环上的AsyncSqliteSaver；
+    create_checkpointer()仍返回独立的SqliteSaver上下文管理器，供一次性脚本使用。
     """
 
     def __init__(self):
         """初始化聊天数据库管理器"""
         self.db_path = get_chat_database_path()
         self._store = None
+        self._pool: Optional[CheckpointerPool] = None
+        self._pool_lock = threading.Lock()
+        self._async_checkpointer: Optional[AsyncSqliteSaver] = None
+        self._async_lock: Optional[asyncio.Lock] = None
+        self._async_lock_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def create_checkpointer(self) -> SqliteSaver:
         """
@@ -225,6 +466,69 @@ class ChatDatabaseManager:
         """
         return create_chat_checkpointer()
 
+    def get_checkpointer_pool(self) -> CheckpointerPool:
+        """
+        获取进程级检查点器连接池（首次调用时创建，应用启动时预先创建）
+
+        Returns:
+            CheckpointerPool: 连接池实例
+        """
+        pool = self._pool
+        if pool is None or pool.closed:
+            with self._pool_lock:
+                pool = self._pool
+                if pool is None or pool.closed:
+                    pool = CheckpointerPool(self.db_path)
+                    self._pool = pool
+        return pool
+
+    def close_checkpointer_pool(self) -> None:
+        """关闭检查点器连接池，在应用关闭时调用"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+    async def get_async_checkpointer(self) -> AsyncSqliteSaver:
+        """
+        获取当前事件循环上的异步检查点器（首次调用时创建，应用启动时预先创建）
+
+        AsyncSqliteSaver绑定创建它的事件循环。事件循环变化时（例如测试或脚本中
+        多次asyncio.run）停止旧连接并在新循环上重建。
+
+        Returns:
+            AsyncSqliteSaver: 异步检查点器
+        """
+        loop = asyncio.get_running_loop()
+        checkpointer = self._async_checkpointer
+        if checkpointer is not None and checkpointer.loop is loop:
+            return checkpointer
+
+        if self._async_lock is None or self._async_lock_loop is not loop:
+            self._async_lock = asyncio.Lock()
+            self._async_lock_loop = loop
+
+        async with self._async_lock:
+            checkpointer = self._async_checkpointer
+            if checkpointer is not None and checkpointer.loop is loop:
+                return checkpointer
+
+            if checkpointer is not None:
+                logger.warning("事件循环已变化，重建聊天异步检查点器")
+                await _shutdown_stale_async_connection(checkpointer)
+
+            checkpointer = await create_async_chat_checkpointer(self.db_path)
+            self._async_checkpointer = checkpointer
+            return checkpointer
+
+    async def close_async_checkpointer(self) -> None:
+        """关闭异步检查点器，在应用关闭时调用"""
+        checkpointer = self._async_checkpointer
+        self._async_checkpointer = None
+        if checkpointer is not None:
+            await checkpointer.conn.close()
+            logger.info("聊天异步检查点器已关闭")
+
     def get_store(self) -> InMemoryStore:
         """
         获取内存存储实例
@@ -250,16 +554,14 @@ class ChatDatabaseManager:
             # 检查连接状态
             is_connected = check_connection()
 
-            # 尝试创建检查点器
+            # 尝试从连接池借用检查点器
             checkpointer_ok = False
             if is_connected:
                 try:
-                    checkpointer = self.create_checkpointer()
-                    # 验证检查点器可以被创建（在上下文管理器中）
-                    with checkpointer as cp:
-                        checkpointer_ok = cp is not None
+                    with self.get_checkpointer_pool().acquire() as slot:
+                        checkpointer_ok = slot.checkpointer is not None
                 except Exception as e:
-                    logger.error(f"检查点器创建失败: {e}")
+                    logger.error(f"检查点器获取失败: {e}")
 
             # 尝试创建内存存储
             store_ok = False
@@ -275,6 +577,8 @@ class ChatDatabaseManager:
                 "connected": is_connected,
                 "checkpointer_ok": checkpointer_ok,
                 "store_ok": store_ok,
+                "checkpointer_pool": self._pool.get_stats() if self._pool is not None else None,
+                "async_checkpointer": self._async_checkpointer is not None,
                 "path": self.db_path,
                 "timestamp": str(datetime.now(timezone.utc)),
             }
@@ -290,14 +594,10 @@ class ChatDatabaseManager:
         """
         清理数据库资源
 
-        关闭检查点器连接，释放资源。
+        关闭检查点器连接池，释放资源。
         """
         try:
-            if self._checkpointer is not None:
-                # SqliteSaver会在上下文管理器中自动关闭连接
-                # 但我们可以显式清理引用
-                self._checkpointer = None
-                logger.info("聊天检查点器已清理")
+            self.close_checkpointer_pool()
 
             if self._store is not None:
                 self._store = None
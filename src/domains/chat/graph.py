@@ -19,6 +19,8 @@ tools → agent → [条件路由] → {tools, END}
 - 工具调用集成
 - 条件路由逻辑
 - 消息处理流程
+- 模型客户端、工具绑定和工具节点每个进程只创建一次，模型配置变化时才重建
+- 同步（invoke）与异步（ainvoke/astream_events）两种调用方式
 
 作者：TaKeKe团队
 版本：1.0.0
@@ -26,18 +28,19 @@ tools → agent → [条件路由] → {tools, END}
 
 import os
 import logging
-from typing import Dict, Any, Literal
+import threading
+from typing import Dict, Any, List, Literal, NamedTuple, Optional, Tuple
 from datetime import datetime
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.store.memory import InMemoryStore
 from langgraph.prebuilt import ToolNode
 
-from .models import ChatState
+from .simple_state import SimpleChatState as ChatState
 from .tools.password_opener import sesame_opener
 from .tools.task_query import query_tasks, get_task_detail
 from .tools.task_crud import create_task, update_task, delete_task
@@ -45,10 +48,143 @@ from .tools.task_search import search_tasks
 from .tools.task_batch import batch_create_subtasks
 from .prompts.system import format_system_prompt
 from .context_manager import manage_conversation_context
+from .streaming import STREAM_TOKENS_CONFIG_KEY
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 聊天可用的全部工具（8个）
+CHAT_TOOLS = [
+    sesame_opener,  # 基础工具
+    query_tasks, get_task_detail,  # 任务查询工具
+    create_task, update_task, delete_task,  # 任务CRUD工具
+    search_tasks,  # 任务搜索工具
+    batch_create_subtasks  # 批量操作工具
+]
+
+
+class ChatModelSettings(NamedTuple):
+    """聊天模型配置（来自环境变量），用于判断是否需要重建模型客户端"""
+    api_key: Optional[str]
+    base_url: str
+    model_name: str
+    temperature: float
+
+
+def read_chat_model_settings() -> ChatModelSettings:
+    """
+    读取聊天模型配置
+
+    聊天模块优先使用OpenAI配置（支持工具调用），其次使用LLM_*配置。
+
+    Returns:
+        ChatModelSettings: 当前配置
+    """
+    return ChatModelSettings(
+        api_key=os.getenv("OPENAI_API_KEY") or os.getenv("LLM_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL") or os.getenv("LLM_BASE_URL", "https://api.openai.com/v1"),
+        model_name=os.getenv("OPENAI_MODEL") or os.getenv("LLM_MODEL", "gpt-3.5-turbo"),
+        temperature=float(os.getenv("OPENAI_TEMPERATURE", os.getenv("LLM_TEMPERATURE", "0.7")))
+    )
+
+
+def build_chat_model(settings: ChatModelSettings) -> Runnable:
+    """
+    按配置创建模型客户端并绑定全部工具
+
+    Args:
+        settings: 模型配置
+
+    Returns:
+        Runnable: 绑定了工具的模型
+
+    Raises:
+        ValueError: 未配置API密钥
+    """
+    if not settings.api_key:
+        raise ValueError("API密钥未设置，请设置LLM_API_KEY或OPENAI_API_KEY环境变量")
+
+    model = ChatOpenAI(
+        model=settings.model_name,
+        api_key=settings.api_key,
+        base_url=settings.base_url,
+        temperature=settings.temperature,
+        max_tokens=1000
+    )
+
+    # 总是绑定工具，失败直接抛异常
+    return model.bind_tools(CHAT_TOOLS)
+
+
+# 进程内共享的模型客户端（按配置缓存）与工具节点
+_chat_model_lock = threading.Lock()
+_chat_model: Optional[Tuple[ChatModelSettings, Runnable]] = None
+_chat_model_stats = {"builds": 0, "reuses": 0}
+_tool_node: Optional[ToolNode] = None
+
+
+def get_chat_model() -> Runnable:
+    """
+    获取共享的模型客户端（已绑定工具）
+
+    每轮对话只读取一次配置并与缓存比较；配置没变时直接复用已创建的
+    ChatOpenAI客户端（及其HTTP连接池）和工具schema，配置变化时才重建。
+
+    Returns:
+        Runnable: 绑定了工具的模型
+
+    Raises:
+        ValueError: 未配置API密钥
+    """
+    global _chat_model
+    settings = read_chat_model_settings()
+    cached = _chat_model
+    if cached is not None and cached[0] == settings:
+        _chat_model_stats["reuses"] += 1
+        return cached[1]
+
+    with _chat_model_lock:
+        cached = _chat_model
+        if cached is not None and cached[0] == settings:
+            _chat_model_stats["reuses"] += 1
+            return cached[1]
+
+        model = build_chat_model(settings)
+        _chat_model = (settings, model)
+        _chat_model_stats["builds"] += 1
+        logger.info(f"✅ 模型创建成功（绑定{len(CHAT_TOOLS)}个工具）: {settings.model_name} @ {settings.base_url}")
+        return model
+
+
+def reset_chat_model() -> None:
+    """丢弃缓存的模型客户端，下一轮对话时按当前配置重建"""
+    global _chat_model
+    with _chat_model_lock:
+        _chat_model = None
+
+
+def get_chat_model_stats() -> Dict[str, Any]:
+    """
+    获取模型客户端缓存统计信息
+
+    Returns:
+        Dict[str, Any]: 构建次数、复用次数和当前模型
+    """
+    cached = _chat_model
+    return {
+        **_chat_model_stats,
+        "model": cached[0].model_name if cached is not None else None,
+        "base_url": cached[0].base_url if cached is not None else None
+    }
+
+
+def get_tool_node() -> ToolNode:
+    """获取共享的工具节点（工具schema只解析一次）"""
+    global _tool_node
+    if _tool_node is None:
+        _tool_node = ToolNode(CHAT_TOOLS)
+    return _tool_node
+
 
 class ChatGraph:
     """
@@ -83,20 +219,15 @@ class ChatGraph:
         tools -> agent -> [条件路由] -> {tools, END}
         """
         try:
-            # 创建工具节点 - 支持并行工具调用，包含所有8个工具
-            tool_node = ToolNode([
-                sesame_opener,  # 基础工具
-                query_tasks, get_task_detail,  # 任务查询工具
-                create_task, update_task, delete_task,  # 任务CRUD工具
-                search_tasks,  # 任务搜索工具
-                batch_create_subtasks  # 批量操作工具
-            ])
+            # 工具节点 - 支持并行工具调用，包含所有8个工具（进程内共享）
+            tool_node = get_tool_node()
 
             # 创建状态图构建器
             builder = StateGraph(ChatState)
 
             # 添加节点
-            builder.add_node("agent", self._agent_node)
+            # agent节点同时提供同步和异步实现：invoke走同步，ainvoke/astream_events走异步
+            builder.add_node("agent", RunnableLambda(self._agent_node, afunc=self._aagent_node, name="agent"))
             builder.add_node("tools", tool_node)
 
             # 添加边
@@ -146,54 +277,111 @@ class ChatGraph:
             Dict[str, Any]: 更新后的状态（仅包含messages）
         """
         try:
-            # 从配置中获取用户信息
-            user_id = config.get("configurable", {}).get("user_id")
-            session_id = config.get("configurable", {}).get("thread_id")
-
-            if not user_id or not session_id:
-                raise ValueError("缺少user_id或thread_id配置")
+            model, messages_with_system = self._prepare_agent_call(state, config)
 
-            # 获取模型（已绑定工具）
-            model = self._get_model()
-            model_name = model.model_name if hasattr(model, 'model_name') else "gpt-3.5-turbo"
+            # 调用模型，模型会自动决定是否使用工具
+            response = model.invoke(messages_with_system)
 
-            # 构建消息列表 - 使用标准的LangChain消息格式
-            messages = state["messages"]
+            return self._finish_agent_call(response, config)
 
-            # 使用上下文管理器优化消息历史
-            if len(messages) > 1:  # 只有多条消息时才需要优化
-                original_count = len(messages)
-                messages = manage_conversation_context(messages, model_name)
-                optimized_count = len(messages)
+        except Exception as e:
+            return self._agent_error_response(e)
 
-                if original_count != optimized_count:
-                    logger.info(f"📝 上下文优化: {original_count} -> {optimized_count} 条消息")
+    async def _aagent_node(self, state: ChatState, config: RunnableConfig) -> Dict[str, Any]:
+        """
+        Agent节点的异步版本（ainvoke/astream_events时使用）
 
-            # 添加系统提示词到消息开头
-            system_prompt = format_system_prompt(user_id, session_id)
-            from langchain_core.messages import SystemMessage
-            messages_with_system = [SystemMessage(content=system_prompt)] + messages
+        与_agent_node逻辑相同，但用await model.ainvoke()调用模型，
+        等待LLM响应期间不占用事件循环和线程。传入config使模型调用挂在当前节点下，
+        回调可以逐token收到模型输出，取消时也会一并取消HTTP请求。
+        运行配置中STREAM_TOKENS_CONFIG_KEY为True时显式以stream=True调用，
+        模型走流式接口（每个token触发一次回调），最终仍返回完整的消息。
 
-            # 调用模型，模型会自动决定是否使用工具
-            response = model.invoke(messages_with_system)
+        Args:
+            state: 当前聊天状态（包含messages字段）
+            config: 运行配置，包含user_id和thread_id
 
-            logger.info(f"✅ Agent节点处理完成: user_id={user_id}, session_id={session_id}")
-            logger.debug(f"🔧 user_id传递状态验证: {user_id} -> ChatState")
+        Returns:
+            Dict[str, Any]: 更新后的状态（仅包含messages）
+        """
+        try:
+            model, messages_with_system = self._prepare_agent_call(state, config)
 
-            # 检查是否有工具调用
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                logger.info(f"🔧 模型生成工具调用: {[call['name'] for call in response.tool_calls]}")
+            if config.get("configurable", {}).get(STREAM_TOKENS_CONFIG_KEY):
+                response = await model.ainvoke(messages_with_system, config, stream=True)
+            else:
+                response = await model.ainvoke(messages_with_system, config)
 
-            # 返回更新后的消息列表
-            return {"messages": [response]}
+            return self._finish_agent_call(response, config)
 
         except Exception as e:
-            logger.error(f"❌ Agent节点处理失败: {e}")
+            return self._agent_error_response(e)
+
+    def _prepare_agent_call(self, state: ChatState, config: RunnableConfig) -> Tuple[Runnable, List[BaseMessage]]:
+        """
+        准备模型调用：校验配置、获取模型、优化上下文并添加系统提示词
+
+        Args:
+            state: 当前聊天状态
+            config: 运行配置
+
+        Returns:
+            Tuple[Runnable, List[BaseMessage]]: 模型和带系统提示词的消息列表
+
+        Raises:
+            ValueError: 缺少user_id或thread_id配置
+        """
+        # 从配置中获取用户信息
+        user_id = config.get("configurable", {}).get("user_id")
+        session_id = config.get("configurable", {}).get("thread_id")
+
+        if not user_id or not session_id:
+            raise ValueError("缺少user_id或thread_id配置")
+
+        # 获取模型（已绑定工具）
+        model = self._get_model()
+        model_name = model.model_name if hasattr(model, 'model_name') else "gpt-3.5-turbo"
+
+        # 构建消息列表 - 使用标准的LangChain消息格式
+        messages = state["messages"]
+
+        # 使用上下文管理器优化消息历史
+        if len(messages) > 1:  # 只有多条消息时才需要优化
+            original_count = len(messages)
+            messages = manage_conversation_context(messages, model_name)
+            optimized_count = len(messages)
+
+            if original_count != optimized_count:
+                logger.info(f"📝 上下文优化: {original_count} -> {optimized_count} 条消息")
+
+        # 添加系统提示词到消息开头
+        system_prompt = format_system_prompt(user_id, session_id)
+        from langchain_core.messages import SystemMessage
+        return model, [SystemMessage(content=system_prompt)] + messages
+
+    def _finish_agent_call(self, response: BaseMessage, config: RunnableConfig) -> Dict[str, Any]:
+        """记录模型回复并返回状态更新"""
+        user_id = config.get("configurable", {}).get("user_id")
+        session_id = config.get("configurable", {}).get("thread_id")
+
+        logger.info(f"✅ Agent节点处理完成: user_id={user_id}, session_id={session_id}")
+        logger.debug(f"🔧 user_id传递状态验证: {user_id} -> ChatState")
+
+        # 检查是否有工具调用
+        if hasattr(response, 'tool_calls') and response.tool_calls:
+            logger.info(f"🔧 模型生成工具调用: {[call['name'] for call in response.tool_calls]}")
+
+        # 返回更新后的消息列表
+        return {"messages": [response]}
+
+    def _agent_error_response(self, error: Exception) -> Dict[str, Any]:
+        """Agent节点失败时生成错误回复"""
+        logger.error(f"❌ Agent节点处理失败: {error}")
 
-            # 生成错误回复
-            from langchain_core.messages import AIMessage
-            error_message = AIMessage(content="抱歉，我现在遇到了一些问题，请稍后再试。")
-            return {"messages": [error_message]}
+        # 生成错误回复
+        from langchain_core.messages import AIMessage
+        error_message = AIMessage(content="抱歉，我现在遇到了一些问题，请稍后再试。")
+        return {"messages": [error_message]}
 
     
     def _route_to_tools(self, state: ChatState) -> Literal["tools", "end"]:
@@ -231,47 +419,17 @@ class ChatGraph:
             return "end"
 
     
-    def _get_model(self) -> ChatOpenAI:
+    def _get_model(self) -> Runnable:
         """
-        获取OpenAI模型实例并绑定工具
+        获取OpenAI模型实例（已绑定工具）
+
+        返回进程内共享的实例，配置变化时才重建（见get_chat_model）。
 
         Returns:
-            ChatOpenAI: 模型实例
+            Runnable: 绑定了工具的模型
         """
         try:
-            # 聊天模块优先使用OpenAI配置（支持工具调用）
-            api_key = os.getenv("OPENAI_API_KEY") or os.getenv("LLM_API_KEY")
-            base_url = os.getenv("OPENAI_BASE_URL") or os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
-            model_name = os.getenv("OPENAI_MODEL") or os.getenv("LLM_MODEL", "gpt-3.5-turbo")
-            temperature = float(os.getenv("OPENAI_TEMPERATURE", os.getenv("LLM_TEMPERATURE", "0.7")))
-
-            if not api_key:
-                raise ValueError("API密钥未设置，请设置LLM_API_KEY或OPENAI_API_KEY环境变量")
-
-            # 创建模型实例
-            model = ChatOpenAI(
-                model=model_name,
-                api_key=api_key,
-                base_url=base_url,
-                temperature=temperature,
-                max_tokens=1000
-            )
-
-            # 简化工具绑定策略 - 总是执行bind_tools，失败抛异常
-            all_tools = [
-                sesame_opener,  # 基础工具
-                query_tasks, get_task_detail,  # 任务查询工具
-                create_task, update_task, delete_task,  # 任务CRUD工具
-                search_tasks,  # 任务搜索工具
-                batch_create_subtasks  # 批量操作工具
-            ]
-
-            # 总是绑定工具，失败直接抛异常
-            model = model.bind_tools(all_tools)
-            logger.info(f"✅ 模型创建成功（绑定{len(all_tools)}个工具）: {model_name} @ {base_url}")
-
-            return model
-
+            return get_chat_model()
         except Exception as e:
             logger.error(f"❌ 模型创建失败: {e}")
             raise
@@ -298,6 +456,27 @@ class ChatGraph:
             logger.error(f"聊天图调用失败: {e}")
             raise
 
+    async def ainvoke(self, state: ChatState, config: RunnableConfig) -> ChatState:
+        """
+        异步调用聊天图
+
+        Args:
+            state: 聊天状态
+            config: 运行配置
+
+        Returns:
+            ChatState: 处理后的状态
+        """
+        try:
+            if not self.graph:
+                raise RuntimeError("聊天图未初始化")
+
+            return await self.graph.ainvoke(state, config)
+
+        except Exception as e:
+            logger.error(f"聊天图异步调用失败: {e}")
+            raise
+
     def stream(self, state: ChatState, config: RunnableConfig):
         """
         流式调用聊天图
@@ -15,6 +15,8 @@ Chat领域API路由
 3. 本地存储：SQLite存储会话信息
 4. 流式响应：长连接保持5分钟
 5. 自动创建session：聊天时自动创建会话
+6. 本地流式：CHAT_BACKEND=local时在本进程运行聊天图，逐token输出；
+   请求头Accept: text/event-stream时改为SSE事件，包含工具调用进度
 
 作者：TaKeKe团队
 版本：2.0.0 - 简化版本
@@ -23,9 +25,10 @@ Chat领域API路由
 import logging
 import os
 import json
-from typing import List, Dict, Any
+from contextlib import aclosing
+from typing import List, Dict, Any, AsyncIterator
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.responses import StreamingResponse
 from starlette.responses import Response
 
@@ -38,6 +41,7 @@ from .schemas import (
     ChatMessageRequest,
     DeleteSessionResponse
 )
+from src.api.config import config
 from src.api.dependencies import get_current_user_id
 from src.api.schemas import UnifiedResponse
 
@@ -47,6 +51,13 @@ logger = logging.getLogger(__name__)
 # 创建路由器
 router = APIRouter(prefix="/chat", tags=["聊天系统"])
 
+# 流式响应头：禁用缓存和代理缓冲，token到达后立即发给客户端
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"  # 禁用nginx缓冲
+}
+
 # 初始化聊天数据库
 try:
     init_chat_database()
@@ -225,6 +236,7 @@ async def delete_session(
 async def chat_stream(
     session_id: str,
     request: ChatMessageRequest,
+    http_request: Request,
     user_id: UUID = Depends(get_current_user_id)
 ) -> StreamingResponse:
     """
@@ -233,6 +245,8 @@ async def chat_stream(
     - 输入：token，session id，message（字符串）
     - 过程：如果session不存在，就先创建一个session，标题用会话+时间占位。如果存在，就接着这个session开始聊天。
     - 输出：流式输出AI的返回结果，每一次就只有单纯的字符串，没有任何其他内容
+    - 本地模式（CHAT_BACKEND=local）下，Accept: text/event-stream时输出SSE事件：
+      token、tool_start、tool_end、done、error
     """
     try:
         repository = ChatRepository()
@@ -250,6 +264,17 @@ async def chat_stream(
             # 更新会话时间戳
             repository.update_session_timestamp(session_id, str(user_id))
 
+        logger.info(f"开始流式聊天: session_id={session_id}, user_id={user_id}, message={request.message[:50]}...")
+
+        if config.chat_backend == "local":
+            # 本地运行聊天图，逐token输出
+            sse = "text/event-stream" in http_request.headers.get("accept", "")
+            return StreamingResponse(
+                local_chat_stream(str(user_id), session_id, request.message, sse),
+                media_type="text/event-stream" if sse else "text/plain; charset=utf-8",
+                headers=STREAM_HEADERS
+            )
+
         # 调用微服务的聊天功能
         from src.services.chat_microservice_client import get_chat_microservice_client
         client = get_chat_microservice_client()
@@ -269,17 +294,11 @@ async def chat_stream(
                 logger.error(f"流式聊天微服务调用失败: {e}")
                 yield "抱歉，聊天服务暂时不可用。"
 
-        logger.info(f"开始流式聊天: session_id={session_id}, user_id={user_id}, message={request.message[:50]}...")
-
         # 返回流式响应，保持5分钟连接
         return StreamingResponse(
             generate_stream(),
             media_type="text/plain; charset=utf-8",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no"  # 禁用nginx缓冲
-            }
+            headers=STREAM_HEADERS
         )
 
     except Exception as e:
@@ -292,4 +311,47 @@ async def chat_stream(
         return StreamingResponse(
             error_stream(),
             media_type="text/plain; charset=utf-8"
-        )
\ No newline at end of file
+        )
+
+
+def format_sse_event(event: Dict[str, Any]) -> str:
+    """把流式事件编码为一条SSE消息（格式与聊天微服务一致）"""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def local_chat_stream(user_id: str, session_id: str, message: str, sse: bool) -> AsyncIterator[str]:
+    """
+    本地聊天图的流式输出
+
+    直接转发ChatService.astream_message()的事件：纯文本模式只输出token，
+    SSE模式输出全部事件。StreamingResponse每发送完一块才取下一块，客户端读得慢时
+    上游的有界队列填满，模型停止读取LLM响应；客户端断开时本生成器被取消，
+    aclosing确保上游生成器随之关闭、取消图运行和LLM请求。
+
+    Args:
+        user_id: 用户ID
+        session_id: 会话ID
+        message: 用户消息
+        sse: 是否输出SSE事件
+
+    Yields:
+        str: 响应数据块
+    """
+    from .service import chat_service
+
+    try:
+        async with aclosing(chat_service.astream_message(user_id, session_id, message)) as events:
+            async for event in events:
+                if sse:
+                    if event["type"] == "done":
+                        event = {"type": "done", "session_id": event["session_id"]}
+                    yield format_sse_event(event)
+                elif event["type"] == "token":
+                    yield event["content"]
+
+    except Exception as e:
+        logger.error(f"本地流式聊天失败: session_id={session_id}, user_id={user_id}, error={e}")
+        if sse:
+            yield format_sse_event({"type": "error", "message": "抱歉，聊天服务暂时不可用。"})
+        else:
+            yield "抱歉，聊天服务暂时不可用。"
@@ -16,26 +16,33 @@
 - 聊天历史查询
 - JWT认证集成
 - 用户隔离机制
+- 检查点器与编译后的图按连接池槽位缓存，跨调用复用
+- 异步接口（acreate_session/asend_message/astream_message/aget_chat_history）：
+  AsyncSqliteSaver + ainvoke，不阻塞事件循环；同步接口与其共享输入校验和结果组装逻辑
+- 逐token流式输出（含工具调用进度），背压和取消一直传到LLM请求
 
 作者：TaKeKe团队
 版本：1.0.0
 """
 
+import asyncio
 import logging
 import uuid
-import json
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
-from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator
+from contextlib import contextmanager, suppress
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base.id import uuid6
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.store.memory import InMemoryStore
 
-from .database import chat_db_manager, get_chat_database_path
+from .database import chat_db_manager
 from .graph import create_chat_graph
-from .models import ChatState, ChatSession, ChatMessage
+from .models import ChatSession
+from .simple_state import SimpleChatState as ChatState
+from .streaming import ChatStreamHandler, STREAM_TOKENS_CONFIG_KEY
 from .prompts.system import format_welcome_message, format_session_summary
 from src.core.uuid_converter import UUIDConverter
 
@@ -52,11 +59,16 @@ class ChatService:
     和历史查询等核心业务逻辑。
     """
 
+    # 连接池槽位上缓存的对象名
+    _SAFE_CHECKPOINTER_KEY = "type_safe_checkpointer"
+    _GRAPH_KEY = "chat_graph"
+
     def __init__(self):
         """初始化聊天服务"""
         self.db_manager = chat_db_manager
         self._store = self.db_manager.get_store()
         self._graph = None  # Graph缓存实例
+        self._async_graph = None  # 基于异步检查点器编译的图（事件循环内共享）
 
     def _create_graph_with_checkpointer(self, checkpointer):
         """
@@ -101,17 +113,49 @@ class ChatService:
         Returns:
             函数执行结果
 
+        检查点器从进程级连接池借用（见CheckpointerPool），包装器在每个槽位上只创建一次。
+
         Examples:
             >>> def some_operation(checkpointer):
             ...     # 使用类型安全的 checkpointer
             ...     checkpointer.put(config, checkpoint, metadata, {})
             >>> result = self._with_checkpointer(some_operation)
         """
-        with self.db_manager.create_checkpointer() as checkpointer:
-            # 创建类型安全的checkpointer包装器
+        with self.db_manager.get_checkpointer_pool().acquire() as slot:
+            return func(self._get_safe_checkpointer(slot))
+
+    def _with_graph(self, func):
+        """
+        使用编译好的聊天图执行函数
+
+        每个连接池槽位上的图只编译一次并缓存，之后的调用直接复用，
+        不再为每条消息新建连接、建表和编译图。槽位同一时刻只被一个调用方持有，
+        因此缓存的图不会被并发使用。
+
+        图直接使用槽位上的SqliteSaver编译：LangGraph编译时要求checkpointer是
+        BaseCheckpointSaver实例，不接受TypeSafeCheckpointer包装器；
+        图内部的版本号由同一个SqliteSaver生成，格式一致。
+
+        Args:
+            func: 要执行的函数，接受ChatGraph参数
+
+        Returns:
+            函数执行结果
+        """
+        with self.db_manager.get_checkpointer_pool().acquire() as slot:
+            graph = slot.get_or_create(
+                self._GRAPH_KEY,
+                lambda: self._create_graph_with_checkpointer(slot.checkpointer)
+            )
+            return func(graph)
+
+    def _get_safe_checkpointer(self, slot):
+        """获取槽位上缓存的类型安全checkpointer包装器"""
+        return slot.get_or_create(
+            self._SAFE_CHECKPOINTER_KEY,
             # 这个包装器会自动修复 checkpoint 中的类型问题
-            safe_checkpointer = self._create_type_safe_checkpointer(checkpointer)
-            return func(safe_checkpointer)
+            lambda: self._create_type_safe_checkpointer(slot.checkpointer)
+        )
 
     def _create_type_safe_checkpointer(self, base_checkpointer):
         """
@@ -380,38 +424,42 @@ class ChatService:
             Exception: 会话创建失败时抛出
         """
         try:
-            # 生成会话ID
-            session_id = self._create_thread_id()
-
-            # 创建会话记录
-            session = ChatSession(
-                session_id=session_id,
-                user_id=user_id,
-                title=title or "新会话",
-                created_at=datetime.now(timezone.utc),
-                updated_at=datetime.now(timezone.utc)
-            )
+            session = self._new_session(user_id, title)
 
             # 直接创建会话记录，避免LangGraph的复杂初始化
-            self._create_session_record_directly(user_id, session_id, session.title)
-
-            logger.info(f"聊天会话创建成功: user_id={user_id}, session_id={session_id}")
+            self._create_session_record_directly(user_id, session.session_id, session.title)
 
-            # 返回固定欢迎消息（不调用LLM）
-            welcome_msg = f"你好！我是你的AI助手，会话'{session.title}'已创建。有什么可以帮助你的吗？"
-
-            return {
-                "session_id": session_id,
-                "title": session.title,
-                "created_at": session.created_at.isoformat(),
-                "welcome_message": welcome_msg,
-                "status": "created"
-            }
+            return self._build_create_result(session)
 
         except Exception as e:
             logger.error(f"创建聊天会话失败: user_id={user_id}, error={e}")
             raise Exception(f"创建会话失败: {str(e)}")
 
+    def _new_session(self, user_id: str, title: Optional[str]) -> ChatSession:
+        """生成新的会话记录对象"""
+        return ChatSession(
+            session_id=self._create_thread_id(),
+            user_id=user_id,
+            title=title or "新会话",
+            created_at=datetime.now(timezone.utc),
+            updated_at=datetime.now(timezone.utc)
+        )
+
+    def _build_create_result(self, session: ChatSession) -> Dict[str, Any]:
+        """构造会话创建结果"""
+        logger.info(f"聊天会话创建成功: user_id={session.user_id}, session_id={session.session_id}")
+
+        # 返回固定欢迎消息（不调用LLM）
+        welcome_msg = f"你好！我是你的AI助手，会话'{session.title}'已创建。有什么可以帮助你的吗？"
+
+        return {
+            "session_id": session.session_id,
+            "title": session.title,
+            "created_at": session.created_at.isoformat(),
+            "welcome_message": welcome_msg,
+            "status": "created"
+        }
+
     def send_message(self, user_id: str, session_id: str, message: str) -> Dict[str, Any]:
         """
         发送消息到聊天会话
@@ -433,46 +481,16 @@ class ChatService:
             Exception: 消息发送失败时抛出
         """
         try:
-            # 验证输入
-            if not message or not message.strip():
-                raise ValueError("消息内容不能为空")
+            current_state, config = self._prepare_turn(user_id, session_id, message)
 
-            # 获取配置
-            config = self._create_runnable_config(user_id, session_id)
-
-            # 创建用户消息 - 使用标准LangChain格式
-            from langchain_core.messages import HumanMessage
-            user_message = HumanMessage(content=message.strip())
-
-            # 创建当前状态 - 简化版本，只包含messages字段
-            # 用户和会话信息通过config传递，避免在state中添加自定义字段
-            current_state = {
-                "messages": [user_message]  # 只包含messages，移除所有自定义字段
-            }
-
-            def _send_with_checkpointer(checkpointer):
-                # 使用新的方法创建图实例
-                temp_graph = self._create_graph_with_checkpointer(checkpointer)
-
-                # 运行图处理消息 - 使用临时图实例内部的编译后的图
-                result = temp_graph.graph.invoke(current_state, config)
-                return result
+            def _send_with_graph(chat_graph):
+                # 运行图处理消息 - 使用缓存的编译后的图
+                return chat_graph.graph.invoke(current_state, config)
 
             # 使用辅助方法执行检查点操作
-            result = self._with_checkpointer(_send_with_checkpointer)
-
-            # 提取AI回复 - 使用优化逻辑
-            ai_response = self._extract_ai_response(result.get("messages", []))
+            result = self._with_graph(_send_with_graph)
 
-            logger.info(f"✅ 消息处理成功: user_id={user_id}, session_id={session_id}")
-
-            return {
-                "session_id": session_id,
-                "user_message": message,
-                "ai_response": ai_response,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "status": "success"
-            }
+            return self._build_send_result(user_id, session_id, message, result)
 
         except ValueError as e:
             logger.warning(f"⚠️ 消息验证失败: user_id={user_id}, session_id={session_id}, error={e}")
@@ -481,6 +499,45 @@ class ChatService:
             logger.error(f"❌ 消息发送失败: user_id={user_id}, session_id={session_id}, error={e}")
             raise Exception(f"发送消息失败: {str(e)}")
 
+    def _prepare_turn(self, user_id: str, session_id: str, message: str):
+        """
+        校验消息并构造一轮对话的图输入和运行配置
+
+        Returns:
+            Tuple[Dict[str, Any], RunnableConfig]: 图输入状态和运行配置
+
+        Raises:
+            ValueError: 消息为空或UUID格式无效
+        """
+        # 验证输入
+        if not message or not message.strip():
+            raise ValueError("消息内容不能为空")
+
+        # 获取配置
+        config = self._create_runnable_config(user_id, session_id)
+
+        # 创建当前状态 - 使用标准LangChain格式，只包含messages字段
+        # 用户和会话信息通过config传递，避免在state中添加自定义字段
+        current_state = {
+            "messages": [HumanMessage(content=message.strip())]
+        }
+        return current_state, config
+
+    def _build_send_result(self, user_id: str, session_id: str, message: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """从图的最终状态中提取AI回复，构造发送结果"""
+        # 提取AI回复 - 使用优化逻辑
+        ai_response = self._extract_ai_response(result.get("messages", []))
+
+        logger.info(f"✅ 消息处理成功: user_id={user_id}, session_id={session_id}")
+
+        return {
+            "session_id": session_id,
+            "user_message": message,
+            "ai_response": ai_response,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "status": "success"
+        }
+
     def _extract_ai_response(self, messages: List) -> str:
         """
         从消息列表中提取最新的AI回复
@@ -534,82 +591,92 @@ class ChatService:
             # 获取配置
             config = self._create_runnable_config(user_id, session_id)
 
-            def _get_history_with_checkpointer(checkpointer):
-                # 使用临时图获取最新状态（确保正确的checkpointer）
-                temp_graph = create_chat_graph(checkpointer, self._store)
-
+            def _get_history_with_graph(chat_graph):
                 # 使用ChatGraph实例内部的编译后的图的get_state方法
-                snapshot = temp_graph.graph.get_state(config)
-
-                # 提取messages字段
-                state_messages = snapshot.values.get("messages", [])
-
-                # 序列化LangChain messages为API格式
-                messages = []
-                for msg in state_messages:
-                    if isinstance(msg, HumanMessage):
-                        message_item = {
-                            "type": "human",
-                            "content": msg.content,
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        }
-                        # 增加id字段（如果有）
-                        if hasattr(msg, 'id') and msg.id:
-                            message_item["id"] = str(msg.id)
-                        messages.append(message_item)
-
-                    elif isinstance(msg, AIMessage):
-                        message_item = {
-                            "type": "ai",
-                            "content": msg.content,
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        }
-                        # 增加id字段（如果有）
-                        if hasattr(msg, 'id') and msg.id:
-                            message_item["id"] = str(msg.id)
-                        # 增加tool_calls字段（如果有）
-                        if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                            message_item["tool_calls"] = [dict(call) for call in msg.tool_calls]
-                        # 增加additional_kwargs字段（如果有）
-                        if hasattr(msg, 'additional_kwargs') and msg.additional_kwargs:
-                            message_item["additional_kwargs"] = msg.additional_kwargs
-                        messages.append(message_item)
-
-                    elif isinstance(msg, ToolMessage):
-                        message_item = {
-                            "type": "tool",
-                            "content": msg.content,
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        }
-                        # 增加tool_call_id字段
-                        if hasattr(msg, 'tool_call_id') and msg.tool_call_id:
-                            message_item["tool_call_id"] = msg.tool_call_id
-                        messages.append(message_item)
-
-                # 应用limit截断（取最新N条）
-                if len(messages) > limit:
-                    messages = messages[-limit:]
-
-                return messages
+                snapshot = chat_graph.graph.get_state(config)
+                return self._serialize_history(snapshot.values.get("messages", []), limit)
 
             # 使用辅助方法执行检查点操作
-            messages = self._with_checkpointer(_get_history_with_checkpointer)
-
-            logger.info(f"获取聊天历史成功: user_id={user_id}, session_id={session_id}, messages={len(messages)}")
+            messages = self._with_graph(_get_history_with_graph)
 
-            return {
-                "session_id": session_id,
-                "messages": messages,
-                "total_count": len(messages),
-                "limit": limit,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "status": "success"
-            }
+            return self._build_history_result(user_id, session_id, messages, limit)
 
         except Exception as e:
             logger.error(f"获取聊天历史失败: user_id={user_id}, session_id={session_id}, error={e}")
             raise Exception(f"获取聊天历史失败: {str(e)}")
 
+    def _serialize_history(self, state_messages: List[BaseMessage], limit: int) -> List[Dict[str, Any]]:
+        """
+        将状态中的LangChain消息序列化为API格式，只保留最新limit条
+
+        Args:
+            state_messages: 状态中的消息列表
+            limit: 返回消息数量限制
+
+        Returns:
+            List[Dict[str, Any]]: 序列化后的消息
+        """
+        # 序列化LangChain messages为API格式
+        messages = []
+        for msg in state_messages:
+            if isinstance(msg, HumanMessage):
+                message_item = {
+                    "type": "human",
+                    "content": msg.content,
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+                # 增加id字段（如果有）
+                if hasattr(msg, 'id') and msg.id:
+                    message_item["id"] = str(msg.id)
+                messages.append(message_item)
+
+            elif isinstance(msg, AIMessage):
+                message_item = {
+                    "type": "ai",
+                    "content": msg.content,
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+                # 增加id字段（如果有）
+                if hasattr(msg, 'id') and msg.id:
+                    message_item["id"] = str(msg.id)
+                # 增加tool_calls字段（如果有）
+                if hasattr(msg, 'tool_calls') and msg.tool_calls:
+                    message_item["tool_calls"] = [dict(call) for call in msg.tool_calls]
+                # 增加additional_kwargs字段（如果有）
+                if hasattr(msg, 'additional_kwargs') and msg.additional_kwargs:
+                    message_item["additional_kwargs"] = msg.additional_kwargs
+                messages.append(message_item)
+
+            elif isinstance(msg, ToolMessage):
+                message_item = {
+                    "type": "tool",
+                    "content": msg.content,
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+                # 增加tool_call_id字段
+                if hasattr(msg, 'tool_call_id') and msg.tool_call_id:
+                    message_item["tool_call_id"] = msg.tool_call_id
+                messages.append(message_item)
+
+        # 应用limit截断（取最新N条）
+        if len(messages) > limit:
+            messages = messages[-limit:]
+
+        return messages
+
+    def _build_history_result(self, user_id: str, session_id: str, messages: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+        """构造聊天历史结果"""
+        logger.info(f"获取聊天历史成功: user_id={user_id}, session_id={session_id}, messages={len(messages)}")
+
+        return {
+            "session_id": session_id,
+            "messages": messages,
+            "total_count": len(messages),
+            "limit": limit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "status": "success"
+        }
+
     def get_session_info(self, user_id: str, session_id: str) -> Dict[str, Any]:
         """
         获取会话信息
@@ -648,11 +715,17 @@ class ChatService:
                 # 计算消息数量
                 message_count = len([msg for msg in messages if isinstance(msg, (HumanMessage, AIMessage))])
 
-                # 获取会话标题，优先从元数据获取，其次从状态值获取
-                session_title = metadata.get("title") or channel_values.get("session_title", "未命名会话")
                 if metadata.get("user_id") != user_id:
                     raise ValueError(f"无权访问此会话: {session_id}")
 
+                # 标题只写在创建会话的检查点里，优先从会话目录获取
+                catalog_entry = checkpointer.get_session(session_id)
+                session_title = (
+                    (catalog_entry or {}).get("title")
+                    or metadata.get("title")
+                    or channel_values.get("session_title", "未命名会话")
+                )
+
                 # 获取最后更新时间
                 if isinstance(metadata, dict):
                     source = metadata.get("source", {})
@@ -689,8 +762,8 @@ class ChatService:
         """
         列出用户的聊天会话
 
-        通过直接查询SQLite数据库来获取用户会话列表，
-        绕过SqliteSaver的API限制，实现真正的会话管理功能。
+        从会话目录表读取（见session_catalog），按(user_id, updated_at)索引
+        做一次范围扫描，不再扫描checkpoints表并逐行解析元数据。
 
         Args:
             user_id: 用户ID
@@ -698,167 +771,31 @@ class ChatService:
 
         Returns:
             Dict[str, Any]: 会话列表
-
-        Raises:
-            Exception: 获取会话列表失败时抛出
         """
         try:
-            sessions = []
-            db_path = get_chat_database_path()
-
-            # 直接查询SQLite数据库获取检查点信息
-            import sqlite3
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
-            cursor = conn.cursor()
+            with self.db_manager.get_checkpointer_pool().acquire() as slot:
+                entries, total_count = slot.checkpointer.list_sessions(user_id, limit)
 
-            try:
-                # 查询检查点表，获取不同thread_id的最新检查点
-                # 直接查询，在Python层面处理UTF-8问题
-                query = """
-                SELECT
-                    thread_id,
-                    checkpoint_id,
-                    checkpoint,
-                    metadata
-                FROM checkpoints
-                WHERE (thread_id, checkpoint_id) IN (
-                    SELECT
-                        thread_id,
-                        MAX(checkpoint_id) as checkpoint_id
-                    FROM checkpoints
-                    GROUP BY thread_id
-                )
-                ORDER BY thread_id DESC
-                LIMIT ?
-                """
-
-                cursor.execute(query, (max(limit * 3, 100),))  # 获取足够多的数据以便过滤
-                rows = cursor.fetchall()
-
-                logger.info(f"list_sessions查询返回{len(rows)}条记录，开始处理用户{user_id}")
-
-                for row in rows:
-                    try:
-                        # 提取数据，处理可能的UTF-8错误
-                        try:
-                            session_id = row['thread_id']
-                        except UnicodeDecodeError:
-                            # 如果thread_id有编码问题，跳过这个记录
-                            logger.warning(f"跳过编码错误的记录: thread_id编码错误")
-                            continue
-
-                        try:
-                            metadata_str = row['metadata']
-                            if isinstance(metadata_str, bytes):
-                                # 如果metadata是二进制数据，尝试解码或跳过
-                                try:
-                                    metadata_str = metadata_str.decode('utf-8')
-                                except UnicodeDecodeError:
-                                    logger.debug(f"metadata为二进制数据，跳过用户验证: session_id={session_id[:8]}...")
-                                    metadata_str = "{}"
-                        except UnicodeDecodeError:
-                            logger.debug(f"metadata编码错误，使用空字符串: session_id={session_id[:8]}...")
-                            metadata_str = "{}"
-
-                        # 直接从metadata解析用户信息，避免使用checkpointer API
-                        try:
-                            # 尝试解析metadata
-                            if metadata_str:
-                                if isinstance(metadata_str, bytes):
-                                    # 如果是二进制数据，尝试解码
-                                    try:
-                                        metadata_str = metadata_str.decode('utf-8')
-                                    except UnicodeDecodeError:
-                                        logger.debug(f"跳过二进制metadata: session_id={session_id[:8]}...")
-                                        continue
+            sessions = [
+                {
+                    "session_id": entry["session_id"],
+                    "user_id": entry["user_id"],
+                    "title": entry["title"] or "未命名会话",
+                    "message_count": entry["message_count"],
+                    "created_at": entry["created_at"],
+                    "updated_at": entry["updated_at"],
+                    "status": "active",
+                    "checkpoint_id": entry["last_checkpoint_id"]
+                }
+                for entry in entries
+            ]
 
-                                try:
-                                    metadata = json.loads(metadata_str)
-                                    session_user_id = metadata.get("user_id")
-
-                                    if session_user_id == user_id:
-                                        # 找到属于当前用户的会话
-                                        # 获取该会话的检查点数量
-                                        count_query = """
-                                        SELECT COUNT(*) as checkpoint_count
-                                        FROM checkpoints
-                                        WHERE thread_id = ?
-                                        """
-                                        cursor.execute(count_query, (session_id,))
-                                        count_row = cursor.fetchone()
-                                        checkpoint_count = count_row['checkpoint_count'] if count_row else 0
-
-                                        # 构建会话信息
-                                        session_info = {
-                                            "session_id": session_id,
-                                            "user_id": user_id,
-                                            "title": metadata.get("title") or "未命名会话",
-                                            "message_count": checkpoint_count,
-                                            "created_at": metadata.get("created_at") or datetime.now(timezone.utc).isoformat(),
-                                            "updated_at": datetime.now(timezone.utc).isoformat(),
-                                            "status": "active",
-                                            "checkpoint_id": row['checkpoint_id']
-                                        }
-
-                                        sessions.append(session_info)
-                                        logger.debug(f"找到用户会话: {metadata.get('title')} ({session_id[:8]}...)")
-
-                                except json.JSONDecodeError:
-                                    logger.debug(f"metadata JSON解析失败: session_id={session_id[:8]}...")
-                                    continue
-                            else:
-                                logger.debug(f"metadata为空: session_id={session_id[:8]}...")
-                                continue
-
-                        except Exception as parse_error:
-                            # 如果解析失败，跳过这个会话
-                            logger.debug(f"metadata解析失败: session_id={session_id[:8]}..., error={parse_error}")
-                            continue
-
-                    except Exception as e:
-                        logger.warning(f"处理会话失败: session_id={row.get('thread_id', 'unknown')}, error={e}")
-                        # 如果是UTF-8解码错误，尝试从checkpoint数据中获取信息
-                        if "utf-8" in str(e).lower() and "decode" in str(e).lower():
-                            try:
-                                # 尝试从checkpoint数据中解析会话信息
-                                checkpoint_data = json.loads(row['checkpoint'])
-                                channel_values = checkpoint_data.get('channel_values', {})
-
-                                session_info = {
-                                    "session_id": session_id,
-                                    "user_id": channel_values.get("user_id", user_id),
-                                    "title": channel_values.get("session_title", "未命名会话"),
-                                    "message_count": len(channel_values.get("messages", [])),
-                                    "created_at": datetime.now(timezone.utc).isoformat(),
-                                    "updated_at": datetime.now(timezone.utc).isoformat(),
-                                    "status": "active",
-                                    "checkpoint_id": row['checkpoint_id']
-                                }
-
-                                # 验证用户ID匹配
-                                if session_info["user_id"] == user_id:
-                                    sessions.append(session_info)
-                                    logger.info(f"从checkpoint数据恢复会话: session_id={session_id}")
-                                    continue
-                            except Exception as recovery_error:
-                                logger.debug(f"从checkpoint恢复会话失败: {recovery_error}")
-
-                        continue
-
-            finally:
-                conn.close()
-
-            # 按创建时间倒序排序（最新的在前）并限制数量
-            sessions.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-            limited_sessions = sessions[:limit]
-
-            logger.info(f"列出用户会话: user_id={user_id}, 找到 {len(sessions)} 个会话，返回 {len(limited_sessions)} 个")
+            logger.info(f"列出用户会话: user_id={user_id}, 共 {total_count} 个会话，返回 {len(sessions)} 个")
 
             return {
                 "user_id": user_id,
-                "sessions": limited_sessions,
-                "total_count": len(sessions),
+                "sessions": sessions,
+                "total_count": total_count,
                 "limit": limit,
                 "timestamp": datetime.now(timezone.utc).isoformat(),
                 "status": "success"
@@ -866,48 +803,6 @@ class ChatService:
 
         except Exception as e:
             logger.error(f"列出会话失败: user_id={user_id}, error={e}")
-            # 如果直接查询失败，回退到使用checkpointer API
-            return self._list_sessions_fallback(user_id, limit)
-
-    def _list_sessions_fallback(self, user_id: str, limit: int = 20) -> Dict[str, Any]:
-        """
-        会话列表查询的回退方法
-
-        当直接数据库查询失败时，使用checkpointer API作为回退方案。
-        """
-        try:
-            sessions = []
-
-            def _list_with_checkpointer(checkpointer):
-                # 尝试列出检查点（仅作为回退）
-                try:
-                    # 使用一个通用的配置来尝试获取检查点
-                    test_config = self._create_runnable_config(user_id, "fallback-list")
-                    checkpoints = list(checkpointer.list(test_config, limit=1))
-
-                    # 如果有检查点，说明系统工作正常，但无法列出所有会话
-                    # 返回空列表而不是错误
-                    logger.warning("使用回退方法：无法遍历所有检查点，返回空列表")
-
-                except Exception as e:
-                    logger.warning(f"回退方法也失败: {e}")
-
-                return []
-
-            limited_sessions = self._with_checkpointer(_list_with_checkpointer)
-
-            return {
-                "user_id": user_id,
-                "sessions": limited_sessions,
-                "total_count": 0,
-                "limit": limit,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "status": "success",
-                "note": "使用回退方法，可能不完整"
-            }
-
-        except Exception as e:
-            logger.error(f"回退方法也失败: user_id={user_id}, error={e}")
             return {
                 "user_id": user_id,
                 "sessions": [],
@@ -991,15 +886,10 @@ class ChatService:
             # 检查数据库连接
             db_health = self.db_manager.health_check()
 
-            # 检查图创建能力（通过尝试创建临时图）
+            # 检查图创建能力（借用连接池中已编译的图，首次时编译）
             graph_ok = False
             try:
-                def _test_graph_creation(checkpointer):
-                    temp_graph = create_chat_graph(checkpointer, self._store)
-                    return temp_graph is not None
-
-                self._with_checkpointer(_test_graph_creation)
-                graph_ok = True
+                graph_ok = self._with_graph(lambda chat_graph: chat_graph.graph is not None)
             except Exception as e:
                 logger.error(f"图创建测试失败: {e}")
 
@@ -1020,6 +910,182 @@ class ChatService:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
 
+    # ===== 异步接口 =====
+    # 供事件循环中的调用方使用：检查点器为AsyncSqliteSaver，图通过ainvoke运行，
+    # 等待LLM和数据库期间让出事件循环，一个worker可以同时处理大量对话。
+
+    async def _get_async_graph(self):
+        """
+        获取基于异步检查点器编译的聊天图
+
+        已编译的图不保存单次运行的状态，可以被多个并发对话同时使用，
+        因此整个事件循环只编译一次；异步检查点器重建时才重新编译。
+
+        Returns:
+            ChatGraph: 聊天图实例
+        """
+        checkpointer = await self.db_manager.get_async_checkpointer()
+        graph = self._async_graph
+        if graph is None or graph.checkpointer is not checkpointer:
+            graph = self._create_graph_with_checkpointer(checkpointer)
+            self._async_graph = graph
+        return graph
+
+    async def acreate_session(self, user_id: str, title: Optional[str] = None) -> Dict[str, Any]:
+        """
+        创建新的聊天会话（异步）
+
+        Args:
+            user_id: 用户ID
+            title: 会话标题（可选）
+
+        Returns:
+            Dict[str, Any]: 会话创建结果
+
+        Raises:
+            Exception: 会话创建失败时抛出
+        """
+        try:
+            session = self._new_session(user_id, title)
+
+            checkpointer = await self.db_manager.get_async_checkpointer()
+            config, checkpoint, metadata = self._build_session_checkpoint(
+                checkpointer, user_id, session.session_id, session.title
+            )
+            await checkpointer.aput(config, checkpoint, metadata, {})
+
+            return self._build_create_result(session)
+
+        except Exception as e:
+            logger.error(f"创建聊天会话失败: user_id={user_id}, error={e}")
+            raise Exception(f"创建会话失败: {str(e)}")
+
+    async def asend_message(self, user_id: str, session_id: str, message: str) -> Dict[str, Any]:
+        """
+        发送消息到聊天会话（异步）
+
+        Args:
+            user_id: 用户ID
+            session_id: 会话ID
+            message: 用户消息内容
+
+        Returns:
+            Dict[str, Any]: 消息处理结果，格式与send_message相同
+
+        Raises:
+            ValueError: 消息为空或ID格式无效
+            Exception: 消息发送失败时抛出
+        """
+        try:
+            current_state, config = self._prepare_turn(user_id, session_id, message)
+
+            chat_graph = await self._get_async_graph()
+            result = await chat_graph.graph.ainvoke(current_state, config)
+
+            return self._build_send_result(user_id, session_id, message, result)
+
+        except ValueError as e:
+            logger.warning(f"⚠️ 消息验证失败: user_id={user_id}, session_id={session_id}, error={e}")
+            raise
+        except Exception as e:
+            logger.error(f"❌ 消息发送失败: user_id={user_id}, session_id={session_id}, error={e}")
+            raise Exception(f"发送消息失败: {str(e)}")
+
+    async def astream_message(self, user_id: str, session_id: str, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式发送消息（异步生成器）
+
+        图在后台任务中运行，模型以流式接口调用，token和工具调用进度经
+        ChatStreamHandler的有界队列实时产出：
+        - {"type": "token", "content": str}：agent节点模型输出的文本片段
+        - {"type": "tool_start", "name": str}：开始调用工具
+        - {"type": "tool_end", "name": str}：工具调用完成
+        - {"type": "done", ...}：本轮结束，其余字段与send_message的返回结果相同
+
+        背压：调用方不读取时队列很快填满，模型的流式读取在回调中等待，不再从LLM连接读数据。
+        取消：调用方停止迭代（aclose）或所在任务被取消（例如客户端断开）时，
+        后台的图运行被取消，正在进行的LLM请求随之关闭。
+
+        Args:
+            user_id: 用户ID
+            session_id: 会话ID
+            message: 用户消息内容
+
+        Yields:
+            Dict[str, Any]: 流式事件
+
+        Raises:
+            ValueError: 消息为空或ID格式无效
+            Exception: 消息发送失败时抛出
+        """
+        current_state, config = self._prepare_turn(user_id, session_id, message)
+        chat_graph = await self._get_async_graph()
+
+        handler = ChatStreamHandler()
+        stream_config = {
+            **config,
+            "callbacks": [handler],
+            "configurable": {**config["configurable"], STREAM_TOKENS_CONFIG_KEY: True}
+        }
+        run = asyncio.ensure_future(chat_graph.graph.ainvoke(current_state, stream_config))
+        next_event = None
+
+        try:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(handler.queue.get())
+                await asyncio.wait({next_event, run}, return_when=asyncio.FIRST_COMPLETED)
+                if next_event.done():
+                    # 先取完队列中的事件，图运行结束后才退出
+                    event, next_event = next_event.result(), None
+                    yield event
+                elif run.done():
+                    break
+
+            result = run.result()
+            yield {"type": "done", **self._build_send_result(user_id, session_id, message, result)}
+
+        except Exception as e:
+            logger.error(f"❌ 流式消息发送失败: user_id={user_id}, session_id={session_id}, error={e}")
+            raise Exception(f"发送消息失败: {str(e)}")
+
+        finally:
+            if next_event is not None:
+                next_event.cancel()
+            if not run.done():
+                run.cancel()
+                logger.info(f"流式对话已取消: user_id={user_id}, session_id={session_id}")
+                with suppress(asyncio.CancelledError):
+                    await run
+
+    async def aget_chat_history(self, user_id: str, session_id: str, limit: int = 50) -> Dict[str, Any]:
+        """
+        获取聊天历史记录（异步）
+
+        Args:
+            user_id: 用户ID
+            session_id: 会话ID
+            limit: 返回消息数量限制
+
+        Returns:
+            Dict[str, Any]: 聊天历史记录，格式与get_chat_history相同
+
+        Raises:
+            Exception: 获取历史记录失败时抛出
+        """
+        try:
+            config = self._create_runnable_config(user_id, session_id)
+
+            chat_graph = await self._get_async_graph()
+            snapshot = await chat_graph.graph.aget_state(config)
+            messages = self._serialize_history(snapshot.values.get("messages", []), limit)
+
+            return self._build_history_result(user_id, session_id, messages, limit)
+
+        except Exception as e:
+            logger.error(f"获取聊天历史失败: user_id={user_id}, session_id={session_id}, error={e}")
+            raise Exception(f"获取聊天历史失败: {str(e)}")
+
     def _create_session_record_directly(self, user_id: str, session_id: str, title: str):
         """
         使用LangGraph API创建会话记录，确保类型一致性
@@ -1031,46 +1097,10 @@ class ChatService:
         """
         try:
             # 使用checkpointer创建会话记录，确保类型正确
-            with self.db_manager.create_checkpointer() as checkpointer:
-                # 创建LangGraph标准的配置
-                config = {
-                    "configurable": {
-                        "thread_id": session_id,
-                        "checkpoint_ns": ""
-                    }
-                }
-
-                # 创建符合LangGraph格式的checkpoint
-                current_time = datetime.now(timezone.utc)
-                checkpoint_data = {
-                    "v": 1,
-                    "ts": current_time.timestamp(),
-                    "id": str(uuid.uuid4()),
-                    "channel_values": {
-                        "user_id": user_id,
-                        "session_id": session_id,
-                        "session_title": title,
-                        "created_at": current_time.isoformat(),
-                        "messages": []
-                    },
-                    "channel_versions": {
-                        "messages": 1  # 确保是整数类型
-                    },
-                    "versions_seen": {},
-                    "pending_sends": []
-                }
-
-                metadata = {
-                    "user_id": user_id,
-                    "title": title,
-                    "source": "create",
-                    "step": -1,
-                    "parents": {},
-                    "created_at": current_time.isoformat()
-                }
-
+            with self.db_manager.get_checkpointer_pool().acquire() as slot:
+                checkpointer = slot.checkpointer
                 # 使用checkpointer.put，这会正确处理类型
-                checkpointer.put(config, checkpoint_data, metadata, {})
+                checkpointer.put(*self._build_session_checkpoint(checkpointer, user_id, session_id, title), {})
 
             logger.debug(f"会话记录已创建: session_id={session_id}, user_id={user_id}")
 
@@ -1078,7 +1108,60 @@ class ChatService:
             logger.error(f"创建会话记录失败: {e}")
             raise Exception(f"创建会话记录失败: {str(e)}")
 
-  
+    def _build_session_checkpoint(self, checkpointer, user_id: str, session_id: str, title: str):
+        """
+        构造新会话的初始检查点
+
+        Args:
+            checkpointer: 用于生成版本号的检查点器（同步或异步）
+            user_id: 用户ID
+            session_id: 会话ID
+            title: 会话标题
+
+        Returns:
+            Tuple[RunnableConfig, Dict[str, Any], Dict[str, Any]]: 配置、检查点和元数据
+        """
+        # 创建LangGraph标准的配置
+        config = {
+            "configurable": {
+                "thread_id": session_id,
+                "checkpoint_ns": ""
+            }
+        }
+
+        # 创建符合LangGraph格式的checkpoint
+        current_time = datetime.now(timezone.utc)
+        checkpoint_data = {
+            "v": 1,
+            "ts": current_time.timestamp(),
+            # 与LangGraph一致使用按时间递增的uuid6，图运行后的检查点才会排在它之后
+            "id": str(uuid6(clock_seq=-2)),
+            "channel_values": {
+                "user_id": user_id,
+                "session_id": session_id,
+                "session_title": title,
+                "created_at": current_time.isoformat(),
+                "messages": []
+            },
+            "channel_versions": {
+                # 使用检查点器自己的版本号格式，与图运行时生成的版本号可比较
+                "messages": checkpointer.get_next_version(None, None)
+            },
+            "versions_seen": {},
+            "pending_sends": []
+        }
+
+        metadata = {
+            "user_id": user_id,
+            "title": title,
+            "source": "create",
+            "step": -1,
+            "parents": {},
+            "created_at": current_time.isoformat()
+        }
+
+        return config, checkpoint_data, metadata
+
     def _ensure_database_initialized(self):
         """
         确保数据库表已初始化
@@ -1088,7 +1171,8 @@ class ChatService:
         """
         try:
             # 使用数据库管理器初始化数据库
-            with self.db_manager.create_checkpointer() as checkpointer:
+            with self.db_manager.get_checkpointer_pool().acquire() as slot:
+                checkpointer = slot.checkpointer
                 # 创建符合LangGraph标准的配置
                 dummy_config = {"configurable": {"thread_id": "__db_init__", "checkpoint_ns": ""}}
 
@@ -1098,7 +1182,7 @@ class ChatService:
                     "ts": 0,
                     "id": "init-checkpoint",
                     "channel_values": {"messages": []},
-                    "channel_versions": {"messages": 1},  # 确保是整数类型
+                    "channel_versions": {"messages": checkpointer.get_next_version(None, None)},
                     "versions_seen": {},
                     "pending_sends": []
                 }
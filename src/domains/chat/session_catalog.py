@@ -0,0 +1,347 @@
+"""
+聊天会话目录
+
+在聊天数据库中维护一张会话目录表，每个会话一行，记录所属用户、标题、
+最新检查点、消息数和更新时间，按(user_id, updated_at)建索引。
+会话列表只需一次索引范围扫描，不再对checkpoints全表GROUP BY、逐行解析元数据
+并为每个会话单独COUNT。
+
+设计原则：
+1. 事务一致：检查点器写入检查点时在同一个事务中更新目录行，删除会话时一并删除
+2. 同步（SqliteSaver）与异步（AsyncSqliteSaver）检查点器各有一个子类，行为一致
+3. 只记录根命名空间、带user_id的检查点；子图检查点和内部占位线程不进入目录
+4. 目录为空而已有检查点时（升级前的数据库），建表后一次性从最新检查点回填
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    get_checkpoint_metadata
+)
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+SESSION_CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_session_catalog (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT,
+    last_checkpoint_id TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_session_catalog_user_updated
+    ON chat_session_catalog (user_id, updated_at DESC);
+"""
+
+# 与SqliteSaver.put相同的检查点写入语句
+_INSERT_CHECKPOINT_SQL = (
+    "INSERT OR REPLACE INTO checkpoints "
+    "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+# 标题只在创建会话的检查点中出现，之后的检查点不覆盖；乱序到达的旧检查点不回退目录
+_UPSERT_CATALOG_SQL = """
+INSERT INTO chat_session_catalog
+    (session_id, user_id, title, last_checkpoint_id, message_count, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    title = COALESCE(excluded.title, chat_session_catalog.title),
+    last_checkpoint_id = excluded.last_checkpoint_id,
+    message_count = excluded.message_count,
+    updated_at = excluded.updated_at
+WHERE excluded.last_checkpoint_id >= chat_session_catalog.last_checkpoint_id
+"""
+
+_LIST_SESSIONS_SQL = """
+SELECT session_id, user_id, title, last_checkpoint_id, message_count, created_at, updated_at
+FROM chat_session_catalog
+WHERE user_id = ?
+ORDER BY updated_at DESC
+LIMIT ?
+"""
+
+_CATALOG_COLUMNS = (
+    "session_id", "user_id", "title", "last_checkpoint_id", "message_count", "created_at", "updated_at"
+)
+
+
+def count_messages(checkpoint: Checkpoint) -> int:
+    """统计检查点中用户和AI消息的数量（不含工具消息）"""
+    messages = (checkpoint.get("channel_values") or {}).get("messages") or []
+    return len([msg for msg in messages if isinstance(msg, (HumanMessage, AIMessage))])
+
+
+def build_catalog_row(
+    config: RunnableConfig,
+    checkpoint: Checkpoint,
+    metadata: Dict[str, Any]
+) -> Optional[Tuple]:
+    """
+    根据一次检查点写入构造目录行
+
+    Args:
+        config: 检查点配置（含thread_id和checkpoint_ns）
+        checkpoint: 检查点
+        metadata: 合并了配置项后的检查点元数据
+
+    Returns:
+        Optional[Tuple]: 目录行参数；不属于会话目录的检查点返回None
+    """
+    configurable = config.get("configurable", {})
+    user_id = metadata.get("user_id")
+    if configurable.get("checkpoint_ns", "") != "" or not user_id:
+        return None
+
+    now = datetime.now(timezone.utc).isoformat()
+    return (
+        str(configurable["thread_id"]),
+        str(user_id),
+        metadata.get("title"),
+        checkpoint["id"],
+        count_messages(checkpoint),
+        metadata.get("created_at") or now,
+        now
+    )
+
+
+class CatalogSqliteSaver(SqliteSaver):
+    """
+    同步检查点器：写入检查点时在同一事务中维护会话目录
+
+    SqliteSaver.cursor()在退出时无论成败都会提交，无法把两条语句放进一个原子事务，
+    因此put()和delete_thread()自行持锁执行并在失败时回滚。
+    """
+
+    def __init__(self, conn, **kwargs: Any):
+        super().__init__(conn, **kwargs)
+        # setup()在持锁的put()中也会被调用，使用可重入锁
+        self.lock = threading.RLock()
+
+    def setup(self) -> None:
+        """创建检查点表和会话目录表，目录为空时回填"""
+        if self.is_setup:
+            return
+        with self.lock:
+            if self.is_setup:
+                return
+            super().setup()
+            self.conn.executescript(SESSION_CATALOG_SCHEMA)
+            self._backfill_catalog()
+            self.conn.commit()
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """写入检查点并更新会话目录（单个事务）"""
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        merged_metadata = get_checkpoint_metadata(config, metadata)
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        serialized_metadata = json.dumps(merged_metadata, ensure_ascii=False).encode("utf-8", "ignore")
+        catalog_row = build_catalog_row(config, checkpoint, merged_metadata)
+
+        with self.lock:
+            self.setup()
+            try:
+                self.conn.execute(_INSERT_CHECKPOINT_SQL, (
+                    str(config["configurable"]["thread_id"]),
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    serialized_checkpoint,
+                    serialized_metadata
+                ))
+                if catalog_row is not None:
+                    self.conn.execute(_UPSERT_CATALOG_SQL, catalog_row)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+        return {
+            "configurable": {
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def delete_thread(self, thread_id: str) -> None:
+        """删除会话的检查点、写入记录和目录行（单个事务）"""
+        with self.lock:
+            self.setup()
+            try:
+                for table in ("checkpoints", "writes"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+                self.conn.execute("DELETE FROM chat_session_catalog WHERE session_id = ?", (str(thread_id),))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def list_sessions(self, user_id: str, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        按更新时间倒序列出用户的会话（索引范围扫描）
+
+        Args:
+            user_id: 用户ID
+            limit: 返回数量上限
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: 会话目录行和该用户的会话总数
+        """
+        with self.lock:
+            self.setup()
+            rows = self.conn.execute(_LIST_SESSIONS_SQL, (user_id, limit)).fetchall()
+            total = self.conn.execute(
+                "SELECT COUNT(*) FROM chat_session_catalog WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+        return [dict(zip(_CATALOG_COLUMNS, row)) for row in rows], total
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """获取单个会话的目录行"""
+        with self.lock:
+            self.setup()
+            row = self.conn.execute(
+                "SELECT " + ", ".join(_CATALOG_COLUMNS) + " FROM chat_session_catalog WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        return dict(zip(_CATALOG_COLUMNS, row)) if row else None
+
+    def _backfill_catalog(self) -> None:
+        """目录为空时，用每个会话最新的根检查点回填（升级前创建的数据库只执行一次）"""
+        if self.conn.execute("SELECT 1 FROM chat_session_catalog LIMIT 1").fetchone():
+            return
+
+        rows = self.conn.execute(
+            """
+            SELECT thread_id, checkpoint_id, type, checkpoint, metadata
+            FROM checkpoints AS c
+            WHERE checkpoint_ns = '' AND checkpoint_id = (
+                SELECT MAX(checkpoint_id) FROM checkpoints
+                WHERE thread_id = c.thread_id AND checkpoint_ns = ''
+            )
+            """
+        ).fetchall()
+
+        backfilled = 0
+        for thread_id, checkpoint_id, type_, blob, metadata_blob in rows:
+            try:
+                metadata = json.loads(metadata_blob) if metadata_blob else {}
+                checkpoint = self.serde.loads_typed((type_, blob))
+                config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+                catalog_row = build_catalog_row(config, checkpoint, metadata)
+                if catalog_row is None:
+                    continue
+                # 标题只写在创建会话的检查点里
+                if catalog_row[2] is None:
+                    catalog_row = catalog_row[:2] + (self._find_title(thread_id),) + catalog_row[3:]
+                self.conn.execute(_UPSERT_CATALOG_SQL, catalog_row)
+                backfilled += 1
+            except Exception as e:
+                logger.warning(f"回填会话目录失败: thread_id={thread_id}, error={e}")
+
+        if backfilled:
+            logger.info(f"会话目录回填完成: {backfilled}个会话")
+
+    def _find_title(self, thread_id: str) -> Optional[str]:
+        for (metadata_blob,) in self.conn.execute(
+            "SELECT metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' ORDER BY checkpoint_id",
+            (thread_id,)
+        ):
+            try:
+                title = json.loads(metadata_blob).get("title") if metadata_blob else None
+            except ValueError:
+                continue
+            if title:
+                return title
+        return None
+
+
+class AsyncCatalogSqliteSaver(AsyncSqliteSaver):
+    """异步检查点器：写入检查点时在同一事务中维护会话目录（回填由同步连接池在启动时完成）"""
+
+    async def setup(self) -> None:
+        """创建检查点表和会话目录表"""
+        if self.is_setup:
+            return
+        await super().setup()
+        async with self.lock:
+            await self.conn.executescript(SESSION_CATALOG_SCHEMA)
+            await self.conn.commit()
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """写入检查点并更新会话目录（单个事务）"""
+        await self.setup()
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        merged_metadata = get_checkpoint_metadata(config, metadata)
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        serialized_metadata = json.dumps(merged_metadata, ensure_ascii=False).encode("utf-8", "ignore")
+        catalog_row = build_catalog_row(config, checkpoint, merged_metadata)
+
+        async with self.lock:
+            try:
+                await self.conn.execute(_INSERT_CHECKPOINT_SQL, (
+                    str(config["configurable"]["thread_id"]),
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    serialized_checkpoint,
+                    serialized_metadata
+                ))
+                if catalog_row is not None:
+                    await self.conn.execute(_UPSERT_CATALOG_SQL, catalog_row)
+                await self.conn.commit()
+            except BaseException:
+                await self.conn.rollback()
+                raise
+
+        return {
+            "configurable": {
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """删除会话的检查点、写入记录和目录行（单个事务）"""
+        await self.setup()
+        async with self.lock:
+            try:
+                for table in ("checkpoints", "writes"):
+                    await self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+                await self.conn.execute("DELETE FROM chat_session_catalog WHERE session_id = ?", (str(thread_id),))
+                await self.conn.commit()
+            except BaseException:
+                await self.conn.rollback()
+                raise
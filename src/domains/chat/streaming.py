@@ -0,0 +1,104 @@
+"""
+聊天流式输出
+
+在本地运行聊天图时，把模型逐个生成的token和工具调用进度实时交给调用方。
+
+设计原则：
+1. 有界缓冲：事件放入固定大小的asyncio.Queue，调用方读得慢时，
+   回调中的await queue.put()会阻塞模型的流式读取循环，背压一直传到LLM的HTTP连接
+2. 只转发agent节点的模型输出，忽略其他节点里的模型调用
+3. 事件格式与聊天微服务的SSE事件一致（type + 内容）
+
+事件类型：
+- {"type": "token", "content": str}：模型输出的文本片段
+- {"type": "tool_start", "name": str}：开始调用工具
+- {"type": "tool_end", "name": str}：工具调用完成（失败时带error字段）
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 流式事件缓冲区大小（事件数），调用方来不及读取时模型的流式读取在此处等待
+CHAT_STREAM_BUFFER_SIZE = int(os.getenv("CHAT_STREAM_BUFFER_SIZE", "32"))
+
+# 运行配置中的开关：为True时agent节点以流式方式调用模型（以"__"开头，不会写入检查点元数据）
+STREAM_TOKENS_CONFIG_KEY = "__chat_stream_tokens"
+
+
+class ChatStreamHandler(AsyncCallbackHandler):
+    """
+    聊天流式事件收集器
+
+    作为回调传给graph.ainvoke()，会被模型和工具的子运行继承。
+    回调由模型的流式循环逐个await，队列满时流式读取随之暂停。
+    """
+
+    def __init__(self, maxsize: int = CHAT_STREAM_BUFFER_SIZE, node: str = "agent"):
+        """
+        初始化收集器
+
+        Args:
+            maxsize: 队列大小（事件数）
+            node: 只转发该节点内的模型输出
+        """
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max(1, maxsize))
+        self.node = node
+        self._model_runs: Set[UUID] = set()
+        self._tool_names: Dict[UUID, str] = {}
+
+    async def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> None:
+        if (metadata or {}).get("langgraph_node") == self.node:
+            self._model_runs.add(run_id)
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        # 工具调用参数的片段没有文本内容，不转发
+        if token and run_id in self._model_runs:
+            await self.queue.put({"type": "token", "content": token})
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._model_runs.discard(run_id)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._model_runs.discard(run_id)
+
+    async def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        **kwargs: Any
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._tool_names[run_id] = name
+        await self.queue.put({"type": "tool_start", "name": name})
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        await self.queue.put({"type": "tool_end", "name": self._tool_names.pop(run_id, "tool")})
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        logger.warning(f"聊天工具调用失败: {error}")
+        await self.queue.put({
+            "type": "tool_end",
+            "name": self._tool_names.pop(run_id, "tool"),
+            "error": str(error)
+        })
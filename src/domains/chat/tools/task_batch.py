@@ -34,6 +34,7 @@ from langchain_core.tools import tool
 # 导入辅助函数
 from .utils import (
     get_task_service_context,
+    invalidate_user_task_cache,
     safe_uuid_convert,
     _success_response,
     _error_response
@@ -279,6 +280,9 @@ def batch_create_subtasks_core(parent_id: str, subtasks: List[Dict[str, Any]], u
                         'index': i + 1
                     })
 
+            # 单个子任务失败不会中断循环，部分子任务可能已创建，统一清除任务响应缓存
+            invalidate_user_task_cache(user_uuid)
+
             # 构建结果数据
             total_tasks = len([task for task in validated_subtasks if task is not None])
             success_count = len(created_tasks)
@@ -34,6 +34,7 @@ from langchain_core.runnables import RunnableConfig
 # 导入辅助函数
 from .utils import (
     get_task_service_context,
+    invalidate_user_task_cache,
     safe_uuid_convert,
     parse_datetime,
     _success_response,
@@ -129,7 +130,10 @@ def create_task(
             user_id = safe_uuid_convert(user_id_str)
 
             # 调用任务服务创建任务
-            result = task_service.create_task(create_request, user_id)
+            try:
+                result = task_service.create_task(create_request, user_id)
+            finally:
+                invalidate_user_task_cache(user_id)
 
             # 构建成功响应
             response = _success_response(result, "任务创建成功")
@@ -241,7 +245,10 @@ def update_task(
             user_id = safe_uuid_convert(user_id_str)
 
             # 调用任务服务更新任务
-            result = task_service.update_task_with_tree_structure(task_uuid, update_request, user_id)
+            try:
+                result = task_service.update_task_with_tree_structure(task_uuid, update_request, user_id)
+            finally:
+                invalidate_user_task_cache(user_id)
 
             # 构建成功响应
             response = _success_response(result, "任务更新成功")
@@ -306,7 +313,10 @@ def delete_task(task_id: str, config: RunnableConfig = None) -> str:
             user_id = safe_uuid_convert(user_id_str)
 
             # 调用任务服务删除任务
-            result = task_service.delete_task(task_uuid, user_id)
+            try:
+                result = task_service.delete_task(task_uuid, user_id)
+            finally:
+                invalidate_user_task_cache(user_id)
 
             # 构建成功响应
             response = _success_response(result, "任务删除成功")
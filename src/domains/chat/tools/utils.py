@@ -6,9 +6,10 @@
 
 核心功能：
 1. Session管理：get_task_service_context()
-2. UUID转换：safe_uuid_convert()
-3. 日期解析：parse_datetime()
-4. 响应格式化：_success_response(), _error_response()
+2. 缓存失效：invalidate_user_task_cache()
+3. UUID转换：safe_uuid_convert()
+4. 日期解析：parse_datetime()
+5. 响应格式化：_success_response(), _error_response()
 
 设计原则：
 1. 简洁直接：避免过度抽象，保持代码简单易懂
@@ -38,6 +39,8 @@ from sqlalchemy.exc import SQLAlchemyError
 # 导入数据库连接和服务
 from src.database.connection import get_engine
 from src.services.task_microservice_client import get_task_microservice_client
+from src.services.enhanced_task_microservice_client import get_enhanced_task_microservice_client
+from src.services.conditional_get import bump_user_data_version
 from src.domains.points.service import PointsService
 
 # 配置日志
@@ -128,6 +131,26 @@ def get_task_service_context() -> Generator[Dict[str, Any], None, None]:
                 logger.error(f"数据库Session关闭失败: {close_error}")
 
 
+def invalidate_user_task_cache(user_id: Optional[Union[str, UUID]]) -> None:
+    """
+    聊天工具写任务后清除用户的任务响应缓存并递增数据版本号
+
+    与任务路由的写接口使用同一个缓存失效入口，任务列表等只读接口不会在TTL内
+    继续返回写之前的数据，也不会凭旧的ETag直接返回304。
+    无论写操作成功与否都应调用，失效失败只记录日志。
+
+    Args:
+        user_id (Optional[Union[str, UUID]]): 用户ID，为None时不做任何事
+    """
+    if user_id is None:
+        return
+    try:
+        bump_user_data_version(user_id)
+        get_enhanced_task_microservice_client().invalidate_user_cache(str(user_id))
+    except Exception as e:
+        logger.warning(f"清除任务响应缓存失败: user_id={user_id}, error={e}")
+
+
 def safe_uuid_convert(uuid_input: Optional[Union[str, UUID]]) -> Optional[UUID]:
     """
     安全转换UUID格式
@@ -0,0 +1,214 @@
+"""
+Task列表游标分页
+
+为 GET /tasks 提供不透明游标（next_cursor）分页，保证单次响应大小有界。
+
+核心功能：
+1. 游标编解码：游标内含偏移量、上一页最后一个任务ID和筛选条件指纹，对客户端不透明
+2. 上游分页：上游支持时把游标翻译为limit/offset
+3. 本地切片：上游返回完整数组（不支持分页）时，从完整列表中按游标切片；
+   优先按上一页最后一个任务ID定位（keyset），找不到时退回偏移量
+4. 上游能力探测：auto模式下首次收到完整数组后切换为本地切片，
+   此后请求不再携带limit/offset，使完整列表可以命中响应缓存
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.api.config import config
+
+
+logger = logging.getLogger(__name__)
+
+CURSOR_VERSION = 1
+
+
+class InvalidCursorError(ValueError):
+    """分页游标无效（格式错误、版本不符或与筛选条件不匹配）"""
+
+
+@dataclass(frozen=True)
+class CursorPosition:
+    """游标位置"""
+    offset: int
+    last_task_id: Optional[str] = None
+
+
+def _filters_fingerprint(filters: Dict[str, Any]) -> str:
+    normalized = json.dumps(
+        {key: value for key, value in filters.items() if value is not None},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(offset: int, last_task_id: Optional[str], filters: Dict[str, Any]) -> str:
+    """
+    编码分页游标
+
+    Args:
+        offset (int): 下一页起始偏移量
+        last_task_id (str, optional): 当前页最后一个任务ID
+        filters (Dict[str, Any]): 当前筛选条件，游标只能在相同筛选条件下使用
+
+    Returns:
+        str: URL安全的不透明游标
+    """
+    payload = {
+        "v": CURSOR_VERSION,
+        "o": offset,
+        "k": last_task_id,
+        "f": _filters_fingerprint(filters)
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, filters: Dict[str, Any]) -> CursorPosition:
+    """
+    解码分页游标
+
+    Args:
+        cursor (str): 客户端传入的游标
+        filters (Dict[str, Any]): 当前筛选条件
+
+    Returns:
+        CursorPosition: 游标位置
+
+    Raises:
+        InvalidCursorError: 游标无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError, binascii.Error) as e:
+        raise InvalidCursorError("游标格式错误") from e
+
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise InvalidCursorError("游标版本不受支持")
+
+    offset = payload.get("o")
+    if not isinstance(offset, int) or offset < 0:
+        raise InvalidCursorError("游标偏移量无效")
+
+    if payload.get("f") != _filters_fingerprint(filters):
+        raise InvalidCursorError("游标与当前筛选条件不匹配")
+
+    last_task_id = payload.get("k")
+    return CursorPosition(offset=offset, last_task_id=last_task_id if isinstance(last_task_id, str) else None)
+
+
+def slice_task_list(
+    tasks: List[Dict[str, Any]],
+    position: CursorPosition,
+    limit: int
+) -> Dict[str, Any]:
+    """
+    从完整任务列表中按游标切出一页
+
+    Args:
+        tasks (List[Dict[str, Any]]): 上游返回的完整任务列表
+        position (CursorPosition): 游标位置
+        limit (int): 每页大小
+
+    Returns:
+        Dict[str, Any]: {"tasks": [...], "total": N, "limit": limit, "offset": offset}，
+            与上游分页响应格式一致
+    """
+    offset = position.offset
+    if position.last_task_id is not None:
+        # keyset定位：上一页之后有任务被插入或删除时仍能无重复、无遗漏地续读
+        for index, task in enumerate(tasks):
+            if isinstance(task, dict) and task.get("id") == position.last_task_id:
+                offset = index + 1
+                break
+
+    offset = min(offset, len(tasks))
+    return {
+        "tasks": tasks[offset:offset + limit],
+        "total": len(tasks),
+        "limit": limit,
+        "offset": offset
+    }
+
+
+def build_next_cursor(
+    page_data: Dict[str, Any],
+    filters: Dict[str, Any],
+    default_offset: int = 0
+) -> Optional[str]:
+    """
+    根据当前页数据生成下一页游标
+
+    Args:
+        page_data (Dict[str, Any]): {"tasks": [...], "total": N, "limit": L, "offset": offset}
+        filters (Dict[str, Any]): 当前筛选条件
+        default_offset (int): 上游未返回offset时使用的当前页偏移量
+
+    Returns:
+        Optional[str]: 下一页游标；已是最后一页时返回None
+    """
+    tasks = page_data.get("tasks") or []
+    offset = page_data.get("offset", default_offset)
+    total = page_data.get("total")
+    limit = page_data.get("limit")
+    next_offset = offset + len(tasks)
+
+    if not tasks:
+        return None
+    if total is not None and next_offset >= total:
+        return None
+    if total is None and limit and len(tasks) < limit:
+        # 上游未返回总数时，不足一页即视为最后一页
+        return None
+
+    last_task = tasks[-1]
+    last_task_id = last_task.get("id") if isinstance(last_task, dict) else None
+    return encode_cursor(next_offset, last_task_id, filters)
+
+
+# 上游分页能力：None表示尚未探测
+_upstream_pagination_supported: Optional[bool] = None
+
+
+def upstream_pagination_enabled() -> bool:
+    """
+    是否把分页参数（limit/offset）转发给上游
+
+    由配置task_service_pagination_mode决定：
+    - upstream：始终转发
+    - local：从不转发，始终本地切片
+    - auto：默认转发，探测到上游不支持分页后改为本地切片
+
+    Returns:
+        bool: True表示转发分页参数
+    """
+    mode = getattr(config, 'task_service_pagination_mode', 'auto')
+    if mode == "local":
+        return False
+    if mode == "upstream":
+        return True
+    return _upstream_pagination_supported is not False
+
+
+def mark_upstream_pagination_unsupported() -> None:
+    """记录上游不支持分页（收到完整任务数组），后续请求改为本地切片"""
+    global _upstream_pagination_supported
+    if _upstream_pagination_supported is not False:
+        logger.info("Task微服务返回完整任务数组，列表分页切换为本地切片模式")
+    _upstream_pagination_supported = False
+
+
+def reset_upstream_pagination_detection() -> None:
+    """重置上游分页能力探测结果"""
+    global _upstream_pagination_supported
+    _upstream_pagination_supported = None
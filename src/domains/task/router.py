@@ -12,6 +12,8 @@ Task领域API路由 - 纯微服务代理模式
 5. POST /tasks/special/top3 - 设置Top3（微服务代理）
 6. GET /tasks/special/top3/{date} - 查看Top3（微服务代理）
 7. POST /tasks/{task_id}/complete - 任务完成（微服务代理）
+   POST /tasks/complete:batch - 批量完成任务（并发扇出）
+   GET /tasks/{task_id}/tree - 任务树（上游优先，按层并发展开兜底）
 8. POST /tasks/focus-status - 专注状态（微服务代理）
 9. GET /tasks/pomodoro-count - 番茄钟计数（微服务代理）
 
@@ -28,12 +30,13 @@ Task领域API路由 - 纯微服务代理模式
 版本：5.0.0（纯微服务代理）
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from uuid import UUID
 from datetime import date, datetime
 
-from fastapi import APIRouter, HTTPException, Depends, Body, Query, Path
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Path, Request, Response
 from fastapi import status
 from pydantic import BaseModel, Field
 
@@ -50,6 +53,13 @@ from src.services.focus_microservice_client import (
     get_focus_client
 )
 
+# 导入条件GET支持
+from src.services.conditional_get import (
+    ConditionalGet,
+    bump_user_data_version,
+    get_conditional_get_manager
+)
+
 # 导入认证依赖
 from src.api.dependencies import get_current_user_id
 from src.api.config import config
@@ -61,9 +71,18 @@ from .schemas import (
     TaskListQuery,
     TaskResponse,
     TaskListResponse,
-    TaskDeleteResponse,
-    PaginationInfo
+    TaskDeleteResponse
 )
+from .pagination import (
+    CursorPosition,
+    InvalidCursorError,
+    build_next_cursor,
+    decode_cursor,
+    mark_upstream_pagination_unsupported,
+    slice_task_list,
+    upstream_pagination_enabled
+)
+from .tree import TaskTreeExpander, prune_task_tree
 from src.api.schemas import UnifiedResponse
 
 # 配置日志
@@ -87,6 +106,11 @@ class Top3SetRequest(BaseModel):
     task_ids: List[str] = Field(..., description="任务ID列表，最多3个", example=["550e8400-e29b-41d4-a716-446655440000", "6ba7b810-9dad-11d1-80b4-00c04fd430c8", "6ba7b811-9dad-11d1-80b4-00c04fd430c8"])
 
 
+class BatchCompleteTasksRequest(BaseModel):
+    """批量完成任务请求模型"""
+    task_ids: List[str] = Field(..., min_length=1, description="任务ID列表，数量上限见配置task_batch_complete_max_items", example=["550e8400-e29b-41d4-a716-446655440000", "6ba7b810-9dad-11d1-80b4-00c04fd430c8"])
+
+
 class FocusStatusRequest(BaseModel):
     """专注状态请求模型"""
     focus_status: str = Field(..., description="专注状态", example="focused")
@@ -103,35 +127,71 @@ def create_error_response(status_code: int, message: str) -> UnifiedResponse:
     )
 
 
-def adapt_microservice_response_to_client(microservice_data: Dict[str, Any]) -> Dict[str, Any]:
+def invalidate_task_cache(client: EnhancedTaskMicroserviceClient, user_id: UUID) -> None:
     """
-    适配微服务响应数据为客户端格式
+    写操作后清除用户的任务响应缓存，并递增用户数据版本号使ETag失效
 
-    Args:
-        microservice_data (Dict[str, Any]): 微服务响应数据
+    无论微服务调用成功与否都会执行，避免超时等情况下写入已生效但缓存仍是旧数据。
 
-    Returns:
-        Dict[str, Any]: 适配后的响应数据
+    Args:
+        client: 增强版微服务客户端
+        user_id: 用户ID
     """
-    # 微服务响应格式已经是标准格式，直接透传
-    # 但需要确保包含必要字段
-    if not isinstance(microservice_data, dict):
-        return microservice_data
+    bump_user_data_version(user_id)
+    try:
+        client.invalidate_user_cache(str(user_id))
+    except Exception as e:
+        logger.warning(f"清除任务响应缓存失败: user_id={user_id}, error={e}")
+
+
+# 优先级映射：微服务 -> 本地(小写)
+# 支持多种格式: 首字母大写, 全小写, 全大写（Task微服务返回全大写格式）
+_PRIORITY_MAPPING: Dict[str, str] = {
+    'Low': 'low',
+    'low': 'low',
+    'LOW': 'low',
+    'Medium': 'medium',
+    'medium': 'medium',
+    'MEDIUM': 'medium',
+    'High': 'high',
+    'high': 'high',
+    'HIGH': 'high'
+}
+
+# 状态映射：微服务 -> 本地
+# 支持多种格式: 小写, 全大写, 下划线分隔（Task微服务返回NOT_STARTED状态）
+_STATUS_MAPPING: Dict[str, str] = {
+    'todo': 'pending',
+    'TODO': 'pending',
+    'pending': 'pending',
+    'NOT_STARTED': 'pending',
+    'inprogress': 'in_progress',
+    'IN_PROGRESS': 'in_progress',
+    'in_progress': 'in_progress',
+    'completed': 'completed',
+    'COMPLETED': 'completed'
+}
+
+# 缺失时补充的必需字段：不可变默认值可直接共享，列表和时间戳在缺失时才创建
+_NONE_DEFAULT_FIELDS = ('parent_id', 'planned_start_time', 'planned_end_time', 'last_claimed_date')
+_LIST_DEFAULT_FIELDS = ('tags', 'service_ids')
+_TIMESTAMP_DEFAULT_FIELDS = ('created_at', 'updated_at')
+
+
+def _adapt_task_list_data(data: Any) -> Optional[Dict[str, Any]]:
+    """
+    适配任务列表数据为 {"tasks": [...], "pagination": {...}} 格式
 
-    # 确保响应包含必要的字段
-    adapted_data = microservice_data.copy()
+    Args:
+        data (Any): 微服务响应的data字段，任务数组或 {"tasks": [...], "total": N, ...}
 
-    # 处理任务列表响应的分页信息
-    if "data" in adapted_data and isinstance(adapted_data["data"], list):
+    Returns:
+        Optional[Dict[str, Any]]: 适配后的列表数据；data不是任务列表时返回None
+    """
+    if isinstance(data, list):
         # 微服务返回的是任务数组，需要包装成分页格式
-        tasks_array = adapted_data["data"]
-        # 适配每个任务的数据格式
-        adapted_tasks = []
-        for task in tasks_array:
-            adapted_task = adapt_single_task_data(task)
-            adapted_tasks.append(adapted_task)
-
-        adapted_data["data"] = {
+        adapted_tasks = [adapt_single_task_data(task) for task in data]
+        return {
             "tasks": adapted_tasks,
             "pagination": {
                 "current_page": 1,
@@ -142,38 +202,57 @@ def adapt_microservice_response_to_client(microservice_data: Dict[str, Any]) ->
                 "has_prev": False
             }
         }
-    elif "data" in adapted_data and isinstance(adapted_data["data"], dict):
-        # 检查是否是任务列表格式: {"tasks": [...], "total": N, ...}
-        if "tasks" in adapted_data["data"] and isinstance(adapted_data["data"]["tasks"], list):
-            # 任务列表格式，适配每个任务
-            tasks_array = adapted_data["data"]["tasks"]
-            adapted_tasks = []
-            for task in tasks_array:
-                adapted_task = adapt_single_task_data(task)
-                adapted_tasks.append(adapted_task)
-
-            # 构建分页信息
-            total = adapted_data["data"].get("total", len(adapted_tasks))
-            limit = adapted_data["data"].get("limit", 20)
-            offset = adapted_data["data"].get("offset", 0)
-
-            current_page = (offset // limit) + 1 if limit > 0 else 1
-            total_pages = (total + limit - 1) // limit if limit > 0 else 1
-
-            adapted_data["data"] = {
-                "tasks": adapted_tasks,
-                "pagination": {
-                    "current_page": current_page,
-                    "page_size": limit,
-                    "total_count": total,
-                    "total_pages": total_pages,
-                    "has_next": current_page < total_pages,
-                    "has_prev": current_page > 1
-                }
+
+    if isinstance(data, dict) and isinstance(data.get("tasks"), list):
+        adapted_tasks = [adapt_single_task_data(task) for task in data["tasks"]]
+
+        # 构建分页信息
+        total = data.get("total", len(adapted_tasks))
+        limit = data.get("limit", 20)
+        offset = data.get("offset", 0)
+
+        current_page = (offset // limit) + 1 if limit > 0 else 1
+        total_pages = (total + limit - 1) // limit if limit > 0 else 1
+
+        return {
+            "tasks": adapted_tasks,
+            "pagination": {
+                "current_page": current_page,
+                "page_size": limit,
+                "total_count": total,
+                "total_pages": total_pages,
+                "has_next": current_page < total_pages,
+                "has_prev": current_page > 1
             }
-        else:
-            # 单个任务对象，适配数据格式
-            adapted_data["data"] = adapt_single_task_data(adapted_data["data"])
+        }
+
+    return None
+
+
+def adapt_microservice_response_to_client(microservice_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    适配微服务响应数据为客户端格式
+
+    Args:
+        microservice_data (Dict[str, Any]): 微服务响应数据
+
+    Returns:
+        Dict[str, Any]: 适配后的响应数据
+    """
+    # 微服务响应格式已经是标准格式，直接透传
+    # 但需要确保包含必要字段
+    if not isinstance(microservice_data, dict):
+        return microservice_data
+
+    adapted_data = microservice_data.copy()
+    data = adapted_data.get("data")
+
+    list_data = _adapt_task_list_data(data)
+    if list_data is not None:
+        adapted_data["data"] = list_data
+    elif isinstance(data, dict):
+        # 单个任务对象，适配数据格式
+        adapted_data["data"] = adapt_single_task_data(data)
 
     return adapted_data
 
@@ -182,91 +261,102 @@ def adapt_single_task_data(task_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     适配单个任务数据格式
 
+    映射表为模块级常量，缺失字段的默认值仅在需要时创建。
+
     Args:
         task_data (Dict[str, Any]): 原始任务数据
 
     Returns:
-        Dict[str, Any]: 适配后的任务数据
+        Dict[str, Any]: 适配后的任务数据（新字典，不修改原始数据）
     """
-    adapted_task = task_data.copy()
-
-    # 优先级映射：微服务 -> 本地(小写)
-    # 支持多种格式: 首字母大写, 全小写, 全大写
-    priority_mapping = {
-        'Low': 'low',
-        'low': 'low',
-        'Medium': 'medium',
-        'medium': 'medium',
-        'High': 'high',
-        'high': 'high',
-        'HIGH': 'high',      # Task微服务返回的全大写格式
-        'MEDIUM': 'medium',
-        'LOW': 'low'
-    }
-
-    # 状态映射：微服务 -> 本地
-    # 支持多种格式: 小写, 全大写, 下划线分隔
-    status_mapping = {
-        'todo': 'pending',
-        'TODO': 'pending',
-        'pending': 'pending',
-        'NOT_STARTED': 'pending',    # Task微服务返回的NOT_STARTED状态
-        'inprogress': 'in_progress',
-        'IN_PROGRESS': 'in_progress',
-        'in_progress': 'in_progress',
-        'completed': 'completed',
-        'COMPLETED': 'completed'
-    }
+    adapted_task = dict(task_data)
 
     # 映射优先级字段 - 支持不区分大小写
-    if 'priority' in adapted_task and adapted_task['priority']:
-        original_priority = str(adapted_task['priority'])
-        mapped_priority = priority_mapping.get(original_priority)
-        if mapped_priority:
-            adapted_task['priority'] = mapped_priority
-        else:
-            # 降级处理: 尝试转换为小写后映射
-            logger.warning(f"未知的优先级格式: {original_priority}, 尝试转换为小写")
-            adapted_task['priority'] = original_priority.lower()
+    priority = adapted_task.get('priority')
+    if priority:
+        mapped_priority = _PRIORITY_MAPPING.get(priority)
+        if mapped_priority is None:
+            # 降级处理: 转换为小写
+            logger.warning(f"未知的优先级格式: {priority}, 尝试转换为小写")
+            mapped_priority = str(priority).lower()
+        adapted_task['priority'] = mapped_priority
 
     # 映射状态字段 - 支持不区分大小写和特殊格式
-    if 'status' in adapted_task and adapted_task['status']:
-        original_status = str(adapted_task['status'])
-        mapped_status = status_mapping.get(original_status)
-        if mapped_status:
-            adapted_task['status'] = mapped_status
-        else:
-            # 降级处理: 特殊状态转换
-            logger.warning(f"未知的状态格式: {original_status}, 尝试智能转换")
-            if original_status.upper() == 'NOT_STARTED':
-                adapted_task['status'] = 'pending'
-            elif '_' in original_status:
-                # 处理下划线格式: IN_PROGRESS -> in_progress
-                adapted_task['status'] = original_status.lower()
-            else:
-                adapted_task['status'] = original_status.lower()
+    task_status = adapted_task.get('status')
+    if task_status:
+        mapped_status = _STATUS_MAPPING.get(task_status)
+        if mapped_status is None:
+            # 降级处理: 特殊状态转换，下划线格式 IN_PROGRESS -> in_progress
+            logger.warning(f"未知的状态格式: {task_status}, 尝试智能转换")
+            mapped_status = str(task_status).lower()
+            if mapped_status == 'not_started':
+                mapped_status = 'pending'
+        adapted_task['status'] = mapped_status
 
     # 添加缺失的必需字段（如果不存在）
-    required_fields = {
-        'parent_id': None,
-        'tags': [],
-        'service_ids': [],
-        'planned_start_time': None,
-        'planned_end_time': None,
-        'last_claimed_date': None,
-        'is_deleted': False,
-        'created_at': datetime.now().isoformat(),
-        'updated_at': datetime.now().isoformat(),
-        'completion_percentage': 0.0
-    }
-
-    for field, default_value in required_fields.items():
+    for field in _NONE_DEFAULT_FIELDS:
+        if field not in adapted_task:
+            adapted_task[field] = None
+    for field in _LIST_DEFAULT_FIELDS:
+        if field not in adapted_task:
+            adapted_task[field] = []
+    if 'is_deleted' not in adapted_task:
+        adapted_task['is_deleted'] = False
+    if 'completion_percentage' not in adapted_task:
+        adapted_task['completion_percentage'] = 0.0
+
+    now = None
+    for field in _TIMESTAMP_DEFAULT_FIELDS:
         if field not in adapted_task:
-            adapted_task[field] = default_value
+            if now is None:
+                now = datetime.now().isoformat()
+            adapted_task[field] = now
 
     return adapted_task
 
 
+def build_task_response(task_data: Dict[str, Any]) -> TaskResponse:
+    """
+    将微服务返回的单个任务直接适配并校验为TaskResponse
+
+    Args:
+        task_data (Dict[str, Any]): 微服务响应的data字段
+
+    Returns:
+        TaskResponse: 任务响应对象
+    """
+    return TaskResponse.model_validate(adapt_single_task_data(task_data))
+
+
+def build_task_list_response(data: Any, page: int, page_size: int) -> TaskListResponse:
+    """
+    将微服务返回的任务列表一次遍历适配，并整体校验为TaskListResponse
+
+    Args:
+        data (Any): 微服务响应的data字段
+        page (int): 请求页码（微服务未返回分页信息时使用）
+        page_size (int): 请求每页大小（微服务未返回分页信息时使用）
+
+    Returns:
+        TaskListResponse: 任务列表响应对象
+    """
+    list_data = _adapt_task_list_data(data)
+    if list_data is None:
+        # 如果没有分页信息，使用默认值
+        list_data = {
+            "tasks": [],
+            "pagination": {
+                "current_page": page,
+                "page_size": page_size,
+                "total_count": 0,
+                "total_pages": 1,
+                "has_next": False,
+                "has_prev": False
+            }
+        }
+    return TaskListResponse.model_validate(list_data)
+
+
 # ===================
 # 基础CRUD接口 (4个)
 # ===================
@@ -315,24 +405,20 @@ async def create_task_endpoint(
             data=task_data
         )
 
-        # 适配响应数据
-        adapted_response = adapt_microservice_response_to_client(response)
-
-        # 构造TaskResponse对象
-        if adapted_response.get("success") and adapted_response.get("data"):
-            task_data = adapted_response["data"]
-            task_response = TaskResponse(**task_data)
+        # 适配并构造TaskResponse对象
+        if response.get("success") and isinstance(response.get("data"), dict):
+            task_response = build_task_response(response["data"])
 
             return UnifiedResponse(
-                code=adapted_response.get("code", 201),
+                code=response.get("code", 201),
                 data=task_response,
-                message=adapted_response.get("message", "任务创建成功")
+                message=response.get("message", "任务创建成功")
             )
         else:
             return UnifiedResponse(
-                code=adapted_response.get("code", 500),
+                code=response.get("code", 500),
                 data=None,
-                message=adapted_response.get("message", "任务创建失败")
+                message=response.get("message", "任务创建失败")
             )
 
     except TaskMicroserviceError as e:
@@ -349,6 +435,8 @@ async def create_task_endpoint(
             data=None,
             message="内部服务器错误"
         )
+    finally:
+        invalidate_task_cache(client, user_id)
 
 
 @router.get("/", response_model=UnifiedResponse[TaskListResponse], summary="获取任务列表")
@@ -357,37 +445,72 @@ async def get_tasks_endpoint(
     page_size: int = Query(20, ge=1, le=100, description="每页大小，1-100"),
     status: Optional[str] = Query(None, description="任务状态筛选"),
     priority: Optional[str] = Query(None, description="优先级筛选"),
+    cursor: Optional[str] = Query(None, description="分页游标，传入上一页返回的pagination.next_cursor；提供时忽略page"),
     user_id: UUID = Depends(get_current_user_id),
-    client: EnhancedTaskMicroserviceClient = Depends(get_enhanced_task_microservice_client)
+    client: EnhancedTaskMicroserviceClient = Depends(get_enhanced_task_microservice_client),
+    http_request: Request = None,
+    http_response: Response = None
 ) -> UnifiedResponse[TaskListResponse]:
     """
     获取任务列表 - RESTful GET接口（符合docs/标准）
 
+    支持两种分页方式：
+    - page/page_size：传统页码分页
+    - cursor：游标分页，下一页游标见响应的pagination.next_cursor
+
+    上游支持分页时转发limit/offset；上游返回完整任务数组时在本地切片，
+    保证单次响应最多page_size个任务。
+
+    支持条件GET：响应带ETag，请求携带匹配的If-None-Match时返回304。
+
     Args:
         page: 页码
         page_size: 每页大小
         status: 任务状态筛选
         priority: 优先级筛选
+        cursor: 分页游标
         user_id: 用户ID（从JWT token提取）
         client: 增强版微服务客户端
+        http_request: 请求对象（读取If-None-Match）
+        http_response: 响应对象（写入ETag）
 
     Returns:
         UnifiedResponse[TaskListResponse]: 任务列表响应
     """
     try:
-        logger.info(f"GET任务列表API调用: user_id={user_id}, page={page}")
+        logger.info(f"GET任务列表API调用: user_id={user_id}, page={page}, cursor={cursor is not None}")
+
+        conditional = ConditionalGet(http_request, http_response, user_id)
+        not_modified = conditional.short_circuit()
+        if not_modified is not None:
+            return not_modified
+
+        filters = {"status": status, "priority": priority}
+        if cursor:
+            try:
+                position = decode_cursor(cursor, filters)
+            except InvalidCursorError as e:
+                return create_error_response(400, f"无效的分页游标: {e}")
+        else:
+            position = CursorPosition(offset=(page - 1) * page_size)
 
         # 准备查询参数
-        query_params = {
-            "page": page,
-            "page_size": page_size
-        }
-
+        query_params = {}
         if status:
             query_params["status"] = status
         if priority:
             query_params["priority"] = priority
 
+        # 上游不支持分页时不携带分页参数，使完整列表的缓存键与页码无关
+        forward_pagination = upstream_pagination_enabled()
+        if forward_pagination:
+            query_params.update({
+                "page": position.offset // page_size + 1,
+                "page_size": page_size,
+                "limit": page_size,
+                "offset": position.offset
+            })
+
         # 调用微服务
         response = await client.call_microservice(
             method="GET",
@@ -396,45 +519,31 @@ async def get_tasks_endpoint(
             params=query_params
         )
 
-        # 适配响应数据
-        adapted_response = adapt_microservice_response_to_client(response)
-
-        # 构造TaskListResponse对象
-        if adapted_response.get("success") and adapted_response.get("data"):
-            list_data = adapted_response["data"]
-
-            # 处理分页信息
-            if "pagination" in list_data:
-                pagination_info = PaginationInfo(**list_data["pagination"])
-            else:
-                tasks_count = len(list_data.get("tasks", []))
-                pagination_info = PaginationInfo(
-                    current_page=page,
-                    page_size=page_size,
-                    total_count=tasks_count,
-                    total_pages=1,
-                    has_next=False,
-                    has_prev=False
-                )
-
-            # 转换任务数据
-            tasks = [TaskResponse(**task_data) for task_data in list_data.get("tasks", [])]
-
-            task_list_response = TaskListResponse(
-                tasks=tasks,
-                pagination=pagination_info
-            )
-
-            return UnifiedResponse(
-                code=adapted_response.get("code", 200),
+        # 一次遍历适配并构造TaskListResponse对象
+        if response.get("success") and response.get("data") is not None:
+            page_data = response["data"]
+            if isinstance(page_data, list):
+                # 上游返回完整任务数组（不支持分页），本地切片
+                if forward_pagination:
+                    mark_upstream_pagination_unsupported()
+                page_data = slice_task_list(page_data, position, page_size)
+
+            task_list_response = build_task_list_response(page_data, page, page_size)
+            if isinstance(page_data, dict) and isinstance(page_data.get("tasks"), list):
+                next_cursor = build_next_cursor(page_data, filters, position.offset)
+                task_list_response.pagination.next_cursor = next_cursor
+                task_list_response.pagination.has_next = next_cursor is not None
+
+            return conditional.finalize(UnifiedResponse(
+                code=response.get("code", 200),
                 data=task_list_response,
-                message=adapted_response.get("message", "查询成功")
-            )
+                message=response.get("message", "查询成功")
+            ))
         else:
             return UnifiedResponse(
-                code=adapted_response.get("code", 500),
+                code=response.get("code", 500),
                 data=None,
-                message=adapted_response.get("message", "查询失败")
+                message=response.get("message", "查询失败")
             )
 
     except TaskMicroserviceError as e:
@@ -556,46 +665,20 @@ async def query_tasks_endpoint(
             print(f"❌ 微服务调用异常: {type(e).__name__}: {e}")
             raise
 
-        # 适配响应数据
-        adapted_response = adapt_microservice_response_to_client(response)
-
-        # 构造TaskListResponse对象
-        if adapted_response.get("success") and adapted_response.get("data"):
-            list_data = adapted_response["data"]
-
-            # 处理分页信息
-            if "pagination" in list_data:
-                pagination_info = PaginationInfo(**list_data["pagination"])
-            else:
-                # 如果没有分页信息，使用默认值
-                tasks_count = len(list_data.get("tasks", []))
-                pagination_info = PaginationInfo(
-                    current_page=request.page,
-                    page_size=request.page_size,
-                    total_count=tasks_count,
-                    total_pages=1,
-                    has_next=False,
-                    has_prev=False
-                )
-
-            # 转换任务数据
-            tasks = [TaskResponse(**task_data) for task_data in list_data.get("tasks", [])]
-
-            task_list_response = TaskListResponse(
-                tasks=tasks,
-                pagination=pagination_info
-            )
+        # 一次遍历适配并构造TaskListResponse对象
+        if response.get("success") and response.get("data") is not None:
+            task_list_response = build_task_list_response(response["data"], request.page, request.page_size)
 
             return UnifiedResponse(
-                code=adapted_response.get("code", 200),
+                code=response.get("code", 200),
                 data=task_list_response,
-                message=adapted_response.get("message", "查询成功")
+                message=response.get("message", "查询成功")
             )
         else:
             return UnifiedResponse(
-                code=adapted_response.get("code", 500),
+                code=response.get("code", 500),
                 data=None,
-                message=adapted_response.get("message", "查询失败")
+                message=response.get("message", "查询失败")
             )
 
     except TaskMicroserviceError as e:
@@ -668,30 +751,9 @@ async def update_task_endpoint(
             task_id=task_id
         )
 
-        # 更新接口返回任务对象，但使用简化的响应处理
-        # 微服务已经返回标准格式，直接使用，避免复杂的适配逻辑导致错误
-
-        # 构造TaskResponse对象
-        if response.get("success") and response.get("data"):
-            task_data = response["data"]
-
-            # 直接使用微服务返回的数据，只做必要的字段适配
-            # 优先级和状态转换为小写
-            if "priority" in task_data and task_data["priority"]:
-                task_data["priority"] = task_data["priority"].lower()
-            if "status" in task_data and task_data["status"]:
-                status_map = {
-                    "NOT_STARTED": "pending",
-                    "IN_PROGRESS": "in_progress",
-                    "COMPLETED": "completed",
-                    "CANCELLED": "cancelled"
-                }
-                task_data["status"] = status_map.get(task_data["status"], task_data["status"].lower())
-
-            # 补充微服务缺失的completion_percentage字段（临时方案）
-            task_data.setdefault('completion_percentage', 0.0)
-
-            task_response = TaskResponse(**task_data)
+        # 适配并构造TaskResponse对象（优先级和状态转换为小写，补充缺失字段）
+        if response.get("success") and isinstance(response.get("data"), dict):
+            task_response = build_task_response(response["data"])
 
             return UnifiedResponse(
                 code=response.get("code", 200),
@@ -719,6 +781,8 @@ async def update_task_endpoint(
             data=None,
             message="内部服务器错误"
         )
+    finally:
+        invalidate_task_cache(client, user_id)
 
 
 @router.delete("/{task_id}", response_model=UnifiedResponse[TaskDeleteResponse], summary="删除任务")
@@ -787,12 +851,320 @@ async def delete_task_endpoint(
             ),
             message="内部服务器错误"
         )
+    finally:
+        invalidate_task_cache(client, user_id)
+
+
+# ===================
+# 任务树接口 (1个)
+# ===================
+
+def adapt_task_tree(node: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    递归适配任务树中每个节点的数据格式
+
+    Args:
+        node (Dict[str, Any]): 任务树节点（children为子节点列表）
+
+    Returns:
+        Tuple[Dict[str, Any], int]: (适配后的节点, 节点总数)
+    """
+    children = node.get("children") or []
+    adapted = adapt_single_task_data({key: value for key, value in node.items() if key != "children"})
+    adapted_children = []
+    node_count = 1
+    for child in children:
+        adapted_child, child_count = adapt_task_tree(child)
+        adapted_children.append(adapted_child)
+        node_count += child_count
+    adapted["children"] = adapted_children
+    return adapted, node_count
+
+
+def _extract_upstream_tree(response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """从上游任务树响应中取出根节点，格式不符时返回None"""
+    if not response.get("success"):
+        return None
+    data = response.get("data")
+    if not isinstance(data, dict) or not data:
+        return None
+    if isinstance(data.get("task"), dict):
+        # {"task": {...}, "children": [...]} 格式
+        return {**data["task"], "children": data.get("children") or []}
+    return data
+
+
+@router.get("/{task_id}/tree", response_model=UnifiedResponse[Dict[str, Any]], summary="获取任务树")
+async def get_task_tree_endpoint(
+    task_id: str = Path(..., description="根任务ID"),
+    max_depth: Optional[int] = Query(None, ge=0, description="最大展开深度（根任务为第0层），不超过配置上限"),
+    user_id: UUID = Depends(get_current_user_id),
+    client: EnhancedTaskMicroserviceClient = Depends(get_enhanced_task_microservice_client)
+) -> UnifiedResponse[Dict[str, Any]]:
+    """
+    获取任务树 - 微服务代理
+
+    实现方式：
+    1. 优先调用上游任务树接口（GET /tasks/{task_id}/tree/），按深度和节点数上限裁剪
+    2. 上游不可用或不支持时，查询根任务后按层并发展开子任务
+       （每层并发上限、请求内备忘、深度和节点数上限）
+
+    Args:
+        task_id: 根任务ID
+        max_depth: 最大展开深度
+        user_id: 用户ID（从JWT token提取）
+        client: 增强版微服务客户端
+
+    Returns:
+        UnifiedResponse[Dict[str, Any]]: 包含tree（根节点，children为子节点列表）、
+            source（upstream或expanded）、max_depth、node_count和truncated
+    """
+    depth_limit = getattr(config, 'task_tree_max_depth', 5)
+    node_limit = getattr(config, 'task_tree_max_nodes', 500)
+    if max_depth is not None:
+        depth_limit = min(max_depth, depth_limit)
+
+    try:
+        logger.info(f"获取任务树API调用: user_id={user_id}, task_id={task_id}, max_depth={depth_limit}")
+
+        tree = None
+        truncated = False
+        source = "upstream"
+
+        if getattr(config, 'task_tree_upstream_enabled', True):
+            try:
+                response = await client.call_microservice(
+                    method="GET",
+                    path="tasks/{task_id}/tree",
+                    user_id=str(user_id),
+                    task_id=task_id
+                )
+                tree = _extract_upstream_tree(response)
+                if tree is None:
+                    logger.info(f"上游任务树接口不可用，改为按层展开: code={response.get('code')}")
+            except TaskMicroserviceError as e:
+                logger.info(f"上游任务树接口调用失败，改为按层展开: {e}")
+
+        if tree is not None:
+            truncated = prune_task_tree(tree, depth_limit, node_limit)
+        else:
+            source = "expanded"
+            root_response = await client.call_microservice(
+                method="GET",
+                path="tasks/{task_id}",
+                user_id=str(user_id),
+                task_id=task_id
+            )
+            root = root_response.get("data")
+            if not root_response.get("success") or not isinstance(root, dict) or not root:
+                return UnifiedResponse(
+                    code=root_response.get("code", 404),
+                    data=None,
+                    message=root_response.get("message", "任务不存在")
+                )
+
+            expander = TaskTreeExpander(
+                client=client,
+                user_id=str(user_id),
+                max_depth=depth_limit,
+                level_concurrency=getattr(config, 'task_tree_level_concurrency', 8),
+                max_nodes=node_limit,
+                max_child_pages=getattr(config, 'task_tree_max_child_pages', 20)
+            )
+            tree = await expander.expand(root)
+            truncated = expander.truncated
+            logger.info(f"任务树按层展开完成: task_id={task_id}, stats={expander.get_stats()}")
+
+        adapted_tree, node_count = adapt_task_tree(tree)
+
+        return UnifiedResponse(
+            code=200,
+            data={
+                "tree": adapted_tree,
+                "source": source,
+                "max_depth": depth_limit,
+                "node_count": node_count,
+                "truncated": truncated
+            },
+            message="查询成功"
+        )
+
+    except TaskMicroserviceError as e:
+        logger.error(f"微服务调用失败: {e}")
+        return UnifiedResponse(
+            code=e.status_code,
+            data=None,
+            message=e.message
+        )
+    except Exception as e:
+        logger.error(f"获取任务树异常: {e}")
+        return UnifiedResponse(
+            code=500,
+            data=None,
+            message="内部服务器错误"
+        )
 
 
 # ===================
-# 任务完成接口 (1个)
+# 任务完成接口 (2个)
 # ===================
 
+def build_completed_task_info(task_id: str, task_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    组装已完成任务的响应数据
+
+    Args:
+        task_id: 任务ID（微服务数据缺失时的兜底值）
+        task_data: 微服务返回的任务数据
+
+    Returns:
+        Dict[str, Any]: 任务信息（id、title、status、completed_at）
+    """
+    task_data = task_data or {}
+    return {
+        "id": task_data.get("id", task_id),
+        "title": task_data.get("title", ""),
+        "status": "completed",
+        "completed_at": task_data.get("updated_at", "")
+    }
+
+
+def build_completion_reward() -> Dict[str, Any]:
+    """
+    组装任务完成奖励
+
+    Returns:
+        Dict[str, Any]: 奖励信息
+    """
+    # Mock reward数据（硬编码）
+    # TODO: 临时mock iPhone17Pro奖励，后续需实现真实Reward微服务调用和抽奖逻辑
+    return {
+        "description": "恭喜获得iPhone 17 Pro!",
+        "id": "mock-reward-iphone17pro",
+        "quantity": 1,
+        "name": "iPhone 17 Pro",
+        "value": 9999
+    }
+
+
+@router.post("/complete:batch", response_model=UnifiedResponse[Dict[str, Any]], summary="批量完成任务")
+async def batch_complete_tasks_endpoint(
+    request: BatchCompleteTasksRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    client: EnhancedTaskMicroserviceClient = Depends(get_enhanced_task_microservice_client)
+) -> UnifiedResponse[Dict[str, Any]]:
+    """
+    批量完成任务 - 并发扇出到Task微服务
+
+    实现方式：
+    1. 去重后在有界信号量下并发执行各任务的完成调用（PUT status=COMPLETED）
+    2. 对返回空响应的任务，在所有完成调用结束后统一并发执行一轮补偿性GET
+    3. 返回逐项结果，单个任务失败不影响其他任务
+
+    Args:
+        request: 批量完成请求，包含任务ID列表
+        user_id: 用户ID（从JWT token提取）
+        client: 增强版微服务客户端
+
+    Returns:
+        UnifiedResponse[Dict[str, Any]]: 包含results（逐项结果）和summary（成功/失败统计）
+    """
+    max_items = getattr(config, 'task_batch_complete_max_items', 50)
+    task_ids = list(dict.fromkeys(request.task_ids))
+    if len(task_ids) > max_items:
+        return create_error_response(400, f"单次最多完成{max_items}个任务")
+
+    semaphore = asyncio.Semaphore(max(1, getattr(config, 'task_batch_complete_concurrency', 10)))
+
+    async def call_limited(method: str, path: str, **kwargs) -> Dict[str, Any]:
+        async with semaphore:
+            return await client.call_microservice(method=method, path=path, user_id=str(user_id), **kwargs)
+
+    def failed_item(task_id: str, error: BaseException) -> Dict[str, Any]:
+        if isinstance(error, TaskMicroserviceError):
+            return {"task_id": task_id, "success": False, "code": error.status_code, "message": error.message}
+        logger.error(f"批量完成任务异常: task_id={task_id}, error={error}")
+        return {"task_id": task_id, "success": False, "code": 500, "message": "内部服务器错误"}
+
+    try:
+        logger.info(f"批量完成任务API调用: user_id={user_id}, count={len(task_ids)}")
+
+        # 第一轮：并发完成所有任务
+        complete_results = await asyncio.gather(
+            *(
+                call_limited("POST", "tasks/{task_id}/complete", data={"status": "COMPLETED"}, task_id=task_id)
+                for task_id in task_ids
+            ),
+            return_exceptions=True
+        )
+
+        results: Dict[str, Dict[str, Any]] = {}
+        task_data_map: Dict[str, Dict[str, Any]] = {}
+        pending_fetch: List[str] = []
+        for task_id, response in zip(task_ids, complete_results):
+            if isinstance(response, BaseException):
+                results[task_id] = failed_item(task_id, response)
+            elif not response.get("success", False):
+                results[task_id] = {
+                    "task_id": task_id,
+                    "success": False,
+                    "code": response.get("code", 500),
+                    "message": response.get("message", "任务完成失败")
+                }
+            elif isinstance(response.get("data"), dict) and response["data"]:
+                task_data_map[task_id] = response["data"]
+            else:
+                pending_fetch.append(task_id)
+
+        # 第二轮：统一补偿性GET（Task微服务PUT返回空响应的bug，与单个完成接口相同）
+        # 微服务返回完整任务后pending_fetch为空，不会发出任何GET
+        if pending_fetch:
+            logger.warning(f"Task微服务返回空响应，批量执行补偿性GET: count={len(pending_fetch)}")
+            fetch_results = await asyncio.gather(
+                *(call_limited("GET", f"tasks/{task_id}") for task_id in pending_fetch),
+                return_exceptions=True
+            )
+            for task_id, response in zip(pending_fetch, fetch_results):
+                if isinstance(response, BaseException):
+                    # 完成调用已成功，补偿查询失败时仍按成功返回，任务信息使用兜底值
+                    logger.warning(f"补偿性GET失败: task_id={task_id}, error={response}")
+                    task_data_map[task_id] = {}
+                else:
+                    task_data_map[task_id] = response.get("data") or {}
+
+        for task_id, task_data in task_data_map.items():
+            results[task_id] = {
+                "task_id": task_id,
+                "success": True,
+                "code": 200,
+                "message": "任务完成成功",
+                "task": build_completed_task_info(task_id, task_data),
+                "reward": build_completion_reward()
+            }
+
+        items = [results[task_id] for task_id in task_ids]
+        succeeded = sum(1 for item in items if item["success"])
+
+        return UnifiedResponse(
+            code=200,
+            message=f"批量完成任务: 成功{succeeded}个, 失败{len(items) - succeeded}个",
+            data={
+                "results": items,
+                "summary": {
+                    "total": len(items),
+                    "succeeded": succeeded,
+                    "failed": len(items) - succeeded
+                }
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"批量完成任务异常: {e}")
+        return create_error_response(500, "内部服务器错误")
+    finally:
+        invalidate_task_cache(client, user_id)
+
+
 @router.post("/{task_id}/complete", response_model=UnifiedResponse[Dict[str, Any]], summary="完成任务")
 async def complete_task_endpoint(
     task_id: str = Path(..., description="任务ID"),
@@ -848,33 +1220,12 @@ async def complete_task_endpoint(
             )
             task_data = get_response.get("data", {})
 
-        # 补充completion_percentage（任务完成为100%）
-        task_data.setdefault('completion_percentage', 100.0)
-
-        # 组装task响应数据
-        task_info = {
-            "id": task_data.get("id", task_id),
-            "title": task_data.get("title", ""),
-            "status": "completed",
-            "completed_at": task_data.get("updated_at", "")
-        }
-
-        # Mock reward数据（硬编码）
-        # TODO: 临时mock iPhone17Pro奖励，后续需实现真实Reward微服务调用和抽奖逻辑
-        reward_info = {
-            "description": "恭喜获得iPhone 17 Pro!",
-            "id": "mock-reward-iphone17pro",
-            "quantity": 1,
-            "name": "iPhone 17 Pro",
-            "value": 9999
-        }
-
         return UnifiedResponse(
             code=200,
             message="任务完成成功",
             data={
-                "task": task_info,
-                "reward": reward_info
+                "task": build_completed_task_info(task_id, task_data),
+                "reward": build_completion_reward()
             }
         )
 
@@ -892,6 +1243,8 @@ async def complete_task_endpoint(
             data=None,
             message="内部服务器错误"
         )
+    finally:
+        invalidate_task_cache(client, user_id)
 
 
 # ===================
@@ -960,21 +1313,29 @@ async def set_top3_endpoint(
             data=None,
             message="内部服务器错误"
         )
+    finally:
+        bump_user_data_version(user_id)
 
 
 @router.get("/special/top3/{query_date}", response_model=UnifiedResponse[Dict[str, Any]], summary="获取Top3任务")
 async def get_top3_endpoint(
     query_date: str = Path(..., description="查询日期，格式：YYYY-MM-DD"),
     user_id: UUID = Depends(get_current_user_id),
-    client: EnhancedTaskMicroserviceClient = Depends(get_enhanced_task_microservice_client)
+    client: EnhancedTaskMicroserviceClient = Depends(get_enhanced_task_microservice_client),
+    http_request: Request = None,
+    http_response: Response = None
 ) -> UnifiedResponse[Dict[str, Any]]:
     """
     获取Top3任务 - 微服务代理（路径重写，Mock模式）
 
+    支持条件GET：响应带ETag，请求携带匹配的If-None-Match时返回304。
+
     Args:
         query_date: 查询日期
         user_id: 用户ID（从JWT token提取）
         client: 增强版微服务客户端
+        http_request: 请求对象（读取If-None-Match）
+        http_response: 响应对象（写入ETag）
 
     Returns:
         UnifiedResponse[Dict[str, Any]]: Top3任务响应
@@ -984,6 +1345,11 @@ async def get_top3_endpoint(
     try:
         logger.info(f"获取Top3 API调用: user_id={user_id}, date={query_date}")
 
+        conditional = ConditionalGet(http_request, http_response, user_id)
+        not_modified = conditional.short_circuit()
+        if not_modified is not None:
+            return not_modified
+
         # 调用微服务（路径会被重写为 GET /api/v1/tasks/top3/{user_id}/{date}）
         response = await client.call_microservice(
             method="POST",
@@ -995,11 +1361,11 @@ async def get_top3_endpoint(
         # Top3查询接口返回任务ID列表，不是任务对象，直接使用微服务响应
         # 不需要通过 adapt_microservice_response_to_client 进行任务数据适配
 
-        return UnifiedResponse(
+        return conditional.finalize(UnifiedResponse(
             code=response.get("code", 200),
             data=response.get("data", {}),
             message=response.get("message", "Top3查询成功")
-        )
+        ))
 
     except TaskMicroserviceError as e:
         logger.error(f"微服务调用失败: {e}")
@@ -1146,7 +1512,12 @@ async def health_check_endpoint(
             data={
                 "healthy": is_healthy,
                 "timestamp": datetime.now().isoformat(),
-                "service": "task-microservice-proxy"
+                "service": "task-microservice-proxy",
+                "cache": client.get_cache_stats(),
+                "coalescing": client.get_coalescing_stats(),
+                "circuit_breaker": client.get_circuit_breaker_stats(),
+                "hedging": client.get_hedging_stats(),
+                "conditional_get": get_conditional_get_manager().get_stats()
             },
             message="健康" if is_healthy else "不健康"
         )
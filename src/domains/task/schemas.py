@@ -477,6 +477,7 @@ class PaginationInfo(BaseModel):
     - total_pages: 总页数
     - has_next: 是否有下一页
     - has_prev: 是否有上一页
+    - next_cursor: 下一页游标（不透明字符串），最后一页为null
     """
     model_config = ConfigDict(from_attributes=True)
 
@@ -486,6 +487,7 @@ class PaginationInfo(BaseModel):
     total_pages: int = Field(..., description="总页数")
     has_next: bool = Field(..., description="是否有下一页")
     has_prev: bool = Field(..., description="是否有上一页")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，作为cursor参数传入获取下一页；最后一页为null")
 
 
 class TaskListResponse(BaseModel):
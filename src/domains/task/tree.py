@@ -0,0 +1,273 @@
+"""
+Task任务树展开
+
+为 GET /tasks/{task_id}/tree 在上游不提供任务树接口时，按层（广度优先）并发展开子任务。
+
+核心功能：
+1. 广度优先：同一层的所有节点并发查询子任务，层与层之间顺序进行
+2. 每层并发上限：使用信号量限制同时发往上游的请求数
+3. 深度和节点数上限：防止超深或超大的任务树拖垮上游和响应大小；
+   上游直接返回的任务树按同样的广度优先顺序裁剪
+4. 请求内备忘：同一父任务的子任务只查询一次，重复出现的节点和环只展开一次
+
+子任务查询使用 GET tasks?parent_id=...，返回结果再按parent_id过滤，
+上游忽略该筛选参数时结果仍然正确（只是代价更高，且会命中响应缓存）。
+上游分页返回时按offset继续翻页；翻页次数达到上限仍未取完时把任务树标记为截断。
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from src.services.enhanced_task_microservice_client import EnhancedTaskMicroserviceClient
+
+
+logger = logging.getLogger(__name__)
+
+
+def extract_task_items(data: Any) -> List[Dict[str, Any]]:
+    """
+    从任务列表响应的data字段中取出任务数组
+
+    Args:
+        data (Any): 任务数组或 {"tasks": [...], ...}
+
+    Returns:
+        List[Dict[str, Any]]: 任务数组
+    """
+    if isinstance(data, dict):
+        data = data.get("tasks")
+    if not isinstance(data, list):
+        return []
+    return [item for item in data if isinstance(item, dict)]
+
+
+def next_page_offset(data: Any) -> Optional[int]:
+    """
+    根据上游分页响应计算下一页的offset
+
+    Args:
+        data (Any): 任务列表响应的data字段
+
+    Returns:
+        Optional[int]: 下一页offset；上游未分页或已是最后一页时返回None
+    """
+    if not isinstance(data, dict):
+        return None
+    tasks = data.get("tasks") or []
+    if not tasks:
+        return None
+
+    offset = data.get("offset") or 0
+    total = data.get("total")
+    limit = data.get("limit")
+    next_offset = offset + len(tasks)
+    if total is not None:
+        return next_offset if next_offset < total else None
+    # 上游未返回总数时，满一页才可能还有下一页
+    if limit and len(tasks) >= limit:
+        return next_offset
+    return None
+
+
+class TaskTreeExpander:
+    """
+    任务树展开器
+
+    每个请求创建一个实例，备忘表只在单次请求内有效。
+    """
+
+    def __init__(
+        self,
+        client: EnhancedTaskMicroserviceClient,
+        user_id: str,
+        max_depth: int,
+        level_concurrency: int = 8,
+        max_nodes: int = 1000,
+        max_child_pages: int = 20
+    ):
+        """
+        初始化展开器
+
+        Args:
+            client: 增强版微服务客户端
+            user_id (str): 用户ID
+            max_depth (int): 最大展开深度（根节点为第0层）
+            level_concurrency (int): 每层同时查询子任务的最大请求数
+            max_nodes (int): 任务树最大节点数（含根节点）
+            max_child_pages (int): 单个父任务查询子任务时最多请求的页数
+        """
+        self.client = client
+        self.user_id = user_id
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_child_pages = max(1, max_child_pages)
+        self._semaphore = asyncio.Semaphore(max(1, level_concurrency))
+        self._children_memo: Dict[str, List[Dict[str, Any]]] = {}
+
+        self.upstream_calls = 0
+        self.truncated = False
+
+    async def fetch_children(self, parent_id: str) -> List[Dict[str, Any]]:
+        """
+        查询父任务的直接子任务（带请求内备忘）
+
+        上游分页返回时继续翻页，直到取完、已取到足够填满节点上限的子任务，
+        或达到翻页上限；后两种情况下把任务树标记为截断。
+
+        Args:
+            parent_id (str): 父任务ID
+
+        Returns:
+            List[Dict[str, Any]]: 子任务列表
+        """
+        if parent_id in self._children_memo:
+            return self._children_memo[parent_id]
+
+        children: List[Dict[str, Any]] = []
+        params: Dict[str, Any] = {"parent_id": parent_id}
+        pages = 0
+        async with self._semaphore:
+            while True:
+                self.upstream_calls += 1
+                pages += 1
+                response = await self.client.call_microservice(
+                    method="GET",
+                    path="tasks",
+                    user_id=self.user_id,
+                    params=params
+                )
+
+                if not response.get("success"):
+                    logger.warning(f"查询子任务失败: parent_id={parent_id}, message={response.get('message')}")
+                    if pages > 1:
+                        # 已取到部分子任务，后续页失败
+                        self.truncated = True
+                    break
+
+                data = response.get("data")
+                children.extend(
+                    task for task in extract_task_items(data)
+                    if task.get("parent_id") == parent_id
+                )
+
+                next_offset = next_page_offset(data)
+                if next_offset is None or next_offset <= params.get("offset", 0):
+                    break
+                if len(children) >= self.max_nodes or pages >= self.max_child_pages:
+                    logger.info(f"子任务翻页达到上限，任务树被截断: parent_id={parent_id}, pages={pages}")
+                    self.truncated = True
+                    break
+
+                params = {
+                    "parent_id": parent_id,
+                    "limit": data.get("limit") or len(data.get("tasks") or []),
+                    "offset": next_offset
+                }
+
+        self._children_memo[parent_id] = children
+        return children
+
+    async def expand(self, root: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从根任务开始按层展开任务树
+
+        Args:
+            root (Dict[str, Any]): 根任务数据
+
+        Returns:
+            Dict[str, Any]: 根节点，每个节点的children字段为子节点列表
+        """
+        root_node = {**root, "children": []}
+        visited: Set[str] = {root_node.get("id")}
+        level: List[Dict[str, Any]] = [root_node]
+        node_count = 1
+        depth = 0
+
+        while level and depth < self.max_depth:
+            # 同一父任务在同一层重复出现时只查询一次
+            pending_ids = list(dict.fromkeys(
+                node["id"] for node in level if node["id"] not in self._children_memo
+            ))
+            await asyncio.gather(*(self.fetch_children(task_id) for task_id in pending_ids))
+
+            next_level: List[Dict[str, Any]] = []
+            for node in level:
+                for child in self._children_memo.get(node["id"], []):
+                    child_id = child.get("id")
+                    if child_id is None or child_id in visited:
+                        continue
+                    if node_count >= self.max_nodes:
+                        self.truncated = True
+                        break
+                    visited.add(child_id)
+                    node_count += 1
+                    child_node = {**child, "children": []}
+                    node["children"].append(child_node)
+                    next_level.append(child_node)
+
+            level = next_level
+            depth += 1
+
+        return root_node
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取本次展开的统计信息
+
+        Returns:
+            Dict[str, Any]: 上游调用次数、备忘条目数、是否被截断
+        """
+        return {
+            "upstream_calls": self.upstream_calls,
+            "memo_entries": len(self._children_memo),
+            "truncated": self.truncated
+        }
+
+
+def prune_task_tree(root: Dict[str, Any], max_depth: int, max_nodes: Optional[int] = None) -> bool:
+    """
+    按深度和节点数裁剪上游返回的任务树（原地修改）
+
+    与按层展开相同，按广度优先顺序保留节点，节点数达到上限后丢弃其余节点。
+
+    Args:
+        root (Dict[str, Any]): 任务树根节点
+        max_depth (int): 最大深度（根节点为第0层）
+        max_nodes (int, optional): 最大节点数（含根节点），None表示不限制
+
+    Returns:
+        bool: 是否有节点被裁剪
+    """
+    pruned = False
+    node_count = 1
+    level: List[Dict[str, Any]] = [root]
+    depth = 0
+
+    while level:
+        next_level: List[Dict[str, Any]] = []
+        for node in level:
+            children = node.get("children")
+            kept: List[Dict[str, Any]] = []
+            if isinstance(children, list):
+                if depth >= max_depth:
+                    pruned = pruned or bool(children)
+                else:
+                    for child in children:
+                        if not isinstance(child, dict):
+                            continue
+                        if max_nodes is not None and node_count >= max_nodes:
+                            pruned = True
+                            break
+                        node_count += 1
+                        kept.append(child)
+                        next_level.append(child)
+            node["children"] = kept
+
+        level = next_level
+        depth += 1
+
+    return pruned
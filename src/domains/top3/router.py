@@ -34,6 +34,7 @@ from .database import get_top3_session
 from src.api.schemas import UnifiedResponse
 
 from src.api.dependencies import get_current_user_id
+from src.services.conditional_get import bump_user_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -191,6 +192,8 @@ async def set_top3(
             data=None,
             message="设置Top3失败"
         )
+    finally:
+        bump_user_data_version(user_id)
 
 
 @router.get(
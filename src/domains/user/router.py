@@ -9,7 +9,7 @@ from uuid import UUID
 from typing import Dict, Any, Annotated
 from datetime import datetime, date
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlmodel import Session, select
 
 from .schemas import (
@@ -21,6 +21,7 @@ from src.database import get_db_session
 from src.api.dependencies import get_current_user_id
 from src.domains.user.models import User, UserSettings, UserStats
 from src.services.rewards_integration_service import get_rewards_service
+from src.services.conditional_get import ConditionalGet, bump_user_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -30,15 +31,23 @@ router = APIRouter(prefix="/user", tags=["用户管理"])
 @router.get("/profile", summary="获取用户信息")
 async def get_user_profile(
     business_session: Annotated[Session, Depends(get_db_session)],
-    user_id: UUID = Depends(get_current_user_id)
+    user_id: UUID = Depends(get_current_user_id),
+    http_request: Request = None,
+    http_response: Response = None
 ) -> UnifiedResponse[EnhancedUserProfileResponse]:
     """
     获取当前用户信息
 
     包含完整的用户资料信息、偏好设置和积分余额。
     直接查询主数据库，确保用户数据可以正确获取。
+    支持条件GET：响应带ETag，请求携带匹配的If-None-Match时返回304。
     """
     try:
+        conditional = ConditionalGet(http_request, http_response, user_id)
+        not_modified = conditional.short_circuit()
+        if not_modified is not None:
+            return not_modified
+
         # 转换UUID格式（去掉连字符）以匹配数据库中的格式
         user_id_str = str(user_id).replace('-', '')
 
@@ -105,11 +114,11 @@ async def get_user_profile(
 
         logger.info(f"获取用户信息成功: user_id={user_id}, nickname={user_profile.nickname}")
 
-        return UnifiedResponse(
+        return conditional.finalize(UnifiedResponse(
             code=200,
             data=user_profile,
             message="success"
-        )
+        ))
 
     except Exception as e:
         logger.error(f"获取用户信息失败: user_id={user_id}, error={str(e)}")
@@ -244,6 +253,7 @@ async def update_user_profile(
 
             # 提交事务
             business_session.commit()
+            bump_user_data_version(user_id)
 
             # 构造更新响应数据
             update_response = {
@@ -0,0 +1,241 @@
+"""
+自适应准入控制
+
+为开销大的接口（流式聊天、会话列表、用户信息聚合读取、批量任务操作）按路由分组限制
+同时处理的请求数，超出时短暂排队，排队过久时直接拒绝（503 + Retry-After），
+避免过载时所有请求一起变慢。
+
+核心功能：
+1. 并发上限：每个分组同时处理的请求数不超过max_concurrency
+2. 有界队列：排队请求数超过max_queue时立即拒绝
+3. CoDel式排队超时：按interval统计最小排队时间，最小排队时间超过target_delay
+   说明存在持续积压（不是突发），此时排队超时从max_queue_wait缩短为target_delay，
+   尽快拒绝新请求；积压消失后恢复
+4. 统计信息：正在处理数、队列深度、拒绝次数（按原因）、排队时间
+
+使用方式：
+    controller = get_admission_controller("chat_stream")
+    await controller.acquire()  # 可能抛出AdmissionRejected
+    try:
+        ...
+    finally:
+        controller.release()
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from src.api.config import config
+
+
+class AdmissionRejected(Exception):
+    """请求被准入控制拒绝"""
+
+    def __init__(self, group: str, reason: str, retry_after: int):
+        self.group = group
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"{group}分组过载，请求已被拒绝（{reason}）")
+
+
+class AdmissionController:
+    """
+    单个路由分组的准入控制器
+
+    在单事件循环中使用，状态变更都是同步操作，不需要加锁。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        target_delay: float = 0.05,
+        interval: float = 0.5,
+        max_queue_wait: float = 1.0
+    ):
+        """
+        初始化准入控制器
+
+        Args:
+            name: 分组名
+            max_concurrency: 同时处理的最大请求数
+            max_queue: 最大排队请求数
+            target_delay: CoDel目标排队时间（秒），过载时的排队超时
+            interval: CoDel统计间隔（秒）
+            max_queue_wait: 未过载时的最长排队时间（秒）
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.target_delay = target_delay
+        self.interval = interval
+        self.max_queue_wait = max_queue_wait
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # CoDel状态
+        self._overloaded = False
+        self._min_delay = math.inf
+        self._interval_end = 0.0
+
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "shed_queue_full": 0,
+            "shed_timeout": 0,
+            "max_queue_depth": 0,
+            "total_queue_delay": 0.0
+        }
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def overloaded(self) -> bool:
+        return self._overloaded
+
+    async def acquire(self) -> None:
+        """
+        获取处理名额，必要时排队
+
+        Raises:
+            AdmissionRejected: 队列已满或排队超时
+        """
+        enqueued_at = time.monotonic()
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            self._in_flight += 1
+            self._admitted(0.0, enqueued_at)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._stats["shed_queue_full"] += 1
+            raise AdmissionRejected(self.name, "queue_full", self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+
+        timeout = self.target_delay if self._overloaded else self.max_queue_wait
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 超时或取消的同时名额已经转交给了本请求
+                if isinstance(e, asyncio.CancelledError):
+                    self.release()
+                    raise
+            else:
+                self._remove_waiter(waiter)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                now = time.monotonic()
+                self._record_delay(now - enqueued_at, now)
+                self._stats["shed_timeout"] += 1
+                raise AdmissionRejected(self.name, "timeout", self._retry_after())
+
+        now = time.monotonic()
+        self._admitted(now - enqueued_at, now)
+
+    def release(self) -> None:
+        """释放处理名额，优先转交给排队最久的请求"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # 名额直接转交，正在处理数不变
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _admitted(self, delay: float, now: float) -> None:
+        self._stats["admitted"] += 1
+        self._stats["total_queue_delay"] += delay
+        self._record_delay(delay, now)
+
+    def _record_delay(self, delay: float, now: float) -> None:
+        """CoDel：每个interval结束时根据最小排队时间判断是否存在持续积压"""
+        if now >= self._interval_end:
+            if self._interval_end:
+                self._overloaded = self._min_delay > self.target_delay
+            self._min_delay = math.inf
+            self._interval_end = now + self.interval
+        self._min_delay = min(self._min_delay, delay)
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _retry_after(self) -> int:
+        """建议的重试间隔（秒）"""
+        return max(1, math.ceil(self.interval + self.max_queue_wait))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        stats = dict(self._stats)
+        total_queue_delay = stats.pop("total_queue_delay")
+        return {
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "overloaded": self._overloaded,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "shed": stats["shed_queue_full"] + stats["shed_timeout"],
+            "avg_queue_delay_ms": round(total_queue_delay / stats["admitted"] * 1000, 3) if stats["admitted"] else 0.0,
+            **stats
+        }
+
+
+# 全局准入控制器注册表（按路由分组共享）
+_admission_controllers: Dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(name: str, limits: Optional[Dict[str, int]] = None) -> AdmissionController:
+    """
+    获取指定路由分组的准入控制器（单例）
+
+    Args:
+        name: 路由分组名
+        limits: 分组限制（max_concurrency、max_queue），默认从config.admission_route_groups读取
+
+    Returns:
+        AdmissionController: 准入控制器实例
+    """
+    controller = _admission_controllers.get(name)
+    if controller is None:
+        if limits is None:
+            limits = getattr(config, 'admission_route_groups', {}).get(name, {})
+        controller = AdmissionController(
+            name=name,
+            max_concurrency=limits.get("max_concurrency", 64),
+            max_queue=limits.get("max_queue", 128),
+            target_delay=getattr(config, 'admission_target_delay', 0.05),
+            interval=getattr(config, 'admission_interval', 0.5),
+            max_queue_wait=getattr(config, 'admission_max_queue_wait', 1.0)
+        )
+        _admission_controllers[name] = controller
+    return controller
+
+
+def get_all_admission_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取所有准入控制器的统计信息
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 按路由分组索引的统计信息
+    """
+    return {name: controller.get_stats() for name, controller in _admission_controllers.items()}
@@ -6,18 +6,57 @@
 - 统一的响应格式转换
 - 错误处理和重试机制
 - 异步HTTP请求
+- 进程内共享的长连接HTTP/2连接池（登录高峰时不必每次握手）
+- 并发的公钥/健康检查请求合并为一次上游调用
 """
 
 import os
-import asyncio
-from typing import Dict, Any, Optional, Union
-from datetime import datetime, timezone
+import time
+import logging
+from typing import Dict, Any, Optional, Tuple
 
 import httpx
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
 
 from src.api.config import config
+from src.services.http_client_registry import get_http_client_registry
+from src.services.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+# 认证微服务在HTTP客户端注册表中的名字，所有认证客户端共享这一个连接池
+AUTH_HTTP_CLIENT_NAME = "auth"
+
+
+def get_auth_http_client() -> httpx.AsyncClient:
+    """
+    获取认证微服务的共享HTTP客户端
+
+    进程内只有一个连接池（HTTP/2、长连接），保持连接数与最大连接数一致，
+    登录高峰过后连接不会被关闭，下一波请求无需重新握手。
+    客户端由注册表负责关闭，调用方不要关闭它。
+
+    Returns:
+        httpx.AsyncClient实例
+    """
+    max_connections = getattr(config, 'auth_service_max_connections', 100)
+    return get_http_client_registry().get_client(
+        AUTH_HTTP_CLIENT_NAME,
+        timeout=httpx.Timeout(
+            connect=10.0,  # 连接超时10秒
+            read=float(getattr(config, 'auth_service_timeout', 30)),
+            write=10.0,     # 写入超时10秒
+            pool=60.0       # 连接池超时60秒
+        ),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=getattr(config, 'auth_service_max_keepalive_connections', max_connections),
+            keepalive_expiry=getattr(config, 'auth_service_keepalive_expiry', 60.0)
+        ),
+        http2=True
+    )
 
 
 class AuthMicroserviceClient:
@@ -53,23 +92,24 @@ class AuthMicroserviceClient:
 
         self.project = project or os.getenv("AUTH_PROJECT", "tatake_backend")
 
-        # 配置HTTP客户端，设置合理的超时和重试策略
-        self.client_config = {
-            "timeout": httpx.Timeout(
-                connect=10.0,  # 连接超时10秒
-                read=30.0,      # 读取超时30秒
-                write=10.0,     # 写入超时10秒
-                pool=60.0       # 连接池超时60秒
-            ),
-            "limits": httpx.Limits(
-                max_connections=20,           # 最大连接数
-                max_keepalive_connections=5,   # 最大保持连接数
-                keepalive_expiry=30.0         # 保持连接过期时间
-            ),
-            "http2": True,  # 启用HTTP/2支持，提升性能
-        }
+        # 公钥、健康检查：并发调用合并为一次上游请求
+        self._single_flight = SingleFlight()
+        self._health_cache_ttl = getattr(config, 'auth_service_health_cache_ttl', 5.0)
+        self._health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
+        logger.info(f"初始化认证微服务客户端: base_url={self.base_url}, project={self.project}")
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        获取共享的HTTP客户端
 
-        print(f"[AuthMicroserviceClient] 初始化: base_url={self.base_url}, project={self.project}")
+        连接池由HTTP客户端注册表管理（长连接复用、HTTP/2），在应用关闭时统一释放，
+        调用方不要关闭它。
+
+        Returns:
+            httpx.AsyncClient实例
+        """
+        return get_auth_http_client()
 
     async def _make_request(
         self,
@@ -116,93 +156,92 @@ class AuthMicroserviceClient:
         if headers:
             request_headers.update(headers)
 
-        # 创建HTTP客户端
-        async with httpx.AsyncClient(**self.client_config) as client:
-            try:
-                print(f"[AuthMicroserviceClient] 发起请求: {method} {url}")
-                print(f"[AuthMicroserviceClient] 请求数据: {data}")
-
-                # 发起HTTP请求
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    json=data,
-                    headers=request_headers
-                )
-
-                print(f"[AuthMicroserviceClient] 响应状态: {response.status_code}")
-
-                # 检查HTTP状态码
-                if response.status_code >= 400:
-                    # 对429错误（请求过于频繁）提供更友好的错误提示
-                    if response.status_code == 429:
-                        raise HTTPException(
-                            status_code=429,
-                            detail="发送验证码过于频繁，请稍后再试。通常需要等待60秒后才能重新发送。"
-                        )
-
-                    error_msg = f"认证微服务请求失败: HTTP {response.status_code}"
-                    try:
-                        error_detail = response.json()
-                        error_msg += f" - {error_detail.get('message', '未知错误')}"
-                    except:
-                        if response.text:
-                            error_msg += f" - {response.text[:200]}"
-
+        # 获取共享HTTP客户端
+        client = self._get_http_client()
+        try:
+            # 请求数据可能包含密码、验证码，不写入日志
+            logger.debug(f"认证微服务请求: {method} {endpoint}")
+
+            # 发起HTTP请求
+            response = await client.request(
+                method=method,
+                url=url,
+                json=data,
+                headers=request_headers
+            )
+
+            logger.debug(f"认证微服务响应: {method} {endpoint} -> {response.status_code}")
+
+            # 检查HTTP状态码
+            if response.status_code >= 400:
+                # 对429错误（请求过于频繁）提供更友好的错误提示
+                if response.status_code == 429:
                     raise HTTPException(
-                        status_code=response.status_code,
-                        detail=error_msg
+                        status_code=429,
+                        detail="发送验证码过于频繁，请稍后再试。通常需要等待60秒后才能重新发送。"
                     )
 
-                # 解析JSON响应
+                error_msg = f"认证微服务请求失败: HTTP {response.status_code}"
                 try:
-                    response_data = response.json()
-                except Exception as e:
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail=f"认证微服务返回无效JSON: {str(e)}"
-                    )
-
-                # 验证响应格式（微服务应该返回 {code, message, data} 格式）
-                if not isinstance(response_data, dict):
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail="认证微服务返回格式错误：非JSON对象"
-                    )
-
-                if "code" not in response_data:
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail="认证微服务返回格式错误：缺少code字段"
-                    )
+                    error_detail = response.json()
+                    error_msg += f" - {error_detail.get('message', '未知错误')}"
+                except:
+                    if response.text:
+                        error_msg += f" - {response.text[:200]}"
 
-                print(f"[AuthMicroserviceClient] 响应数据: {response_data}")
-                return response_data
-
-            except httpx.TimeoutException as e:
                 raise HTTPException(
-                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                    detail=f"认证微服务请求超时: {str(e)}"
+                    status_code=response.status_code,
+                    detail=error_msg
                 )
-            except httpx.ConnectError as e:
+
+            # 解析JSON响应
+            try:
+                response_data = response.json()
+            except Exception as e:
                 raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=f"无法连接到认证微服务: {str(e)}"
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"认证微服务返回无效JSON: {str(e)}"
                 )
-            except httpx.HTTPError as e:
+
+            # 验证响应格式（微服务应该返回 {code, message, data} 格式）
+            if not isinstance(response_data, dict):
                 raise HTTPException(
                     status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"认证微服务通信错误: {str(e)}"
+                    detail="认证微服务返回格式错误：非JSON对象"
                 )
-            except HTTPException:
-                # 重新抛出HTTP异常
-                raise
-            except Exception as e:
+
+            if "code" not in response_data:
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"认证微服务客户端内部错误: {str(e)}"
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail="认证微服务返回格式错误：缺少code字段"
                 )
 
+            return response_data
+
+        except httpx.TimeoutException as e:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"认证微服务请求超时: {str(e)}"
+            )
+        except httpx.ConnectError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"无法连接到认证微服务: {str(e)}"
+            )
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"认证微服务通信错误: {str(e)}"
+            )
+        except HTTPException:
+            # 重新抛出HTTP异常
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"认证微服务客户端内部错误: {str(e)}"
+            )
+
     # ==================== 微信认证相关接口 ====================
 
     async def guest_init(self) -> Dict[str, Any]:
@@ -440,10 +479,16 @@ class AuthMicroserviceClient:
 
         获取JWT公钥用于本地验证JWT签名。业务服务可以调用此接口获取公钥。
 
+        并发调用（例如多个验证器实例同时刷新公钥）只发起一次上游请求。
+
         Returns:
             包含公钥信息的响应数据
         """
-        return await self._make_request("GET", "/auth/system/public-key")
+        return await self._single_flight.do(
+            "public_key",
+            lambda: self._make_request("GET", "/auth/system/public-key"),
+            route="public_key"
+        )
 
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -452,9 +497,23 @@ class AuthMicroserviceClient:
         检查认证微服务的健康状态。
         支持多种响应格式以兼容不同的服务版本。
 
+        并发调用只发起一次上游请求，成功结果缓存auth_service_health_cache_ttl秒，
+        避免多个探活方同时轮询时放大对认证微服务的请求。
+
         Returns:
             包含健康状态信息的响应数据
         """
+        cached = self._health_cache
+        if cached is not None and time.monotonic() - cached[0] < self._health_cache_ttl:
+            return cached[1]
+
+        response_data = await self._single_flight.do("health", self._fetch_health, route="health")
+        if self._health_cache_ttl > 0:
+            self._health_cache = (time.monotonic(), response_data)
+        return response_data
+
+    async def _fetch_health(self) -> Dict[str, Any]:
+        """请求认证微服务健康检查接口并转换为标准格式"""
         # 使用特殊的健康检查处理
         url = f"{self.base_url}/health"
 
@@ -464,89 +523,95 @@ class AuthMicroserviceClient:
             "User-Agent": "TaKeKe-Backend/1.0.0"
         }
 
-        # 创建HTTP客户端
-        async with httpx.AsyncClient(**self.client_config) as client:
-            try:
-                print(f"[AuthMicroserviceClient] 发起健康检查: GET {url}")
-
-                # 发起HTTP请求
-                response = await client.request(
-                    method="GET",
-                    url=url,
-                    headers=request_headers
-                )
+        # 获取共享HTTP客户端
+        client = self._get_http_client()
+        try:
+            logger.debug(f"认证微服务健康检查: GET {url}")
 
-                print(f"[AuthMicroserviceClient] 健康检查响应状态: {response.status_code}")
+            # 发起HTTP请求
+            response = await client.request(
+                method="GET",
+                url=url,
+                headers=request_headers
+            )
 
-                # 检查HTTP状态码
-                if response.status_code >= 400:
-                    error_msg = f"认证微服务健康检查失败: HTTP {response.status_code}"
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=error_msg
-                    )
+            logger.debug(f"认证微服务健康检查响应状态: {response.status_code}")
 
-                # 解析JSON响应
-                try:
-                    response_data = response.json()
-                except Exception as e:
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail=f"认证微服务返回无效JSON: {str(e)}"
-                    )
-
-                # 处理不同的响应格式
-                if "code" in response_data:
-                    # 标准格式: {"code": 200, "message": "ok", "data": {...}}
-                    print(f"[AuthMicroserviceClient] 健康检查响应(标准格式): {response_data}")
-                    return response_data
-                elif "status" in response_data:
-                    # 简单格式: {"status": "healthy", "service": "Auth Service"}
-                    # 转换为标准格式
-                    standard_response = {
-                        "code": 200,
-                        "message": "Health check passed",
-                        "data": {
-                            "status": response_data.get("status"),
-                            "service": response_data.get("service", "Auth Service")
-                        }
-                    }
-                    print(f"[AuthMicroserviceClient] 健康检查响应(转换格式): {standard_response}")
-                    return standard_response
-                else:
-                    # 未知格式，尽力转换
-                    standard_response = {
-                        "code": 200,
-                        "message": "Health check response format unknown but service responded",
-                        "data": response_data
-                    }
-                    print(f"[AuthMicroserviceClient] 健康检查响应(通用格式): {standard_response}")
-                    return standard_response
-
-            except httpx.TimeoutException as e:
+            # 检查HTTP状态码
+            if response.status_code >= 400:
+                error_msg = f"认证微服务健康检查失败: HTTP {response.status_code}"
                 raise HTTPException(
-                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                    detail=f"认证微服务健康检查超时: {str(e)}"
+                    status_code=response.status_code,
+                    detail=error_msg
                 )
-            except httpx.ConnectError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=f"无法连接到认证微服务进行健康检查: {str(e)}"
-                )
-            except httpx.HTTPError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"认证微服务健康检查通信错误: {str(e)}"
-                )
-            except HTTPException:
-                # 重新抛出HTTP异常
-                raise
+
+            # 解析JSON响应
+            try:
+                response_data = response.json()
             except Exception as e:
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"认证微服务健康检查内部错误: {str(e)}"
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"认证微服务返回无效JSON: {str(e)}"
                 )
 
+            # 处理不同的响应格式
+            if "code" in response_data:
+                # 标准格式: {"code": 200, "message": "ok", "data": {...}}
+                return response_data
+            elif "status" in response_data:
+                # 简单格式: {"status": "healthy", "service": "Auth Service"}
+                # 转换为标准格式
+                standard_response = {
+                    "code": 200,
+                    "message": "Health check passed",
+                    "data": {
+                        "status": response_data.get("status"),
+                        "service": response_data.get("service", "Auth Service")
+                    }
+                }
+                return standard_response
+            else:
+                # 未知格式，尽力转换
+                standard_response = {
+                    "code": 200,
+                    "message": "Health check response format unknown but service responded",
+                    "data": response_data
+                }
+                return standard_response
+
+        except httpx.TimeoutException as e:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"认证微服务健康检查超时: {str(e)}"
+            )
+        except httpx.ConnectError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"无法连接到认证微服务进行健康检查: {str(e)}"
+            )
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"认证微服务健康检查通信错误: {str(e)}"
+            )
+        except HTTPException:
+            # 重新抛出HTTP异常
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"认证微服务健康检查内部错误: {str(e)}"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取请求合并统计信息
+
+        Returns:
+            Dict[str, Any]: 公钥/健康检查的请求数和被合并的请求数
+        """
+        return self._single_flight.get_stats()
+
 
 # 全局客户端实例（单例模式）
 _auth_client: Optional[AuthMicroserviceClient] = None
@@ -14,8 +14,9 @@ JWT令牌验证器
 
 import os
 import asyncio
+import logging
 import time
-from typing import Dict, Any, Optional, NamedTuple
+from typing import Dict, Any, Optional, NamedTuple, Tuple
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass
 import hashlib
@@ -23,7 +24,14 @@ import hashlib
 import jwt
 from fastapi import HTTPException, status
 
+from src.api.config import config
+
 from .client import AuthMicroserviceClient
+from .token_cache import TokenCache
+from .tracing import AuthTracer
+
+
+logger = logging.getLogger(__name__)
 
 
 class JWTValidationError(Exception):
@@ -73,12 +81,19 @@ class JWTValidator:
     - 自动刷新：定期更新缓存的公钥
     """
 
-    def __init__(self, auth_client: Optional[AuthMicroserviceClient] = None):
+    def __init__(
+        self,
+        auth_client: Optional[AuthMicroserviceClient] = None,
+        user_cache_max_size: Optional[int] = None,
+        user_cache_ttl: Optional[int] = None
+    ):
         """
         初始化JWT验证器
 
         Args:
             auth_client: 认证微服务客户端，可选
+            user_cache_max_size: 用户信息缓存最大条目数，默认从配置读取
+            user_cache_ttl: 用户信息缓存时间（秒），默认从配置读取
         """
         self.auth_client = auth_client or AuthMicroserviceClient()
 
@@ -93,139 +108,260 @@ class JWTValidator:
                 # Base64解码公钥
                 import base64
                 self.local_public_key = base64.b64decode(self.local_public_key).decode('utf-8')
-                print(f"[JWTValidator] 成功加载本地公钥配置，算法={self.local_algorithm}")
+                logger.info(f"成功加载本地公钥配置，算法={self.local_algorithm}")
             except Exception as e:
-                print(f"[JWTValidator] 解码本地公钥失败: {str(e)}")
+                logger.warning(f"解码本地公钥失败: {str(e)}")
                 self.local_public_key = ""
 
-        # 公钥缓存
+        # 公钥缓存（默认密钥）
         self._public_key_cache: Optional[str] = None
         self._public_key_algorithm: Optional[str] = None
         self._key_cache_time: Optional[float] = None
-        self._key_cache_ttl = 3600  # 公钥缓存1小时
+        self._key_cache_ttl = getattr(config, 'jwt_public_key_cache_ttl', 3600)  # 公钥缓存1小时
+        # 到期前多久开始后台刷新
+        self._key_refresh_ahead = min(
+            getattr(config, 'jwt_public_key_refresh_ahead', 300),
+            self._key_cache_ttl / 2
+        )
 
         # 是否使用对称加密（从微服务获取的配置）
         self._is_symmetric: Optional[bool] = None
 
-        # 用户信息缓存 {token_hash: UserInfo}
-        self._user_cache: Dict[str, UserInfo] = {}
-        self._user_cache_ttl = 300  # 用户信息缓存5分钟
-        self._max_cache_size = 1000  # 最大缓存条目数
+        # 按kid索引的密钥集合 {kid: (key_data, algorithm)}，支持密钥轮换期间新旧密钥并存
+        self._key_set: Dict[str, Tuple[str, str]] = {}
+
+        # 公钥刷新：同一时刻最多一个在途请求，并发调用方共享结果
+        self._key_refresh_task: Optional["asyncio.Task[Tuple[str, str, bool]]"] = None
+        self._unknown_kid_refresh_interval = getattr(config, 'jwt_unknown_kid_refresh_interval', 30)
+        self._last_unknown_kid_refresh = 0.0
+        # 刷新失败后的退避：连续失败时等待时间翻倍，期间不再发起后台刷新
+        self._refresh_backoff = getattr(config, 'jwt_public_key_refresh_backoff', 5.0)
+        self._refresh_backoff_max = getattr(config, 'jwt_public_key_refresh_backoff_max', 300.0)
+        self._consecutive_refresh_failures = 0
+        self._next_refresh_attempt = 0.0
+        self._key_stats = {
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "deduplicated": 0,
+            "background_refreshes": 0,
+            "backoff_skipped": 0,
+            "stale_served": 0
+        }
+
+        # 用户信息缓存 {token_hash: UserInfo}，LRU淘汰，条目不会存活到令牌exp之后
+        self._user_cache_ttl = user_cache_ttl or getattr(config, 'jwt_user_cache_ttl', 300)
+        self._max_cache_size = user_cache_max_size or getattr(config, 'jwt_user_cache_max_size', 10000)
+        self._user_cache: TokenCache[UserInfo] = TokenCache(
+            max_size=self._max_cache_size,
+            ttl=self._user_cache_ttl
+        )
+
+        # 验证路径采样追踪（DEBUG日志，分阶段耗时）
+        self.tracer = AuthTracer(sample_rate=getattr(config, 'auth_trace_sample_rate', 0.01))
 
-        print("[JWTValidator] 初始化JWT验证器")
+        logger.info("初始化JWT验证器")
 
-    async def _get_public_key_info(self) -> tuple[str, str, bool]:
+    async def _get_public_key_info(self, kid: Optional[str] = None) -> tuple[str, str, bool]:
         """
-        从微服务获取公钥信息（微服务优先，本地配置作为降级方案）
+        获取验证令牌用的密钥信息（微服务优先，本地配置作为降级方案）
 
         设计原则：
         - 认证微服务是公钥的唯一权威来源（Single Source of Truth）
-        - 优先从微服务动态获取最新公钥
-        - 微服务不可用时才降级到本地配置
-        - 使用缓存减少网络请求，但不影响动态更新能力
+        - 缓存有效期内直接返回；临近过期时在后台刷新，请求不等待
+        - 缓存已过期时立即返回最近一次成功获取的密钥，同时在后台刷新，请求不等待；
+          刷新失败后按指数退避，退避期间不再访问认证微服务
+        - 并发的刷新请求合并为一次微服务调用，避免缓存过期瞬间的惊群
+        - 从未成功获取过密钥时同步获取，失败才降级到本地配置
+        - 令牌携带未知kid时触发一次（限频的）刷新，以便尽快拿到轮换后的新密钥
+
+        Args:
+            kid: 令牌头部的密钥ID，可选
 
         Returns:
             (key_data, algorithm, is_symmetric)
             - key_data: 密钥数据（公钥或对称密钥标识）
             - algorithm: 算法名称
             - is_symmetric: 是否为对称加密
+        """
+        current_time = time.time()
+        has_cached_key = (
+            self._public_key_cache is not None and
+            self._public_key_algorithm and
+            self._is_symmetric is not None and
+            self._key_cache_time is not None
+        )
+
+        if kid and kid not in self._key_set and has_cached_key and (
+            current_time - self._last_unknown_kid_refresh >= self._unknown_kid_refresh_interval
+        ):
+            # 未知kid：可能是密钥刚轮换，同步刷新一次
+            self._last_unknown_kid_refresh = current_time
+            logger.info(f"令牌使用未知的密钥ID，刷新公钥: kid={kid}")
+            try:
+                await self._refresh_key_info()
+            except Exception as e:
+                logger.warning(f"按密钥ID刷新公钥失败: {str(e)}")
+            return self._select_key(kid)
+
+        if has_cached_key:
+            age = current_time - self._key_cache_time
+            if age >= self._key_cache_ttl - self._key_refresh_ahead:
+                self._schedule_background_refresh()
+            if age >= self._key_cache_ttl:
+                # 已过期：不等待刷新，继续使用最近一次成功获取的密钥
+                self._key_stats["stale_served"] += 1
+                logger.debug("公钥缓存已过期，刷新完成前继续使用上次成功获取的公钥")
+            else:
+                logger.debug("使用缓存的公钥信息")
+            return self._select_key(kid)
+
+        try:
+            await self._refresh_key_info()
+            return self._select_key(kid)
+        except Exception as e:
+            logger.warning(f"从微服务获取公钥失败: {str(e)}")
+
+            # 微服务不可用，降级到本地配置（备份方案）
+            if self.local_public_key and self.local_algorithm in ["RS256", "RS384", "RS512"]:
+                logger.warning("降级使用本地配置的公钥（备份方案）")
+                return self.local_public_key, self.local_algorithm, False
+
+            logger.warning("降级使用本地对称密钥（备份方案）")
+            return self.local_secret, self.local_algorithm, True
+
+    def _select_key(self, kid: Optional[str]) -> tuple[str, str, bool]:
+        """按kid从密钥集合中选择密钥，没有kid或kid未知时使用默认密钥"""
+        if kid and kid in self._key_set:
+            key_data, algorithm = self._key_set[kid]
+            return key_data, algorithm, False
+        return self._public_key_cache, self._public_key_algorithm, self._is_symmetric
+
+    async def _refresh_key_info(self) -> tuple[str, str, bool]:
+        """
+        刷新公钥缓存（single-flight）
+
+        已有在途刷新时直接等待其结果。刷新任务不随调用方取消。
+
+        Returns:
+            (key_data, algorithm, is_symmetric)
 
         Raises:
             JWTValidationError: 获取公钥失败时
         """
+        task = self._key_refresh_task
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._fetch_public_key_info())
+            self._key_refresh_task = task
+        else:
+            self._key_stats["deduplicated"] += 1
+        return await asyncio.shield(task)
+
+    def _schedule_background_refresh(self) -> None:
+        """公钥临近过期或已过期时在后台刷新，失败时保留当前密钥；退避期间不发起刷新"""
+        if self._key_refresh_task is not None and not self._key_refresh_task.done():
+            return
+        if time.time() < self._next_refresh_attempt:
+            self._key_stats["backoff_skipped"] += 1
+            return
+        self._key_stats["background_refreshes"] += 1
+        logger.debug("后台刷新公钥")
+        task = asyncio.ensure_future(self._fetch_public_key_info())
+        task.add_done_callback(self._on_background_refresh_done)
+        self._key_refresh_task = task
+
+    @staticmethod
+    def _on_background_refresh_done(task: "asyncio.Task") -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"后台刷新公钥失败，继续使用当前公钥: {str(task.exception())}")
+
+    async def _fetch_public_key_info(self) -> tuple[str, str, bool]:
+        """
+        从认证微服务获取公钥信息并更新缓存
+
+        支持两种响应格式：
+        - 单个公钥：{"public_key": "...", "algorithm": "RS256"}，公钥为空表示对称加密
+        - 密钥集合：{"keys": [{"kid": "...", "public_key": "...", "algorithm": "RS256"}, ...]}，
+          可同时携带public_key作为默认密钥，否则使用集合中的第一个
+
+        Returns:
+            默认密钥的 (key_data, algorithm, is_symmetric)
+
+        Raises:
+            JWTValidationError: 获取公钥失败时
+        """
+        self._key_stats["refreshes"] += 1
         try:
-            # 检查缓存是否有效（缓存提升性能，但不阻止动态更新）
-            current_time = time.time()
-            if (self._public_key_cache and
-                self._public_key_algorithm and
-                self._is_symmetric is not None and
-                self._key_cache_time and
-                current_time - self._key_cache_time < self._key_cache_ttl):
-
-                print("[JWTValidator] 使用缓存的公钥信息")
-                return self._public_key_cache, self._public_key_algorithm, self._is_symmetric
-
-            # 优先从微服务获取最新公钥（权威来源）
-            print("[JWTValidator] 从认证微服务获取公钥信息")
+            logger.info("从认证微服务获取公钥信息")
             response = await self.auth_client.get_public_key()
 
             if response.get("code") != 200:
                 raise JWTValidationError(f"获取公钥失败: {response.get('message', '未知错误')}")
 
-            data = response.get("data", {})
+            data = response.get("data") or {}
             public_key = data.get("public_key", "")
+            default_algorithm = data.get("algorithm", "RS256")
+
+            key_set: Dict[str, Tuple[str, str]] = {}
+            for item in data.get("keys") or []:
+                if isinstance(item, dict) and item.get("kid") and item.get("public_key"):
+                    key_set[item["kid"]] = (item["public_key"], item.get("algorithm", default_algorithm))
+
+            if not public_key and key_set:
+                public_key, default_algorithm = next(iter(key_set.values()))
 
             if not public_key:
                 # 微服务返回空公钥，表示使用对称加密
-                print("[JWTValidator] 微服务明确使用对称加密")
+                logger.info("微服务明确使用对称加密")
                 key_data = self.local_secret
                 algorithm = self.local_algorithm
                 is_symmetric = True
             else:
                 # 微服务返回公钥，使用非对称加密
-                print("[JWTValidator] 微服务返回RS256公钥")
+                logger.info(f"微服务返回{default_algorithm}公钥")
                 key_data = public_key
-                # 这里假设微服务也会返回算法信息，否则使用默认值
-                algorithm = data.get("algorithm", "RS256")
+                algorithm = default_algorithm
                 is_symmetric = False
+        except Exception:
+            self._key_stats["refresh_failures"] += 1
+            self._consecutive_refresh_failures += 1
+            backoff = min(
+                self._refresh_backoff * (2 ** (self._consecutive_refresh_failures - 1)),
+                self._refresh_backoff_max
+            )
+            self._next_refresh_attempt = time.time() + backoff
+            raise
 
-            # 更新缓存
-            self._public_key_cache = key_data
-            self._public_key_algorithm = algorithm
-            self._is_symmetric = is_symmetric
-            self._key_cache_time = current_time
+        self._consecutive_refresh_failures = 0
+        self._next_refresh_attempt = 0.0
 
-            print(f"[JWTValidator] 成功缓存公钥信息: algorithm={algorithm}, is_symmetric={is_symmetric}")
-            return key_data, algorithm, is_symmetric
+        # 更新缓存
+        self._public_key_cache = key_data
+        self._public_key_algorithm = algorithm
+        self._is_symmetric = is_symmetric
+        self._key_set = key_set
+        self._key_cache_time = time.time()
 
-        except Exception as e:
-            # 微服务不可用，降级到本地配置（备份方案）
-            print(f"[JWTValidator] ⚠️  从微服务获取公钥失败: {str(e)}")
-
-            if self.local_public_key and self.local_algorithm in ["RS256", "RS384", "RS512"]:
-                print("[JWTValidator] 🔄 降级使用本地配置的公钥（备份方案）")
-                return self.local_public_key, self.local_algorithm, False
+        logger.info(
+            f"成功缓存公钥信息: algorithm={algorithm}, is_symmetric={is_symmetric}, kids={list(key_set)}"
+        )
+        return key_data, algorithm, is_symmetric
 
-            print("[JWTValidator] 🔄 降级使用本地对称密钥（备份方案）")
-            return self.local_secret, self.local_algorithm, True
+    @staticmethod
+    def _get_token_kid(token: str) -> Optional[str]:
+        """读取令牌头部的kid（不验证签名）"""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            return None
+        return kid if isinstance(kid, str) else None
 
     def _get_token_hash(self, token: str) -> str:
         """生成token的哈希值用作缓存键"""
         return hashlib.sha256(token.encode()).hexdigest()
 
-    def _clean_cache(self) -> None:
-        """清理过期的用户信息缓存"""
-        current_time = time.time()
-        expired_keys = []
-
-        for token_hash, user_info in self._user_cache.items():
-            if user_info.is_cache_expired(self._user_cache_ttl):
-                expired_keys.append(token_hash)
-
-        for key in expired_keys:
-            del self._user_cache[key]
-
-        # 如果缓存太大，删除最旧的条目
-        if len(self._user_cache) > self._max_cache_size:
-            sorted_items = sorted(self._user_cache.items(), key=lambda x: x[1].cache_time)
-            excess_count = len(self._user_cache) - self._max_cache_size
-            for token_hash, _ in sorted_items[:excess_count]:
-                del self._user_cache[token_hash]
-
     def _get_user_from_cache(self, token: str) -> Optional[UserInfo]:
         """从缓存获取用户信息"""
-        token_hash = self._get_token_hash(token)
-        user_info = self._user_cache.get(token_hash)
-
-        if user_info:
-            # 检查缓存和token是否过期
-            if not user_info.is_cache_expired(self._user_cache_ttl) and not user_info.is_expired():
-                return user_info
-            else:
-                # 过期则删除
-                del self._user_cache[token_hash]
-
-        return None
+        return self._user_cache.get(self._get_token_hash(token))
 
     def _cache_user_info(self, token: str, payload: Dict[str, Any]) -> UserInfo:
         """缓存用户信息"""
@@ -239,8 +375,7 @@ class JWTValidator:
             cache_time=time.time()
         )
 
-        self._user_cache[token_hash] = user_info
-        self._clean_cache()  # 清理过期缓存
+        self._user_cache.set(token_hash, user_info, exp=user_info.exp)
 
         return user_info
 
@@ -265,11 +400,15 @@ class JWTValidator:
         Raises:
             HTTPException: 令牌验证失败时
         """
+        trace = self.tracer.start()
         try:
             # 首先检查缓存
             cached_user = self._get_user_from_cache(token)
+            if trace:
+                trace.mark("cache_lookup")
             if cached_user:
-                print(f"[JWTValidator] 使用缓存的用户信息: user_id={cached_user.user_id}")
+                if trace:
+                    trace.finish("cache_hit", cached_user.user_id)
                 # 从缓存中恢复payload（基本信息）
                 payload = {
                     'sub': cached_user.user_id,
@@ -280,62 +419,55 @@ class JWTValidator:
                 }
                 return TokenValidationResult(payload=payload, user_info=cached_user)
 
-            print(f"[JWTValidator] 缓存未命中，验证token: {token[:20]}...")
-
             # 获取公钥信息
-            key_data, algorithm, is_symmetric = await self._get_public_key_info()
-
-            print(f"[JWTValidator] 验证令牌: algorithm={algorithm}, is_symmetric={is_symmetric}")
-
-            # 根据加密类型选择验证方式
-            if is_symmetric:
-                # 对称加密验证
-                payload = jwt.decode(
-                    token,
-                    key_data,
-                    algorithms=[algorithm],
-                    options={
-                        'require': ['exp', 'iat', 'sub'],  # 必需字段
-                        'verify_aud': False,  # 暂时不验证aud
-                        'verify_iss': False   # 暂时不验证iss
-                    }
-                )
-            else:
-                # 非对称加密验证
-                payload = jwt.decode(
-                    token,
-                    key_data,
-                    algorithms=[algorithm],
-                    options={
-                        'require': ['exp', 'iat', 'sub'],
-                        'verify_aud': False,
-                        'verify_iss': False
-                    }
-                )
-
-            print(f"[JWTValidator] 令牌验证成功: user_id={payload.get('sub')}")
+            kid = self._get_token_kid(token)
+            key_data, algorithm, is_symmetric = await self._get_public_key_info(kid)
+            if trace:
+                trace.mark("key_fetch")
+
+            # 对称和非对称加密使用相同的验证参数，由algorithm区分
+            payload = jwt.decode(
+                token,
+                key_data,
+                algorithms=[algorithm],
+                options={
+                    'require': ['exp', 'iat', 'sub'],  # 必需字段
+                    'verify_aud': False,  # 暂时不验证aud
+                    'verify_iss': False   # 暂时不验证iss
+                }
+            )
+            if trace:
+                trace.mark("signature_verify")
 
             # 缓存用户信息
             user_info = self._cache_user_info(token, payload)
+            if trace:
+                trace.finish("verified", user_info.user_id)
 
             return TokenValidationResult(payload=payload, user_info=user_info)
 
         except jwt.ExpiredSignatureError as e:
-            print(f"[JWTValidator] 令牌已过期: {str(e)}")
+            if trace:
+                trace.finish("expired")
+            logger.debug(f"令牌已过期: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="认证令牌已过期",
                 headers={"WWW-Authenticate": "Bearer"}
             )
         except jwt.InvalidTokenError as e:
-            print(f"[JWTValidator] 无效令牌: {str(e)}")
+            if trace:
+                trace.finish("invalid")
+            logger.debug(f"无效令牌: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"无效的认证令牌: {str(e)}",
                 headers={"WWW-Authenticate": "Bearer"}
             )
         except Exception as e:
-            print(f"[JWTValidator] 令牌验证异常: {str(e)}")
+            if trace:
+                trace.finish("error")
+            logger.error(f"令牌验证异常: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"令牌验证失败: {str(e)}"
@@ -347,27 +479,29 @@ class JWTValidator:
 
         当怀疑公钥已更新时，可以调用此方法强制刷新缓存
         """
-        print("[JWTValidator] 使公钥和用户缓存失效")
+        logger.info("使公钥和用户缓存失效")
         self._public_key_cache = None
         self._public_key_algorithm = None
         self._is_symmetric = None
         self._key_cache_time = None
+        self._key_set = {}
         self._user_cache.clear()  # 清空用户信息缓存
 
     async def refresh_public_key(self) -> bool:
         """
         强制刷新公钥缓存
 
+        刷新失败时保留当前公钥。
+
         Returns:
             刷新是否成功
         """
         try:
-            self.invalidate_cache()
-            await self._get_public_key_info()
-            print("[JWTValidator] 公钥缓存刷新成功")
+            await self._refresh_key_info()
+            logger.info("公钥缓存刷新成功")
             return True
         except Exception as e:
-            print(f"[JWTValidator] 公钥缓存刷新失败: {str(e)}")
+            logger.error(f"公钥缓存刷新失败: {str(e)}")
             return False
 
     def get_cache_info(self) -> Dict[str, Any]:
@@ -383,7 +517,11 @@ class JWTValidator:
             "is_symmetric": self._is_symmetric,
             "cache_time": self._key_cache_time,
             "cache_age": time.time() - self._key_cache_time if self._key_cache_time else None,
-            "cache_ttl": self._key_cache_ttl
+            "cache_ttl": self._key_cache_ttl,
+            "kids": list(self._key_set),
+            "key_refresh": dict(self._key_stats),
+            "user_cache": self._user_cache.get_stats(),
+            "trace": self.tracer.get_stats()
         }
 
 
@@ -406,6 +544,27 @@ def get_jwt_validator() -> JWTValidator:
     return _jwt_validator
 
 
+async def warm_up_auth(timeout: float = 5.0) -> bool:
+    """
+    预热认证微服务连接并预取公钥，在应用启动时调用
+
+    通过全局验证器刷新一次公钥：同时建立共享连接池里的第一条（HTTP/2）连接，
+    并让首批请求直接使用已缓存的公钥。超时或失败时不影响启动，
+    之后首次验证令牌时会按正常流程获取公钥。
+
+    Args:
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        是否预取成功
+    """
+    try:
+        return await asyncio.wait_for(get_jwt_validator().refresh_public_key(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"认证微服务预热超时（{timeout}秒），首次验证令牌时再获取公钥")
+        return False
+
+
 async def validate_jwt_token(token: str) -> TokenValidationResult:
     """
     便捷的JWT令牌验证函数
@@ -0,0 +1,117 @@
+"""
+JWT令牌验证结果缓存
+
+按令牌哈希缓存已验证的用户信息，避免每个请求都重复验签。
+
+设计原则：
+- 有界LRU：超过容量时淘汰最久未使用的条目，插入、查询、淘汰都是O(1)
+- 按条目过期：过期时间取缓存TTL和令牌exp中较早的一个，令牌过期后不会再命中
+- 惰性清理：过期条目在查询时删除，未被查询的过期条目随LRU淘汰，无需全表扫描
+- 单事件循环内无锁：所有操作都是同步的字典操作，不跨await
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+
+V = TypeVar("V")
+
+
+class TokenCache(Generic[V]):
+    """
+    带TTL的LRU令牌缓存
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        """
+        初始化缓存
+
+        Args:
+            max_size: 最大条目数
+            ttl: 条目最长存活时间（秒）
+        """
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        # key -> (expires_at, value)，按最近使用顺序排列
+        self._entries: "OrderedDict[str, Tuple[float, V]]" = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> Optional[V]:
+        """
+        查询缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            未过期的缓存值，未命中时返回None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self._expirations += 1
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: str, value: V, exp: Optional[float] = None) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            exp: 令牌过期时间戳（秒），条目不会存活到该时间之后
+        """
+        expires_at = time.time() + self.ttl
+        if exp:
+            expires_at = min(expires_at, exp)
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def discard(self, key: str) -> None:
+        """删除缓存条目"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            条目数、容量、TTL以及命中、未命中、淘汰和过期次数
+        """
+        total = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations
+        }
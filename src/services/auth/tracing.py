@@ -0,0 +1,113 @@
+"""
+认证路径采样追踪
+
+替代验证路径上的print输出：按采样率记录单次令牌验证各阶段耗时，
+通过标准logging以DEBUG级别输出，并累计被采样请求的分阶段耗时统计。
+
+设计原则：
+- 零开销关闭：未采样或logger未开启DEBUG时start()返回None，调用方只做一次None判断
+- 分阶段计时：缓存查询（cache_lookup）、密钥获取（key_fetch）、签名验证（signature_verify）
+- 不记录令牌内容：日志中只出现用户ID和阶段耗时
+"""
+
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger("src.services.auth.trace")
+
+
+class AuthTrace:
+    """单次令牌验证的追踪记录"""
+
+    __slots__ = ("tracer", "start_time", "stage_start", "stages")
+
+    def __init__(self, tracer: "AuthTracer"):
+        self.tracer = tracer
+        self.start_time = time.perf_counter()
+        self.stage_start = self.start_time
+        self.stages: Dict[str, float] = {}
+
+    def mark(self, stage: str) -> None:
+        """
+        结束当前阶段，记录自上一个阶段结束以来的耗时
+
+        Args:
+            stage: 阶段名称
+        """
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.stage_start)
+        self.stage_start = now
+
+    def finish(self, outcome: str, user_id: Optional[str] = None) -> None:
+        """
+        结束追踪并输出日志
+
+        Args:
+            outcome: 验证结果，如 cache_hit、verified、expired、invalid、error
+            user_id: 用户ID
+        """
+        total = time.perf_counter() - self.start_time
+        self.tracer._record(outcome, total, self.stages)
+        stage_text = " ".join(f"{name}={duration * 1000:.3f}ms" for name, duration in self.stages.items())
+        logger.debug(
+            f"auth trace: outcome={outcome} user_id={user_id} total={total * 1000:.3f}ms {stage_text}"
+        )
+
+
+class AuthTracer:
+    """
+    认证路径采样追踪器
+    """
+
+    def __init__(self, sample_rate: float = 0.01):
+        """
+        初始化追踪器
+
+        Args:
+            sample_rate: 采样率（0-1），0表示关闭
+        """
+        self.sample_rate = sample_rate
+        self._sampled = 0
+        self._outcomes: Dict[str, int] = {}
+        self._stage_totals: Dict[str, float] = {}
+        self._stage_counts: Dict[str, int] = {}
+
+    def start(self) -> Optional[AuthTrace]:
+        """
+        按采样率开始一次追踪
+
+        Returns:
+            追踪记录；未被采样或DEBUG日志未开启时返回None
+        """
+        if self.sample_rate <= 0 or not logger.isEnabledFor(logging.DEBUG):
+            return None
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        return AuthTrace(self)
+
+    def _record(self, outcome: str, total: float, stages: Dict[str, float]) -> None:
+        self._sampled += 1
+        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+        for name, duration in (("total", total), *stages.items()):
+            self._stage_totals[name] = self._stage_totals.get(name, 0.0) + duration
+            self._stage_counts[name] = self._stage_counts.get(name, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取被采样请求的统计信息
+
+        Returns:
+            采样率、采样数、各结果次数和各阶段平均耗时（毫秒）
+        """
+        return {
+            "sample_rate": self.sample_rate,
+            "sampled": self._sampled,
+            "outcomes": dict(self._outcomes),
+            "avg_stage_ms": {
+                name: round(self._stage_totals[name] / count * 1000, 4)
+                for name, count in self._stage_counts.items()
+            }
+        }
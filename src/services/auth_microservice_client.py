@@ -3,24 +3,26 @@ Auth微服务客户端
 
 功能：与Auth-Service(20251)通信
 接口：4个认证接口
+连接：与公钥获取、健康检查共享进程内的认证微服务连接池（HTTP/2、长连接）
 """
 import httpx
 import os
 from typing import Dict, Any
 from src.api.config import config
+from src.services.auth.client import get_auth_http_client
 
 
 class AuthMicroserviceClient:
     """Auth微服务客户端"""
 
     def __init__(self):
-        self.base_url = config.auth_service_url
+        self.base_url = config.auth_service_url.rstrip('/')
         self.timeout = config.auth_service_timeout
-        self.client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=self.timeout,
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
-        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共享的认证微服务HTTP客户端（由HTTP客户端注册表管理）"""
+        return get_auth_http_client()
 
     async def wechat_login(self, wechat_openid: str) -> Dict[str, Any]:
         """微信登录
@@ -29,7 +31,7 @@ class AuthMicroserviceClient:
             HTTPException: 当Auth微服务返回错误时
         """
         response = await self.client.post(
-            "/auth/wechat/login",
+            f"{self.base_url}/auth/wechat/login",
             json={"project": os.getenv("AUTH_PROJECT", "tatake_backend_f3111d"), "wechat_openid": wechat_openid}
         )
 
@@ -50,7 +52,7 @@ class AuthMicroserviceClient:
             HTTPException: 当Auth微服务返回错误时
         """
         response = await self.client.post(
-            "/auth/wechat/register",
+            f"{self.base_url}/auth/wechat/register",
             json={"project": os.getenv("AUTH_PROJECT", "tatake_backend_f3111d"), "wechat_openid": wechat_openid}
         )
 
@@ -75,7 +77,7 @@ class AuthMicroserviceClient:
             HTTPException: 当Auth微服务返回错误时
         """
         response = await self.client.post(
-            "/auth/phone/send-code",
+            f"{self.base_url}/auth/phone/send-code",
             json={"project": os.getenv("AUTH_PROJECT", "tatake_backend_f3111d"), "phone": phone, "scene": scene}
         )
 
@@ -102,7 +104,7 @@ class AuthMicroserviceClient:
             HTTPException: 当Auth微服务返回错误时
         """
         response = await self.client.post(
-            "/auth/phone/verify",
+            f"{self.base_url}/auth/phone/verify",
             json={"project": os.getenv("AUTH_PROJECT", "tatake_backend_f3111d"), "phone": phone, "code": code, "scene": scene}
         )
 
@@ -123,7 +125,7 @@ class AuthMicroserviceClient:
             HTTPException: 当Auth微服务返回错误时
         """
         response = await self.client.post(
-            "/auth/token/refresh",
+            f"{self.base_url}/auth/token/refresh",
             json={"project": config.project, "refresh_token": refresh_token}
         )
 
@@ -138,8 +140,10 @@ class AuthMicroserviceClient:
         return response.json()
 
     async def close(self):
-        """关闭客户端"""
-        await self.client.aclose()
+        """关闭客户端
+
+        连接池是进程内共享的，由应用关闭时的close_http_clients()统一释放，这里不做任何事。
+        """
 
 
 # 全局单例
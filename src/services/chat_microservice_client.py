@@ -30,6 +30,7 @@ import httpx
 from pydantic import BaseModel
 
 from src.api.config import config, get_chat_service_url, get_chat_service_timeout
+from src.services.circuit_breaker import create_breaker_transport
 
 
 class ChatMicroserviceError(Exception):
@@ -63,7 +64,10 @@ class ChatMicroserviceClient:
         self.client = httpx.AsyncClient(
             timeout=self.timeout,
             headers={"Content-Type": "application/json"},
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            transport=create_breaker_transport(
+                "chat",
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
         )
 
     async def close(self):
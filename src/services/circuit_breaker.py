@@ -0,0 +1,348 @@
+"""
+微服务熔断器
+
+为所有出站微服务客户端（Task、Focus、Reward、Chat、Auth）提供共享的熔断能力。
+当上游服务故障或明显变慢时快速失败，避免每个用户请求都占用工作协程等待重试和超时。
+
+核心功能：
+1. 滑动窗口统计：按最近N次调用计算错误率和慢调用率
+2. 三态状态机：CLOSED（正常）→ OPEN（快速失败）→ HALF_OPEN（单请求探测）
+3. 半开探测：打开时间到期后只放行一个探测请求，成功则关闭，失败则重新打开
+4. 状态监听：状态变化时通知监听者（如Task客户端的健康状态缓存）
+5. httpx传输层集成：CircuitBreakerTransport可直接作为AsyncClient的transport使用
+
+使用方式：
+    breaker = get_circuit_breaker("focus")
+    client = httpx.AsyncClient(transport=CircuitBreakerTransport(breaker, limits=...))
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.api.config import config
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.ConnectError):
+    """
+    熔断器打开异常
+
+    继承httpx.ConnectError，使各客户端现有的"无法连接"处理逻辑（通常映射为503）
+    无需修改即可生效；需要区分时可单独捕获本异常。
+    """
+
+    def __init__(self, name: str, request: Optional[httpx.Request] = None):
+        self.breaker_name = name
+        super().__init__(f"{name}微服务熔断中，请求已被快速拒绝", request=request)
+
+
+StateListener = Callable[["CircuitBreaker", CircuitState, CircuitState], None]
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    在单事件循环中使用，所有状态变更都是同步操作，不需要加锁。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 0.8,
+        slow_call_duration: float = 5.0,
+        minimum_calls: int = 5,
+        window_size: int = 20,
+        open_duration: float = 30.0
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            name (str): 熔断器名称（通常为上游服务名）
+            failure_rate_threshold (float): 错误率阈值，达到后打开熔断器
+            slow_call_rate_threshold (float): 慢调用率阈值，达到后打开熔断器
+            slow_call_duration (float): 慢调用判定时长（秒）
+            minimum_calls (int): 计算比率所需的最少调用次数
+            window_size (int): 滑动窗口大小（调用次数）
+            open_duration (float): 打开状态持续时间（秒），之后进入半开探测
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+
+        self.state = CircuitState.CLOSED
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._window_failures = 0
+        self._window_slow = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._listeners: List[StateListener] = []
+
+        # 统计计数器
+        self.total_calls = 0
+        self.total_failures = 0
+        self.rejected_calls = 0
+        self.times_opened = 0
+
+    def add_listener(self, listener: StateListener) -> None:
+        """
+        注册状态变化监听器
+
+        Args:
+            listener (StateListener): 回调函数 (breaker, old_state, new_state)
+        """
+        self._listeners.append(listener)
+
+    def allow_request(self) -> bool:
+        """
+        判断是否放行请求
+
+        Returns:
+            bool: True表示放行；False表示熔断中，调用方应快速失败
+        """
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at >= self.open_duration:
+                self._transition(CircuitState.HALF_OPEN)
+            else:
+                self.rejected_calls += 1
+                return False
+
+        # HALF_OPEN：同一时刻只放行一个探测请求
+        if self._probe_in_flight:
+            self.rejected_calls += 1
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self, duration: float = 0.0) -> None:
+        """记录一次成功调用"""
+        self._record(failed=False, duration=duration)
+
+    def record_failure(self, duration: float = 0.0) -> None:
+        """记录一次失败调用"""
+        self._record(failed=True, duration=duration)
+
+    def release(self) -> None:
+        """
+        释放放行名额但不记录结果
+
+        用于请求被取消等无法判断上游健康状况的情况，避免半开探测名额永久占用。
+        """
+        if self.state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def reset(self) -> None:
+        """重置为关闭状态并清空统计窗口"""
+        self._clear_window()
+        self._probe_in_flight = False
+        if self.state != CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def _record(self, failed: bool, duration: float) -> None:
+        slow = duration >= self.slow_call_duration
+        self.total_calls += 1
+        if failed:
+            self.total_failures += 1
+
+        if self.state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+            if failed or slow:
+                self._open()
+            else:
+                self._clear_window()
+                self._transition(CircuitState.CLOSED)
+            return
+
+        if self.state == CircuitState.OPEN:
+            # 打开前已发出的请求晚到的结果，不影响状态
+            return
+
+        if len(self._window) == self._window.maxlen:
+            old_failed, old_slow = self._window[0]
+            self._window_failures -= old_failed
+            self._window_slow -= old_slow
+        self._window.append((failed, slow))
+        self._window_failures += failed
+        self._window_slow += slow
+
+        calls = len(self._window)
+        if calls < self.minimum_calls:
+            return
+        if (self._window_failures / calls >= self.failure_rate_threshold or
+                self._window_slow / calls >= self.slow_call_rate_threshold):
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        self._clear_window()
+        self._transition(CircuitState.OPEN)
+
+    def _clear_window(self) -> None:
+        self._window.clear()
+        self._window_failures = 0
+        self._window_slow = 0
+
+    def _transition(self, new_state: CircuitState) -> None:
+        old_state = self.state
+        if old_state == new_state:
+            return
+        self.state = new_state
+        self.logger.warning(f"熔断器状态变化: {self.name} {old_state.value} -> {new_state.value}")
+        for listener in self._listeners:
+            try:
+                listener(self, old_state, new_state)
+            except Exception as e:
+                self.logger.error(f"熔断器监听器执行失败: {self.name}, error={e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取熔断器统计信息
+
+        Returns:
+            Dict[str, Any]: 状态、窗口内错误率和累计计数
+        """
+        calls = len(self._window)
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "window_calls": calls,
+            "window_failure_rate": round(self._window_failures / calls, 4) if calls else 0.0,
+            "window_slow_rate": round(self._window_slow / calls, 4) if calls else 0.0,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "rejected_calls": self.rejected_calls,
+            "times_opened": self.times_opened
+        }
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    带熔断的httpx传输层
+
+    包装真实的传输层：熔断打开时直接抛出CircuitOpenError，不发起网络请求；
+    传输异常（连接失败、超时等）和5xx响应计为失败，其余计为成功。
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **transport_kwargs: Any
+    ):
+        """
+        初始化熔断传输层
+
+        Args:
+            breaker (CircuitBreaker): 熔断器
+            transport (httpx.AsyncBaseTransport, optional): 被包装的传输层
+            **transport_kwargs: 未提供transport时用于创建httpx.AsyncHTTPTransport的参数（如limits、http2）
+        """
+        self.breaker = breaker
+        self._transport = transport or httpx.AsyncHTTPTransport(**transport_kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.breaker.name, request=request)
+
+        start_time = time.monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            self.breaker.record_failure(time.monotonic() - start_time)
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        duration = time.monotonic() - start_time
+        if response.status_code >= 500:
+            self.breaker.record_failure(duration)
+        else:
+            self.breaker.record_success(duration)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# 全局熔断器注册表（按上游服务名共享）
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    获取指定上游服务的熔断器（单例）
+
+    同一进程内同名熔断器共享状态，阈值从全局配置读取。
+
+    Args:
+        name (str): 上游服务名，如 task、focus、reward、chat、auth
+
+    Returns:
+        CircuitBreaker: 熔断器实例
+    """
+    breaker = _circuit_breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name=name,
+            failure_rate_threshold=getattr(config, 'circuit_breaker_failure_rate_threshold', 0.5),
+            slow_call_rate_threshold=getattr(config, 'circuit_breaker_slow_call_rate_threshold', 0.8),
+            slow_call_duration=getattr(config, 'circuit_breaker_slow_call_duration', 5.0),
+            minimum_calls=getattr(config, 'circuit_breaker_minimum_calls', 5),
+            window_size=getattr(config, 'circuit_breaker_window_size', 20),
+            open_duration=getattr(config, 'circuit_breaker_open_duration', 30.0)
+        )
+        _circuit_breakers[name] = breaker
+    return breaker
+
+
+def create_breaker_transport(name: str, **transport_kwargs: Any) -> httpx.AsyncBaseTransport:
+    """
+    创建指定上游服务的传输层
+
+    熔断器被全局关闭时返回普通传输层。
+
+    Args:
+        name (str): 上游服务名
+        **transport_kwargs: httpx.AsyncHTTPTransport参数（如limits、http2）
+
+    Returns:
+        httpx.AsyncBaseTransport: 传输层实例
+    """
+    if not getattr(config, 'circuit_breaker_enabled', True):
+        return httpx.AsyncHTTPTransport(**transport_kwargs)
+    return CircuitBreakerTransport(get_circuit_breaker(name), **transport_kwargs)
+
+
+def get_all_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取所有熔断器的统计信息
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 按上游服务名索引的统计信息
+    """
+    return {name: breaker.get_stats() for name, breaker in _circuit_breakers.items()}
@@ -0,0 +1,366 @@
+"""
+条件GET（ETag / If-None-Match）支持
+
+为移动端高频轮询的只读接口（任务列表、Top3、用户资料）提供ETag校验，
+内容未变化时返回不带响应体的304，节省序列化开销和出口带宽。
+
+核心功能：
+1. ETag生成：对适配后的响应做规范化JSON序列化后取稳定哈希
+2. If-None-Match处理：支持多个ETag、弱校验前缀W/和通配符*
+3. 按用户的数据版本号：写路径（任务增删改、完成、Top3设置、资料更新、奖品兑换，
+   以及聊天工具写任务）递增版本号；版本号未变且ETag记录未过期时，无需调用上游即可直接返回304
+4. 过期兜底：ETag记录超过max_age后必须重新从上游获取，
+   覆盖不经过本进程写路径的数据变化（其他worker的写操作、其他服务修改积分）
+
+一致性策略与Task响应缓存（task_response_cache）相同：状态只在进程内，
+写路径在本进程内立即失效；其他worker或其他服务的写操作最多在max_age内不可见。
+max_age默认与响应缓存TTL相同（5秒），两者的陈旧窗口一致。
+
+设计原则：
+1. 按用户整体失效：任何写操作都会让该用户所有已记录的ETag失效，宁可多查一次也不返回旧数据
+2. 版本号与ETag记录一起按用户LRU淘汰，淘汰后版本号重新计数不会造成误匹配
+3. 线程安全：聊天工具在线程池中执行写操作后也会递增版本号，所有操作在一把短锁内完成，不跨await
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from src.api.config import config
+
+
+# 每个用户最多记录的资源ETag数（游标分页会产生较多不同的资源键）
+MAX_RESOURCES_PER_USER = 64
+
+
+def compute_etag(payload: Any) -> str:
+    """
+    计算响应内容的ETag
+
+    Args:
+        payload (Any): 响应对象（Pydantic模型、字典等）
+
+    Returns:
+        str: 带双引号的强ETag
+    """
+    body = json.dumps(
+        jsonable_encoder(payload),
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str
+    )
+    return '"' + hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    判断If-None-Match请求头是否匹配ETag
+
+    Args:
+        if_none_match (str, optional): If-None-Match请求头
+        etag (str): 当前ETag
+
+    Returns:
+        bool: 是否匹配
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def build_resource_key(request: Request) -> str:
+    """
+    根据请求路径和规范化的查询参数构建资源键
+
+    Args:
+        request (Request): 请求对象
+
+    Returns:
+        str: 资源键
+    """
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+class _UserETags:
+    """单个用户的数据版本号和ETag记录"""
+    __slots__ = ("version", "resources")
+
+    def __init__(self):
+        self.version = 0
+        # resource_key -> (version, etag, stored_at)
+        self.resources: "OrderedDict[str, Tuple[int, str, float]]" = OrderedDict()
+
+
+class ConditionalGetManager:
+    """
+    条件GET管理器
+
+    所有操作都是同步的，在一把短锁内完成。
+    """
+
+    def __init__(self, max_age: float = 5.0, max_users: int = 10000):
+        """
+        初始化管理器
+
+        Args:
+            max_age (float): ETag记录免上游校验的最长时间（秒）
+            max_users (int): 最多记录的用户数，超出时按LRU淘汰
+        """
+        self.max_age = max_age
+        self.max_users = max_users
+        self._users: "OrderedDict[str, _UserETags]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._short_circuit_hits = 0
+        self._revalidated_hits = 0
+        self._misses = 0
+        self._version_bumps = 0
+
+    def get_version(self, user_id: str) -> int:
+        """
+        获取用户当前数据版本号
+
+        Args:
+            user_id (str): 用户ID
+
+        Returns:
+            int: 版本号，未记录的用户为0
+        """
+        with self._lock:
+            entry = self._users.get(user_id)
+            return entry.version if entry is not None else 0
+
+    def bump_user_version(self, user_id: str) -> None:
+        """
+        递增用户数据版本号，使该用户已记录的ETag全部失效
+
+        Args:
+            user_id (str): 用户ID
+        """
+        with self._lock:
+            entry = self._get_or_create_entry(user_id)
+            entry.version += 1
+            entry.resources.clear()
+            self._version_bumps += 1
+
+    def _get_or_create_entry(self, user_id: str) -> _UserETags:
+        """获取或创建用户记录（调用方持有锁）"""
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = _UserETags()
+            self._users[user_id] = entry
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return entry
+
+    def check_not_modified(self, user_id: str, resource: str, if_none_match: Optional[str]) -> Optional[str]:
+        """
+        不调用上游，仅凭版本号判断客户端缓存是否仍然有效
+
+        Args:
+            user_id (str): 用户ID
+            resource (str): 资源键
+            if_none_match (str, optional): If-None-Match请求头
+
+        Returns:
+            Optional[str]: 有效时返回ETag，否则返回None
+        """
+        if not if_none_match:
+            return None
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            record = entry.resources.get(resource)
+            if record is None:
+                return None
+
+            version, etag, stored_at = record
+            if version != entry.version or time.monotonic() - stored_at > self.max_age:
+                del entry.resources[resource]
+                return None
+            if not etag_matches(if_none_match, etag):
+                return None
+
+            self._users.move_to_end(user_id)
+            self._short_circuit_hits += 1
+            return etag
+
+    def remember(self, user_id: str, resource: str, payload: Any, version: int) -> str:
+        """
+        计算并记录响应的ETag
+
+        Args:
+            user_id (str): 用户ID
+            resource (str): 资源键
+            payload (Any): 响应对象
+            version (int): 发起上游调用前读取的版本号；期间发生写操作时不记录
+
+        Returns:
+            str: ETag
+        """
+        etag = compute_etag(payload)
+
+        with self._lock:
+            if version != 0 and user_id not in self._users:
+                # 上游调用期间该用户的记录已被淘汰，无法确认期间是否发生写操作
+                return etag
+
+            entry = self._get_or_create_entry(user_id)
+            if entry.version == version:
+                entry.resources[resource] = (version, etag, time.monotonic())
+                entry.resources.move_to_end(resource)
+                while len(entry.resources) > MAX_RESOURCES_PER_USER:
+                    entry.resources.popitem(last=False)
+        return etag
+
+    def record_result(self, not_modified: bool) -> None:
+        """记录一次经过上游校验的结果"""
+        if not_modified:
+            self._revalidated_hits += 1
+        else:
+            self._misses += 1
+
+    def clear(self) -> None:
+        """清空所有记录"""
+        with self._lock:
+            self._users.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            Dict[str, Any]: 免上游304次数、上游校验后304次数、未命中次数等
+        """
+        total = self._short_circuit_hits + self._revalidated_hits + self._misses
+        return {
+            "users": len(self._users),
+            "not_modified_without_upstream": self._short_circuit_hits,
+            "not_modified_after_upstream": self._revalidated_hits,
+            "modified": self._misses,
+            "not_modified_ratio": round(
+                (self._short_circuit_hits + self._revalidated_hits) / total, 4
+            ) if total else 0.0,
+            "version_bumps": self._version_bumps
+        }
+
+
+# 全局管理器实例
+_conditional_get_manager: Optional[ConditionalGetManager] = None
+
+
+def get_conditional_get_manager() -> ConditionalGetManager:
+    """
+    获取全局条件GET管理器（单例模式）
+
+    Returns:
+        ConditionalGetManager: 管理器实例
+    """
+    global _conditional_get_manager
+    if _conditional_get_manager is None:
+        _conditional_get_manager = ConditionalGetManager(
+            max_age=getattr(config, 'conditional_get_max_age', 5.0),
+            max_users=getattr(config, 'conditional_get_max_users', 10000)
+        )
+    return _conditional_get_manager
+
+
+def bump_user_data_version(user_id: Any) -> None:
+    """
+    写操作后递增用户数据版本号
+
+    Args:
+        user_id: 用户ID（UUID或字符串）
+    """
+    get_conditional_get_manager().bump_user_version(str(user_id))
+
+
+class ConditionalGet:
+    """
+    单次只读请求的条件GET处理
+
+    使用方式：
+        conditional = ConditionalGet(request, response, user_id)
+        not_modified = conditional.short_circuit()
+        if not_modified is not None:
+            return not_modified
+        result = ...  # 调用上游并构造UnifiedResponse
+        return conditional.finalize(result)
+
+    request为None（如单元测试直接调用路由函数）或功能关闭时所有方法都是空操作。
+    """
+
+    def __init__(self, request: Optional[Request], response: Optional[Response], user_id: Any):
+        self.enabled = request is not None and getattr(config, 'conditional_get_enabled', True)
+        self.response = response
+        self.user_id = str(user_id)
+        if self.enabled:
+            self.manager = get_conditional_get_manager()
+            self.resource = build_resource_key(request)
+            self.if_none_match = request.headers.get("if-none-match")
+            # 在调用上游之前读取版本号，上游调用期间发生写操作时不会记录过期的ETag
+            self.version = self.manager.get_version(self.user_id)
+
+    @staticmethod
+    def _not_modified(etag: str) -> Response:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    def short_circuit(self) -> Optional[Response]:
+        """
+        版本号未变化时直接返回304，不调用上游
+
+        Returns:
+            Optional[Response]: 304响应；需要调用上游时返回None
+        """
+        if not self.enabled:
+            return None
+        etag = self.manager.check_not_modified(self.user_id, self.resource, self.if_none_match)
+        return self._not_modified(etag) if etag is not None else None
+
+    def finalize(self, result: Any) -> Union[Any, Response]:
+        """
+        为上游结果生成ETag，与If-None-Match匹配时返回304
+
+        仅对code为200的成功响应生成ETag。
+
+        Args:
+            result: 构造好的响应对象（UnifiedResponse）
+
+        Returns:
+            原响应对象（已设置ETag响应头）或304响应
+        """
+        if not self.enabled or getattr(result, "code", None) != 200:
+            return result
+
+        etag = self.manager.remember(self.user_id, self.resource, result, self.version)
+        not_modified = etag_matches(self.if_none_match, etag)
+        self.manager.record_result(not_modified)
+        if not_modified:
+            return self._not_modified(etag)
+
+        if self.response is not None:
+            self.response.headers["ETag"] = etag
+            self.response.headers["Cache-Control"] = "private, no-cache"
+        return result
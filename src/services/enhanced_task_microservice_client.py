@@ -11,6 +11,10 @@
 4. 连接池管理：优化网络性能和资源使用
 5. 增强错误处理：详细的网络错误处理和降级策略
 6. 重试机制：智能重试可恢复的错误
+7. 响应缓存：按用户缓存任务列表、标签等只读接口，写操作后显式失效
+8. 请求合并：并发的相同GET请求共享同一个上游调用（single-flight）
+9. 熔断保护：上游故障时快速失败，熔断状态同步到健康状态缓存
+10. 请求对冲：已映射的GET请求超过该路由滚动p95仍未返回时发出对冲请求，受全局预算限制
 
 路径映射策略（重要：路径末尾必须有斜杠 + user_id通过query参数传递）：
 - POST /tasks/query → GET /tasks/?user_id={user_id}
@@ -39,6 +43,19 @@ import httpx
 from pydantic import BaseModel
 
 from src.api.config import config
+from src.services.task_response_cache import (
+    ResponseCacheBackend,
+    InMemoryResponseCache,
+    build_cache_key
+)
+from src.services.single_flight import SingleFlight
+from src.services.request_hedging import HedgeBudget, LatencyTracker, RequestHedger
+from src.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    create_breaker_transport
+)
 
 
 class TaskMicroserviceError(Exception):
@@ -132,6 +149,16 @@ class ConnectionPoolManager:
             max_keepalive = 20
             max_connections = 100
 
+        # 熔断传输层：Task微服务故障时快速失败
+        self.transport = create_breaker_transport(
+            "task",
+            limits=httpx.Limits(
+                max_keepalive_connections=max_keepalive,  # 最大保持连接数
+                max_connections=max_connections           # 最大连接数
+            )
+        )
+        self.circuit_breaker: Optional[CircuitBreaker] = getattr(self.transport, "breaker", None)
+
         self.client = httpx.AsyncClient(
             timeout=httpx.Timeout(
                 connect=connect_timeout,   # 连接超时
@@ -139,10 +166,7 @@ class ConnectionPoolManager:
                 write=write_timeout,       # 写入超时
                 pool=pool_timeout          # 连接池超时
             ),
-            limits=httpx.Limits(
-                max_keepalive_connections=max_keepalive,  # 最大保持连接数
-                max_connections=max_connections           # 最大连接数
-            )
+            transport=self.transport
         )
         self.logger.info(f"连接池管理器初始化完成，超时配置: connect={connect_timeout}s, read={read_timeout}s, write={write_timeout}s, pool={pool_timeout}s")
         self.logger.info(f"连接池限制: max_keepalive={max_keepalive}, max_connections={max_connections}")
@@ -232,14 +256,29 @@ class EnhancedTaskMicroserviceClient:
     - 连接池管理和复用
     - 增强的错误处理和重试机制
     - 直接响应透传（无需格式转换）
+    - 只读接口的按用户响应缓存
+    - 并发相同GET请求的合并
+    - 熔断保护（与其他微服务客户端共享熔断器实现）
     """
 
-    def __init__(self, base_url: Optional[str] = None):
+    # 可缓存的只读接口（原始方法, 原始路径）
+    CACHEABLE_ROUTES: Set[Tuple[str, str]] = {
+        ("GET", "tasks"),
+        ("POST", "tasks/query"),
+        ("GET", "tasks/tags"),
+    }
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        response_cache: Optional[ResponseCacheBackend] = None
+    ):
         """
         初始化增强版微服务客户端
 
         Args:
             base_url (str): 微服务基础URL，默认从环境变量读取
+            response_cache (ResponseCacheBackend, optional): 响应缓存后端，默认使用进程内缓存
         """
         self.logger = logging.getLogger(__name__)
         self.base_url = base_url or getattr(config, 'task_service_url', 'http://45.152.65.130:20253')
@@ -286,6 +325,39 @@ class EnhancedTaskMicroserviceClient:
             "cache_ttl": health_check_interval
         }
 
+        # 响应缓存配置
+        self.cache_enabled = getattr(config, 'task_service_cache_enabled', True)
+        self.cache_ttl = getattr(config, 'task_service_cache_ttl', 5.0)
+        self.response_cache: ResponseCacheBackend = response_cache or InMemoryResponseCache(
+            default_ttl=self.cache_ttl,
+            max_entries=getattr(config, 'task_service_cache_max_entries', 10000)
+        )
+
+        # 请求合并配置
+        self.coalescing_enabled = getattr(config, 'task_service_coalescing_enabled', True)
+        self.single_flight = SingleFlight()
+
+        # 请求对冲配置（默认关闭，会增加上游负载）
+        self.hedging_enabled = getattr(config, 'task_service_hedging_enabled', False)
+        self.hedger = RequestHedger(
+            tracker=LatencyTracker(
+                percentile=getattr(config, 'task_service_hedging_percentile', 0.95),
+                window_size=getattr(config, 'task_service_hedging_window_size', 200),
+                min_samples=getattr(config, 'task_service_hedging_min_samples', 20)
+            ),
+            budget=HedgeBudget(
+                ratio=getattr(config, 'task_service_hedging_budget_ratio', 0.05),
+                max_tokens=getattr(config, 'task_service_hedging_max_burst', 10.0)
+            ),
+            min_delay=getattr(config, 'task_service_hedging_min_delay', 0.05),
+            max_delay=getattr(config, 'task_service_hedging_max_delay', 2.0)
+        )
+
+        # 熔断器：状态变化同步到健康状态缓存
+        self.circuit_breaker = self.connection_pool.circuit_breaker
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.add_listener(self._on_circuit_state_change)
+
     def _build_path_mappings(self) -> Dict[Tuple[str, str], Tuple[str, str]]:
         """
         构建路径映射表
@@ -382,6 +454,121 @@ class EnhancedTaskMicroserviceClient:
             # 不包含任何参数的路径，直接返回
             return new_method, new_path_template
 
+    def _is_cacheable(self, method: str, original_path: str, new_method: str) -> bool:
+        """
+        判断请求是否可以使用响应缓存
+
+        只有白名单中的只读接口、且映射后为GET请求时才缓存。
+
+        Args:
+            method (str): 原始HTTP方法
+            original_path (str): 原始路径
+            new_method (str): 映射后的HTTP方法
+
+        Returns:
+            bool: 是否可缓存
+        """
+        return (
+            self.cache_enabled
+            and new_method == "GET"
+            and (method.upper(), original_path) in self.CACHEABLE_ROUTES
+        )
+
+    def invalidate_user_cache(self, user_id: str) -> int:
+        """
+        清除指定用户的响应缓存
+
+        在用户的任务发生写操作（创建/更新/删除/完成）后调用，包括聊天工具发起的写操作。
+        同时递增用户的失效代数，进行中的读请求返回后不会再写入缓存。
+
+        Args:
+            user_id (str): 用户ID
+
+        Returns:
+            int: 被清除的缓存条目数
+        """
+        removed = self.response_cache.invalidate_user(str(user_id))
+        if removed:
+            self.logger.debug(f"已清除用户响应缓存: user_id={user_id}, entries={removed}")
+        return removed
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取响应缓存统计信息
+
+        Returns:
+            Dict[str, Any]: 命中率、条目数等指标
+        """
+        stats = self.response_cache.get_stats()
+        stats["enabled"] = self.cache_enabled
+        return stats
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """
+        获取请求合并统计信息
+
+        Returns:
+            Dict[str, Any]: 按路由的请求数、上游调用数和被合并的请求数
+        """
+        stats = self.single_flight.get_stats()
+        stats["enabled"] = self.coalescing_enabled
+        return stats
+
+    def get_hedging_stats(self) -> Dict[str, Any]:
+        """
+        获取请求对冲统计信息
+
+        Returns:
+            Dict[str, Any]: 总请求数、对冲数、对冲比例以及按路由的统计和当前对冲阈值
+        """
+        stats = self.hedger.get_stats()
+        stats["enabled"] = self.hedging_enabled
+        return stats
+
+    def _get_route_label(self, method: str, original_path: str, new_method: str) -> str:
+        """
+        获取用于统计的路由标签
+
+        已映射的路径使用路径模板，未映射的路径（可能包含具体ID）统一归类，避免标签无限增长。
+        """
+        key = (method.upper(), original_path)
+        if key in self.path_mappings:
+            return f"{key[0]} {original_path}"
+        return f"{new_method} <unmapped>"
+
+    def _on_circuit_state_change(
+        self,
+        breaker: CircuitBreaker,
+        old_state: CircuitState,
+        new_state: CircuitState
+    ) -> None:
+        """
+        熔断器状态变化回调
+
+        打开时立即把健康状态标记为不健康；关闭时标记为健康，
+        避免健康检查在熔断期间继续访问上游。
+        """
+        if new_state == CircuitState.HALF_OPEN:
+            return
+        self._health_status = {
+            "status": "unhealthy" if new_state == CircuitState.OPEN else "healthy",
+            "last_check": time.time(),
+            "cache_ttl": self._health_status["cache_ttl"]
+        }
+
+    def get_circuit_breaker_stats(self) -> Dict[str, Any]:
+        """
+        获取熔断器统计信息
+
+        Returns:
+            Dict[str, Any]: 熔断器状态和计数，熔断器被禁用时为 {"enabled": False}
+        """
+        if self.circuit_breaker is None:
+            return {"enabled": False}
+        stats = self.circuit_breaker.get_stats()
+        stats["enabled"] = True
+        return stats
+
     def _get_headers(self) -> Dict[str, str]:
         """
         获取HTTP请求头
@@ -409,6 +596,10 @@ class EnhancedTaskMicroserviceClient:
             current_time - self._health_status["last_check"] < self._health_status["cache_ttl"]):
             return True
 
+        # 熔断打开期间直接判定为不健康，不访问上游
+        if self.circuit_breaker is not None and self.circuit_breaker.state == CircuitState.OPEN:
+            return False
+
         try:
             client = self.connection_pool.get_client()
             response = await client.get(
@@ -486,6 +677,15 @@ class EnhancedTaskMicroserviceClient:
 
                 return response
 
+            except CircuitOpenError as e:
+                # 熔断中：不重试、不等待，直接快速失败
+                raise TaskMicroserviceError(
+                    "Task微服务暂时不可用，请稍后重试",
+                    status_code=503,
+                    original_error=e,
+                    is_recoverable=True
+                )
+
             except (httpx.ConnectError, httpx.TimeoutException) as e:
                 last_error = e
                 if attempt < self.max_retries:
@@ -591,14 +791,47 @@ class EnhancedTaskMicroserviceClient:
         self.logger.info(f"调试信息：原始路径={path} -> 重写后路径={new_path}")
         self.logger.info(f"调试信息：请求数据={request_data}, 查询参数={query_params}")
 
+        # 6. 只读接口先查响应缓存
+        # 发起请求前记下用户的失效代数：请求期间发生写操作时不缓存写之前的响应，
+        # 写操作之后到达的请求也不会合并到写之前发起的上游调用上
+        cache_key = None
+        cache_generation = self.response_cache.get_generation(validated_user_id)
+        if self._is_cacheable(method, path, new_method):
+            cache_key = build_cache_key(validated_user_id, new_method, new_path, query_params)
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                self.logger.debug(f"响应缓存命中: {new_method} {new_path}")
+                return cached_response
+
         try:
-            # 5. 执行HTTP请求（带重试）
-            response = await self._execute_request_with_retry(
-                method=new_method,
-                url=full_url,
-                request_data=request_data,
-                params=query_params
-            )
+            # 7. 执行HTTP请求（带重试）
+            # GET请求是幂等的，并发的相同请求合并为一次上游调用；
+            # 共享的是httpx.Response，每个调用方各自解析JSON，互不影响
+            # 已映射的GET请求可对冲：对冲在合并之内，被合并的请求共享对冲后的结果
+            route_label = self._get_route_label(method, path, new_method)
+
+            def execute_once():
+                return self._execute_request_with_retry(
+                    method=new_method,
+                    url=full_url,
+                    request_data=request_data,
+                    params=query_params
+                )
+
+            def send_request():
+                if self.hedging_enabled and new_method == "GET" and (method.upper(), path) in self.path_mappings:
+                    return self.hedger.run(route_label, execute_once)
+                return execute_once()
+
+            if self.coalescing_enabled and new_method == "GET":
+                flight_key = cache_key or build_cache_key(validated_user_id, new_method, new_path, query_params)
+                response = await self.single_flight.do(
+                    (flight_key, cache_generation),
+                    send_request,
+                    route=route_label
+                )
+            else:
+                response = await send_request()
 
             self.logger.debug(f"微服务响应状态: {response.status_code}")
 
@@ -659,6 +892,10 @@ class EnhancedTaskMicroserviceClient:
                 if "message" not in response_data:
                     response_data["message"] = "success" if response_data.get("success") else "error"
 
+                # 只缓存成功的响应
+                if cache_key is not None and response_data.get("success"):
+                    self.response_cache.set(cache_key, response_data, self.cache_ttl, generation=cache_generation)
+
             return response_data
 
         except Exception as e:
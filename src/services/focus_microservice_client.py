@@ -7,6 +7,7 @@ Focus微服务客户端
 import httpx
 from typing import Dict, Any
 from src.api.config import config
+from src.services.circuit_breaker import create_breaker_transport
 
 
 class FocusMicroserviceClient:
@@ -17,9 +18,12 @@ class FocusMicroserviceClient:
         self.client = httpx.AsyncClient(
             base_url=self.base_url,
             timeout=config.focus_service_timeout,
-            limits=httpx.Limits(
-                max_connections=100,
-                max_keepalive_connections=20
+            transport=create_breaker_transport(
+                "focus",
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20
+                )
             )
         )
 
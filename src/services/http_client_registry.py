@@ -0,0 +1,126 @@
+"""
+HTTP客户端注册表
+
+为每个上游微服务提供一个长生命周期、带连接池的httpx.AsyncClient，
+替代"每次调用创建一个AsyncClient"的写法，使连接可以保持（keep-alive）并复用。
+
+核心功能：
+1. 按上游服务名复用客户端：同一进程内同名上游共享一个连接池
+2. 按上游配置连接限制、超时和HTTP/2
+3. 集成熔断传输层：与circuit_breaker模块共享熔断状态
+4. 生命周期管理：在FastAPI的lifespan关闭阶段统一关闭所有客户端
+
+使用方式：
+    client = get_http_client_registry().get_client(
+        "auth",
+        timeout=httpx.Timeout(30.0),
+        limits=httpx.Limits(max_connections=20),
+        http2=True
+    )
+    response = await client.get(url)  # 不要用 async with，客户端由注册表负责关闭
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.services.circuit_breaker import create_breaker_transport
+
+
+class HTTPClientRegistry:
+    """
+    HTTP客户端注册表
+
+    客户端被关闭后（例如应用重启lifespan），下一次获取时会自动重建。
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get_client(
+        self,
+        name: str,
+        timeout: Optional[httpx.Timeout] = None,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False
+    ) -> httpx.AsyncClient:
+        """
+        获取指定上游服务的共享客户端
+
+        首次获取时按传入配置创建，后续调用直接返回已有实例（配置参数被忽略）。
+
+        Args:
+            name (str): 上游服务名，如 task、auth
+            timeout (httpx.Timeout, optional): 超时配置
+            limits (httpx.Limits, optional): 连接池限制
+            http2 (bool): 是否启用HTTP/2
+
+        Returns:
+            httpx.AsyncClient: 共享客户端实例
+        """
+        client = self._clients.get(name)
+        if client is not None and not client.is_closed:
+            return client
+
+        client = httpx.AsyncClient(
+            timeout=timeout or httpx.Timeout(30.0),
+            transport=create_breaker_transport(
+                name,
+                limits=limits or httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                http2=http2
+            )
+        )
+        self._clients[name] = client
+        self.logger.info(f"创建共享HTTP客户端: {name}, http2={http2}")
+        return client
+
+    async def close_all(self) -> None:
+        """关闭所有共享客户端"""
+        clients = list(self._clients.items())
+        self._clients.clear()
+        for name, client in clients:
+            try:
+                await client.aclose()
+                self.logger.info(f"共享HTTP客户端已关闭: {name}")
+            except Exception as e:
+                self.logger.error(f"关闭共享HTTP客户端失败: {name}, error={e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取注册表状态
+
+        Returns:
+            Dict[str, Any]: 各上游客户端是否处于打开状态
+        """
+        return {
+            name: {"closed": client.is_closed}
+            for name, client in self._clients.items()
+        }
+
+
+# 全局注册表实例
+_http_client_registry: Optional[HTTPClientRegistry] = None
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    """
+    获取全局HTTP客户端注册表（单例模式）
+
+    Returns:
+        HTTPClientRegistry: 注册表实例
+    """
+    global _http_client_registry
+    if _http_client_registry is None:
+        _http_client_registry = HTTPClientRegistry()
+    return _http_client_registry
+
+
+async def close_http_clients() -> None:
+    """关闭全局注册表中的所有客户端，在应用关闭时调用"""
+    if _http_client_registry is not None:
+        await _http_client_registry.close_all()
@@ -0,0 +1,278 @@
+"""
+请求对冲（Hedged Requests）
+
+针对延迟敏感的幂等读请求：主请求在动态阈值内未返回时，再发出一个相同的对冲请求，
+取先成功返回的结果并取消另一个。用少量额外上游负载换取尾延迟（p99）的下降。
+
+核心功能：
+1. 动态阈值：按路由维护滚动延迟窗口，以指定分位数（默认p95）作为对冲触发阈值，
+   并限制在[min_delay, max_delay]之间；样本不足时不对冲
+2. 全局对冲预算：令牌桶，每个主请求积累budget_ratio个令牌，每次对冲消耗1个，
+   保证对冲带来的额外上游请求不超过主请求数的budget_ratio（外加少量突发）
+3. 先到先得：任一请求成功即返回并取消另一个；一个失败时继续等待另一个
+4. 统计：按路由的请求数、对冲数、对冲获胜数和当前阈值
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """
+    按路由的滚动延迟窗口
+
+    阈值在每积累refresh_interval个新样本后重新计算，避免每个请求都排序。
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        window_size: int = 200,
+        min_samples: int = 20,
+        refresh_interval: int = 10
+    ):
+        """
+        初始化延迟统计
+
+        Args:
+            percentile (float): 阈值分位数，0-1之间
+            window_size (int): 每个路由保留的最近样本数
+            min_samples (int): 计算阈值所需的最少样本数
+            refresh_interval (int): 每隔多少个新样本重新计算一次阈值
+        """
+        self.percentile = percentile
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.refresh_interval = max(1, refresh_interval)
+        self._samples: Dict[str, Deque[float]] = {}
+        self._thresholds: Dict[str, float] = {}
+        self._since_refresh: Dict[str, int] = {}
+
+    def record(self, route: str, duration: float) -> None:
+        """
+        记录一次请求耗时
+
+        Args:
+            route (str): 路由标签
+            duration (float): 耗时（秒）
+        """
+        samples = self._samples.get(route)
+        if samples is None:
+            samples = self._samples[route] = deque(maxlen=self.window_size)
+        samples.append(duration)
+
+        count = self._since_refresh.get(route, 0) + 1
+        if count >= self.refresh_interval or route not in self._thresholds:
+            self._refresh(route)
+            count = 0
+        self._since_refresh[route] = count
+
+    def _refresh(self, route: str) -> None:
+        samples = self._samples[route]
+        if len(samples) < self.min_samples:
+            return
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile))
+        self._thresholds[route] = ordered[index]
+
+    def get_percentile(self, route: str) -> Optional[float]:
+        """
+        获取路由当前的分位数延迟
+
+        Args:
+            route (str): 路由标签
+
+        Returns:
+            Optional[float]: 分位数延迟（秒），样本不足时返回None
+        """
+        return self._thresholds.get(route)
+
+
+class HedgeBudget:
+    """
+    对冲预算（令牌桶）
+
+    在单事件循环中使用，所有操作都是同步的，不需要加锁。
+    """
+
+    def __init__(self, ratio: float = 0.05, max_tokens: float = 10.0):
+        """
+        初始化对冲预算
+
+        Args:
+            ratio (float): 每个主请求积累的令牌数，即对冲请求占主请求的最大比例
+            max_tokens (float): 令牌上限，决定允许的最大突发对冲数
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+
+    def on_request(self) -> None:
+        """记录一个主请求，积累令牌"""
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """
+        尝试消耗一个令牌发出对冲请求
+
+        Returns:
+            bool: 是否允许对冲
+        """
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class RequestHedger:
+    """
+    请求对冲执行器
+    """
+
+    def __init__(
+        self,
+        tracker: Optional[LatencyTracker] = None,
+        budget: Optional[HedgeBudget] = None,
+        min_delay: float = 0.05,
+        max_delay: float = 2.0
+    ):
+        """
+        初始化对冲执行器
+
+        Args:
+            tracker (LatencyTracker, optional): 延迟统计
+            budget (HedgeBudget, optional): 对冲预算
+            min_delay (float): 对冲阈值下限（秒），避免对极快的路由过度对冲
+            max_delay (float): 对冲阈值上限（秒）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.tracker = tracker or LatencyTracker()
+        self.budget = budget or HedgeBudget()
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._route_stats: Dict[str, Dict[str, int]] = {}
+
+    def get_hedge_delay(self, route: str) -> Optional[float]:
+        """
+        获取路由的对冲触发阈值
+
+        Args:
+            route (str): 路由标签
+
+        Returns:
+            Optional[float]: 阈值（秒），样本不足时返回None（不对冲）
+        """
+        percentile = self.tracker.get_percentile(route)
+        if percentile is None:
+            return None
+        return min(self.max_delay, max(self.min_delay, percentile))
+
+    def _stats(self, route: str) -> Dict[str, int]:
+        stats = self._route_stats.get(route)
+        if stats is None:
+            stats = self._route_stats[route] = {
+                "requests": 0,
+                "hedged": 0,
+                "hedge_wins": 0,
+                "budget_denied": 0
+            }
+        return stats
+
+    async def run(self, route: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行请求，超过阈值未返回时发出对冲请求
+
+        func必须是幂等的，可能被调用两次。
+
+        Args:
+            route (str): 路由标签（同一路由共享延迟统计）
+            func (Callable[[], Awaitable[T]]): 发起一次请求的协程工厂
+
+        Returns:
+            T: 先成功返回的请求结果
+
+        Raises:
+            Exception: 所有请求都失败时抛出主请求的异常
+        """
+        stats = self._stats(route)
+        stats["requests"] += 1
+        self.budget.on_request()
+        delay = self.get_hedge_delay(route)
+
+        start = time.monotonic()
+        primary = asyncio.ensure_future(func())
+        hedge: Optional["asyncio.Future[T]"] = None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done:
+                    if self.budget.try_acquire():
+                        stats["hedged"] += 1
+                        self.logger.debug(f"请求对冲: route={route}, delay={delay:.3f}s")
+                        hedge_start = time.monotonic()
+                        hedge = asyncio.ensure_future(func())
+                    else:
+                        stats["budget_denied"] += 1
+
+            if hedge is None:
+                result = await primary
+                self.tracker.record(route, time.monotonic() - start)
+                return result
+
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled() or task.exception() is not None:
+                        continue
+                    if task is hedge:
+                        stats["hedge_wins"] += 1
+                        self.tracker.record(route, time.monotonic() - hedge_start)
+                    else:
+                        self.tracker.record(route, time.monotonic() - start)
+                    return task.result()
+
+            # 两个请求都失败，以主请求的异常为准
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取对冲统计信息
+
+        Returns:
+            Dict[str, Any]: 总请求数、对冲数、对冲比例、剩余令牌以及按路由的统计和当前阈值
+        """
+        total_requests = sum(stats["requests"] for stats in self._route_stats.values())
+        total_hedged = sum(stats["hedged"] for stats in self._route_stats.values())
+        routes = {}
+        for route, stats in self._route_stats.items():
+            delay = self.get_hedge_delay(route)
+            routes[route] = {
+                **stats,
+                "hedge_delay_ms": round(delay * 1000, 2) if delay is not None else None
+            }
+        return {
+            "requests": total_requests,
+            "hedged": total_hedged,
+            "hedge_ratio": round(total_hedged / total_requests, 4) if total_requests else 0.0,
+            "budget_ratio": self.budget.ratio,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "routes": routes
+        }
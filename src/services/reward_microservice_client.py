@@ -8,6 +8,7 @@ Reward微服务客户端（增强版）
 import httpx
 from typing import Dict, Any
 from src.api.config import config
+from src.services.circuit_breaker import create_breaker_transport
 
 
 class RewardMicroserviceClient:
@@ -18,9 +19,12 @@ class RewardMicroserviceClient:
         self.client = httpx.AsyncClient(
             base_url=self.base_url,
             timeout=config.reward_service_timeout,
-            limits=httpx.Limits(
-                max_connections=100,
-                max_keepalive_connections=20
+            transport=create_breaker_transport(
+                "reward",
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20
+                )
             )
         )
 
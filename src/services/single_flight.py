@@ -0,0 +1,93 @@
+"""
+请求合并（Single-Flight）
+
+对并发的相同幂等请求只发起一次上游调用，所有等待者共享同一个结果。
+典型场景：客户端重连时并发发出多个相同的 GET /tasks 请求。
+
+核心功能：
+1. 按请求键合并进行中的调用，后到的请求直接等待已有的上游调用
+2. 上游调用运行在独立Task中，单个调用方被取消不会影响其他等待者
+3. 按路由统计请求数、上游调用数和被合并的请求数
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    进行中请求合并器
+
+    同一时刻每个键最多只有一个上游调用在执行；调用完成（成功或失败）后立即移除，
+    之后的同键请求会发起新的调用，因此不会产生陈旧结果。
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._route_stats: Dict[str, Dict[str, int]] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[T]],
+        route: str = "default"
+    ) -> T:
+        """
+        执行或加入一个进行中的调用
+
+        Args:
+            key (Hashable): 请求键，相同键的并发请求会被合并
+            func (Callable[[], Awaitable[T]]): 发起上游调用的工厂函数
+            route (str): 统计用的路由标签
+
+        Returns:
+            T: 上游调用结果（异常会传播给所有等待者）
+        """
+        stats = self._route_stats.setdefault(
+            route, {"requests": 0, "upstream_calls": 0, "deduplicated": 0}
+        )
+        stats["requests"] += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            stats["deduplicated"] += 1
+            self.logger.debug(f"合并进行中的请求: route={route}")
+        else:
+            stats["upstream_calls"] += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, k=key: self._on_done(k, done))
+
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        """调用完成后移除进行中记录，并标记异常已被读取"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取合并统计信息
+
+        Returns:
+            Dict[str, Any]: 进行中的调用数以及按路由的计数
+        """
+        total_requests = sum(s["requests"] for s in self._route_stats.values())
+        total_deduplicated = sum(s["deduplicated"] for s in self._route_stats.values())
+        return {
+            "in_flight": len(self._inflight),
+            "requests": total_requests,
+            "deduplicated": total_deduplicated,
+            "dedup_ratio": round(total_deduplicated / total_requests, 4) if total_requests else 0.0,
+            "routes": {route: dict(stats) for route, stats in self._route_stats.items()}
+        }
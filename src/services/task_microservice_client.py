@@ -42,6 +42,7 @@ import httpx
 from pydantic import BaseModel
 
 from src.api.config import config
+from src.services.http_client_registry import get_http_client_registry
 
 
 class TaskMicroserviceError(Exception):
@@ -82,6 +83,25 @@ class TaskMicroserviceClient:
             pool=60.0     # 连接池超时60秒
         )
 
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        获取共享的HTTP客户端
+
+        连接池由HTTP客户端注册表管理，在应用关闭时统一释放，调用方不要关闭它。
+
+        Returns:
+            httpx.AsyncClient: 长连接复用的客户端实例
+        """
+        return get_http_client_registry().get_client(
+            "task",
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=getattr(config, 'task_service_max_connections', 100),
+                max_keepalive_connections=getattr(config, 'task_service_max_keepalive_connections', 20)
+            ),
+            http2=True
+        )
+
     def _get_headers(self) -> Dict[str, str]:
         """
         获取HTTP请求头
@@ -239,80 +259,80 @@ class TaskMicroserviceClient:
             query_params["user_id"] = user_id
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                self.logger.debug(f"调用微服务: {method} {url}, params={query_params}")
-
-                # 发送HTTP请求
-                response = await client.request(
-                    method=method.upper(),
-                    url=url,
-                    json=request_data,
-                    params=query_params,
-                    headers=self._get_headers()
-                )
-
-                self.logger.debug(f"微服务响应: status={response.status_code}")
-
-                # 记录响应状态和内容
-                self.logger.debug(f"微服务响应状态: {response.status_code}")
-                self.logger.debug(f"微服务响应头: {dict(response.headers)}")
-
-                # 解析响应内容
-                response_data = None
-                try:
-                    response_data = response.json()
-                    self.logger.debug(f"微服务响应JSON: {response_data}")
-                except Exception as e:
-                    self.logger.error(f"解析响应JSON失败: {e}")
-                    self.logger.error(f"原始响应内容: {response.text}")
-
-                    # 检查是否是连接错误
-                    if response.status_code == 0:
-                        return {
-                            "code": 503,
-                            "data": None,
-                            "message": "微服务不可用，请检查微服务状态"
-                        }
+            client = self._get_http_client()
+            self.logger.debug(f"调用微服务: {method} {url}, params={query_params}")
+
+            # 发送HTTP请求
+            response = await client.request(
+                method=method.upper(),
+                url=url,
+                json=request_data,
+                params=query_params,
+                headers=self._get_headers()
+            )
 
-                    # 如果无法解析JSON，检查状态码
-                    if response.status_code >= 400:
-                        return {
-                            "code": response.status_code,
-                            "data": None,
-                            "message": f"微服务返回错误: HTTP {response.status_code}"
-                        }
+            self.logger.debug(f"微服务响应: status={response.status_code}")
+
+            # 记录响应状态和内容
+            self.logger.debug(f"微服务响应状态: {response.status_code}")
+            self.logger.debug(f"微服务响应头: {dict(response.headers)}")
 
-                    # 其他情况，构造基础错误响应
+            # 解析响应内容
+            response_data = None
+            try:
+                response_data = response.json()
+                self.logger.debug(f"微服务响应JSON: {response_data}")
+            except Exception as e:
+                self.logger.error(f"解析响应JSON失败: {e}")
+                self.logger.error(f"原始响应内容: {response.text}")
+
+                # 检查是否是连接错误
+                if response.status_code == 0:
                     return {
-                        "code": 500,
+                        "code": 503,
                         "data": None,
-                        "message": f"微服务响应格式错误: {response.text[:100]}"
+                        "message": "微服务不可用，请检查微服务状态"
                     }
 
-                # 检查HTTP状态码
+                # 如果无法解析JSON，检查状态码
                 if response.status_code >= 400:
-                    error_code = self.map_error_status(response.status_code, response_data)
-                    error_message = response_data.get("message", f"HTTP {response.status_code}")
-
                     return {
-                        "code": error_code,
+                        "code": response.status_code,
                         "data": None,
-                        "message": error_message
+                        "message": f"微服务返回错误: HTTP {response.status_code}"
                     }
 
-                # 转换响应格式
-                transformed_response = self.transform_response(response_data)
+                # 其他情况，构造基础错误响应
+                return {
+                    "code": 500,
+                    "data": None,
+                    "message": f"微服务响应格式错误: {response.text[:100]}"
+                }
 
-                # 特殊处理：检查是否是"接口不存在"错误
-                if (not transformed_response.get("success", True) and
-                    "接口不存在" in transformed_response.get("message", "")):
-                    return {
-                        "code": 501,
-                        "data": None,
-                        "message": f"功能暂未实现：{path} 接口尚未在微服务中实现"
-                    }
+            # 检查HTTP状态码
+            if response.status_code >= 400:
+                error_code = self.map_error_status(response.status_code, response_data)
+                error_message = response_data.get("message", f"HTTP {response.status_code}")
 
-                return transformed_response
+                return {
+                    "code": error_code,
+                    "data": None,
+                    "message": error_message
+                }
+
+            # 转换响应格式
+            transformed_response = self.transform_response(response_data)
+
+            # 特殊处理：检查是否是"接口不存在"错误
+            if (not transformed_response.get("success", True) and
+                "接口不存在" in transformed_response.get("message", "")):
+                return {
+                    "code": 501,
+                    "data": None,
+                    "message": f"功能暂未实现：{path} 接口尚未在微服务中实现"
+                }
+
+            return transformed_response
 
         except httpx.TimeoutException as e:
             self.logger.error(f"微服务调用超时: {url}")
@@ -345,12 +365,12 @@ class TaskMicroserviceClient:
             bool: 微服务是否可用
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/health",
-                    headers=self._get_headers()
-                )
-                return response.status_code == 200
+            client = self._get_http_client()
+            response = await client.get(
+                f"{self.base_url}/health",
+                headers=self._get_headers()
+            )
+            return response.status_code == 200
         except Exception as e:
             self.logger.warning(f"微服务健康检查失败: {e}")
             return False
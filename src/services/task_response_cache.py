@@ -0,0 +1,248 @@
+"""
+Task微服务响应缓存
+
+为EnhancedTaskMicroserviceClient提供按用户隔离的读穿透缓存（read-through cache），
+用于吸收移动端对任务列表、标签等只读接口的高频重复轮询。
+
+核心功能：
+1. 缓存键：(user_id, 映射后的方法和路径, 规范化后的查询参数)
+2. TTL过期 + 容量上限（LRU淘汰）
+3. 按用户显式失效：创建/更新/删除/完成任务后清除该用户的全部缓存
+4. 按用户的失效代数：每次失效递增，读请求发起前记下代数，
+   响应返回时代数已变化（期间发生过写操作）则不写入缓存
+5. 指标统计：命中率、条目数、淘汰次数、失效次数
+
+一致性策略：缓存只在进程内，本进程的写操作立即失效；其他worker或其他服务的写操作
+最多在TTL（默认5秒）内不可见。条件GET（conditional_get）的ETag记录采用同一策略，
+max_age默认与本缓存TTL相同。
+
+设计原则：
+1. 可插拔：客户端只依赖ResponseCacheBackend接口，可替换为Redis等共享实现
+2. 隔离性：返回数据均为深拷贝，调用方修改不会污染缓存
+3. 线程安全：聊天工具在线程池中执行写操作后也会失效缓存，所有操作在一把短锁内完成，不跨await
+
+作者：TaKeKe团队
+版本：1.0.0
+"""
+
+import copy
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+CacheKey = Tuple[str, str, str, str]
+
+
+def build_cache_key(
+    user_id: str,
+    method: str,
+    path: str,
+    params: Optional[Dict[str, Any]] = None
+) -> CacheKey:
+    """
+    构建缓存键
+
+    查询参数按键排序后序列化，None值会被忽略，
+    保证 {"page": 1, "status": None} 与 {"page": 1} 命中同一缓存。
+
+    Args:
+        user_id (str): 用户ID
+        method (str): 映射后的HTTP方法
+        path (str): 映射后的微服务路径
+        params (Dict[str, Any], optional): 查询参数
+
+    Returns:
+        CacheKey: 缓存键
+    """
+    normalized = {
+        str(key): value
+        for key, value in (params or {}).items()
+        if value is not None
+    }
+    normalized_params = json.dumps(normalized, sort_keys=True, default=str, ensure_ascii=False)
+    return (user_id, method.upper(), path, normalized_params)
+
+
+class ResponseCacheBackend(ABC):
+    """响应缓存后端抽象接口"""
+
+    @abstractmethod
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """读取缓存，未命中或已过期时返回None"""
+        pass
+
+    @abstractmethod
+    def set(
+        self,
+        key: CacheKey,
+        value: Dict[str, Any],
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None
+    ) -> None:
+        """写入缓存；指定generation且该用户的失效代数已变化时不写入"""
+        pass
+
+    @abstractmethod
+    def get_generation(self, user_id: str) -> int:
+        """获取用户当前的失效代数"""
+        pass
+
+    @abstractmethod
+    def invalidate_user(self, user_id: str) -> int:
+        """清除指定用户的全部缓存并递增失效代数，返回清除的条目数"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """清空缓存"""
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        pass
+
+
+class InMemoryResponseCache(ResponseCacheBackend):
+    """
+    进程内响应缓存（LRU + TTL）
+
+    使用OrderedDict维护访问顺序，并为每个用户维护键索引，
+    使按用户失效的代价只与该用户的条目数相关。
+
+    失效代数取自全局递增序号，最多记录max_entries个用户；被淘汰用户的代数
+    计入下限，未记录用户的代数取下限，淘汰只会让代数变大（多跳过一次写入），
+    不会让已失效的代数重新匹配。
+    """
+
+    def __init__(self, default_ttl: float = 5.0, max_entries: int = 10000):
+        """
+        初始化进程内缓存
+
+        Args:
+            default_ttl (float): 默认过期时间（秒）
+            max_entries (int): 最大条目数，超出后淘汰最久未使用的条目
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._user_index: Dict[str, Set[CacheKey]] = {}
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._generation_sequence = 0
+        self._generation_floor = 0
+        self._lock = threading.Lock()
+
+        # 统计计数器
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes_skipped = 0
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(
+        self,
+        key: CacheKey,
+        value: Dict[str, Any],
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None
+    ) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            if generation is not None and generation != self._get_generation(key[0]):
+                # 读请求进行期间该用户发生过写操作，响应可能是写之前的数据
+                self.stale_writes_skipped += 1
+                return
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._user_index.setdefault(key[0], set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def get_generation(self, user_id: str) -> int:
+        with self._lock:
+            return self._get_generation(user_id)
+
+    def invalidate_user(self, user_id: str) -> int:
+        with self._lock:
+            self._generation_sequence += 1
+            self._generations[user_id] = self._generation_sequence
+            self._generations.move_to_end(user_id)
+            while len(self._generations) > max(1, self.max_entries):
+                _, evicted = self._generations.popitem(last=False)
+                self._generation_floor = max(self._generation_floor, evicted)
+
+            keys = self._user_index.pop(user_id, None)
+            if not keys:
+                return 0
+
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_index.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "users": len(self._user_index),
+            "max_entries": self.max_entries,
+            "default_ttl": self.default_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_writes_skipped": self.stale_writes_skipped
+        }
+
+    def _get_generation(self, user_id: str) -> int:
+        """获取用户失效代数（调用方持有锁）"""
+        return self._generations.get(user_id, self._generation_floor)
+
+    def _remove(self, key: CacheKey) -> None:
+        """删除单个条目并维护用户索引"""
+        self._entries.pop(key, None)
+        user_keys = self._user_index.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_index[key[0]]
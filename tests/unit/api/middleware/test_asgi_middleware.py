@@ -0,0 +1,207 @@
+"""
+纯ASGI中间件单元测试
+
+测试覆盖：
+- 日志、安全中间件添加响应头
+- 读取请求体的中间件向路由回放完整请求体
+- 限流返回429及限流头
+- 异常处理中间件返回统一JSON错误
+- 流式响应逐块透传
+- 认证中间件缺少令牌时返回401
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+from unittest.mock import AsyncMock, patch
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.api.config import config
+from src.api.middleware import (
+    AuthMiddleware,
+    ExceptionHandlerMiddleware,
+    LoggingMiddleware,
+    RateLimitMiddleware,
+    SecurityMiddleware
+)
+from src.api.middleware.auth import RefreshTokenMiddleware
+from src.api.middleware.security import InputValidationMiddleware
+
+
+def _build_app(*middlewares) -> FastAPI:
+    """按给定顺序（由外到内）构建应用"""
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"body": await request.json()}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    for middleware in reversed(middlewares):
+        app.add_middleware(middleware)
+    return app
+
+
+class TestResponseHeaders:
+    """响应头测试"""
+
+    def test_logging_adds_request_headers(self):
+        client = TestClient(_build_app(LoggingMiddleware))
+
+        response = client.post("/echo", json={"name": "test"})
+
+        assert response.status_code == 200
+        assert response.json() == {"body": {"name": "test"}}
+        assert response.headers["X-Request-ID"]
+        assert "X-Process-Time" in response.headers
+
+    def test_security_headers_and_csrf_cookie(self):
+        client = TestClient(_build_app(SecurityMiddleware))
+
+        response = client.get("/stream")
+
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        if config.csrf_protection:
+            assert "csrf_token" in response.cookies
+            assert response.headers["X-CSRF-Token"] == response.cookies["csrf_token"]
+
+
+class TestRequestBodyReplay:
+    """请求体回放测试"""
+
+    def test_full_stack_replays_body(self):
+        client = TestClient(_build_app(
+            ExceptionHandlerMiddleware, LoggingMiddleware, SecurityMiddleware, InputValidationMiddleware
+        ))
+
+        response = client.post("/echo", json={"items": list(range(100))})
+
+        assert response.status_code == 200
+        assert response.json() == {"body": {"items": list(range(100))}}
+
+    def test_dangerous_body_rejected(self):
+        client = TestClient(_build_app(InputValidationMiddleware))
+
+        response = client.post("/echo", json={"q": "<script>alert(1)</script>"})
+
+        assert response.status_code == 400
+        assert response.json()["code"] == 400
+
+
+class TestRateLimit:
+    """限流测试"""
+
+    def test_rate_limit_returns_429(self, monkeypatch):
+        monkeypatch.setattr(config, "rate_limit_enabled", True)
+        monkeypatch.setattr(config, "rate_limit_requests_per_minute", 2)
+        client = TestClient(_build_app(RateLimitMiddleware))
+
+        first = client.get("/stream")
+        assert first.headers["x-rate-limit-limit"] == "2"
+        assert first.headers["x-rate-limit-remaining"] == "1"
+
+        client.get("/stream")
+        limited = client.get("/stream")
+
+        assert limited.status_code == 429
+        assert limited.json()["code"] == 429
+
+
+class TestExceptionHandler:
+    """异常处理测试"""
+
+    def test_unhandled_exception_returns_500_json(self):
+        client = TestClient(_build_app(ExceptionHandlerMiddleware), raise_server_exceptions=False)
+
+        response = client.get("/boom")
+
+        assert response.status_code == 500
+        assert response.json()["code"] == 500
+
+    def test_not_found_passes_through(self):
+        client = TestClient(_build_app(ExceptionHandlerMiddleware))
+
+        response = client.get("/missing")
+
+        assert response.status_code == 404
+
+
+class TestStreaming:
+    """流式响应测试"""
+
+    def test_streaming_passes_through_full_stack(self, monkeypatch):
+        monkeypatch.setattr(config, "rate_limit_enabled", True)
+        client = TestClient(_build_app(
+            ExceptionHandlerMiddleware, LoggingMiddleware, SecurityMiddleware,
+            RateLimitMiddleware, InputValidationMiddleware
+        ))
+
+        with client.stream("GET", "/stream") as response:
+            chunks = list(response.iter_text())
+
+        assert "".join(chunks) == "chunk-0\nchunk-1\nchunk-2\n"
+        assert "X-Request-ID" in response.headers
+
+
+class TestAuth:
+    """认证中间件测试"""
+
+    def test_missing_token_returns_401(self):
+        client = TestClient(_build_app(ExceptionHandlerMiddleware, AuthMiddleware))
+
+        response = client.get("/stream")
+
+        assert response.status_code == 401
+        assert response.json()["code"] == 401
+
+    def test_public_path_skips_auth(self):
+        app = _build_app(ExceptionHandlerMiddleware, AuthMiddleware)
+
+        @app.get("/health")
+        async def health():
+            return {"ok": True}
+
+        assert TestClient(app).get("/health").status_code == 200
+
+    def test_valid_token_sets_user_state(self):
+        app = _build_app(AuthMiddleware)
+
+        @app.get("/whoami")
+        async def whoami(request: Request):
+            return {"user_id": request.state.user_id}
+
+        context = AsyncMock(return_value=type("Ctx", (), {
+            "error": None,
+            "result": type("Res", (), {"payload": {"sub": "user-1", "is_guest": False}})()
+        })())
+        with patch("src.api.middleware.auth_microservice.resolve_auth_context", context):
+            response = TestClient(app).get("/whoami", headers={"Authorization": "Bearer t"})
+
+        assert response.json() == {"user_id": "user-1"}
+
+    def test_refresh_token_read_from_body(self):
+        app = FastAPI()
+        app.add_middleware(RefreshTokenMiddleware)
+
+        @app.post("/auth/token/refresh")
+        async def refresh(request: Request):
+            body = await request.json()
+            return {"state": request.state.refresh_token, "body": body["refresh_token"]}
+
+        response = TestClient(app).post("/auth/token/refresh", json={"refresh_token": "r1"})
+
+        assert response.json() == {"state": "r1", "body": "r1"}
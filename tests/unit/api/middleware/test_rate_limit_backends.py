@@ -0,0 +1,165 @@
+"""
+限流后端单元测试
+
+测试覆盖：
+- 多个worker（多个后端实例）共享同一SQLite文件时总放行数不超过限制
+- 远离限制时用预留配额本地放行，不是每个请求都访问共享存储
+- 预留的配额对其他worker可见
+- 超限后在本地缓存拒绝结果
+- 同一键不同限制档位不共用预留配额
+- 共享存储不可用时退化为进程内计数
+- 按配置创建后端
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.config import config
+from src.api.middleware.rate_limit import RateLimitMiddleware
+from src.api.middleware.rate_limiter import (
+    InProcessRateLimitBackend,
+    RateLimitBackend,
+    SQLiteRateLimitBackend,
+    create_rate_limit_backend
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "rate_limit.db")
+
+
+class TestSQLiteRateLimitBackend:
+    """SQLite共享限流后端测试"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("workers, limit", [(3, 20), (8, 60), (8, 1000)])
+    async def test_limit_shared_across_workers(self, db_path, workers, limit):
+        backends = [SQLiteRateLimitBackend(db_path) for _ in range(workers)]
+
+        allowed = 0
+        for i in range(limit * 3):
+            decision = await backends[i % workers].hit("ip:1", limit)
+            allowed += decision.allowed
+
+        # 进程内计数时每个worker各自放行limit个；共享后总数不超过limit，
+        # 窗口末尾各worker未用完的预留最多各浪费少量配额
+        assert limit - workers <= allowed <= limit
+        for backend in backends:
+            await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_local_admission_far_from_limit(self, db_path):
+        backend = SQLiteRateLimitBackend(db_path, lease_size=20)
+
+        for _ in range(100):
+            assert (await backend.hit("ip:1", 1000)).allowed
+
+        stats = backend.get_stats()
+        assert stats["reservations"] == 5
+        assert stats["local_decisions"] == 95
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_reservations_visible_to_other_workers(self, db_path):
+        first = SQLiteRateLimitBackend(db_path, lease_size=10)
+        await first.hit("user:1", 100)
+
+        second = SQLiteRateLimitBackend(db_path, lease_size=10)
+        decision = await second.hit("user:1", 100)
+
+        # 第一个worker预留了10个配额
+        assert decision.remaining == 89
+        await first.close()
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_denial_cached_locally(self, db_path):
+        backend = SQLiteRateLimitBackend(db_path)
+        for _ in range(3):
+            await backend.hit("ip:1", 3)
+
+        decisions = [await backend.hit("ip:1", 3) for _ in range(5)]
+
+        assert not any(d.allowed for d in decisions)
+        # 第一次拒绝访问共享存储，之后在本地拒绝
+        assert backend.get_stats()["reservations"] == 4
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_stricter_tier_does_not_spend_default_tier_lease(self, db_path):
+        sqlite_backend = SQLiteRateLimitBackend(db_path)
+        memory_backend = InProcessRateLimitBackend()
+
+        results = {}
+        for backend in (sqlite_backend, memory_backend):
+            # 默认档位（60/分钟）的3次请求后，同一IP尝试登录档位（5/分钟）
+            for _ in range(3):
+                assert (await backend.hit("ip:1", 60)).allowed
+            results[backend.name] = sum([(await backend.hit("ip:1", 5)).allowed for _ in range(30)])
+
+        # 默认档位预留但未用完的配额按已使用计入，共享后端只会更保守
+        assert results["memory"] == 2
+        assert results["sqlite"] <= results["memory"]
+        await sqlite_backend.close()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_counts_on_store_error(self, db_path):
+        backend = SQLiteRateLimitBackend(db_path)
+
+        with patch.object(backend, "_reserve_db", side_effect=sqlite3.OperationalError("locked")):
+            decisions = [await backend.hit("ip:1", 3) for _ in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert backend.get_stats()["store_errors"] == 4
+        await backend.close()
+
+
+class TestCreateRateLimitBackend:
+    """后端工厂测试"""
+
+    def test_backend_interface_is_abstract(self):
+        with pytest.raises(TypeError):
+            RateLimitBackend()
+
+    def test_default_is_in_process(self):
+        assert isinstance(create_rate_limit_backend(SimpleNamespace()), InProcessRateLimitBackend)
+
+    def test_sqlite_backend(self, db_path):
+        backend = create_rate_limit_backend(SimpleNamespace(rate_limit_backend="sqlite", rate_limit_sqlite_path=db_path))
+        assert isinstance(backend, SQLiteRateLimitBackend)
+        assert backend.get_stats()["backend"] == "sqlite"
+
+
+class TestSharedRateLimitMiddleware:
+    """多worker共享限流中间件测试"""
+
+    def test_workers_share_quota(self, db_path, monkeypatch):
+        monkeypatch.setattr(config, "rate_limit_enabled", True)
+        monkeypatch.setattr(config, "rate_limit_requests_per_minute", 4)
+        monkeypatch.setattr(config, "rate_limit_backend", "sqlite")
+        monkeypatch.setattr(config, "rate_limit_sqlite_path", db_path)
+
+        clients = []
+        for _ in range(2):
+            app = FastAPI()
+
+            @app.get("/tasks")
+            async def tasks():
+                return {"ok": True}
+
+            app.add_middleware(RateLimitMiddleware)
+            clients.append(TestClient(app))
+
+        statuses = [clients[i % 2].get("/tasks").status_code for i in range(8)]
+
+        assert statuses.count(200) == 4
+        assert statuses.count(429) == 4
@@ -0,0 +1,102 @@
+"""
+滑动窗口限流器单元测试
+
+测试覆盖：
+- 窗口内超过限制时拒绝，被拒绝的请求不计数
+- 上一窗口的计数按剩余占比计入估算
+- 过期键增量清理
+- 分级限流中间件按端点使用不同限制
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.config import config
+from src.api.middleware.rate_limit import AdvancedRateLimitMiddleware
+from src.api.middleware.rate_limiter import SlidingWindowRateLimiter
+
+
+class TestSlidingWindowRateLimiter:
+    """滑动窗口限流器测试"""
+
+    def test_limit_within_window(self):
+        limiter = SlidingWindowRateLimiter(window_seconds=60)
+
+        decisions = [limiter.hit("ip:1", 3, now=1000.0) for _ in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+        assert decisions[0].reset_at == 1020.0
+        assert limiter.get_stats()["limited"] == 1
+
+    def test_keys_are_independent(self):
+        limiter = SlidingWindowRateLimiter(window_seconds=60)
+
+        limiter.hit("ip:1", 1, now=1000.0)
+
+        assert limiter.hit("ip:1", 1, now=1000.0).allowed is False
+        assert limiter.hit("ip:2", 1, now=1000.0).allowed is True
+
+    def test_previous_window_is_weighted(self):
+        limiter = SlidingWindowRateLimiter(window_seconds=60)
+        for _ in range(10):
+            limiter.hit("k", 10, now=1000.0)  # 窗口[960, 1020)
+
+        # 新窗口刚开始：上一窗口几乎全部计入
+        assert limiter.hit("k", 10, now=1021.0).allowed is False
+        # 新窗口过半：上一窗口计入一半，估算值5
+        decision = limiter.hit("k", 10, now=1050.0)
+        assert decision.allowed is True
+        assert decision.remaining == 4
+
+    def test_counts_reset_after_two_windows(self):
+        limiter = SlidingWindowRateLimiter(window_seconds=60)
+        for _ in range(5):
+            limiter.hit("k", 5, now=1000.0)
+
+        assert limiter.hit("k", 5, now=1200.0).remaining == 4
+
+    def test_incremental_cleanup(self):
+        limiter = SlidingWindowRateLimiter(window_seconds=60, cleanup_batch=2)
+        for i in range(5):
+            limiter.hit(f"old:{i}", 10, now=1000.0)
+        limiter.hit("recent", 10, now=1075.0)
+
+        # 每次请求最多清理2个过期键
+        limiter.hit("new", 10, now=1139.0)
+        assert len(limiter) == 5
+
+        limiter.cleanup(now=1139.0, max_items=100)
+        assert len(limiter) == 2
+        assert limiter.get_stats()["expired"] == 5
+
+
+class TestAdvancedRateLimitMiddleware:
+    """分级限流中间件测试"""
+
+    def test_endpoint_tiers(self, monkeypatch):
+        monkeypatch.setattr(config, "rate_limit_enabled", True)
+        app = FastAPI()
+
+        @app.post("/auth/sms/send")
+        async def send_sms():
+            return {"ok": True}
+
+        @app.get("/tasks")
+        async def tasks():
+            return {"ok": True}
+
+        app.add_middleware(AdvancedRateLimitMiddleware)
+        client = TestClient(app)
+
+        statuses = [client.post("/auth/sms/send").status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+
+        limited = client.post("/auth/sms/send")
+        assert int(limited.headers["Retry-After"]) >= 1
+
+        response = client.get("/tasks")
+        assert response.headers["x-rate-limit-limit"] == "60"
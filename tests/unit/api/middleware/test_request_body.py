@@ -0,0 +1,164 @@
+"""
+请求体缓冲单元测试
+
+测试覆盖：
+- 整个中间件栈只读取一次请求体，路由仍能拿到完整请求体
+- 缓冲的请求体和解析结果可通过request.state.request_body复用
+- 超过大小限制时返回413
+- 危险内容扫描（只检查解析后的字符串值，非法JSON跳过）
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import json
+
+import pytest
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import src.api.middleware.body as body_module
+from src.api.middleware import LoggingMiddleware, RequestBodyMiddleware
+from src.api.middleware.body import RequestBody, read_request_body
+from src.api.middleware.security import InputValidationMiddleware
+
+
+def _build_app(*middlewares) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        cached = request.state.request_body
+        return {"body": await request.json(), "cached": cached.json()}
+
+    for middleware in reversed(middlewares):
+        app.add_middleware(middleware)
+    return app
+
+
+class TestRequestBodyBuffering:
+    """请求体缓冲测试"""
+
+    def test_body_read_once_across_stack(self):
+        calls = []
+        original = body_module.buffer_request_body
+
+        async def counting_buffer(receive, max_size=None):
+            calls.append(max_size)
+            return await original(receive, max_size)
+
+        client = TestClient(_build_app(RequestBodyMiddleware, LoggingMiddleware, InputValidationMiddleware))
+        with patch.object(body_module, "buffer_request_body", counting_buffer):
+            response = client.post("/echo", json={"title": "任务", "items": [1, 2, 3]})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "body": {"title": "任务", "items": [1, 2, 3]},
+            "cached": {"title": "任务", "items": [1, 2, 3]}
+        }
+        assert len(calls) == 1
+
+    def test_inner_middleware_buffers_without_body_layer(self):
+        client = TestClient(_build_app(LoggingMiddleware, InputValidationMiddleware))
+
+        response = client.post("/echo", json={"a": 1})
+
+        assert response.json()["cached"] == {"a": 1}
+
+    def test_json_parsed_once(self):
+        body = RequestBody(b'{"a": [1, 2]}')
+
+        with patch.object(body_module.json, "loads", wraps=json.loads) as loads:
+            assert body.json() is body.json()
+
+        assert loads.call_count == 1
+
+    def test_invalid_json_raises_value_error(self):
+        body = RequestBody(b"{not json")
+
+        with pytest.raises(ValueError):
+            body.json()
+        with pytest.raises(ValueError):
+            body.json()
+
+
+class TestMaxBodySize:
+    """请求体大小限制测试"""
+
+    def test_declared_length_over_limit_returns_413(self, monkeypatch):
+        monkeypatch.setattr(body_module.config, "max_request_body_size", 16)
+        client = TestClient(_build_app(RequestBodyMiddleware))
+
+        response = client.post("/echo", json={"data": "x" * 100})
+
+        assert response.status_code == 413
+        assert response.json()["code"] == 413
+
+    def test_input_validation_enforces_limit(self, monkeypatch):
+        monkeypatch.setattr(body_module.config, "max_request_body_size", 16)
+        client = TestClient(_build_app(InputValidationMiddleware))
+
+        assert client.post("/echo", json={"data": "x" * 100}).status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_streamed_body_over_limit(self):
+        chunks = [
+            {"type": "http.request", "body": b"x" * 10, "more_body": True},
+            {"type": "http.request", "body": b"x" * 10, "more_body": False}
+        ]
+
+        async def receive():
+            return chunks.pop(0)
+
+        scope = {"type": "http", "method": "POST", "headers": [(b"content-type", b"application/json")]}
+        with pytest.raises(Exception) as exc_info:
+            await read_request_body(scope, receive, max_size=15)
+
+        assert exc_info.value.status_code == 413
+
+
+class TestDangerousContentScan:
+    """危险内容扫描测试"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(_build_app(RequestBodyMiddleware, InputValidationMiddleware))
+
+    @pytest.mark.parametrize("payload", [
+        {"q": "<script>alert(1)</script>"},
+        {"nested": {"list": ["ok", "1 UNION  SELECT password"]}},
+        {"link": "javascript:void(0)"},
+    ])
+    def test_dangerous_raw_body_rejected(self, client, payload):
+        assert client.post("/echo", json=payload).status_code == 400
+
+    def test_escaped_content_rejected(self, client):
+        raw = '{"q": "\\u003cscript\\u003ealert(1)\\u003c/script\\u003e"}'
+
+        response = client.post("/echo", content=raw, headers={"content-type": "application/json"})
+
+        assert response.status_code == 400
+
+    def test_safe_body_passes(self, client):
+        payload = {"title": "完成报告", "note": "select a table\nand drop the draft"}
+
+        response = client.post("/echo", json=payload)
+
+        assert response.status_code == 200
+        assert response.json()["body"] == payload
+
+    def test_only_string_values_are_checked(self, client):
+        payload = {"<script>x</script>": "ok", "count": 1}
+
+        assert client.post("/echo", json=payload).status_code == 200
+
+    def test_invalid_json_is_skipped(self):
+        middleware = InputValidationMiddleware(app=None)
+        body = RequestBody(b'{"q": "<script>alert(1)</script>"')
+
+        assert middleware._body_contains_dangerous_content(body) is False
+
+    def test_dangerous_query_rejected(self, client):
+        assert client.post("/echo?q=drop%20table%20users", json={}).status_code == 400
@@ -0,0 +1,144 @@
+"""
+请求级认证上下文单元测试
+
+测试覆盖：
+- 中间件和多个认证依赖在同一请求内只验证一次令牌
+- 验证失败结果同样被复用
+- 可选认证依赖在令牌无效时返回None
+- 环境开关只解析一次
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import pytest
+from unittest.mock import patch
+from uuid import uuid4
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+import src.api.auth_context as auth_context
+from src.api.dependencies import (
+    get_current_user_id,
+    get_current_user_id_optional,
+    get_current_user_info
+)
+from src.services.auth.jwt_validator import TokenValidationResult, UserInfo
+
+
+USER_ID = str(uuid4())
+
+
+def _result(user_id: str = USER_ID) -> TokenValidationResult:
+    payload = {"sub": user_id, "is_guest": False, "exp": 9999999999, "iat": 0, "token_type": "access"}
+    user_info = UserInfo(user_id=user_id, is_guest=False, exp=9999999999, iat=0, token_hash="h", cache_time=0)
+    return TokenValidationResult(payload=payload, user_info=user_info)
+
+
+class _ContextMiddleware(BaseHTTPMiddleware):
+    """与MicroserviceAuthMiddleware相同的方式在中间件中验证令牌"""
+
+    async def dispatch(self, request: Request, call_next):
+        auth_header = request.headers.get("Authorization", "")
+        if auth_header.startswith("Bearer "):
+            await auth_context.resolve_auth_context(request, auth_header[7:])
+        return await call_next(request)
+
+
+def _build_app(with_middleware: bool) -> FastAPI:
+    app = FastAPI()
+    if with_middleware:
+        app.add_middleware(_ContextMiddleware)
+
+    @app.get("/me")
+    async def me(
+        user_id=Depends(get_current_user_id),
+        info: TokenValidationResult = Depends(get_current_user_info),
+        optional_id=Depends(get_current_user_id_optional)
+    ):
+        return {"user_id": str(user_id), "sub": info.payload["sub"], "optional": str(optional_id)}
+
+    @app.get("/maybe")
+    async def maybe(optional_id=Depends(get_current_user_id_optional)):
+        return {"optional": optional_id}
+
+    return app
+
+
+class TestAuthContext:
+    """请求级认证上下文测试"""
+
+    @pytest.fixture
+    def validate(self):
+        calls = []
+
+        async def fake_validate(token):
+            calls.append(token)
+            if token == "bad":
+                raise HTTPException(status_code=401, detail="无效的认证令牌")
+            return _result()
+
+        auth_context.reset_auth_settings()
+        with patch.object(auth_context, "validate_jwt_token", side_effect=fake_validate):
+            yield calls
+        auth_context.reset_auth_settings()
+
+    @pytest.mark.parametrize("with_middleware", [False, True])
+    def test_single_validation_per_request(self, validate, with_middleware):
+        client = TestClient(_build_app(with_middleware))
+
+        response = client.get("/me", headers={"Authorization": "Bearer good"})
+
+        assert response.status_code == 200
+        assert response.json() == {"user_id": USER_ID, "sub": USER_ID, "optional": USER_ID}
+        assert validate == ["good"]
+
+        client.get("/me", headers={"Authorization": "Bearer good"})
+        assert validate == ["good", "good"]
+
+    def test_invalid_token_is_validated_once(self, validate):
+        client = TestClient(_build_app(False))
+
+        response = client.get("/me", headers={"Authorization": "Bearer bad"})
+
+        assert response.status_code == 401
+        assert validate == ["bad"]
+
+    def test_optional_dependency_returns_none_for_invalid_token(self, validate):
+        client = TestClient(_build_app(False))
+
+        response = client.get("/maybe", headers={"Authorization": "Bearer bad"})
+
+        assert response.status_code == 200
+        assert response.json() == {"optional": None}
+
+    def test_missing_token_returns_401(self, validate):
+        client = TestClient(_build_app(False))
+        assert client.get("/me").status_code == 401
+        assert validate == []
+
+    @pytest.mark.asyncio
+    async def test_direct_call_without_request(self, validate):
+        from fastapi.security import HTTPAuthorizationCredentials
+
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="good")
+        assert str(await get_current_user_id(credentials)) == USER_ID
+
+
+class TestAuthSettings:
+    """认证环境开关测试"""
+
+    def test_settings_resolved_once(self, monkeypatch):
+        auth_context.reset_auth_settings()
+        monkeypatch.setenv("ENVIRONMENT", "development")
+        monkeypatch.setenv("JWT_SKIP_SIGNATURE", "true")
+        assert auth_context.get_auth_settings().use_dev_validator is True
+
+        monkeypatch.setenv("JWT_SKIP_SIGNATURE", "false")
+        assert auth_context.get_auth_settings().use_dev_validator is True
+
+        auth_context.reset_auth_settings()
+        assert auth_context.get_auth_settings().use_dev_validator is False
+        auth_context.reset_auth_settings()
@@ -0,0 +1,201 @@
+"""
+异步聊天服务单元测试
+
+测试覆盖：
+- asend_message/aget_chat_history与同步接口读写同一份会话数据
+- 并发对话时等待LLM不阻塞事件循环
+- astream_message逐token产出，并报告工具调用进度
+- 异步检查点器在同一事件循环内复用，事件循环变化时重建
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, List, Optional
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel, FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.domains.chat.database import ChatDatabaseManager
+from src.domains.chat.graph import ChatGraph
+from src.domains.chat.service import ChatService
+
+
+class SlowChatModel(BaseChatModel):
+    """模拟LLM网络延迟的模型：同步版本阻塞线程，异步版本让出事件循环"""
+
+    delay: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="慢回复"))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="慢回复"))])
+
+
+@pytest.fixture
+def service(tmp_path):
+    manager = ChatDatabaseManager()
+    manager.db_path = str(tmp_path / "chat.db")
+    service = ChatService()
+    service.db_manager = manager
+    yield service
+    manager.close_checkpointer_pool()
+
+
+def use_model(model):
+    return patch.object(ChatGraph, "_get_model", lambda self: model)
+
+
+class TestAsyncChatService:
+    """异步聊天接口测试"""
+
+    @pytest.mark.asyncio
+    async def test_async_and_sync_share_sessions(self, service):
+        user_id = str(uuid.uuid4())
+        try:
+            session_id = (await service.acreate_session(user_id, "异步会话"))["session_id"]
+
+            with use_model(FakeListChatModel(responses=["收到"])):
+                result = await service.asend_message(user_id, session_id, "你好")
+                service.send_message(user_id, session_id, "再来一条")
+
+            history = await service.aget_chat_history(user_id, session_id)
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        assert result["ai_response"] == "收到"
+        assert history["total_count"] == 4
+        assert service.get_chat_history(user_id, session_id)["total_count"] == 4
+        assert service.get_session_info(user_id, session_id)["message_count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_turns_do_not_block_event_loop(self, service):
+        model = SlowChatModel(delay=0.2)
+        turns = 50
+        try:
+            sessions = []
+            for _ in range(turns):
+                user_id = str(uuid.uuid4())
+                sessions.append((user_id, (await service.acreate_session(user_id))["session_id"]))
+
+            with use_model(model):
+                start = time.perf_counter()
+                results = await asyncio.gather(*(
+                    service.asend_message(user_id, session_id, "你好") for user_id, session_id in sessions
+                ))
+                elapsed = time.perf_counter() - start
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        assert all(result["ai_response"] == "慢回复" for result in results)
+        # 串行需要 50 * 0.2 = 10 秒
+        assert elapsed < 3
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_tokens_then_done(self, service):
+        user_id = str(uuid.uuid4())
+        try:
+            session_id = (await service.acreate_session(user_id))["session_id"]
+            with use_model(FakeListChatModel(responses=["你好呀"])):
+                events = [event async for event in service.astream_message(user_id, session_id, "你好")]
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        tokens = [event["content"] for event in events if event["type"] == "token"]
+        assert "".join(tokens) == "你好呀"
+        assert len(tokens) > 1
+        assert events[-1]["type"] == "done"
+        assert events[-1]["ai_response"] == "你好呀"
+
+    @pytest.mark.asyncio
+    async def test_stream_reports_tool_progress(self, service):
+        model = FakeMessagesListChatModel(responses=[
+            AIMessage(content="", tool_calls=[{"name": "sesame_opener", "args": {"command": "芝麻开门"}, "id": "call_1"}]),
+            AIMessage(content="密码已生成")
+        ])
+        user_id = str(uuid.uuid4())
+        try:
+            session_id = (await service.acreate_session(user_id))["session_id"]
+            with use_model(model):
+                events = [event async for event in service.astream_message(user_id, session_id, "芝麻开门")]
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        kinds = [(event["type"], event.get("name")) for event in events if event["type"] != "token"]
+        assert kinds == [("tool_start", "sesame_opener"), ("tool_end", "sesame_opener"), ("done", None)]
+        assert events[-1]["ai_response"] == "密码已生成"
+
+    @pytest.mark.asyncio
+    async def test_empty_message_rejected(self, service):
+        with pytest.raises(ValueError):
+            await service.asend_message(str(uuid.uuid4()), str(uuid.uuid4()), "  ")
+
+
+class TestAsyncCheckpointer:
+    """异步检查点器生命周期测试"""
+
+    def test_reused_within_loop_and_rebuilt_for_new_loop(self, tmp_path):
+        manager = ChatDatabaseManager()
+        manager.db_path = str(tmp_path / "chat.db")
+
+        async def get_twice():
+            first = await manager.get_async_checkpointer()
+            second = await manager.get_async_checkpointer()
+            cursor = await first.conn.execute("PRAGMA journal_mode")
+            mode = (await cursor.fetchone())[0]
+            return first, second, mode
+
+        first, second, mode = asyncio.run(get_twice())
+        assert first is second
+        assert mode == "wal"
+
+        async def get_and_close():
+            checkpointer = await manager.get_async_checkpointer()
+            await manager.close_async_checkpointer()
+            return checkpointer
+
+        assert asyncio.run(get_and_close()) is not first
+        # 旧循环上的连接已关闭，aiosqlite后台线程已退出
+        first.conn.join(timeout=5)
+        assert not first.conn.is_alive()
+        assert manager.health_check()["async_checkpointer"] is False
+
+    def test_rebuild_closes_connection_on_still_running_loop(self, tmp_path):
+        manager = ChatDatabaseManager()
+        manager.db_path = str(tmp_path / "chat.db")
+
+        old_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=old_loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            first = asyncio.run_coroutine_threadsafe(
+                manager.get_async_checkpointer(), old_loop
+            ).result(timeout=5)
+
+            async def rebuild_and_close():
+                checkpointer = await manager.get_async_checkpointer()
+                await manager.close_async_checkpointer()
+                return checkpointer
+
+            assert asyncio.run(rebuild_and_close()) is not first
+            first.conn.join(timeout=5)
+            assert not first.conn.is_alive()
+        finally:
+            old_loop.call_soon_threadsafe(old_loop.stop)
+            thread.join(timeout=5)
+            old_loop.close()
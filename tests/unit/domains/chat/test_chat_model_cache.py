@@ -0,0 +1,81 @@
+"""
+聊天模型客户端缓存单元测试
+
+测试覆盖：
+- 配置不变时复用同一个模型客户端（工具只绑定一次）
+- 配置变化、手动重置时重建
+- 未配置API密钥时报错
+- 工具节点在多个图实例间共享
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.store.memory import InMemoryStore
+
+import src.domains.chat.graph as chat_graph
+from src.domains.chat.graph import (
+    CHAT_TOOLS,
+    ChatGraph,
+    get_chat_model,
+    get_chat_model_stats,
+    reset_chat_model
+)
+
+
+@pytest.fixture(autouse=True)
+def model_env(monkeypatch):
+    for name in ("LLM_API_KEY", "LLM_BASE_URL", "LLM_MODEL", "LLM_TEMPERATURE", "OPENAI_TEMPERATURE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:9/v1")
+    monkeypatch.setenv("OPENAI_MODEL", "model-a")
+    reset_chat_model()
+    yield monkeypatch
+    reset_chat_model()
+
+
+class TestChatModelCache:
+    """模型客户端缓存测试"""
+
+    def test_reuses_model_while_settings_unchanged(self):
+        builds = get_chat_model_stats()["builds"]
+
+        first = get_chat_model()
+        second = ChatGraph(InMemorySaver(), InMemoryStore())._get_model()
+
+        assert first is second
+        assert get_chat_model_stats()["builds"] == builds + 1
+        assert get_chat_model_stats()["model"] == "model-a"
+        assert len(first.kwargs["tools"]) == len(CHAT_TOOLS)
+
+    def test_rebuilds_when_settings_change(self, model_env):
+        first = get_chat_model()
+
+        model_env.setenv("OPENAI_MODEL", "model-b")
+        second = get_chat_model()
+
+        assert second is not first
+        assert second.bound.model_name == "model-b"
+        assert get_chat_model() is second
+
+    def test_reset_forces_rebuild(self):
+        first = get_chat_model()
+        reset_chat_model()
+
+        assert get_chat_model() is not first
+
+    def test_missing_api_key_raises(self, model_env):
+        model_env.delenv("OPENAI_API_KEY")
+
+        with pytest.raises(ValueError):
+            get_chat_model()
+
+    def test_tool_node_shared_between_graphs(self):
+        graph_a = ChatGraph(InMemorySaver(), InMemoryStore())
+        graph_b = ChatGraph(InMemorySaver(), InMemoryStore())
+
+        assert chat_graph.get_tool_node() is chat_graph.get_tool_node()
+        assert graph_a.graph.nodes["tools"].bound is graph_b.graph.nodes["tools"].bound
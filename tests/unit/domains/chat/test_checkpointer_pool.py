@@ -0,0 +1,148 @@
+"""
+聊天检查点器连接池单元测试
+
+测试覆盖：
+- 启动时打开固定数量的连接，WAL模式并已建表
+- 连接用尽时等待，超时报错；关闭后拒绝借用
+- 多线程并发借用时同时在用的连接数不超过池大小
+- ChatService跨调用复用检查点器和编译后的图
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import threading
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.domains.chat.database import ChatDatabaseManager, CheckpointerPool
+from src.domains.chat.graph import ChatGraph
+from src.domains.chat.service import ChatService
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "chat.db")
+
+
+class TestCheckpointerPool:
+    """连接池测试"""
+
+    def test_opens_fixed_connections_in_wal_mode(self, db_path):
+        pool = CheckpointerPool(db_path, size=3)
+
+        assert pool.get_stats()["available"] == 3
+        with pool.acquire() as slot:
+            cursor = slot.checkpointer.conn.execute("PRAGMA journal_mode")
+            assert cursor.fetchone()[0] == "wal"
+            assert slot.checkpointer.is_setup is True
+        pool.close()
+
+    def test_get_or_create_caches_per_slot(self, db_path):
+        pool = CheckpointerPool(db_path, size=1)
+        calls = []
+
+        for _ in range(3):
+            with pool.acquire() as slot:
+                slot.get_or_create("graph", lambda: calls.append(1) or object())
+
+        assert len(calls) == 1
+        pool.close()
+
+    def test_acquire_times_out_when_exhausted(self, db_path):
+        pool = CheckpointerPool(db_path, size=1, acquire_timeout=0.05)
+
+        with pool.acquire():
+            with pytest.raises(RuntimeError):
+                with pool.acquire():
+                    pass
+
+        stats = pool.get_stats()
+        assert stats["timeouts"] == 1
+        assert stats["available"] == 1
+        pool.close()
+
+    def test_closed_pool_rejects_acquire(self, db_path):
+        pool = CheckpointerPool(db_path, size=1)
+        pool.close()
+
+        with pytest.raises(RuntimeError):
+            with pool.acquire():
+                pass
+
+    def test_concurrent_threads_never_exceed_size(self, db_path):
+        pool = CheckpointerPool(db_path, size=2)
+        in_use = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def worker():
+            nonlocal in_use, peak
+            for _ in range(5):
+                with pool.acquire():
+                    with lock:
+                        in_use += 1
+                        peak = max(peak, in_use)
+                    time.sleep(0.001)
+                    with lock:
+                        in_use -= 1
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak <= 2
+        stats = pool.get_stats()
+        assert stats["acquisitions"] == 30
+        assert stats["waits"] > 0
+        assert stats["available"] == 2
+        pool.close()
+
+    def test_manager_recreates_pool_after_close(self, db_path):
+        manager = ChatDatabaseManager()
+        manager.db_path = db_path
+
+        pool = manager.get_checkpointer_pool()
+        assert manager.get_checkpointer_pool() is pool
+
+        manager.close_checkpointer_pool()
+        assert pool.closed
+        assert manager.get_checkpointer_pool() is not pool
+        manager.close_checkpointer_pool()
+
+
+class TestChatServiceReuse:
+    """ChatService复用连接池测试"""
+
+    @pytest.fixture
+    def service(self, db_path):
+        manager = ChatDatabaseManager()
+        manager.db_path = db_path
+        service = ChatService()
+        service.db_manager = manager
+        yield service
+        manager.close_checkpointer_pool()
+
+    def test_graph_compiled_once_per_slot(self, service):
+        fake = FakeListChatModel(responses=["收到"])
+        user_id = str(uuid.uuid4())
+        session_id = service.create_session(user_id, "测试")["session_id"]
+
+        with patch.object(ChatGraph, "_get_model", lambda self: fake), \
+                patch.object(service, "_create_graph_with_checkpointer",
+                             wraps=service._create_graph_with_checkpointer) as create_graph:
+            for i in range(5):
+                result = service.send_message(user_id, session_id, f"消息{i}")
+                assert result["ai_response"] == "收到"
+            history = service.get_chat_history(user_id, session_id)
+
+        # 单线程顺序调用总是借到同一个槽位
+        assert create_graph.call_count == 1
+        assert history["total_count"] == 10
+        assert service.get_session_info(user_id, session_id)["message_count"] == 10
@@ -0,0 +1,188 @@
+"""
+本地流式聊天单元测试
+
+测试覆盖：
+- 聊天接口本地模式：纯文本逐token输出；Accept: text/event-stream时输出SSE事件（含工具调用进度）
+- 背压：调用方不读取时模型停止生成
+- 取消：调用方关闭流时正在进行的模型调用被取消
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import importlib
+import json
+import uuid
+from typing import Any, AsyncIterator, List, Optional
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel, FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.api.dependencies import get_current_user_id
+from src.domains.chat.database import ChatDatabaseManager
+from src.domains.chat.graph import ChatGraph
+from src.domains.chat.service import ChatService
+from src.domains.chat.streaming import CHAT_STREAM_BUFFER_SIZE
+
+# 包的__init__导出了同名的router对象，这里取模块本身
+chat_router_module = importlib.import_module("src.domains.chat.router")
+
+
+class ProbeStreamModel(BaseChatModel):
+    """逐字符流式输出的模型，记录已生成的token数；hang_after之后挂起直到被取消"""
+
+    text: str = "你好" * 200
+    hang_after: Optional[int] = None
+    probe: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "probe-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.text))])
+
+    async def _astream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        try:
+            for index, char in enumerate(self.text):
+                if self.hang_after is not None and index >= self.hang_after:
+                    await asyncio.sleep(30)
+                self.probe["produced"] += 1
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=char))
+                if run_manager:
+                    await run_manager.on_llm_new_token(char, chunk=chunk)
+                yield chunk
+        except asyncio.CancelledError:
+            self.probe["cancelled"] = True
+            raise
+
+
+@pytest.fixture
+def service(tmp_path):
+    manager = ChatDatabaseManager()
+    manager.db_path = str(tmp_path / "chat.db")
+    service = ChatService()
+    service.db_manager = manager
+    yield service
+    manager.close_checkpointer_pool()
+
+
+def use_model(model):
+    return patch.object(ChatGraph, "_get_model", lambda self: model)
+
+
+@pytest.fixture
+def local_app(service, monkeypatch):
+    user_id = uuid.uuid4()
+    monkeypatch.setattr(chat_router_module.config, "chat_backend", "local")
+    monkeypatch.setattr(chat_router_module, "ChatRepository", MagicMock())
+    monkeypatch.setattr("src.domains.chat.service.chat_service", service)
+
+    app = FastAPI()
+    app.include_router(chat_router_module.router)
+    app.dependency_overrides[get_current_user_id] = lambda: user_id
+    return app
+
+
+async def post_chat(app: FastAPI, message: str, accept: str = "*/*") -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            f"/chat/sessions/{uuid.uuid4()}/chat",
+            json={"message": message},
+            headers={"Accept": accept}
+        )
+
+
+class TestLocalChatRouter:
+    """聊天接口本地模式测试"""
+
+    @pytest.mark.asyncio
+    async def test_plain_text_streams_tokens_only(self, local_app, service):
+        try:
+            with use_model(FakeListChatModel(responses=["你好，我在"])):
+                response = await post_chat(local_app, "你好")
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text == "你好，我在"
+
+    @pytest.mark.asyncio
+    async def test_sse_reports_tool_progress(self, local_app, service):
+        model = FakeMessagesListChatModel(responses=[
+            AIMessage(content="", tool_calls=[{"name": "sesame_opener", "args": {"command": "芝麻开门"}, "id": "call_1"}]),
+            AIMessage(content="密码已生成")
+        ])
+        try:
+            with use_model(model):
+                response = await post_chat(local_app, "芝麻开门", accept="text/event-stream")
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in response.text.split("\n\n") if line]
+        assert [event["type"] for event in events] == ["tool_start", "tool_end", "done"]
+        assert events[0]["name"] == "sesame_opener"
+
+    @pytest.mark.asyncio
+    async def test_invalid_session_id_yields_error_event(self, local_app, service):
+        transport = httpx.ASGITransport(app=local_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/chat/sessions/not-a-uuid/chat",
+                json={"message": "你好"},
+                headers={"Accept": "text/event-stream"}
+            )
+
+        assert json.loads(response.text[len("data: "):])["type"] == "error"
+
+
+class TestStreamFlowControl:
+    """背压与取消测试"""
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_pauses_model(self, service):
+        probe = {"produced": 0, "cancelled": False}
+        model = ProbeStreamModel(probe=probe)
+        user_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+        try:
+            with use_model(model):
+                stream = service.astream_message(user_id, session_id, "你好")
+                first = await stream.__anext__()
+                await asyncio.sleep(0.2)
+                produced_while_paused = probe["produced"]
+
+                events = [first] + [event async for event in stream]
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        assert produced_while_paused <= CHAT_STREAM_BUFFER_SIZE + 2
+        assert "".join(event["content"] for event in events if event["type"] == "token") == model.text
+        assert events[-1]["type"] == "done"
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_model_call(self, service):
+        probe = {"produced": 0, "cancelled": False}
+        model = ProbeStreamModel(text="你好呀", hang_after=1, probe=probe)
+        user_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+        try:
+            with use_model(model):
+                stream = service.astream_message(user_id, session_id, "你好")
+                first = await asyncio.wait_for(stream.__anext__(), timeout=5)
+                await asyncio.wait_for(stream.aclose(), timeout=5)
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        assert first == {"type": "token", "content": "你"}
+        assert probe["cancelled"] is True
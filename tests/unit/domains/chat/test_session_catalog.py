@@ -0,0 +1,156 @@
+"""
+聊天会话目录单元测试
+
+测试覆盖：
+- 同步和异步检查点器写入检查点时更新目录（标题、消息数、最新检查点）
+- list_sessions按更新时间倒序、按用户隔离，查询走(user_id, updated_at)索引
+- 删除会话时目录行一并删除
+- 目录更新失败时检查点写入一并回滚
+- 已有检查点的数据库升级时回填目录
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import sqlite3
+import uuid
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.domains.chat.database import ChatDatabaseManager
+from src.domains.chat.graph import ChatGraph
+from src.domains.chat.service import ChatService
+from src.domains.chat.session_catalog import CatalogSqliteSaver
+
+
+@pytest.fixture
+def service(tmp_path):
+    manager = ChatDatabaseManager()
+    manager.db_path = str(tmp_path / "chat.db")
+    service = ChatService()
+    service.db_manager = manager
+    yield service
+    manager.close_checkpointer_pool()
+
+
+def use_model(model):
+    return patch.object(ChatGraph, "_get_model", lambda self: model)
+
+
+def count_rows(db_path: str, table: str, session_id: str) -> int:
+    column = "session_id" if table == "chat_session_catalog" else "thread_id"
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} = ?", (session_id,)).fetchone()[0]
+
+
+class TestSessionCatalog:
+    """会话目录维护测试"""
+
+    def test_send_message_updates_catalog(self, service):
+        user_id = str(uuid.uuid4())
+        session_id = service.create_session(user_id, "目录会话")["session_id"]
+
+        with use_model(FakeListChatModel(responses=["收到"])):
+            service.send_message(user_id, session_id, "你好")
+
+        sessions = service.list_sessions(user_id)["sessions"]
+        info = service.get_session_info(user_id, session_id)
+
+        assert [s["session_id"] for s in sessions] == [session_id]
+        assert sessions[0]["title"] == "目录会话"
+        assert sessions[0]["message_count"] == 2
+        assert info["title"] == "目录会话"
+
+    def test_list_sessions_orders_by_update_and_isolates_users(self, service):
+        user_id, other_user_id = str(uuid.uuid4()), str(uuid.uuid4())
+        first = service.create_session(user_id, "第一个")["session_id"]
+        second = service.create_session(user_id, "第二个")["session_id"]
+        service.create_session(other_user_id, "别人的")
+
+        with use_model(FakeListChatModel(responses=["收到"])):
+            service.send_message(user_id, first, "你好")
+
+        result = service.list_sessions(user_id, limit=1)
+
+        assert result["status"] == "success"
+        assert result["total_count"] == 2
+        assert [s["session_id"] for s in result["sessions"]] == [first]
+        assert [s["session_id"] for s in service.list_sessions(user_id)["sessions"]] == [first, second]
+
+    def test_delete_session_removes_catalog_row(self, service):
+        user_id = str(uuid.uuid4())
+        session_id = service.create_session(user_id, "待删除")["session_id"]
+
+        service.delete_session(user_id, session_id)
+
+        assert service.list_sessions(user_id)["sessions"] == []
+        assert count_rows(service.db_manager.db_path, "chat_session_catalog", session_id) == 0
+
+    @pytest.mark.asyncio
+    async def test_async_turn_updates_catalog(self, service):
+        user_id = str(uuid.uuid4())
+        try:
+            session_id = (await service.acreate_session(user_id, "异步目录"))["session_id"]
+            with use_model(FakeListChatModel(responses=["收到"])):
+                await service.asend_message(user_id, session_id, "你好")
+        finally:
+            await service.db_manager.close_async_checkpointer()
+
+        sessions = service.list_sessions(user_id)["sessions"]
+
+        assert sessions[0]["title"] == "异步目录"
+        assert sessions[0]["message_count"] == 2
+
+    def test_list_query_uses_index(self, service):
+        service.list_sessions(str(uuid.uuid4()))
+
+        with sqlite3.connect(service.db_manager.db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM chat_session_catalog "
+                "WHERE user_id = ? ORDER BY updated_at DESC LIMIT 20",
+                ("user",)
+            ).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "idx_chat_session_catalog_user_updated" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestCatalogSaver:
+    """检查点器事务与回填测试"""
+
+    def test_failed_catalog_update_rolls_back_checkpoint(self, service, tmp_path):
+        user_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+        conn = sqlite3.connect(str(tmp_path / "atomic.db"), check_same_thread=False)
+        saver = CatalogSqliteSaver(conn)
+        saver.setup()
+        conn.execute("DROP TABLE chat_session_catalog")
+
+        config, checkpoint, metadata = service._build_session_checkpoint(saver, user_id, session_id, "失败")
+        with pytest.raises(sqlite3.OperationalError):
+            saver.put(config, checkpoint, metadata, {})
+
+        assert conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 0
+        conn.close()
+
+    def test_backfills_existing_checkpoints(self, service, tmp_path):
+        db_path = str(tmp_path / "legacy.db")
+        user_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        legacy = SqliteSaver(conn)
+        config, checkpoint, metadata = service._build_session_checkpoint(legacy, user_id, session_id, "旧会话")
+        legacy.put(config, checkpoint, metadata, {})
+
+        saver = CatalogSqliteSaver(conn)
+        saver.setup()
+
+        entries, total = saver.list_sessions(user_id, 20)
+        conn.close()
+
+        assert total == 1
+        assert entries[0]["session_id"] == session_id
+        assert entries[0]["title"] == "旧会话"
+        assert entries[0]["last_checkpoint_id"] == checkpoint["id"]
@@ -0,0 +1,145 @@
+"""
+批量完成任务接口单元测试
+
+直接调用路由函数，使用模拟客户端验证：
+- 完成调用在有界信号量下并发执行
+- 补偿性GET在完成调用全部结束后统一执行
+- 逐项结果与失败隔离
+- 数量上限与去重
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from src.domains.task.router import BatchCompleteTasksRequest, batch_complete_tasks_endpoint
+from src.services.enhanced_task_microservice_client import TaskMicroserviceError
+
+
+class FakeTaskClient:
+    """记录调用顺序和并发度的模拟客户端"""
+
+    def __init__(self, complete_responses=None, get_responses=None, delay=0.01):
+        self.complete_responses = complete_responses or {}
+        self.get_responses = get_responses or {}
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.invalidate_user_cache = MagicMock(return_value=0)
+
+    async def call_microservice(self, method, path, user_id, data=None, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if method == "POST":
+                task_id = kwargs["task_id"]
+                self.calls.append(("complete", task_id))
+                response = self.complete_responses.get(task_id, {"success": True, "code": 200, "data": None})
+            else:
+                task_id = path.split("/")[-1]
+                self.calls.append(("get", task_id))
+                response = self.get_responses.get(
+                    task_id, {"success": True, "code": 200, "data": {"id": task_id, "title": f"任务{task_id}"}}
+                )
+            if isinstance(response, Exception):
+                raise response
+            return response
+        finally:
+            self.active -= 1
+
+
+class TestBatchCompleteTasks:
+    """批量完成任务测试"""
+
+    @pytest.mark.asyncio
+    async def test_fan_out_is_bounded_and_gets_run_after_completes(self):
+        client = FakeTaskClient()
+        task_ids = [f"t{i}" for i in range(6)]
+
+        with patch("src.domains.task.router.config") as mock_config:
+            mock_config.task_batch_complete_max_items = 50
+            mock_config.task_batch_complete_concurrency = 2
+            response = await batch_complete_tasks_endpoint(
+                BatchCompleteTasksRequest(task_ids=task_ids), user_id=uuid4(), client=client
+            )
+
+        assert response.code == 200
+        assert client.max_active == 2
+        kinds = [kind for kind, _ in client.calls]
+        assert kinds == ["complete"] * 6 + ["get"] * 6
+        assert [item["task_id"] for item in response.data["results"]] == task_ids
+        assert response.data["results"][0]["task"]["title"] == "任务t0"
+        assert response.data["summary"] == {"total": 6, "succeeded": 6, "failed": 0}
+        client.invalidate_user_cache.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_non_empty_complete_response_skips_compensating_get(self):
+        client = FakeTaskClient(complete_responses={
+            "a": {"success": True, "code": 200, "data": {"id": "a", "title": "A", "updated_at": "2024-12-25T10:00:00Z"}}
+        })
+
+        response = await batch_complete_tasks_endpoint(
+            BatchCompleteTasksRequest(task_ids=["a"]), user_id=uuid4(), client=client
+        )
+
+        assert client.calls == [("complete", "a")]
+        item = response.data["results"][0]
+        assert item["success"] is True
+        assert item["task"] == {"id": "a", "title": "A", "status": "completed", "completed_at": "2024-12-25T10:00:00Z"}
+        assert item["reward"]["id"] == "mock-reward-iphone17pro"
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported_per_item(self):
+        client = FakeTaskClient(
+            complete_responses={
+                "missing": {"success": False, "code": 404, "message": "任务不存在"},
+                "down": TaskMicroserviceError("服务不可用", status_code=503),
+            },
+            get_responses={"ok2": TaskMicroserviceError("超时", status_code=504)}
+        )
+
+        response = await batch_complete_tasks_endpoint(
+            BatchCompleteTasksRequest(task_ids=["ok", "missing", "down", "ok2"]), user_id=uuid4(), client=client
+        )
+
+        results = {item["task_id"]: item for item in response.data["results"]}
+        assert results["ok"]["success"] is True
+        assert results["missing"] == {"task_id": "missing", "success": False, "code": 404, "message": "任务不存在"}
+        assert results["down"]["code"] == 503
+        # 完成成功但补偿查询失败：仍视为成功，任务信息使用兜底值
+        assert results["ok2"]["success"] is True
+        assert results["ok2"]["task"]["id"] == "ok2"
+        assert response.data["summary"] == {"total": 4, "succeeded": 2, "failed": 2}
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_removed_and_limit_enforced(self):
+        client = FakeTaskClient()
+        with patch("src.domains.task.router.config") as mock_config:
+            mock_config.task_batch_complete_max_items = 2
+            mock_config.task_batch_complete_concurrency = 10
+
+            response = await batch_complete_tasks_endpoint(
+                BatchCompleteTasksRequest(task_ids=["a", "a", "b"]), user_id=uuid4(), client=client
+            )
+            assert response.data["summary"]["total"] == 2
+
+            response = await batch_complete_tasks_endpoint(
+                BatchCompleteTasksRequest(task_ids=["a", "b", "c"]), user_id=uuid4(), client=client
+            )
+            assert response.code == 400
+            assert response.data is None
+
+    def test_empty_task_ids_rejected(self):
+        with pytest.raises(ValueError):
+            BatchCompleteTasksRequest(task_ids=[])
+
+    def test_batch_route_registered(self):
+        from src.domains.task.router import router
+        paths = {(route.path, tuple(route.methods)) for route in router.routes}
+        assert ("/tasks/complete:batch", ("POST",)) in paths
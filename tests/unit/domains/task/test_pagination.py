@@ -0,0 +1,156 @@
+"""
+Task列表游标分页单元测试
+
+测试覆盖：
+- 游标编解码与校验
+- 本地切片（偏移量与keyset定位）
+- GET /tasks 上游分页透传与本地切片回退
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from src.domains.task.pagination import (
+    CursorPosition,
+    InvalidCursorError,
+    build_next_cursor,
+    decode_cursor,
+    encode_cursor,
+    reset_upstream_pagination_detection,
+    slice_task_list,
+    upstream_pagination_enabled
+)
+from src.domains.task.router import get_tasks_endpoint
+
+
+def make_tasks(count):
+    return [
+        {"id": f"task-{i}", "title": f"任务{i}", "status": "NOT_STARTED", "is_deleted": False}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def reset_detection():
+    reset_upstream_pagination_detection()
+    yield
+    reset_upstream_pagination_detection()
+
+
+class TestCursorCodec:
+    """游标编解码测试"""
+
+    def test_round_trip(self):
+        filters = {"status": "pending", "priority": None}
+        cursor = encode_cursor(40, "task-39", filters)
+        assert decode_cursor(cursor, filters) == CursorPosition(offset=40, last_task_id="task-39")
+
+    def test_rejects_garbage(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor!", {})
+
+    def test_rejects_cursor_for_other_filters(self):
+        cursor = encode_cursor(20, "task-19", {"status": "pending"})
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, {"status": "completed"})
+
+
+class TestSliceTaskList:
+    """本地切片测试"""
+
+    def test_slice_by_offset(self):
+        page = slice_task_list(make_tasks(50), CursorPosition(offset=20), 20)
+        assert [task["id"] for task in page["tasks"]][0] == "task-20"
+        assert page["total"] == 50
+        assert page["offset"] == 20
+
+    def test_keyset_survives_deleted_task(self):
+        tasks = make_tasks(50)
+        del tasks[3]  # 上一页中的任务被删除
+        page = slice_task_list(tasks, CursorPosition(offset=20, last_task_id="task-19"), 20)
+        assert page["tasks"][0]["id"] == "task-20"
+
+    def test_next_cursor_none_on_last_page(self):
+        page = slice_task_list(make_tasks(25), CursorPosition(offset=20), 20)
+        assert build_next_cursor(page, {}) is None
+
+    def test_next_cursor_without_total_uses_short_page(self):
+        assert build_next_cursor({"tasks": make_tasks(5), "limit": 20}, {}) is None
+        assert build_next_cursor({"tasks": make_tasks(20), "limit": 20}, {}, 40) is not None
+
+
+class TestGetTasksCursorPagination:
+    """GET /tasks 游标分页测试"""
+
+    async def fetch(self, client, **kwargs):
+        params = dict(page=1, page_size=20, status=None, priority=None, cursor=None)
+        params.update(kwargs)
+        return await get_tasks_endpoint(user_id=uuid4(), client=client, **params)
+
+    @pytest.mark.asyncio
+    async def test_local_slicing_when_upstream_returns_full_array(self):
+        client = AsyncMock()
+        client.call_microservice.return_value = {"success": True, "code": 200, "data": make_tasks(45)}
+
+        first = await self.fetch(client)
+        assert len(first.data.tasks) == 20
+        assert first.data.pagination.total_count == 45
+        assert first.data.pagination.has_next is True
+        assert upstream_pagination_enabled() is False
+
+        second = await self.fetch(client, cursor=first.data.pagination.next_cursor)
+        third = await self.fetch(client, cursor=second.data.pagination.next_cursor)
+
+        assert second.data.tasks[0].id == "task-20"
+        assert [task.id for task in third.data.tasks] == [f"task-{i}" for i in range(40, 45)]
+        assert third.data.pagination.next_cursor is None
+        assert third.data.pagination.has_next is False
+
+        # 切换为本地切片后，不再向上游携带分页参数（完整列表缓存键与页码无关）
+        later_params = client.call_microservice.call_args_list[-1].kwargs["params"]
+        assert "limit" not in later_params and "offset" not in later_params
+
+    @pytest.mark.asyncio
+    async def test_cursor_translates_to_upstream_limit_offset(self):
+        client = AsyncMock()
+        client.call_microservice.return_value = {
+            "success": True, "code": 200,
+            "data": {"tasks": make_tasks(20), "total": 100, "limit": 20, "offset": 0}
+        }
+
+        first = await self.fetch(client, status="pending")
+        assert first.data.pagination.has_next is True
+
+        client.call_microservice.return_value = {
+            "success": True, "code": 200,
+            "data": {"tasks": make_tasks(20), "total": 100, "limit": 20, "offset": 20}
+        }
+        await self.fetch(client, status="pending", cursor=first.data.pagination.next_cursor)
+
+        params = client.call_microservice.call_args.kwargs["params"]
+        assert params["limit"] == 20
+        assert params["offset"] == 20
+        assert params["status"] == "pending"
+        assert upstream_pagination_enabled() is True
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_returns_400(self):
+        client = AsyncMock()
+        response = await self.fetch(client, cursor="bogus")
+        assert response.code == 400
+        client.call_microservice.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_local_mode_config(self):
+        client = AsyncMock()
+        client.call_microservice.return_value = {"success": True, "code": 200, "data": make_tasks(3)}
+        with patch("src.domains.task.pagination.config") as mock_config:
+            mock_config.task_service_pagination_mode = "local"
+            response = await self.fetch(client)
+
+        assert len(response.data.tasks) == 3
+        assert "offset" not in client.call_microservice.call_args.kwargs["params"]
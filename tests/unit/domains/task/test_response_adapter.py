@@ -4,6 +4,7 @@ Task响应数据适配器单元测试
 测试src/domains/task/router.py中的数据适配逻辑:
 - adapt_single_task_data(): 单个任务数据转换
 - adapt_microservice_response_to_client(): 微服务响应适配
+- build_task_response() / build_task_list_response(): 直接构造响应模型
 
 覆盖场景:
 1. 状态映射: NOT_STARTED → pending, IN_PROGRESS → in_progress等
@@ -16,7 +17,14 @@ Task响应数据适配器单元测试
 """
 import pytest
 from datetime import datetime
-from src.domains.task.router import adapt_single_task_data, adapt_microservice_response_to_client
+from unittest.mock import patch
+from src.domains.task.router import (
+    adapt_single_task_data,
+    adapt_microservice_response_to_client,
+    build_task_response,
+    build_task_list_response
+)
+from src.domains.task.schemas import TaskListResponse, TaskResponse
 
 
 class TestAdaptSingleTaskData:
@@ -501,3 +509,73 @@ class TestAdaptMicroserviceResponse:
 
         # 应该保持原样
         assert adapted["data"] is None
+
+
+class TestBuildTaskModels:
+    """测试直接构造响应模型"""
+
+    def test_adapt_single_task_does_not_mutate_input(self):
+        """测试适配不修改原始数据"""
+        task_data = {"id": "task_123", "status": "NOT_STARTED", "priority": "HIGH"}
+        adapt_single_task_data(task_data)
+        assert task_data == {"id": "task_123", "status": "NOT_STARTED", "priority": "HIGH"}
+
+    def test_adapt_single_task_skips_clock_when_timestamps_present(self):
+        """测试时间戳存在时不计算默认时间"""
+        task_data = {"id": "task_123", "created_at": "2025-11-12T00:00:00", "updated_at": "2025-11-12T00:00:00"}
+        with patch("src.domains.task.router.datetime") as mock_datetime:
+            adapt_single_task_data(task_data)
+        mock_datetime.now.assert_not_called()
+
+    def test_adapt_single_task_default_lists_not_shared(self):
+        """测试默认列表不在任务间共享"""
+        first = adapt_single_task_data({"id": "1"})
+        second = adapt_single_task_data({"id": "2"})
+        first["tags"].append("x")
+        assert second["tags"] == []
+
+    def test_build_task_response(self):
+        """测试构造单个任务响应"""
+        task = build_task_response({
+            "id": "task_123",
+            "title": "Test Task",
+            "status": "COMPLETED",
+            "priority": "HIGH"
+        })
+        assert isinstance(task, TaskResponse)
+        assert task.status == "completed"
+        assert task.priority == "high"
+        assert task.completion_percentage == 0.0
+        assert task.is_deleted is False
+
+    def test_build_task_list_response_paginated(self):
+        """测试构造分页任务列表响应"""
+        data = {
+            "tasks": [
+                {"id": "1", "title": "A", "status": "IN_PROGRESS"},
+                {"id": "2", "title": "B", "status": "COMPLETED"}
+            ],
+            "total": 45,
+            "limit": 20,
+            "offset": 20
+        }
+        result = build_task_list_response(data, page=1, page_size=20)
+
+        assert isinstance(result, TaskListResponse)
+        assert [task.status for task in result.tasks] == ["in_progress", "completed"]
+        assert result.pagination.current_page == 2
+        assert result.pagination.total_pages == 3
+        assert result.pagination.has_next is True
+
+    def test_build_task_list_response_array(self):
+        """测试构造任务数组响应"""
+        result = build_task_list_response([{"id": "1", "title": "A", "status": "TODO"}], page=3, page_size=10)
+        assert result.tasks[0].status == "pending"
+        assert result.pagination.total_count == 1
+
+    def test_build_task_list_response_without_tasks_uses_request_paging(self):
+        """测试非列表数据时使用请求分页参数"""
+        result = build_task_list_response({}, page=3, page_size=10)
+        assert result.tasks == []
+        assert result.pagination.current_page == 3
+        assert result.pagination.page_size == 10
@@ -0,0 +1,229 @@
+"""
+任务树接口单元测试
+
+测试覆盖：
+- 优先使用上游任务树接口并按深度和节点数裁剪
+- 上游不可用时按层并发展开
+- 每层并发上限、请求内备忘、环和节点数上限
+- 子任务查询跟随上游分页，翻页达到上限时标记截断
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+from uuid import uuid4
+
+from src.domains.task.router import get_task_tree_endpoint
+from src.domains.task.tree import TaskTreeExpander, prune_task_tree
+from src.services.enhanced_task_microservice_client import TaskMicroserviceError
+
+
+def task(task_id, parent_id=None):
+    return {
+        "id": task_id, "title": task_id, "status": "NOT_STARTED", "parent_id": parent_id,
+        "created_at": "2024-12-15T10:00:00Z", "updated_at": "2024-12-15T10:00:00Z"
+    }
+
+
+class FakeTreeClient:
+    """根据父子关系表返回子任务的模拟客户端"""
+
+    def __init__(self, tasks, tree_response=None, page_size=None):
+        self.tasks = {item["id"]: item for item in tasks}
+        self.tree_response = tree_response
+        self.page_size = page_size
+        self.children_calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def call_microservice(self, method, path, user_id, data=None, params=None, **kwargs):
+        if path == "tasks/{task_id}/tree":
+            if isinstance(self.tree_response, Exception):
+                raise self.tree_response
+            return self.tree_response
+        if path == "tasks/{task_id}":
+            found = self.tasks.get(kwargs["task_id"])
+            if found is None:
+                return {"success": False, "code": 404, "message": "任务不存在"}
+            return {"success": True, "code": 200, "data": found}
+
+        parent_id = params["parent_id"]
+        self.children_calls.append(parent_id)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.active -= 1
+        children = [item for item in self.tasks.values() if item["parent_id"] == parent_id]
+        if self.page_size is None:
+            return {"success": True, "code": 200, "data": children}
+
+        offset = params.get("offset", 0)
+        limit = params.get("limit", self.page_size)
+        return {
+            "success": True,
+            "code": 200,
+            "data": {"tasks": children[offset:offset + limit], "total": len(children), "limit": limit, "offset": offset}
+        }
+
+
+def wide_tree():
+    tasks = [task("root")]
+    for i in range(6):
+        tasks.append(task(f"c{i}", "root"))
+        tasks.append(task(f"g{i}", f"c{i}"))
+    return tasks
+
+
+class TestTaskTreeExpander:
+    """按层展开测试"""
+
+    @pytest.mark.asyncio
+    async def test_bfs_respects_level_concurrency(self):
+        client = FakeTreeClient(wide_tree())
+        expander = TaskTreeExpander(client, str(uuid4()), max_depth=5, level_concurrency=2)
+
+        root = await expander.expand(task("root"))
+
+        assert [child["id"] for child in root["children"]] == [f"c{i}" for i in range(6)]
+        assert root["children"][0]["children"][0]["id"] == "g0"
+        assert client.max_active == 2
+        # root + 6个子任务 + 6个孙任务各查询一次
+        assert len(client.children_calls) == 13
+
+    @pytest.mark.asyncio
+    async def test_depth_limit(self):
+        client = FakeTreeClient(wide_tree())
+        expander = TaskTreeExpander(client, str(uuid4()), max_depth=1)
+
+        root = await expander.expand(task("root"))
+
+        assert len(root["children"]) == 6
+        assert all(child["children"] == [] for child in root["children"])
+        assert client.children_calls == ["root"]
+
+    @pytest.mark.asyncio
+    async def test_cycles_and_memo(self):
+        # a -> b -> a 的环：每个节点只展开一次
+        client = FakeTreeClient([task("a", "b"), task("b", "a")])
+        expander = TaskTreeExpander(client, str(uuid4()), max_depth=10)
+
+        root = await expander.expand(task("a", "b"))
+
+        assert root["children"][0]["id"] == "b"
+        assert root["children"][0]["children"] == []
+        assert sorted(client.children_calls) == ["a", "b"]
+        assert await expander.fetch_children("a") == [task("b", "a")]
+        assert len(client.children_calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_max_nodes_truncates(self):
+        client = FakeTreeClient(wide_tree())
+        expander = TaskTreeExpander(client, str(uuid4()), max_depth=5, max_nodes=4)
+
+        root = await expander.expand(task("root"))
+
+        assert len(root["children"]) == 3
+        assert expander.truncated is True
+
+    @pytest.mark.asyncio
+    async def test_children_follow_upstream_pagination(self):
+        client = FakeTreeClient(wide_tree(), page_size=4)
+        expander = TaskTreeExpander(client, str(uuid4()), max_depth=1)
+
+        root = await expander.expand(task("root"))
+
+        assert [child["id"] for child in root["children"]] == [f"c{i}" for i in range(6)]
+        assert client.children_calls == ["root", "root"]
+        assert expander.truncated is False
+
+    @pytest.mark.asyncio
+    async def test_child_page_limit_marks_truncated(self):
+        client = FakeTreeClient(wide_tree(), page_size=2)
+        expander = TaskTreeExpander(client, str(uuid4()), max_depth=1, max_child_pages=2)
+
+        root = await expander.expand(task("root"))
+
+        assert len(root["children"]) == 4
+        assert expander.truncated is True
+
+    def test_prune_upstream_tree(self):
+        tree = {"id": "r", "children": [{"id": "c", "children": [{"id": "g"}]}]}
+        assert prune_task_tree(tree, 1) is True
+        assert tree["children"][0]["children"] == []
+
+    def test_prune_upstream_tree_caps_nodes_breadth_first(self):
+        tree = {"id": "r", "children": [
+            {"id": f"c{i}", "children": [{"id": f"g{i}", "children": []}]} for i in range(3)
+        ]}
+
+        assert prune_task_tree(tree, 5, max_nodes=5) is True
+        assert [child["id"] for child in tree["children"]] == ["c0", "c1", "c2"]
+        assert [len(child["children"]) for child in tree["children"]] == [1, 0, 0]
+
+
+class TestTaskTreeEndpoint:
+    """任务树接口测试"""
+
+    @pytest.mark.asyncio
+    async def test_prefers_upstream_tree(self):
+        upstream_tree = {**task("root"), "children": [{**task("c0", "root"), "children": []}]}
+        client = FakeTreeClient(wide_tree(), tree_response={"success": True, "code": 200, "data": upstream_tree})
+
+        response = await get_task_tree_endpoint(task_id="root", max_depth=None, user_id=uuid4(), client=client)
+
+        assert response.code == 200
+        assert response.data["source"] == "upstream"
+        assert response.data["node_count"] == 2
+        assert response.data["tree"]["children"][0]["status"] == "pending"
+        assert client.children_calls == []
+
+    @pytest.mark.asyncio
+    async def test_upstream_tree_capped_by_max_nodes(self):
+        upstream_tree = {**task("root"), "children": [{**task(f"c{i}", "root"), "children": []} for i in range(6)]}
+        client = FakeTreeClient(wide_tree(), tree_response={"success": True, "code": 200, "data": upstream_tree})
+        with patch("src.domains.task.router.config") as mock_config:
+            mock_config.task_tree_max_depth = 5
+            mock_config.task_tree_upstream_enabled = True
+            mock_config.task_tree_max_nodes = 4
+            response = await get_task_tree_endpoint(task_id="root", max_depth=None, user_id=uuid4(), client=client)
+
+        assert response.data["node_count"] == 4
+        assert response.data["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_expansion(self):
+        client = FakeTreeClient(wide_tree(), tree_response=TaskMicroserviceError("not found", status_code=404))
+
+        response = await get_task_tree_endpoint(task_id="root", max_depth=1, user_id=uuid4(), client=client)
+
+        assert response.data["source"] == "expanded"
+        assert response.data["max_depth"] == 1
+        assert response.data["node_count"] == 7
+
+    @pytest.mark.asyncio
+    async def test_missing_root_returns_404(self):
+        client = FakeTreeClient([], tree_response={"success": False, "code": 404})
+
+        response = await get_task_tree_endpoint(task_id="nope", max_depth=None, user_id=uuid4(), client=client)
+
+        assert response.code == 404
+        assert response.data is None
+
+    @pytest.mark.asyncio
+    async def test_depth_capped_by_config(self):
+        client = FakeTreeClient(wide_tree(), tree_response={"success": False, "code": 404})
+        with patch("src.domains.task.router.config") as mock_config:
+            mock_config.task_tree_max_depth = 1
+            mock_config.task_tree_upstream_enabled = False
+            mock_config.task_tree_level_concurrency = 4
+            mock_config.task_tree_max_nodes = 100
+            mock_config.task_tree_max_child_pages = 20
+            response = await get_task_tree_endpoint(task_id="root", max_depth=9, user_id=uuid4(), client=client)
+
+        assert response.data["max_depth"] == 1
+        assert client.children_calls == ["root"]
@@ -0,0 +1,152 @@
+"""
+认证微服务共享连接池单元测试
+
+测试覆盖：
+- 路由使用的登录客户端与公钥/健康检查客户端共享同一个连接池
+- 保持连接数与最大连接数一致
+- 并发的公钥获取、健康检查只发起一次上游请求，健康检查结果短暂缓存
+- 启动预热：预取公钥成功、失败、超时
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import src.services.auth.jwt_validator as jwt_validator_module
+from src.api.config import config
+from src.services.auth.client import AuthMicroserviceClient, get_auth_http_client
+from src.services.auth.jwt_validator import warm_up_auth
+from src.services.auth_microservice_client import AuthMicroserviceClient as LoginClient
+from src.services.http_client_registry import get_http_client_registry
+
+
+class TestSharedAuthPool:
+    """共享连接池测试"""
+
+    @pytest.mark.asyncio
+    async def test_login_and_key_clients_share_pool(self):
+        await get_http_client_registry().close_all()
+        key_client = AuthMicroserviceClient(base_url="http://localhost:8987")
+        login_client = LoginClient()
+
+        assert login_client.client is key_client._get_http_client()
+        assert login_client.client is get_http_client_registry().get_client("auth")
+        assert LoginClient().client is login_client.client
+
+    @pytest.mark.asyncio
+    async def test_keepalive_matches_max_connections(self):
+        await get_http_client_registry().close_all()
+        pool = get_auth_http_client()._transport._transport._pool
+
+        assert pool._max_connections == config.auth_service_max_connections
+        assert pool._max_keepalive_connections == config.auth_service_max_keepalive_connections
+        assert pool._max_keepalive_connections == pool._max_connections
+        assert pool._http2 is True
+
+    @pytest.mark.asyncio
+    async def test_close_does_not_close_shared_pool(self):
+        await get_http_client_registry().close_all()
+        login_client = LoginClient()
+        shared = login_client.client
+
+        await login_client.close()
+
+        assert not shared.is_closed
+
+
+class TestRequestCoalescing:
+    """公钥/健康检查请求合并测试"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_public_key_calls_share_one_request(self):
+        client = AuthMicroserviceClient(base_url="http://localhost:8987")
+
+        async def slow_request(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return {"code": 200, "data": {"public_key": "k"}}
+
+        with patch.object(client, "_make_request", side_effect=slow_request) as mock_request:
+            results = await asyncio.gather(*(client.get_public_key() for _ in range(10)))
+
+        assert mock_request.call_count == 1
+        assert all(result["data"]["public_key"] == "k" for result in results)
+        assert client.get_stats()["routes"]["public_key"]["deduplicated"] == 9
+
+    @pytest.mark.asyncio
+    async def test_public_key_failure_not_cached(self):
+        client = AuthMicroserviceClient(base_url="http://localhost:8987")
+        responses = [RuntimeError("down"), {"code": 200, "data": {}}]
+
+        with patch.object(client, "_make_request", new_callable=AsyncMock, side_effect=responses):
+            with pytest.raises(RuntimeError):
+                await client.get_public_key()
+            assert (await client.get_public_key())["code"] == 200
+
+    @pytest.mark.asyncio
+    async def test_health_check_coalesced_and_cached(self):
+        client = AuthMicroserviceClient(base_url="http://localhost:8987")
+        client._health_cache_ttl = 60.0
+
+        async def slow_health():
+            await asyncio.sleep(0.02)
+            return {"code": 200, "data": {"status": "healthy"}}
+
+        with patch.object(client, "_fetch_health", side_effect=slow_health) as mock_health:
+            await asyncio.gather(*(client.health_check() for _ in range(5)))
+            await client.health_check()
+
+        assert mock_health.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_health_check_cache_disabled(self):
+        client = AuthMicroserviceClient(base_url="http://localhost:8987")
+        client._health_cache_ttl = 0
+
+        with patch.object(client, "_fetch_health", new_callable=AsyncMock, return_value={"code": 200}) as mock_health:
+            await client.health_check()
+            await client.health_check()
+
+        assert mock_health.call_count == 2
+
+
+class TestWarmUp:
+    """启动预热测试"""
+
+    @pytest.fixture(autouse=True)
+    def reset_validator(self):
+        jwt_validator_module._jwt_validator = None
+        yield
+        jwt_validator_module._jwt_validator = None
+
+    @pytest.mark.asyncio
+    async def test_warm_up_prefetches_public_key(self):
+        validator = jwt_validator_module.get_jwt_validator()
+        validator.auth_client.get_public_key = AsyncMock(
+            return_value={"code": 200, "data": {"public_key": "pem", "algorithm": "RS256"}}
+        )
+
+        assert await warm_up_auth(timeout=1.0) is True
+        assert validator.get_cache_info()["has_cached_key"] is True
+
+    @pytest.mark.asyncio
+    async def test_warm_up_failure_does_not_raise(self):
+        validator = jwt_validator_module.get_jwt_validator()
+        validator.auth_client.get_public_key = AsyncMock(side_effect=RuntimeError("down"))
+
+        assert await warm_up_auth(timeout=1.0) is False
+
+    @pytest.mark.asyncio
+    async def test_warm_up_timeout(self):
+        validator = jwt_validator_module.get_jwt_validator()
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        validator.auth_client.get_public_key = hang
+
+        assert await warm_up_auth(timeout=0.01) is False
+        validator._key_refresh_task.cancel()
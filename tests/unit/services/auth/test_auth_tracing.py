@@ -0,0 +1,99 @@
+"""
+认证路径采样追踪单元测试
+
+测试覆盖：
+- 关闭采样或未开启DEBUG时不产生追踪
+- 缓存命中和验签路径记录各阶段耗时
+- 验证路径不再向标准输出打印
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import logging
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
+
+import jwt
+
+from src.services.auth.jwt_validator import JWTValidator
+from src.services.auth.tracing import AuthTracer
+
+
+TRACE_LOGGER = "src.services.auth.trace"
+
+
+class TestAuthTracer:
+    """AuthTracer测试"""
+
+    def test_disabled_when_sample_rate_zero(self, caplog):
+        caplog.set_level(logging.DEBUG, logger=TRACE_LOGGER)
+        assert AuthTracer(sample_rate=0).start() is None
+
+    def test_disabled_when_debug_off(self, caplog):
+        caplog.set_level(logging.INFO, logger=TRACE_LOGGER)
+        assert AuthTracer(sample_rate=1.0).start() is None
+
+    def test_stage_timings_are_recorded(self, caplog):
+        caplog.set_level(logging.DEBUG, logger=TRACE_LOGGER)
+        tracer = AuthTracer(sample_rate=1.0)
+
+        trace = tracer.start()
+        trace.mark("cache_lookup")
+        trace.mark("key_fetch")
+        trace.finish("verified", "user-1")
+
+        stats = tracer.get_stats()
+        assert stats["sampled"] == 1
+        assert stats["outcomes"] == {"verified": 1}
+        assert set(stats["avg_stage_ms"]) == {"total", "cache_lookup", "key_fetch"}
+        assert "outcome=verified" in caplog.text
+        assert "key_fetch=" in caplog.text
+
+
+class TestValidatorTracing:
+    """JWTValidator追踪集成测试"""
+
+    @pytest.fixture
+    def validator(self):
+        validator = JWTValidator(auth_client=MagicMock())
+        validator.tracer = AuthTracer(sample_rate=1.0)
+
+        async def key_info(kid=None):
+            return "test-secret", "HS256", True
+
+        validator._get_public_key_info = key_info
+        return validator
+
+    @pytest.fixture
+    def token(self):
+        now = datetime.now(timezone.utc)
+        payload = {
+            "sub": "user-1",
+            "iat": int(now.timestamp()),
+            "exp": int((now + timedelta(hours=1)).timestamp())
+        }
+        return jwt.encode(payload, "test-secret", algorithm="HS256")
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit_traces_stages(self, validator, token, caplog, capsys):
+        caplog.set_level(logging.DEBUG, logger=TRACE_LOGGER)
+
+        await validator.validate_token(token)
+        await validator.validate_token(token)
+
+        stats = validator.get_cache_info()["trace"]
+        assert stats["outcomes"] == {"verified": 1, "cache_hit": 1}
+        assert {"cache_lookup", "key_fetch", "signature_verify"} <= set(stats["avg_stage_ms"])
+        assert capsys.readouterr().out == ""
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_is_traced(self, validator, caplog):
+        caplog.set_level(logging.DEBUG, logger=TRACE_LOGGER)
+        bad_token = jwt.encode({"sub": "x", "iat": 0, "exp": 9999999999}, "wrong", algorithm="HS256")
+
+        with pytest.raises(Exception):
+            await validator.validate_token(bad_token)
+
+        assert validator.get_cache_info()["trace"]["outcomes"] == {"invalid": 1}
@@ -0,0 +1,172 @@
+"""
+JWT公钥刷新单元测试
+
+测试覆盖：
+- 缓存过期时并发请求只触发一次公钥获取
+- 临近过期时后台刷新，请求不等待
+- 缓存过期时立即返回上次成功获取的公钥，在后台刷新
+- 刷新失败后按指数退避，退避期间不再访问认证微服务
+- 按kid选择密钥，未知kid触发限频刷新
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock
+
+from src.services.auth.jwt_validator import JWTValidator
+
+
+def _key_response(public_key: str = "default-key", keys=None):
+    data = {"public_key": public_key, "algorithm": "RS256"}
+    if keys is not None:
+        data["keys"] = keys
+    return {"code": 200, "message": "ok", "data": data}
+
+
+class _StubAuthClient:
+    """可控的认证微服务客户端"""
+
+    def __init__(self, responses=None, delay: float = 0.0):
+        self.responses = list(responses or [_key_response()])
+        self.delay = delay
+        self.calls = 0
+
+    async def get_public_key(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        response = self.responses[min(self.calls, len(self.responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _make_validator(client: _StubAuthClient) -> JWTValidator:
+    validator = JWTValidator(auth_client=MagicMock())
+    validator.auth_client = client
+    return validator
+
+
+class TestPublicKeyRefresh:
+    """公钥刷新测试"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self):
+        client = _StubAuthClient(delay=0.05)
+        validator = _make_validator(client)
+
+        results = await asyncio.gather(*(validator._get_public_key_info() for _ in range(20)))
+
+        assert client.calls == 1
+        assert all(result == ("default-key", "RS256", False) for result in results)
+        assert validator.get_cache_info()["key_refresh"]["deduplicated"] == 19
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_before_expiry(self):
+        client = _StubAuthClient([_key_response("old-key"), _key_response("new-key")], delay=0.01)
+        validator = _make_validator(client)
+        await validator._get_public_key_info()
+
+        # 进入提前刷新窗口：仍返回旧密钥，同时在后台刷新
+        validator._key_cache_time = time.time() - (validator._key_cache_ttl - validator._key_refresh_ahead + 1)
+        assert (await validator._get_public_key_info())[0] == "old-key"
+        await validator._key_refresh_task
+
+        assert client.calls == 2
+        assert (await validator._get_public_key_info())[0] == "new-key"
+        assert validator.get_cache_info()["key_refresh"]["background_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_serves_last_good_key_when_refresh_fails(self):
+        client = _StubAuthClient([_key_response("good-key"), RuntimeError("auth down")])
+        validator = _make_validator(client)
+        await validator._get_public_key_info()
+
+        validator._key_cache_time = time.time() - validator._key_cache_ttl - 1
+        key_data, algorithm, is_symmetric = await validator._get_public_key_info()
+        await asyncio.gather(validator._key_refresh_task, return_exceptions=True)
+
+        assert (key_data, algorithm, is_symmetric) == ("good-key", "RS256", False)
+        stats = validator.get_cache_info()["key_refresh"]
+        assert stats["refresh_failures"] == 1
+        assert stats["stale_served"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_key_served_without_waiting_for_refresh(self):
+        client = _StubAuthClient([_key_response("old-key"), _key_response("new-key")])
+        validator = _make_validator(client)
+        await validator._get_public_key_info()
+        client.delay = 10.0  # 认证服务响应很慢
+
+        validator._key_cache_time = time.time() - validator._key_cache_ttl - 1
+        result = await asyncio.wait_for(validator._get_public_key_info(), timeout=1.0)
+
+        assert result[0] == "old-key"
+        await asyncio.sleep(0)  # 让后台刷新任务开始运行
+        assert client.calls == 2
+        validator._key_refresh_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_refresh_failures_back_off(self):
+        client = _StubAuthClient([_key_response("good-key"), RuntimeError("auth down")])
+        validator = _make_validator(client)
+        await validator._get_public_key_info()
+        validator._key_cache_time = time.time() - validator._key_cache_ttl - 1
+
+        await validator._get_public_key_info()
+        await asyncio.gather(validator._key_refresh_task, return_exceptions=True)
+        for _ in range(10):
+            assert (await validator._get_public_key_info())[0] == "good-key"
+
+        # 退避期间不再访问认证微服务
+        assert client.calls == 2
+        assert validator.get_cache_info()["key_refresh"]["backoff_skipped"] == 10
+
+        # 退避结束后再次尝试，连续失败时退避时间翻倍
+        validator._next_refresh_attempt = 0.0
+        await validator._get_public_key_info()
+        await asyncio.gather(validator._key_refresh_task, return_exceptions=True)
+        assert client.calls == 3
+        assert validator._next_refresh_attempt - time.time() > validator._refresh_backoff * 1.5
+
+    @pytest.mark.asyncio
+    async def test_refresh_public_key_keeps_key_on_failure(self):
+        client = _StubAuthClient([_key_response("good-key"), RuntimeError("auth down")])
+        validator = _make_validator(client)
+        await validator._get_public_key_info()
+
+        assert await validator.refresh_public_key() is False
+        assert validator._public_key_cache == "good-key"
+
+    @pytest.mark.asyncio
+    async def test_key_set_selected_by_kid(self):
+        keys = [
+            {"kid": "k1", "public_key": "key-1", "algorithm": "RS256"},
+            {"kid": "k2", "public_key": "key-2", "algorithm": "RS512"}
+        ]
+        client = _StubAuthClient([_key_response("", keys=keys)])
+        validator = _make_validator(client)
+
+        assert await validator._get_public_key_info("k2") == ("key-2", "RS512", False)
+        # 没有kid时使用集合中的第一个作为默认密钥
+        assert await validator._get_public_key_info() == ("key-1", "RS256", False)
+        assert validator.get_cache_info()["kids"] == ["k1", "k2"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_triggers_rate_limited_refresh(self):
+        old_keys = [{"kid": "k1", "public_key": "key-1"}]
+        new_keys = old_keys + [{"kid": "k2", "public_key": "key-2"}]
+        client = _StubAuthClient([_key_response("", keys=old_keys), _key_response("", keys=new_keys)])
+        validator = _make_validator(client)
+        await validator._get_public_key_info("k1")
+
+        assert (await validator._get_public_key_info("k2"))[0] == "key-2"
+        assert client.calls == 2
+
+        # 限频：短时间内的其他未知kid不再触发刷新
+        await validator._get_public_key_info("k3")
+        assert client.calls == 2
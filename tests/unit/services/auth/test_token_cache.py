@@ -0,0 +1,125 @@
+"""
+JWT令牌验证结果缓存单元测试
+
+测试覆盖：
+- 命中、未命中统计
+- 超过容量时按LRU淘汰
+- TTL和令牌exp取较早者过期
+- JWTValidator使用缓存并通过get_cache_info暴露统计
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import time
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
+
+import jwt
+
+from src.services.auth.jwt_validator import JWTValidator
+from src.services.auth.token_cache import TokenCache
+
+
+class TestTokenCache:
+    """TokenCache测试"""
+
+    def test_hit_and_miss_counters(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        # 访问a后，b成为最久未使用
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now)
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set("a", 1)
+
+        monkeypatch.setattr(time, "time", lambda: now + 61)
+        assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_expiry_capped_at_token_exp(self, monkeypatch):
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now)
+        cache = TokenCache(max_size=10, ttl=300)
+        cache.set("a", 1, exp=now + 10)
+
+        monkeypatch.setattr(time, "time", lambda: now + 11)
+        assert cache.get("a") is None
+
+
+class TestJWTValidatorTokenCache:
+    """JWTValidator令牌缓存测试"""
+
+    @pytest.fixture
+    def validator(self):
+        validator = JWTValidator(auth_client=MagicMock(), user_cache_max_size=2, user_cache_ttl=60)
+        validator.local_secret = "test-secret"
+        validator.local_algorithm = "HS256"
+
+        async def key_info(kid=None):
+            return "test-secret", "HS256", True
+
+        validator._get_public_key_info = key_info
+        return validator
+
+    def _token(self, sub: str) -> str:
+        now = datetime.now(timezone.utc)
+        payload = {
+            "sub": sub,
+            "is_guest": False,
+            "iat": int(now.timestamp()),
+            "exp": int((now + timedelta(hours=1)).timestamp())
+        }
+        return jwt.encode(payload, "test-secret", algorithm="HS256")
+
+    @pytest.mark.asyncio
+    async def test_repeated_validation_hits_cache(self, validator):
+        token = self._token("user-1")
+
+        first = await validator.validate_token(token)
+        second = await validator.validate_token(token)
+
+        assert first.user_info is second.user_info
+        stats = validator.get_cache_info()["user_cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_capacity_is_bounded(self, validator):
+        for i in range(5):
+            await validator.validate_token(self._token(f"user-{i}"))
+
+        stats = validator.get_cache_info()["user_cache"]
+        assert stats["size"] == 2
+        assert stats["max_size"] == 2
+        assert stats["evictions"] == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidate_cache_clears_user_cache(self, validator):
+        await validator.validate_token(self._token("user-1"))
+        validator.invalidate_cache()
+        assert validator.get_cache_info()["user_cache"]["size"] == 0
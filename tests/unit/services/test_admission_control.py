@@ -0,0 +1,197 @@
+"""
+自适应准入控制单元测试
+
+测试覆盖：
+- 并发上限与FIFO排队
+- 队列已满、排队超时时拒绝
+- 持续积压时（CoDel）缩短排队超时
+- 排队中取消不泄漏名额
+- 中间件返回503和Retry-After，流式响应结束后才释放名额
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+import src.services.admission_control as admission_control
+from src.api.middleware.admission import AdmissionControlMiddleware
+from src.services.admission_control import AdmissionController, AdmissionRejected
+
+
+def make_controller(**kwargs) -> AdmissionController:
+    params = dict(
+        name="test",
+        max_concurrency=2,
+        max_queue=2,
+        target_delay=0.01,
+        interval=0.05,
+        max_queue_wait=0.5
+    )
+    params.update(kwargs)
+    return AdmissionController(**params)
+
+
+class TestAdmissionController:
+    """准入控制器测试"""
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrency_and_queues_fifo(self):
+        controller = make_controller()
+        await controller.acquire()
+        await controller.acquire()
+
+        order = []
+
+        async def waiter(i):
+            await controller.acquire()
+            order.append(i)
+
+        tasks = [asyncio.create_task(waiter(i)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert controller.in_flight == 2
+        assert controller.queue_depth == 2
+
+        controller.release()
+        controller.release()
+        await asyncio.gather(*tasks)
+
+        assert order == [0, 1]
+        assert controller.in_flight == 2
+        assert controller.get_stats()["queued"] == 2
+
+    @pytest.mark.asyncio
+    async def test_sheds_when_queue_full(self):
+        controller = make_controller(max_concurrency=1, max_queue=1)
+        await controller.acquire()
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire()
+
+        assert exc_info.value.reason == "queue_full"
+        assert exc_info.value.retry_after >= 1
+        controller.release()
+        await queued
+
+    @pytest.mark.asyncio
+    async def test_sheds_after_queue_deadline(self):
+        controller = make_controller(max_concurrency=1, max_queue_wait=0.02)
+        await controller.acquire()
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire()
+
+        assert exc_info.value.reason == "timeout"
+        stats = controller.get_stats()
+        assert stats["shed_timeout"] == 1
+        assert stats["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_standing_queue_shortens_timeout(self):
+        controller = make_controller(max_concurrency=1, max_queue=10, max_queue_wait=0.03, interval=0.02)
+        await controller.acquire()
+
+        # 持续积压：连续两个interval内请求都排队超时
+        for _ in range(2):
+            with pytest.raises(AdmissionRejected):
+                await controller.acquire()
+        assert controller.overloaded is True
+
+        # 过载时排队超时缩短为target_delay
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire()
+        assert loop.time() - start < 0.03
+
+    @pytest.mark.asyncio
+    async def test_recovers_when_queue_drains(self):
+        controller = make_controller(interval=0.01)
+        controller._overloaded = True
+        controller._interval_end = 1.0
+
+        await controller.acquire()
+        controller.release()
+        await asyncio.sleep(0.02)
+        await controller.acquire()
+
+        assert controller.overloaded is False
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        controller = make_controller(max_concurrency=1)
+        await controller.acquire()
+
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+        controller.release()
+        assert controller.in_flight == 0
+        assert controller.queue_depth == 0
+
+
+class TestAdmissionControlMiddleware:
+    """准入控制中间件测试"""
+
+    @pytest.fixture(autouse=True)
+    def controllers(self):
+        admission_control._admission_controllers.clear()
+        admission_control._admission_controllers["chat_stream"] = make_controller(
+            name="chat_stream", max_concurrency=1, max_queue=0
+        )
+        yield admission_control._admission_controllers
+        admission_control._admission_controllers.clear()
+
+    @pytest.fixture
+    def app(self):
+        app = FastAPI()
+        release = asyncio.Event()
+
+        @app.post("/chat/sessions/{session_id}/chat")
+        async def chat(session_id: str):
+            async def tokens():
+                yield "a"
+                await release.wait()
+                yield "b"
+            return StreamingResponse(tokens(), media_type="text/plain")
+
+        @app.get("/tasks")
+        async def tasks():
+            return {"ok": True}
+
+        app.add_middleware(AdmissionControlMiddleware)
+        app.state.release = release
+        return app
+
+    @pytest.mark.asyncio
+    async def test_sheds_with_503_while_stream_in_flight(self, app, controllers):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/chat/sessions/s1/chat"))
+            while controllers["chat_stream"].in_flight == 0:
+                await asyncio.sleep(0.001)
+
+            shed = await client.post("/chat/sessions/s2/chat")
+            assert shed.status_code == 503
+            assert shed.json()["code"] == 503
+            assert int(shed.headers["Retry-After"]) >= 1
+
+            # 不受保护的路由不受影响
+            assert (await client.get("/tasks")).status_code == 200
+
+            app.state.release.set()
+            assert (await first).text == "ab"
+
+        stats = controllers["chat_stream"].get_stats()
+        assert stats["in_flight"] == 0
+        assert stats["shed"] == 1
@@ -0,0 +1,206 @@
+"""
+微服务熔断器单元测试
+
+测试覆盖：
+- 错误率/慢调用率触发熔断
+- 打开状态快速失败
+- 半开状态单请求探测
+- 传输层集成（httpx.MockTransport）
+- Task客户端快速失败与健康状态同步
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import pytest
+import httpx
+from unittest.mock import patch
+from uuid import uuid4
+
+from src.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerTransport,
+    CircuitOpenError,
+    CircuitState,
+    get_circuit_breaker
+)
+from src.services.enhanced_task_microservice_client import (
+    EnhancedTaskMicroserviceClient,
+    TaskMicroserviceError
+)
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    params = dict(
+        name="test",
+        failure_rate_threshold=0.5,
+        slow_call_rate_threshold=0.8,
+        slow_call_duration=1.0,
+        minimum_calls=4,
+        window_size=10,
+        open_duration=30.0
+    )
+    params.update(kwargs)
+    return CircuitBreaker(**params)
+
+
+class TestCircuitBreaker:
+    """熔断器状态机测试"""
+
+    def test_stays_closed_below_minimum_calls(self):
+        breaker = make_breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_opens_on_failure_rate(self):
+        breaker = make_breaker()
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow_request() is False
+        assert breaker.get_stats()["rejected_calls"] == 1
+
+    def test_opens_on_slow_call_rate(self):
+        breaker = make_breaker(slow_call_rate_threshold=0.75)
+        for _ in range(4):
+            breaker.record_success(duration=2.0)
+        assert breaker.state == CircuitState.OPEN
+
+    def test_sliding_window_forgets_old_failures(self):
+        breaker = make_breaker(window_size=4, failure_rate_threshold=0.75)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_success()  # 第一个失败滑出窗口
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_stats()["window_failure_rate"] == 0.25
+
+    def test_half_open_allows_single_probe(self):
+        breaker = make_breaker()
+        with patch("src.services.circuit_breaker.time.monotonic", return_value=100.0):
+            for _ in range(4):
+                breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+
+        with patch("src.services.circuit_breaker.time.monotonic", return_value=131.0):
+            assert breaker.allow_request() is True
+            assert breaker.state == CircuitState.HALF_OPEN
+            assert breaker.allow_request() is False
+
+    def test_successful_probe_closes(self):
+        breaker = make_breaker(open_duration=0.0)
+        for _ in range(4):
+            breaker.record_failure()
+        assert breaker.allow_request() is True
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow_request() is True
+
+    def test_failed_probe_reopens(self):
+        breaker = make_breaker(open_duration=0.0)
+        for _ in range(4):
+            breaker.record_failure()
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.get_stats()["times_opened"] == 2
+
+    def test_release_frees_probe_slot(self):
+        breaker = make_breaker(open_duration=0.0)
+        for _ in range(4):
+            breaker.record_failure()
+        assert breaker.allow_request() is True
+        breaker.release()
+        assert breaker.allow_request() is True
+
+    def test_listeners_are_notified(self):
+        breaker = make_breaker()
+        transitions = []
+        breaker.add_listener(lambda b, old, new: transitions.append((old, new)))
+        for _ in range(4):
+            breaker.record_failure()
+        breaker.reset()
+        assert transitions == [
+            (CircuitState.CLOSED, CircuitState.OPEN),
+            (CircuitState.OPEN, CircuitState.CLOSED)
+        ]
+
+    def test_registry_returns_shared_instance(self):
+        assert get_circuit_breaker("registry-test") is get_circuit_breaker("registry-test")
+
+
+class TestCircuitBreakerTransport:
+    """传输层集成测试"""
+
+    @pytest.mark.asyncio
+    async def test_fails_fast_without_network_call_when_open(self):
+        breaker = make_breaker()
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ConnectError("refused", request=request)
+
+        transport = CircuitBreakerTransport(breaker, transport=httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(4):
+                with pytest.raises(httpx.ConnectError):
+                    await client.get("http://upstream/health")
+            assert breaker.state == CircuitState.OPEN
+
+            with pytest.raises(CircuitOpenError):
+                await client.get("http://upstream/health")
+
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_server_errors_count_as_failures(self):
+        breaker = make_breaker()
+        transport = CircuitBreakerTransport(
+            breaker, transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(4):
+                await client.get("http://upstream/tasks/")
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_client_errors_count_as_success(self):
+        breaker = make_breaker()
+        transport = CircuitBreakerTransport(
+            breaker, transport=httpx.MockTransport(lambda request: httpx.Response(404))
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(4):
+                await client.get("http://upstream/tasks/")
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestTaskClientCircuitBreaker:
+    """Task客户端熔断集成测试"""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_without_retry_sleep(self):
+        client = EnhancedTaskMicroserviceClient(base_url="http://localhost:20253")
+        breaker = client.circuit_breaker
+        breaker.reset()
+        for _ in range(breaker.minimum_calls):
+            breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+
+        with patch("asyncio.sleep") as mock_sleep:
+            with pytest.raises(TaskMicroserviceError) as exc_info:
+                await client.call_microservice("POST", "tasks", str(uuid4()), data={"title": "t"})
+
+        assert exc_info.value.status_code == 503
+        mock_sleep.assert_not_called()
+        assert client._health_status["status"] == "unhealthy"
+        assert await client.health_check() is False
+        breaker.reset()
+        assert client._health_status["status"] == "healthy"
+        await client.close()
@@ -0,0 +1,162 @@
+"""
+条件GET（ETag / If-None-Match）单元测试
+
+测试覆盖：
+- ETag计算稳定性与If-None-Match匹配规则
+- 版本号未变时免上游返回304
+- 写操作（包括聊天工具写任务）递增版本号后重新校验
+- 过期记录必须重新调用上游
+- 路由集成：任务列表和Top3接口返回ETag/304
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.dependencies import get_current_user_id
+from src.domains.task.router import router as task_router
+from src.services.conditional_get import (
+    ConditionalGetManager,
+    compute_etag,
+    etag_matches,
+    get_conditional_get_manager
+)
+from src.services.enhanced_task_microservice_client import get_enhanced_task_microservice_client
+
+
+class TestETagHelpers:
+    """ETag工具函数测试"""
+
+    def test_compute_etag_is_stable_across_key_order(self):
+        assert compute_etag({"a": 1, "b": [1, 2]}) == compute_etag({"b": [1, 2], "a": 1})
+        assert compute_etag({"a": 1}) != compute_etag({"a": 2})
+
+    def test_etag_matches(self):
+        etag = '"abc"'
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('W/"abc"', etag)
+        assert etag_matches('"x", "abc"', etag)
+        assert etag_matches('*', etag)
+        assert not etag_matches('"x"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestConditionalGetManager:
+    """管理器测试"""
+
+    def test_short_circuit_until_version_bump(self):
+        manager = ConditionalGetManager()
+        etag = manager.remember("u1", "/tasks?", {"data": 1}, manager.get_version("u1"))
+
+        assert manager.check_not_modified("u1", "/tasks?", etag) == etag
+        assert manager.check_not_modified("u1", "/tasks?", '"other"') is None
+
+        manager.bump_user_version("u1")
+        assert manager.check_not_modified("u1", "/tasks?", etag) is None
+        assert manager.get_stats()["not_modified_without_upstream"] == 1
+
+    def test_write_during_upstream_call_is_not_remembered(self):
+        manager = ConditionalGetManager()
+        version = manager.get_version("u1")
+        manager.bump_user_version("u1")  # 上游调用期间发生写操作
+        etag = manager.remember("u1", "/tasks?", {"data": "stale"}, version)
+
+        assert manager.check_not_modified("u1", "/tasks?", etag) is None
+
+    def test_expired_record_requires_upstream(self):
+        manager = ConditionalGetManager(max_age=10.0)
+        with patch("src.services.conditional_get.time.monotonic", return_value=100.0):
+            etag = manager.remember("u1", "/tasks?", {"data": 1}, 0)
+        with patch("src.services.conditional_get.time.monotonic", return_value=111.0):
+            assert manager.check_not_modified("u1", "/tasks?", etag) is None
+
+    def test_users_are_evicted_lru(self):
+        manager = ConditionalGetManager(max_users=1)
+        etag = manager.remember("u1", "/tasks?", {"data": 1}, 0)
+        manager.remember("u2", "/tasks?", {"data": 1}, 0)
+        assert manager.check_not_modified("u1", "/tasks?", etag) is None
+
+
+class TestConditionalGetRoutes:
+    """路由集成测试"""
+
+    @pytest.fixture
+    def setup(self):
+        user_id = uuid4()
+        client = AsyncMock()
+        client.call_microservice.return_value = {
+            "success": True,
+            "code": 200,
+            "message": "ok",
+            "data": [{
+                "id": "t1", "title": "任务", "status": "NOT_STARTED", "is_deleted": False,
+                "created_at": "2024-12-15T10:00:00Z", "updated_at": "2024-12-16T14:30:00Z"
+            }]
+        }
+        client.invalidate_user_cache = lambda user_id: 0
+
+        app = FastAPI()
+        app.include_router(task_router, prefix="/api/v1")
+        app.dependency_overrides[get_current_user_id] = lambda: user_id
+        app.dependency_overrides[get_enhanced_task_microservice_client] = lambda: client
+        get_conditional_get_manager().clear()
+        return TestClient(app), client
+
+    def test_tasks_etag_and_304_without_upstream(self, setup):
+        http, client = setup
+
+        first = http.get("/api/v1/tasks/")
+        etag = first.headers["ETag"]
+        assert first.status_code == 200
+        assert client.call_microservice.await_count == 1
+
+        second = http.get("/api/v1/tasks/", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == etag
+        assert client.call_microservice.await_count == 1
+
+    def test_write_endpoint_forces_revalidation(self, setup):
+        http, client = setup
+        etag = http.get("/api/v1/tasks/").headers["ETag"]
+
+        http.delete("/api/v1/tasks/t1")
+        calls_before = client.call_microservice.await_count
+
+        # 写操作后需要调用上游；内容未变化时仍返回304
+        response = http.get("/api/v1/tasks/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert client.call_microservice.await_count == calls_before + 1
+
+    def test_chat_tool_write_forces_revalidation(self, setup):
+        from src.domains.chat.tools.utils import invalidate_user_task_cache
+
+        http, client = setup
+        etag = http.get("/api/v1/tasks/").headers["ETag"]
+
+        with patch("src.domains.chat.tools.utils.get_enhanced_task_microservice_client", return_value=client):
+            invalidate_user_task_cache(http.app.dependency_overrides[get_current_user_id]())
+        calls_before = client.call_microservice.await_count
+
+        response = http.get("/api/v1/tasks/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert client.call_microservice.await_count == calls_before + 1
+
+    def test_top3_etag(self, setup):
+        http, client = setup
+        client.call_microservice.return_value = {
+            "success": True, "code": 200, "data": {"date": "2024-12-25", "task_ids": ["t1"]}
+        }
+
+        first = http.get("/api/v1/tasks/special/top3/2024-12-25")
+        response = http.get(
+            "/api/v1/tasks/special/top3/2024-12-25",
+            headers={"If-None-Match": first.headers["ETag"]}
+        )
+        assert response.status_code == 304
@@ -0,0 +1,77 @@
+"""
+HTTP客户端注册表单元测试
+
+测试覆盖：
+- 同名上游复用同一客户端
+- 关闭后自动重建
+- 集成熔断传输层
+- 旧版Task客户端与Auth客户端使用共享客户端
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import pytest
+import httpx
+
+from src.services.http_client_registry import HTTPClientRegistry, get_http_client_registry
+from src.services.circuit_breaker import CircuitBreakerTransport
+from src.services.task_microservice_client import TaskMicroserviceClient
+from src.services.auth.client import AuthMicroserviceClient
+
+
+class TestHTTPClientRegistry:
+    """注册表测试"""
+
+    @pytest.mark.asyncio
+    async def test_same_name_returns_same_client(self):
+        registry = HTTPClientRegistry()
+        client1 = registry.get_client("svc")
+        client2 = registry.get_client("svc")
+        other = registry.get_client("other")
+
+        assert client1 is client2
+        assert client1 is not other
+        await registry.close_all()
+
+    @pytest.mark.asyncio
+    async def test_close_all_closes_and_recreates(self):
+        registry = HTTPClientRegistry()
+        client = registry.get_client("svc")
+
+        await registry.close_all()
+
+        assert client.is_closed
+        assert registry.get_stats() == {}
+        new_client = registry.get_client("svc")
+        assert new_client is not client
+        assert not new_client.is_closed
+        await registry.close_all()
+
+    @pytest.mark.asyncio
+    async def test_client_uses_breaker_transport(self):
+        registry = HTTPClientRegistry()
+        client = registry.get_client("svc", limits=httpx.Limits(max_connections=5), http2=True)
+
+        assert isinstance(client._transport, CircuitBreakerTransport)
+        assert client._transport.breaker.name == "svc"
+        await registry.close_all()
+
+
+class TestClientsUseSharedPool:
+    """客户端共享连接池测试"""
+
+    @pytest.mark.asyncio
+    async def test_task_client_reuses_registry_client(self):
+        client_a = TaskMicroserviceClient("http://localhost:20253")
+        client_b = TaskMicroserviceClient("http://localhost:20253")
+
+        assert client_a._get_http_client() is client_b._get_http_client()
+        assert client_a._get_http_client() is get_http_client_registry().get_client("task")
+
+    @pytest.mark.asyncio
+    async def test_auth_client_reuses_registry_client(self):
+        client = AuthMicroserviceClient(base_url="http://localhost:8987")
+
+        assert client._get_http_client() is client._get_http_client()
+        assert client._get_http_client() is get_http_client_registry().get_client("auth")
@@ -0,0 +1,228 @@
+"""
+请求对冲单元测试
+
+测试覆盖：
+- 延迟分位数计算和最少样本数
+- 对冲预算积累和消耗
+- 慢请求触发对冲并取先返回的结果
+- 主请求失败时使用对冲结果
+- 预算不足时不对冲
+- 客户端只对已映射的GET请求对冲
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from src.services.request_hedging import HedgeBudget, LatencyTracker, RequestHedger
+from src.services.enhanced_task_microservice_client import EnhancedTaskMicroserviceClient
+
+
+def _warm_hedger(route: str = "GET tasks", latency: float = 0.01, budget_tokens: float = 0.0) -> RequestHedger:
+    """构造已有足够样本的对冲执行器"""
+    tracker = LatencyTracker(percentile=0.95, window_size=50, min_samples=5, refresh_interval=1)
+    for _ in range(10):
+        tracker.record(route, latency)
+    budget = HedgeBudget(ratio=1.0, max_tokens=10.0)
+    budget._tokens = budget_tokens
+    return RequestHedger(tracker=tracker, budget=budget, min_delay=0.0, max_delay=1.0)
+
+
+class TestLatencyTracker:
+    """延迟统计测试"""
+
+    def test_no_threshold_before_min_samples(self):
+        tracker = LatencyTracker(min_samples=5, refresh_interval=1)
+        for _ in range(4):
+            tracker.record("GET tasks", 0.1)
+        assert tracker.get_percentile("GET tasks") is None
+
+    def test_percentile_over_window(self):
+        tracker = LatencyTracker(percentile=0.9, window_size=10, min_samples=10, refresh_interval=1)
+        for value in range(1, 11):
+            tracker.record("GET tasks", value / 100)
+        assert tracker.get_percentile("GET tasks") == pytest.approx(0.10)
+
+        # 旧样本滚出窗口
+        for _ in range(10):
+            tracker.record("GET tasks", 0.01)
+        assert tracker.get_percentile("GET tasks") == pytest.approx(0.01)
+
+    def test_routes_are_independent(self):
+        tracker = LatencyTracker(min_samples=1, refresh_interval=1)
+        tracker.record("GET tasks", 0.5)
+        assert tracker.get_percentile("GET tasks/tags") is None
+
+
+class TestHedgeBudget:
+    """对冲预算测试"""
+
+    def test_budget_limits_hedge_ratio(self):
+        budget = HedgeBudget(ratio=0.05, max_tokens=10.0)
+        granted = 0
+        for _ in range(1000):
+            budget.on_request()
+            if budget.try_acquire():
+                granted += 1
+        assert granted == 50
+
+    def test_budget_burst_is_capped(self):
+        budget = HedgeBudget(ratio=1.0, max_tokens=2.0)
+        for _ in range(10):
+            budget.on_request()
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+
+class TestRequestHedger:
+    """对冲执行器测试"""
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        hedger = _warm_hedger(latency=0.5, budget_tokens=5.0)
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            return "ok"
+
+        assert await hedger.run("GET tasks", upstream) == "ok"
+        assert calls == 1
+        assert hedger.get_stats()["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_samples(self):
+        hedger = RequestHedger(budget=HedgeBudget(ratio=1.0), min_delay=0.0)
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        assert await hedger.run("GET tasks", upstream) == "ok"
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_hedge_wins(self):
+        hedger = _warm_hedger(latency=0.01, budget_tokens=5.0)
+        primary_cancelled = asyncio.Event()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    primary_cancelled.set()
+                    raise
+            return f"call-{calls}"
+
+        assert await hedger.run("GET tasks", upstream) == "call-2"
+        await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+        stats = hedger.get_stats()
+        assert stats["hedged"] == 1
+        assert stats["routes"]["GET tasks"]["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_back_to_hedge(self):
+        hedger = _warm_hedger(latency=0.01, budget_tokens=5.0)
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(0.05)
+                raise ValueError("primary failed")
+            await asyncio.sleep(0.1)
+            return "hedge"
+
+        assert await hedger.run("GET tasks", upstream) == "hedge"
+
+    @pytest.mark.asyncio
+    async def test_both_failed_raises_primary_error(self):
+        hedger = _warm_hedger(latency=0.01, budget_tokens=5.0)
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            current = calls
+            await asyncio.sleep(0.05)
+            raise ValueError(f"failed-{current}")
+
+        with pytest.raises(ValueError, match="failed-1"):
+            await hedger.run("GET tasks", upstream)
+
+    @pytest.mark.asyncio
+    async def test_budget_exhausted_skips_hedge(self):
+        hedger = _warm_hedger(latency=0.01, budget_tokens=0.0)
+        hedger.budget.ratio = 0.0
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        assert await hedger.run("GET tasks", upstream) == "ok"
+        assert calls == 1
+        assert hedger.get_stats()["routes"]["GET tasks"]["budget_denied"] == 1
+
+
+class TestClientHedging:
+    """客户端请求对冲测试"""
+
+    @pytest.fixture
+    def client(self):
+        client = EnhancedTaskMicroserviceClient(base_url="http://localhost:20253")
+        client.cache_enabled = False
+        client.coalescing_enabled = False
+        client.hedging_enabled = True
+        client.hedger = _warm_hedger(route="GET tasks", latency=0.01, budget_tokens=5.0)
+        return client
+
+    def _mock_upstream(self, client, first_delay: float):
+        calls = []
+
+        async def execute(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                await asyncio.sleep(first_delay)
+            response = MagicMock()
+            response.status_code = 200
+            response.json.side_effect = lambda: {"code": 200, "success": True, "data": []}
+            return response
+
+        client._execute_request_with_retry = execute
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_mapped_get_is_hedged(self, client):
+        calls = self._mock_upstream(client, first_delay=10)
+
+        result = await asyncio.wait_for(client.call_microservice("GET", "tasks", str(uuid4())), timeout=2)
+
+        assert result["success"] is True
+        assert len(calls) == 2
+        assert client.get_hedging_stats()["hedged"] == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_are_never_hedged(self, client):
+        calls = self._mock_upstream(client, first_delay=0.05)
+
+        await client.call_microservice("POST", "tasks", str(uuid4()), data={"title": "t"})
+
+        assert len(calls) == 1
+        assert client.get_hedging_stats()["requests"] == 0
@@ -0,0 +1,187 @@
+"""
+请求合并（Single-Flight）单元测试
+
+测试覆盖：
+- 并发相同请求共享一次上游调用
+- 异常传播给所有等待者
+- 单个调用方取消不影响其他等待者
+- 按路由统计
+- 客户端GET请求合并
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from src.services.single_flight import SingleFlight
+from src.services.enhanced_task_microservice_client import EnhancedTaskMicroserviceClient
+
+
+class TestSingleFlight:
+    """SingleFlight测试"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_upstream(self):
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        waiters = [asyncio.create_task(flight.do("k", upstream, route="GET tasks")) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        stats = flight.get_stats()
+        assert stats["routes"]["GET tasks"] == {"requests": 5, "upstream_calls": 1, "deduplicated": 4}
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_merged(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return calls
+
+        await asyncio.gather(flight.do("a", upstream), flight.do("b", upstream))
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_merged(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flight.do("k", upstream) == 1
+        assert await flight.do("k", upstream) == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def upstream():
+            await release.wait()
+            raise ValueError("boom")
+
+        waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def upstream():
+            await release.wait()
+            return "ok"
+
+        leader = asyncio.create_task(flight.do("k", upstream))
+        follower = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == "ok"
+        assert leader.cancelled()
+
+
+class TestClientCoalescing:
+    """客户端请求合并测试"""
+
+    @pytest.fixture
+    def client(self):
+        client = EnhancedTaskMicroserviceClient(base_url="http://localhost:20253")
+        client.cache_enabled = False
+        return client
+
+    def _mock_upstream(self, client, release: asyncio.Event):
+        calls = []
+
+        async def execute(**kwargs):
+            calls.append(kwargs)
+            await release.wait()
+            response = MagicMock()
+            response.status_code = 200
+            response.json.side_effect = lambda: {"code": 200, "success": True, "data": []}
+            return response
+
+        client._execute_request_with_retry = execute
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_concurrent_top3_reads_are_coalesced(self, client):
+        release = asyncio.Event()
+        calls = self._mock_upstream(client, release)
+        user_id = str(uuid4())
+
+        waiters = [
+            asyncio.create_task(client.call_microservice("POST", "tasks/top3/query", user_id, date="2024-12-25"))
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert len(calls) == 1
+        # 每个调用方拿到独立的响应对象
+        results[0]["data"].append("x")
+        assert results[1]["data"] == []
+        stats = client.get_coalescing_stats()
+        assert stats["routes"]["POST tasks/top3/query"]["deduplicated"] == 3
+
+    @pytest.mark.asyncio
+    async def test_different_users_are_not_coalesced(self, client):
+        release = asyncio.Event()
+        calls = self._mock_upstream(client, release)
+
+        waiters = [
+            asyncio.create_task(client.call_microservice("GET", "tasks", str(uuid4())))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*waiters)
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_are_never_coalesced(self, client):
+        release = asyncio.Event()
+        calls = self._mock_upstream(client, release)
+        user_id = str(uuid4())
+
+        waiters = [
+            asyncio.create_task(client.call_microservice("POST", "tasks", user_id, data={"title": "t"}))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*waiters)
+
+        assert len(calls) == 2
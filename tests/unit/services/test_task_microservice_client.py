@@ -121,8 +121,7 @@ class TestTaskMicroserviceClient:
             assert result == expected_code
 
     @pytest.mark.asyncio
-    @patch('src.services.task_microservice_client.httpx.AsyncClient')
-    async def test_call_task_service_success(self, mock_client_class, client, sample_success_response):
+    async def test_call_task_service_success(self, client, sample_success_response):
         """测试成功调用微服务"""
         # 设置Mock
         mock_response = MagicMock()
@@ -131,7 +130,7 @@ class TestTaskMicroserviceClient:
 
         mock_client = AsyncMock()
         mock_client.request = AsyncMock(return_value=mock_response)
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        client._get_http_client = MagicMock(return_value=mock_client)
 
         # 执行调用
         result = await client.call_task_service(
@@ -154,8 +153,7 @@ class TestTaskMicroserviceClient:
         assert call_args[1]["json"]["title"] == "测试任务"
 
     @pytest.mark.asyncio
-    @patch('src.services.task_microservice_client.httpx.AsyncClient')
-    async def test_call_task_service_microservice_error(self, mock_client_class, client, sample_error_response):
+    async def test_call_task_service_microservice_error(self, client, sample_error_response):
         """测试微服务返回错误"""
         # 设置Mock
         mock_response = MagicMock()
@@ -164,7 +162,7 @@ class TestTaskMicroserviceClient:
 
         mock_client = AsyncMock()
         mock_client.request = AsyncMock(return_value=mock_response)
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        client._get_http_client = MagicMock(return_value=mock_client)
 
         # 执行调用
         result = await client.call_task_service(
@@ -179,13 +177,12 @@ class TestTaskMicroserviceClient:
         assert result["message"] == "任务不存在"
 
     @pytest.mark.asyncio
-    @patch('src.services.task_microservice_client.httpx.AsyncClient')
-    async def test_call_task_service_timeout_error(self, mock_client_class, client):
+    async def test_call_task_service_timeout_error(self, client):
         """测试微服务调用超时"""
         # 设置Mock
         mock_client = AsyncMock()
         mock_client.request.side_effect = httpx.TimeoutException("Request timeout")
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        client._get_http_client = MagicMock(return_value=mock_client)
 
         # 执行调用并验证异常
         with pytest.raises(TaskMicroserviceError) as exc_info:
@@ -199,13 +196,12 @@ class TestTaskMicroserviceClient:
         assert "超时" in exc_info.value.message
 
     @pytest.mark.asyncio
-    @patch('src.services.task_microservice_client.httpx.AsyncClient')
-    async def test_call_task_service_connection_error(self, mock_client_class, client):
+    async def test_call_task_service_connection_error(self, client):
         """测试微服务连接失败"""
         # 设置Mock
         mock_client = AsyncMock()
         mock_client.request.side_effect = httpx.ConnectError("Connection failed")
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        client._get_http_client = MagicMock(return_value=mock_client)
 
         # 执行调用并验证异常
         with pytest.raises(TaskMicroserviceError) as exc_info:
@@ -219,8 +215,7 @@ class TestTaskMicroserviceClient:
         assert "不可用" in exc_info.value.message
 
     @pytest.mark.asyncio
-    @patch('src.services.task_microservice_client.httpx.AsyncClient')
-    async def test_call_task_service_with_params(self, mock_client_class, client, sample_success_response):
+    async def test_call_task_service_with_params(self, client, sample_success_response):
         """测试带查询参数的微服务调用"""
         # 设置Mock
         mock_response = MagicMock()
@@ -229,7 +224,7 @@ class TestTaskMicroserviceClient:
 
         mock_client = AsyncMock()
         mock_client.request = AsyncMock(return_value=mock_response)
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        client._get_http_client = MagicMock(return_value=mock_client)
 
         # 执行调用
         user_id = str(uuid4())
@@ -251,8 +246,7 @@ class TestTaskMicroserviceClient:
         assert params["page_size"] == 20
 
     @pytest.mark.asyncio
-    @patch('src.services.task_microservice_client.httpx.AsyncClient')
-    async def test_health_check_success(self, mock_client_class, client):
+    async def test_health_check_success(self, client):
         """测试健康检查成功"""
         # 设置Mock
         mock_response = AsyncMock()
@@ -260,7 +254,7 @@ class TestTaskMicroserviceClient:
 
         mock_client = AsyncMock()
         mock_client.get.return_value = mock_response
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        client._get_http_client = MagicMock(return_value=mock_client)
 
         # 执行健康检查
         result = await client.health_check()
@@ -270,13 +264,12 @@ class TestTaskMicroserviceClient:
         mock_client.get.assert_called_once_with(f"{client.base_url}/health", headers=client._get_headers())
 
     @pytest.mark.asyncio
-    @patch('src.services.task_microservice_client.httpx.AsyncClient')
-    async def test_health_check_failure(self, mock_client_class, client):
+    async def test_health_check_failure(self, client):
         """测试健康检查失败"""
         # 设置Mock
         mock_client = AsyncMock()
         mock_client.get.side_effect = httpx.ConnectError("Connection failed")
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        client._get_http_client = MagicMock(return_value=mock_client)
 
         # 执行健康检查
         result = await client.health_check()
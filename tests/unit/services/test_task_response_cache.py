@@ -0,0 +1,281 @@
+"""
+Task微服务响应缓存单元测试
+
+测试覆盖：
+- 缓存键规范化
+- TTL过期与LRU淘汰
+- 按用户失效
+- 失效代数：写操作之前发起的读请求不写入缓存
+- 命中率统计
+- 客户端读穿透与写后失效
+- 聊天工具写任务后失效缓存
+
+作者：TaTakeKe团队
+版本：1.0.0
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from src.services.task_response_cache import InMemoryResponseCache, ResponseCacheBackend, build_cache_key
+from src.services.enhanced_task_microservice_client import EnhancedTaskMicroserviceClient
+
+
+class TestBuildCacheKey:
+    """缓存键测试"""
+
+    def test_param_order_does_not_matter(self):
+        key1 = build_cache_key("u1", "GET", "tasks/", {"page": 1, "page_size": 20})
+        key2 = build_cache_key("u1", "get", "tasks/", {"page_size": 20, "page": 1})
+        assert key1 == key2
+
+    def test_none_params_are_ignored(self):
+        key1 = build_cache_key("u1", "GET", "tasks/", {"page": 1, "status": None})
+        key2 = build_cache_key("u1", "GET", "tasks/", {"page": 1})
+        assert key1 == key2
+
+    def test_different_users_have_different_keys(self):
+        key1 = build_cache_key("u1", "GET", "tasks/", {"page": 1})
+        key2 = build_cache_key("u2", "GET", "tasks/", {"page": 1})
+        assert key1 != key2
+
+
+class TestInMemoryResponseCache:
+    """进程内缓存测试"""
+
+    def test_backend_interface_is_abstract(self):
+        with pytest.raises(TypeError):
+            ResponseCacheBackend()
+        assert isinstance(InMemoryResponseCache(), ResponseCacheBackend)
+
+    def test_hit_and_miss(self):
+        cache = InMemoryResponseCache(default_ttl=10)
+        key = build_cache_key("u1", "GET", "tasks/")
+
+        assert cache.get(key) is None
+        cache.set(key, {"success": True, "data": [1]})
+        assert cache.get(key) == {"success": True, "data": [1]}
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["entries"] == 1
+
+    def test_returned_value_is_isolated(self):
+        cache = InMemoryResponseCache(default_ttl=10)
+        key = build_cache_key("u1", "GET", "tasks/")
+        cache.set(key, {"data": {"tasks": [{"id": "t1"}]}})
+
+        cached = cache.get(key)
+        cached["data"]["tasks"].append({"id": "t2"})
+
+        assert cache.get(key) == {"data": {"tasks": [{"id": "t1"}]}}
+
+    def test_ttl_expiry(self):
+        cache = InMemoryResponseCache(default_ttl=5)
+        key = build_cache_key("u1", "GET", "tasks/")
+
+        with patch("src.services.task_response_cache.time.monotonic", return_value=100.0):
+            cache.set(key, {"success": True})
+        with patch("src.services.task_response_cache.time.monotonic", return_value=104.0):
+            assert cache.get(key) is not None
+        with patch("src.services.task_response_cache.time.monotonic", return_value=106.0):
+            assert cache.get(key) is None
+
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["entries"] == 0
+        assert stats["users"] == 0
+
+    def test_lru_eviction(self):
+        cache = InMemoryResponseCache(default_ttl=10, max_entries=2)
+        key_a = build_cache_key("u1", "GET", "a")
+        key_b = build_cache_key("u1", "GET", "b")
+        key_c = build_cache_key("u2", "GET", "c")
+
+        cache.set(key_a, {"v": "a"})
+        cache.set(key_b, {"v": "b"})
+        cache.get(key_a)  # a变为最近使用
+        cache.set(key_c, {"v": "c"})
+
+        assert cache.get(key_b) is None
+        assert cache.get(key_a) == {"v": "a"}
+        assert cache.get(key_c) == {"v": "c"}
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_invalidate_user_only_affects_that_user(self):
+        cache = InMemoryResponseCache(default_ttl=10)
+        key_u1_a = build_cache_key("u1", "GET", "tasks/", {"page": 1})
+        key_u1_b = build_cache_key("u1", "GET", "tasks/tags/")
+        key_u2 = build_cache_key("u2", "GET", "tasks/", {"page": 1})
+        for key in (key_u1_a, key_u1_b, key_u2):
+            cache.set(key, {"success": True})
+
+        assert cache.invalidate_user("u1") == 2
+        assert cache.get(key_u1_a) is None
+        assert cache.get(key_u1_b) is None
+        assert cache.get(key_u2) is not None
+        assert cache.get_stats()["invalidations"] == 2
+        assert cache.invalidate_user("u1") == 0
+
+    def test_set_skipped_when_generation_changed(self):
+        cache = InMemoryResponseCache(default_ttl=10)
+        key = build_cache_key("u1", "GET", "tasks/")
+        generation = cache.get_generation("u1")
+
+        cache.invalidate_user("u1")  # 读请求进行期间发生写操作
+        cache.set(key, {"success": True, "data": "stale"}, generation=generation)
+
+        assert cache.get(key) is None
+        assert cache.get_stats()["stale_writes_skipped"] == 1
+        cache.set(key, {"success": True}, generation=cache.get_generation("u1"))
+        assert cache.get(key) is not None
+
+    def test_evicted_generations_never_match_again(self):
+        cache = InMemoryResponseCache(default_ttl=10, max_entries=1)
+        generation = cache.get_generation("u1")
+        cache.invalidate_user("u1")
+        cache.invalidate_user("u2")  # u1的代数被淘汰
+
+        assert cache.get_generation("u1") != generation
+
+    def test_zero_ttl_disables_storage(self):
+        cache = InMemoryResponseCache(default_ttl=0)
+        key = build_cache_key("u1", "GET", "tasks/")
+        cache.set(key, {"success": True})
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestClientResponseCache:
+    """客户端读穿透缓存测试"""
+
+    @pytest.fixture
+    def client(self):
+        client = EnhancedTaskMicroserviceClient(
+            base_url="http://localhost:20253",
+            response_cache=InMemoryResponseCache(default_ttl=30)
+        )
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"code": 200, "success": True, "data": []}
+        client._execute_request_with_retry = AsyncMock(return_value=response)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_repeated_list_reads_hit_cache(self, client):
+        user_id = str(uuid4())
+
+        first = await client.call_microservice("GET", "tasks", user_id, params={"page": 1})
+        second = await client.call_microservice("GET", "tasks", user_id, params={"page": 1})
+
+        assert first == second
+        assert client._execute_request_with_retry.await_count == 1
+        assert client.get_cache_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_query_and_get_share_mapped_key(self, client):
+        user_id = str(uuid4())
+
+        await client.call_microservice("GET", "tasks", user_id, params={"page": 1, "page_size": 20})
+        await client.call_microservice("POST", "tasks/query", user_id, data={"page_size": 20, "page": 1})
+
+        assert client._execute_request_with_retry.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_write_requests_are_not_cached(self, client):
+        user_id = str(uuid4())
+
+        await client.call_microservice("POST", "tasks", user_id, data={"title": "t"})
+        await client.call_microservice("POST", "tasks", user_id, data={"title": "t"})
+
+        assert client._execute_request_with_retry.await_count == 2
+        assert client.get_cache_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_responses_are_not_cached(self, client):
+        user_id = str(uuid4())
+        client._execute_request_with_retry.return_value.json.return_value = {
+            "code": 500, "success": False, "message": "error"
+        }
+
+        await client.call_microservice("GET", "tasks", user_id)
+        await client.call_microservice("GET", "tasks", user_id)
+
+        assert client._execute_request_with_retry.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_user_cache_forces_refetch(self, client):
+        user_id = str(uuid4())
+
+        await client.call_microservice("GET", "tasks", user_id)
+        assert client.invalidate_user_cache(user_id) == 1
+        await client.call_microservice("GET", "tasks", user_id)
+
+        assert client._execute_request_with_retry.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self, client):
+        client.cache_enabled = False
+        user_id = str(uuid4())
+
+        await client.call_microservice("GET", "tasks", user_id)
+        await client.call_microservice("GET", "tasks", user_id)
+
+        assert client._execute_request_with_retry.await_count == 2
+        assert client.get_cache_stats()["enabled"] is False
+
+    @pytest.mark.asyncio
+    async def test_write_during_inflight_read_is_not_cached(self, client):
+        user_id = str(uuid4())
+        started = asyncio.Event()
+        release = asyncio.Event()
+        response = client._execute_request_with_retry.return_value
+
+        async def slow_request(**kwargs):
+            started.set()
+            await release.wait()
+            return response
+
+        client._execute_request_with_retry.side_effect = slow_request
+        read = asyncio.create_task(client.call_microservice("GET", "tasks", user_id))
+        await started.wait()
+
+        # 写操作在读请求返回之前完成失效；之后到达的读请求不合并到写之前的上游调用
+        client.invalidate_user_cache(user_id)
+        later_read = asyncio.create_task(client.call_microservice("GET", "tasks", user_id))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(read, later_read)
+
+        assert client._execute_request_with_retry.await_count == 2
+        # 写之前发起的响应被丢弃，写之后发起的响应正常缓存
+        assert client.get_cache_stats()["stale_writes_skipped"] == 1
+        assert client.get_cache_stats()["entries"] == 1
+
+
+class TestChatToolCacheInvalidation:
+    """聊天工具写任务后的缓存失效测试"""
+
+    def test_chat_tool_write_invalidates_user_cache(self):
+        from src.domains.chat.tools.task_crud import delete_task
+
+        user_id = str(uuid4())
+        client = MagicMock()
+        task_service = MagicMock()
+        task_service.delete_task.return_value = {"deleted_task_id": "t1"}
+        context = MagicMock()
+        context.__enter__.return_value = {"task_service": task_service}
+
+        with patch("src.domains.chat.tools.task_crud.get_task_service_context", return_value=context), \
+                patch("src.domains.chat.tools.utils.get_enhanced_task_microservice_client", return_value=client):
+            delete_task.invoke(
+                {"task_id": str(uuid4())},
+                config={"configurable": {"user_id": user_id}}
+            )
+
+        task_service.delete_task.assert_called_once()
+        client.invalidate_user_cache.assert_called_once_with(user_id)